@@ -0,0 +1,20 @@
+"""
+Gunicorn configuration for H743Poten Web Interface
+
+Usage: gunicorn -c gunicorn.conf.py wsgi:application
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('WEB_PORT', 8080)}"
+
+# The serial port, CV measurement service and live data live in the worker
+# process, so exactly one worker must own them. Threads serve concurrent
+# requests, including the long-lived /api/cv/events Server-Sent Event streams
+# (each open stream occupies one thread).
+workers = 1
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 16))
+
+timeout = 120
+keepalive = 5
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Reconcile or rebuild the SQLite session index
+H743Poten Research Team
+
+Usage: python reindex_sessions.py [--rebuild] [--data-dir DIR]
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir / "src"))
+
+from config.settings import Config
+from services.session_index import SessionIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile the session index with data_logs/sessions")
+    parser.add_argument('--rebuild', action='store_true', help="Drop the index and re-read every session")
+    parser.add_argument('--data-dir', default=str(current_dir / "data_logs"))
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    index = SessionIndex(data_dir / Config.SESSION_INDEX_FILE, data_dir / "sessions")
+    try:
+        counts = index.rebuild() if args.rebuild else index.reconcile()
+        totals = index.totals()
+    finally:
+        index.close()
+
+    print(f"Added {counts['added']}, updated {counts['updated']}, removed {counts['removed']}")
+    print(f"{totals['session_count']} sessions, {totals['total_bytes'] / (1024 * 1024):.2f} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
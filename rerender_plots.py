@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Re-render the PNG plots of saved CV sessions
+H743Poten Research Team
+
+Usage: python rerender_plots.py [--preset thumbnail|preview|publication] [SESSION_ID ...]
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir / "src"))
+
+from services.data_logging_service import DataLoggingService
+from services.plot_renderer import DPI_PRESETS, PlotRenderer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-render the PNG plots of saved CV sessions")
+    parser.add_argument('session_ids', nargs='*', help="Sessions to render (default: all)")
+    parser.add_argument('--preset', choices=sorted(DPI_PRESETS), default='publication')
+    parser.add_argument('--data-dir', default=str(current_dir / "data_logs"))
+    parser.add_argument('--processes', type=int, default=None,
+                        help="Rendering processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    renderer = PlotRenderer(processes=args.processes or os.cpu_count() or 1)
+    service = DataLoggingService(args.data_dir, plot_renderer=renderer)
+    try:
+        results = service.rerender_sessions(args.preset, args.session_ids or None)
+    finally:
+        service.shutdown()
+
+    failed = [session_id for session_id, ok in results.items() if not ok]
+    print(f"Rendered {len(results) - len(failed)}/{len(results)} session plots ({args.preset})")
+    for session_id in failed:
+        print(f"  failed: {session_id}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Rolling Window Kernels - Vectorized moving statistics for 1-D signals
+Median, mean, std, min and max over centered windows without per-point Python loops
+
+All kernels work along the last axis, so a 2-D array is a batch of
+equal-length signals processed in one call.
+"""
+
+import numpy as np
+from typing import Callable
+
+# How windows are handled where they would extend past the signal:
+#   'shrink' - truncate the window at the edges (statistic of fewer points)
+#   'keep'   - return the input values unchanged at the edges
+#   'valid'  - return only positions with a full window (length n - size + 1)
+EDGE_MODES = ('shrink', 'keep', 'valid')
+
+# Maximum window elements materialized at once by median/min/max
+_CHUNK_ELEMENTS = 1 << 20
+
+
+def _window_size(window: int) -> int:
+    """Centered windows span window // 2 points on each side"""
+    if window < 1:
+        raise ValueError(f"Window must be at least 1, got {window}")
+    return 2 * (window // 2) + 1
+
+
+def _check_edges(edges: str) -> None:
+    if edges not in EDGE_MODES:
+        raise ValueError(f"Unknown edge mode: {edges}")
+
+
+def _reduce_windows(x: np.ndarray, size: int, reducer: Callable) -> np.ndarray:
+    """Apply ``reducer`` (reducing the last axis) to every full window, in bounded chunks"""
+    windows = np.lib.stride_tricks.sliding_window_view(x, size, axis=-1)
+    positions = windows.shape[-2]
+    rows = max(1, _CHUNK_ELEMENTS // (size * max(1, x[..., 0].size)))
+    if positions <= rows:
+        return reducer(windows)
+    return np.concatenate([reducer(windows[..., i:i + rows, :]) for i in range(0, positions, rows)],
+                          axis=-1)
+
+
+def _rolling(x, window: int, edges: str, reducer: Callable) -> np.ndarray:
+    _check_edges(edges)
+    x = np.asarray(x, dtype=np.float64)
+    n, size = x.shape[-1], _window_size(window)
+    half = size // 2
+
+    if edges == 'valid':
+        return _reduce_windows(x, size, reducer) if n >= size else np.empty(x.shape[:-1] + (0,))
+
+    out = x.copy()
+    if n >= size:
+        out[..., half:n - half] = _reduce_windows(x, size, reducer)
+        edge_indices = list(range(half)) + list(range(n - half, n))
+    else:
+        edge_indices = range(n)
+
+    if edges == 'shrink':
+        # At most 2 * half truncated windows, independent of n
+        for i in edge_indices:
+            out[..., i] = reducer(x[..., max(0, i - half):min(n, i + half + 1)])
+    return out
+
+
+def _window_sums(x: np.ndarray, size: int, edges: str):
+    """Sums and counts per centered window via cumulative sums (O(n))"""
+    n, half = x.shape[-1], size // 2
+    cumulative = np.concatenate([np.zeros(x.shape[:-1] + (1,)), np.cumsum(x, axis=-1)], axis=-1)
+    if edges == 'valid':
+        stop = np.arange(size, n + 1)
+        start = stop - size
+    else:
+        index = np.arange(n)
+        start = np.maximum(index - half, 0)
+        stop = np.minimum(index + half + 1, n)
+    return cumulative[..., stop] - cumulative[..., start], stop - start
+
+
+def _full_window_mask(n: int, size: int) -> np.ndarray:
+    half = size // 2
+    mask = np.zeros(n, dtype=bool)
+    mask[half:n - half] = True
+    return mask
+
+
+def rolling_median(x, window: int, edges: str = 'shrink') -> np.ndarray:
+    """Centered moving median"""
+    return _rolling(x, window, edges, lambda w: np.median(w, axis=-1))
+
+
+def rolling_min(x, window: int, edges: str = 'shrink') -> np.ndarray:
+    """Centered moving minimum"""
+    return _rolling(x, window, edges, lambda w: w.min(axis=-1))
+
+
+def rolling_max(x, window: int, edges: str = 'shrink') -> np.ndarray:
+    """Centered moving maximum"""
+    return _rolling(x, window, edges, lambda w: w.max(axis=-1))
+
+
+def rolling_mean(x, window: int, edges: str = 'shrink') -> np.ndarray:
+    """Centered moving mean, O(n) via cumulative sums"""
+    _check_edges(edges)
+    x = np.asarray(x, dtype=np.float64)
+    size = _window_size(window)
+    n = x.shape[-1]
+    if edges == 'valid' and n < size:
+        return np.empty(x.shape[:-1] + (0,))
+    # Centering first keeps the cumulative sums small
+    offset = x.mean(axis=-1, keepdims=True) if n else 0.0
+    sums, counts = _window_sums(x - offset, size, edges)
+    mean = sums / counts + offset
+    if edges == 'keep':
+        mean = np.where(_full_window_mask(n, size), mean, x)
+    return mean
+
+
+def rolling_std(x, window: int, edges: str = 'shrink') -> np.ndarray:
+    """Centered moving (population) standard deviation, zero at 'keep' edges
+
+    Computed per window rather than from cumulative sums of squares, which
+    lose precision on flat stretches of a large-offset signal.
+    """
+    std = _rolling(x, window, edges, lambda w: w.std(axis=-1))
+    if edges == 'keep':
+        std[..., ~_full_window_mask(std.shape[-1], _window_size(window))] = 0.0
+    return std
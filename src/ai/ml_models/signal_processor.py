@@ -10,12 +10,15 @@ from dataclasses import dataclass
 from datetime import datetime
 import math
 
+from .rolling_window import rolling_median
+
 logger = logging.getLogger(__name__)
 
 # Check for SciPy availability for advanced filtering
 try:
     from scipy import signal, interpolate
     from scipy.ndimage import gaussian_filter1d
+    from .baseline import asymmetric_baseline, asymmetric_baselines
     SCIPY_AVAILABLE = True
 except ImportError:
     SCIPY_AVAILABLE = False
@@ -57,7 +60,8 @@ class SignalProcessor:
         
         self.logger.info("Signal processor initialized")
     
-    def _get_default_config(self) -> Dict[str, Any]:
+    @staticmethod
+    def _get_default_config() -> Dict[str, Any]:
         """Default configuration for signal processing"""
         return {
             # Filtering parameters
@@ -71,6 +75,10 @@ class SignalProcessor:
             'baseline_method': 'polynomial',  # 'polynomial', 'linear', 'asymmetric'
             'baseline_order': 2,         # Polynomial order for baseline fitting
             'baseline_lambda': 1e4,      # Smoothing parameter for asymmetric baseline
+            'baseline_variant': 'arpls', # Asymmetric baseline weighting: 'asls' or 'arpls'
+            'baseline_asymmetry': 0.01,  # AsLS weight of points above the baseline
+            'baseline_max_iter': 50,     # Reweighting iterations for asymmetric baseline
+            'baseline_tol': 1e-3,        # Relative weight change that ends reweighting
             
             # Noise analysis
             'noise_estimation_method': 'mad',  # 'std', 'mad', 'percentile'
@@ -536,15 +544,8 @@ class SignalProcessor:
                 filtered = medfilt(signal, kernel_size)
                 return filtered
             else:
-                # Simple median filter implementation
-                filtered = np.copy(signal)
-                half_window = kernel_size // 2
-                
-                for i in range(half_window, len(signal) - half_window):
-                    window = signal[i - half_window:i + half_window + 1]
-                    filtered[i] = np.median(window)
-                
-                return filtered
+                # Vectorized median, edge samples left unfiltered
+                return rolling_median(signal, kernel_size, edges='keep')
                 
         except Exception as e:
             self.logger.warning(f"Median filter failed: {e}")
@@ -668,35 +669,54 @@ class SignalProcessor:
         baseline = np.polyval(coeffs, x)
         return baseline
     
+    def _asymmetric_baseline_params(self) -> Dict[str, Any]:
+        defaults = self._get_default_config()
+        return {
+            'lam': self.config.get('baseline_lambda', defaults['baseline_lambda']),
+            'variant': self.config.get('baseline_variant', defaults['baseline_variant']),
+            'p': self.config.get('baseline_asymmetry', defaults['baseline_asymmetry']),
+            'max_iter': self.config.get('baseline_max_iter', defaults['baseline_max_iter']),
+            'tol': self.config.get('baseline_tol', defaults['baseline_tol']),
+        }
+    
     def _asymmetric_baseline(self, signal: np.ndarray) -> np.ndarray:
-        """Asymmetric least squares baseline correction (simplified version)"""
+        """Asymmetric least squares (AsLS/arPLS) baseline correction"""
         try:
-            # This is a simplified version - full ALS requires more complex implementation
-            # For now, use weighted polynomial fitting
-            
-            n = len(signal)
-            x = np.arange(n)
-            
-            # Initial baseline estimate
-            baseline = self._polynomial_baseline(signal, 2)
-            
-            # Iteratively reweight based on residuals
-            for _ in range(3):  # Limited iterations for performance
-                residuals = signal - baseline
-                
-                # Higher weight for negative residuals (baseline should be below signal)
-                weights = np.where(residuals >= 0, 0.01, 1.0)
-                
-                # Weighted polynomial fit
-                coeffs = np.polyfit(x, signal, 2, w=weights)
-                baseline = np.polyval(coeffs, x)
-            
-            return baseline
+            if SCIPY_AVAILABLE:
+                return asymmetric_baseline(signal, **self._asymmetric_baseline_params())
+            return self._weighted_polynomial_baseline(signal)
             
         except Exception as e:
             self.logger.warning(f"Asymmetric baseline failed: {e}")
             return self._polynomial_baseline(signal)
     
+    def _weighted_polynomial_baseline(self, signal: np.ndarray) -> np.ndarray:
+        """Asymmetrically reweighted quadratic baseline (fallback without SciPy)"""
+        x = np.arange(len(signal))
+        baseline = self._polynomial_baseline(signal, 2)
+        
+        for _ in range(3):
+            residuals = signal - baseline
+            # Higher weight for negative residuals (baseline should be below signal)
+            weights = np.where(residuals >= 0, 0.01, 1.0)
+            coeffs = np.polyfit(x, signal, 2, w=weights)
+            baseline = np.polyval(coeffs, x)
+        
+        return baseline
+    
+    def correct_baselines(self, currents: List[np.ndarray]) -> List[np.ndarray]:
+        """
+        Asymmetric baseline correction of many curves
+        
+        Curves of the same length share one solver. Curves must be free of
+        NaN; use correct_baseline for single curves with missing points.
+        """
+        if not SCIPY_AVAILABLE:
+            return [np.asarray(c, dtype=float) - self._weighted_polynomial_baseline(np.asarray(c, dtype=float))
+                    for c in currents]
+        baselines = asymmetric_baselines(currents, **self._asymmetric_baseline_params())
+        return [np.asarray(c, dtype=float) - b for c, b in zip(currents, baselines)]
+    
     def get_processing_summary(self) -> Dict[str, Any]:
         """Get summary of signal processing operations"""
         return {
@@ -706,6 +726,121 @@ class SignalProcessor:
             'config': self.config,
             'last_quality_score': self.quality_assessments[-1].quality_score if self.quality_assessments else None
         }
+    
+    def create_stream(self, filter_type: str = 'lowpass', sampling_rate: float = 1000.0,
+                      **filter_params) -> 'StreamingSignalProcessor':
+        """Create a stateful chunk-by-chunk filter using this processor's config"""
+        return StreamingSignalProcessor(filter_type, sampling_rate, self.config, **filter_params)
+
+class StreamingSignalProcessor:
+    """
+    Stateful filtering of live data, one chunk at a time
+    
+    Filter state is carried between push() calls: Butterworth sections keep
+    their zi, window filters keep the last window-1 samples. Each new sample
+    costs O(1) however much data came before, and the output does not depend
+    on how the stream is split into chunks. All filters are causal: the
+    Savitzky-Golay fit is evaluated at the newest sample of its window.
+    """
+    
+    FILTER_TYPES = ('lowpass', 'savgol', 'median', 'moving_average')
+    
+    def __init__(self, filter_type: str = 'lowpass', sampling_rate: float = 1000.0,
+                 processor_config: Optional[Dict[str, Any]] = None, **filter_params):
+        """
+        Args:
+            filter_type: 'lowpass', 'savgol', 'median' or 'moving_average'
+            sampling_rate: Sampling rate in Hz (sets the low-pass cutoff)
+            processor_config: SignalProcessor config for default parameters
+            **filter_params: cutoff/order (lowpass), window/order (savgol),
+                kernel_size (median), window (moving_average)
+        """
+        if filter_type not in self.FILTER_TYPES:
+            raise ValueError(f"Unknown streaming filter type: {filter_type}")
+        
+        self.config = processor_config or SignalProcessor._get_default_config()
+        self.filter_type = filter_type
+        self.sampling_rate = sampling_rate
+        self.parameters = dict(filter_params)
+        
+        self._sos = None
+        self._coeffs = None
+        self.window = 1
+        
+        if filter_type == 'lowpass' and SCIPY_AVAILABLE:
+            cutoff = filter_params.get('cutoff') or self.config['low_pass_cutoff']
+            order = filter_params.get('order', 4)
+            normalized_cutoff = min(cutoff / (0.5 * sampling_rate), 0.99)
+            self._sos = signal.butter(order, normalized_cutoff, btype='low', output='sos')
+        elif filter_type == 'median':
+            self.window = self._odd_window(filter_params.get('kernel_size', 3))
+        elif filter_type == 'savgol' and SCIPY_AVAILABLE:
+            self.window = self._odd_window(filter_params.get('window') or self.config['savgol_window'])
+            order = min(filter_params.get('order') or self.config['savgol_order'], self.window - 1)
+            self._coeffs = signal.savgol_coeffs(self.window, order, pos=self.window - 1, use='dot')
+        else:
+            # moving_average, and the fallback for lowpass/savgol without SciPy
+            self.window = self._odd_window(filter_params.get('window') or self.config['savgol_window'])
+            self._coeffs = np.full(self.window, 1.0 / self.window)
+        
+        self.reset()
+    
+    @staticmethod
+    def _odd_window(window: int) -> int:
+        window = max(3, int(window))
+        return window if window % 2 else window + 1
+    
+    def reset(self) -> None:
+        """Forget all state, e.g. when a new measurement starts"""
+        self._zi = None
+        self._history = None
+        self._last_valid = None
+        self.samples_processed = 0
+    
+    def push(self, chunk: np.ndarray) -> np.ndarray:
+        """
+        Filter the next chunk of samples
+        
+        Returns an array of the same length. Non-finite samples come back as
+        NaN and are bridged with the last valid value, so they do not
+        disturb the filter state.
+        """
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if not len(chunk):
+            return chunk.copy()
+        
+        valid = np.isfinite(chunk)
+        if not valid.all():
+            if not valid.any() and self._last_valid is None:
+                return np.full(len(chunk), np.nan)
+            # Forward-fill invalid samples from the last valid one
+            last = np.maximum.accumulate(np.where(valid, np.arange(len(chunk)), -1))
+            fill = self._last_valid if self._last_valid is not None else chunk[valid][0]
+            chunk = np.where(last >= 0, chunk[np.maximum(last, 0)], fill)
+        
+        filtered = self._filter(chunk)
+        filtered[~valid] = np.nan
+        self._last_valid = float(chunk[-1])
+        self.samples_processed += len(chunk)
+        return filtered
+    
+    def _filter(self, chunk: np.ndarray) -> np.ndarray:
+        if self._sos is not None:
+            if self._zi is None:
+                # Start in steady state at the first sample to avoid a step transient
+                self._zi = signal.sosfilt_zi(self._sos) * chunk[0]
+            filtered, self._zi = signal.sosfilt(self._sos, chunk, zi=self._zi)
+            return filtered
+        
+        if self._history is None:
+            self._history = np.full(self.window - 1, chunk[0])
+        extended = np.concatenate([self._history, chunk])
+        windows = np.lib.stride_tricks.sliding_window_view(extended, self.window)
+        self._history = extended[-(self.window - 1):].copy()
+        
+        if self.filter_type == 'median':
+            return np.median(windows, axis=1)
+        return windows @ self._coeffs
 
 # Demo function
 def demo_signal_processing():
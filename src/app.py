@@ -17,40 +17,54 @@ from pathlib import Path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 try:
-    # Try relative imports first (when run as module)
-    from .config.settings import Config
-    from .hardware import SCPIHandler
-    from .services.measurement_service import MeasurementService
-    from .services.data_service import DataService
-    from .services.cv_measurement_service import CVMeasurementService
-    from .services.data_logging_service import DataLoggingService
-    from .routes import ai_bp, port_bp
-    from .routes.cv_routes import cv_bp
-    from .routes.data_logging_routes import data_logging_bp
-    from .routes.workflow_routes import workflow_bp
-    from .routes.preview_data import preview_bp
-    from .routes.workflow_api import workflow_api_bp
-    from .routes.peak_detection import peak_detection_bp
+    from .services.lazy_imports import StartupImportTimer, import_report, record_startup, start_warmup
 except ImportError:
-    # Fall back to absolute imports (when run directly)
-    from config.settings import Config
-    from hardware import SCPIHandler
-    from services.measurement_service import MeasurementService
-    from services.data_service import DataService
-    from services.cv_measurement_service import CVMeasurementService
-    from services.data_logging_service import DataLoggingService
-    from routes import ai_bp, port_bp
-    from routes.cv_routes import cv_bp
-    from routes.data_logging_routes import data_logging_bp
-    from routes.workflow_routes import workflow_bp
-    from routes.preview_data import preview_bp
-    from routes.workflow_api import workflow_api_bp
-    from routes.peak_detection import peak_detection_bp
+    from services.lazy_imports import StartupImportTimer, import_report, record_startup, start_warmup
+
+# Per-import costs of the app's own imports, reported on /debug
+with StartupImportTimer(package=__package__):
+    try:
+        # Try relative imports first (when run as module)
+        from .config.settings import Config
+        from .hardware import SCPIHandler
+        from .services.measurement_service import MeasurementService
+        from .services.data_service import DataService
+        from .services.cv_measurement_service import CVMeasurementService
+        from .services.cv_event_stream import CVEventBroker
+        from .services.data_logging_service import DataLoggingService
+        from .services.result_cache import ResultCache
+        from .services.peak_batch import PeakBatchRunner
+        from .routes import ai_bp, port_bp
+        from .routes.cv_routes import cv_bp
+        from .routes.data_logging_routes import data_logging_bp
+        from .routes.workflow_routes import workflow_bp
+        from .routes.preview_data import preview_bp
+        from .routes.workflow_api import workflow_api_bp
+        from .routes.peak_detection import peak_detection_bp
+    except ImportError:
+        # Fall back to absolute imports (when run directly)
+        from config.settings import Config
+        from hardware import SCPIHandler
+        from services.measurement_service import MeasurementService
+        from services.data_service import DataService
+        from services.cv_measurement_service import CVMeasurementService
+        from services.cv_event_stream import CVEventBroker
+        from services.data_logging_service import DataLoggingService
+        from services.result_cache import ResultCache
+        from services.peak_batch import PeakBatchRunner
+        from routes import ai_bp, port_bp
+        from routes.cv_routes import cv_bp
+        from routes.data_logging_routes import data_logging_bp
+        from routes.workflow_routes import workflow_bp
+        from routes.preview_data import preview_bp
+        from routes.workflow_api import workflow_api_bp
+        from routes.peak_detection import peak_detection_bp
 
 logger = logging.getLogger(__name__)
 
 def create_app():
     """Create and configure Flask application"""
+    started = time.perf_counter()
     
     # Set up paths
     current_dir = Path(__file__).parent.resolve()
@@ -85,19 +99,28 @@ def create_app():
     # Initialize services
     scpi_handler = SCPIHandler()
     measurement_service = MeasurementService(scpi_handler)
-    data_service = DataService()
+    data_service = DataService(
+        spill_dir=Config.MEASUREMENT_SPILL_DIR if Config.MEASUREMENT_STORAGE_MODE == 'ring' else None)
     cv_service = CVMeasurementService(scpi_handler)
+    cv_event_broker = CVEventBroker(cv_service)
     
     # Initialize data logging service with correct path
     data_logs_path = project_root / "data_logs"
     data_logging_service = DataLoggingService(str(data_logs_path))
     
+    # Shared by the peak detection and AI peak analysis routes
+    peak_cache = ResultCache(Config.PEAK_CACHE_MAX_BYTES)
+    peak_batch_runner = PeakBatchRunner()
+    
     # Store services in application context
     app.config['scpi_handler'] = scpi_handler
     app.config['measurement_service'] = measurement_service
     app.config['data_service'] = data_service
     app.config['cv_service'] = cv_service
+    app.config['cv_event_broker'] = cv_event_broker
     app.config['data_logging_service'] = data_logging_service
+    app.config['peak_cache'] = peak_cache
+    app.config['peak_batch_runner'] = peak_batch_runner
     
     # Register blueprints
     app.register_blueprint(ai_bp)
@@ -151,7 +174,8 @@ def create_app():
             'config': {
                 'DEBUG': app.debug,
                 'TESTING': app.testing
-            }
+            },
+            'startup': import_report()
         })
     
     @app.route('/')
@@ -219,6 +243,30 @@ def create_app():
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 500
     
+    @app.route('/api/connection/stream-format', methods=['GET', 'POST'])
+    def stream_format():
+        """Get or negotiate the measurement data stream format (ascii/binary)"""
+        try:
+            scpi_handler = app.config['scpi_handler']
+            if request.method == 'POST':
+                if not scpi_handler.is_connected:
+                    return jsonify({'success': False, 'error': 'Device not connected'}), 400
+                data = request.get_json() or {}
+                binary = data.get('format', 'ascii').lower() == 'binary'
+                success = scpi_handler.set_stream_format(binary=binary)
+                return jsonify({
+                    'success': success,
+                    'format': 'binary' if scpi_handler.binary_mode else 'ascii',
+                    'stats': scpi_handler.get_stream_stats()
+                })
+            
+            return jsonify({
+                'format': 'binary' if scpi_handler.binary_mode else 'ascii',
+                'stats': scpi_handler.get_stream_stats()
+            })
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+    
     @app.route('/api/connection/disconnect', methods=['POST'])
     def disconnect_device():
         """Disconnect from device"""
@@ -299,10 +347,10 @@ def create_app():
     def export_data():
         """Export measurement data as CSV"""
         try:
-            # Get current data
-            data = app.config['data_service'].get_current_data()
+            # Get all session data, including points spilled to disk
+            points = app.config['data_service'].get_points()
             
-            if not data['points']:
+            if not points:
                 return jsonify({'error': 'No data to export'}), 400
             
             # Create CSV in memory
@@ -313,7 +361,7 @@ def create_app():
             writer.writerow(['Timestamp', 'Voltage (V)', 'Current (A)', 'Mode'])
             
             # Write data
-            for point in data['points']:
+            for point in points:
                 writer.writerow([
                     point['timestamp'],
                     point['voltage'],
@@ -540,6 +588,12 @@ def create_app():
             logger.error(f"Failed to seek CSV emulation: {e}")
             return jsonify({'success': False, 'error': str(e)}), 500
     
+    record_startup('create_app', time.perf_counter() - started)
+    
+    # Load the deferred heavy modules before the first requests need them
+    if Config.LAZY_IMPORT_WARMUP:
+        start_warmup(delay=Config.LAZY_IMPORT_WARMUP_DELAY)
+    
     return app
 
 if __name__ == "__main__":
@@ -2,6 +2,10 @@
 Configuration settings for H743Poten Web Application
 """
 
+import os
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 class Config:
     # Web server settings
     WEB_HOST = '0.0.0.0'
@@ -17,6 +21,59 @@ class Config:
         SERIAL_PORT = '/dev/ttyACM0'  # Default for Linux/RPi
     BAUD_RATE = 115200
 
+    # Serial reader thread settings
+    SERIAL_LINE_QUEUE_SIZE = 100000   # Max framed lines buffered per channel
+    SERIAL_RESPONSE_TIMEOUT = 1.0     # Seconds to wait for a query response
+    SERIAL_BINARY_STREAM = False      # Negotiate binary CV records on connect (falls back to ASCII)
+
+    # Live CV event stream (Server-Sent Events) settings
+    CV_EVENT_FRAME_RATE = 20              # Max data frames per second per client
+    CV_EVENT_STATUS_INTERVAL = 1.0        # Seconds between periodic status frames
+    CV_EVENT_KEEPALIVE = 15.0             # Seconds of silence before a keepalive comment
+    CV_EVENT_MAX_POINTS_PER_FRAME = 5000  # Larger backlogs are split across frames
+
+    # Live peak detection during CV acquisition (LivePeakDetector)
+    LIVE_PEAK_DETECTION = True
+    LIVE_PEAK_SMOOTHING = 5           # Span (points) of the causal exponential smoothing
+    LIVE_PEAK_THRESHOLD = 0.05        # Rise/fall needed to confirm a peak, as a fraction of the current range
+
+    # Measurement storage: 'memory' keeps every CV point in RAM, 'ring' keeps the
+    # newest CV_RING_SIZE points in RAM and spills older ones to MEASUREMENT_SPILL_DIR.
+    # In ring mode DataService also spills instead of truncating to its max_points.
+    MEASUREMENT_STORAGE_MODE = 'memory'
+    CV_RING_SIZE = 100000             # Points kept in memory in ring mode
+    CV_SPILL_CHUNK = 10000            # Points written to disk per spill
+    MEASUREMENT_SPILL_DIR = os.path.join(_PROJECT_ROOT, 'data_logs', 'spill')
+
+    # Asynchronous session saving (DataLoggingService)
+    SAVE_WORKERS = 2                  # Threads writing CSV and metadata
+    SAVE_JOB_HISTORY = 200            # Finished save jobs kept for status queries
+    SESSION_FORMAT = 'npz'            # Session data files: 'npz' (CSV exported on demand), 'csv' or 'both'
+    SESSION_STREAM_CHUNK = 10000      # Rows per chunk when streaming session data
+    SESSION_INDEX_FILE = 'sessions.db'          # SQLite session index, in the data directory
+    SESSION_INDEX_RECONCILE_ON_START = True     # Pick up sessions changed outside the app
+
+    # Plot rendering (PlotRenderer)
+    PLOT_PROCESSES = 1                # Rendering worker processes (0 renders in-process)
+    PLOT_RENDER_NICENESS = 10         # Niceness of the rendering processes
+    PLOT_MAX_POINTS = 5000            # Points per plot after min/max decimation
+
+    # Peak detection result cache, keyed on a hash of the input arrays and settings
+    PEAK_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+    # Batch peak detection (PeakBatchRunner)
+    PEAK_BATCH_PROCESSES = max(1, (os.cpu_count() or 2) - 1)  # Worker processes (0 runs in-process)
+    PEAK_BATCH_NICENESS = 5           # Niceness of the worker processes
+    PEAK_BATCH_MAX_CURVES = 500       # Curves accepted per batch request
+    PEAK_BATCH_FILE_ROOTS = (         # File references are resolved inside these directories only
+        os.path.join(_PROJECT_ROOT, 'temp_data'),   # Uploaded files
+        os.path.join(_PROJECT_ROOT, 'data_logs'),   # Saved sessions
+    )
+
+    # Heavy scientific modules (SciPy, pandas, matplotlib, AI models) load on first use
+    LAZY_IMPORT_WARMUP = True         # Load them in a background thread once the app is up
+    LAZY_IMPORT_WARMUP_DELAY = 2.0    # Seconds to wait before the warm-up starts
+
     # Default measurement parameters
     DEFAULT_PARAMS = {
         'CV': {
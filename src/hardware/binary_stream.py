@@ -0,0 +1,169 @@
+"""
+Binary CV stream decoding for H743Poten
+Fixed-size little-endian records sent by the STM32 in binary stream mode
+"""
+
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# SCPI negotiation (see STM32_SCPI_Commands.md)
+BINARY_FORMAT_COMMAND = 'POTEn:STReam:FORMat BINary'
+ASCII_FORMAT_COMMAND = 'POTEn:STReam:FORMat ASCii'
+FORMAT_QUERY = 'POTEn:STReam:FORMat?'
+
+SYNC_WORD = 0xA55A
+SYNC_BYTES = SYNC_WORD.to_bytes(2, 'little')
+
+# 20-byte record; crc is CRC-16/CCITT-FALSE over bytes 2..17 (seq through cycle)
+RECORD_DTYPE = np.dtype([
+    ('sync', '<u2'),
+    ('seq', '<u2'),
+    ('time_ms', '<u4'),
+    ('potential', '<f4'),
+    ('current', '<f4'),
+    ('cycle', '<u2'),
+    ('crc', '<u2'),
+])
+RECORD_SIZE = RECORD_DTYPE.itemsize
+CRC_START, CRC_END = 2, RECORD_SIZE - 2
+
+
+def _make_crc_table():
+    table = np.zeros(256, dtype=np.uint16)
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table[byte] = crc & 0xFFFF
+    return table
+
+
+_CRC_TABLE = _make_crc_table()
+
+
+def crc16_ccitt(data: bytes) -> int:
+    """CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF) of a byte string"""
+    crc = 0xFFFF
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ int(_CRC_TABLE[((crc >> 8) ^ byte) & 0xFF])
+    return crc
+
+
+def crc16_records(raw: np.ndarray) -> np.ndarray:
+    """CRC of every record at once; ``raw`` is an (n, RECORD_SIZE) uint8 array"""
+    crc = np.full(len(raw), 0xFFFF, dtype=np.uint16)
+    for column in range(CRC_START, CRC_END):
+        crc = (crc << 8) ^ _CRC_TABLE[(crc >> 8) ^ raw[:, column]]
+    return crc
+
+
+def encode_records(seq, time_ms, potential, current, cycle) -> bytes:
+    """Build binary records (device side format; used for tests and emulation)"""
+    records = np.zeros(len(potential), dtype=RECORD_DTYPE)
+    records['sync'] = SYNC_WORD
+    records['seq'] = np.asarray(seq) & 0xFFFF
+    records['time_ms'] = time_ms
+    records['potential'] = potential
+    records['current'] = current
+    records['cycle'] = cycle
+    raw = records.view(np.uint8).reshape(-1, RECORD_SIZE)
+    records['crc'] = crc16_records(raw)
+    return records.tobytes()
+
+
+class BinaryStreamDecoder:
+    """Incremental decoder for a byte stream of records mixed with ASCII text
+
+    Records are located by their sync word and accepted only if the CRC
+    matches. Bytes outside records (SCPI responses, completion messages) are
+    returned as text. Lost frames are counted from sequence-number gaps.
+    """
+
+    def __init__(self):
+        self._pending = bytearray()
+        self._last_seq = None
+        self.frames_received = 0
+        self.frames_lost = 0
+        self.crc_errors = 0
+
+    def reset(self):
+        self._pending.clear()
+        self._last_seq = None
+
+    def stats(self):
+        return {
+            'frames_received': self.frames_received,
+            'frames_lost': self.frames_lost,
+            'crc_errors': self.crc_errors
+        }
+
+    def feed(self, chunk: bytes):
+        """Add received bytes
+
+        Returns:
+            (records, text) where records is a RECORD_DTYPE array of the
+            complete valid records and text holds the non-record bytes.
+        """
+        # Immutable snapshot, so record arrays can be views of it
+        buf = bytes(self._pending) + chunk if self._pending else bytes(chunk)
+        batches = []
+        text = bytearray()
+        pos = 0
+
+        while True:
+            sync = buf.find(SYNC_BYTES, pos)
+            if sync < 0:
+                # Keep a trailing first sync byte; everything else is text
+                keep = len(buf) - 1 if buf.endswith(SYNC_BYTES[:1]) else len(buf)
+                text.extend(buf[pos:keep])
+                pos = keep
+                break
+
+            text.extend(buf[pos:sync])
+            available = (len(buf) - sync) // RECORD_SIZE
+            if available == 0:
+                pos = sync
+                break
+
+            # Fast path: a run of back-to-back records decoded with one frombuffer
+            raw = np.frombuffer(buf, dtype=np.uint8, count=available * RECORD_SIZE,
+                                offset=sync).reshape(available, RECORD_SIZE)
+            records = raw.view(RECORD_DTYPE).reshape(available)
+            valid = (records['sync'] == SYNC_WORD) & (crc16_records(raw) == records['crc'])
+            run = available if valid.all() else int(np.argmin(valid))
+
+            if run:
+                batches.append(records[:run])
+                pos = sync + run * RECORD_SIZE
+            else:
+                # Corrupt record or a stray sync pattern: drop its bytes rather
+                # than passing them on as text, resyncing at the next sync word
+                # inside the record span if there is one
+                self.crc_errors += 1
+                end = sync + RECORD_SIZE
+                next_sync = buf.find(SYNC_BYTES, sync + 1, end + 1)
+                pos = next_sync if next_sync >= 0 else end
+
+        self._pending = bytearray(buf[pos:])
+
+        if not batches:
+            return np.empty(0, dtype=RECORD_DTYPE), bytes(text)
+
+        records = np.concatenate(batches) if len(batches) > 1 else batches[0]
+        self._count_gaps(records['seq'])
+        self.frames_received += len(records)
+        return records, bytes(text)
+
+    def _count_gaps(self, seq: np.ndarray):
+        """Count frames missing from the sequence numbers (16-bit wraparound)"""
+        seq = seq.astype(np.int64)
+        if self._last_seq is not None:
+            seq = np.concatenate([[self._last_seq], seq])
+        steps = np.diff(seq) % 0x10000
+        lost = int(np.sum(steps[steps > 1] - 1))
+        if lost:
+            self.frames_lost += lost
+            logger.warning(f"Binary stream: {lost} frames lost (sequence gap)")
+        self._last_seq = int(seq[-1])
@@ -5,6 +5,8 @@ Handles serial communication with STM32H743 device
 
 import serial
 import logging
+import queue
+import threading
 import time
 import sys
 import os
@@ -12,15 +14,27 @@ import os
 # Add the parent directory to the Python path to handle imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+import numpy as np
+
 try:
     # Try relative imports first (when run as module)
     from ..config.settings import Config
+    from .binary_stream import (BinaryStreamDecoder, RECORD_DTYPE, BINARY_FORMAT_COMMAND,
+                                ASCII_FORMAT_COMMAND, FORMAT_QUERY)
+    from ..services.cv_line_parser import COMPLETION_SIGNALS
 except ImportError:
     # Fall back to absolute imports (when run directly)
     from config.settings import Config
+    from hardware.binary_stream import (BinaryStreamDecoder, RECORD_DTYPE, BINARY_FORMAT_COMMAND,
+                                        ASCII_FORMAT_COMMAND, FORMAT_QUERY)
+    from services.cv_line_parser import COMPLETION_SIGNALS
 
 logger = logging.getLogger(__name__)
 
+# Prefixes of unsolicited measurement data lines sent by the STM32
+DATA_LINE_PREFIXES = ('CV,', 'CV ')
+ERROR_LINE_PREFIX = '**ERROR'
+
 class SCPIHandler:
     def __init__(self, port=None, baud_rate=None):
         self.port = port or Config.SERIAL_PORT
@@ -29,6 +43,21 @@ class SCPIHandler:
         self.is_connected = False
         self.data_buffer = []  # Buffer for incoming CV data
 
+        # Background reader: frames '\n'-terminated lines into two channels
+        self.data_queue = queue.Queue(maxsize=Config.SERIAL_LINE_QUEUE_SIZE)
+        self.response_queue = queue.Queue(maxsize=Config.SERIAL_LINE_QUEUE_SIZE)
+        self.dropped_lines = 0
+        self._data_event = threading.Event()  # Set when either data channel gets new items
+        self._reader_thread = None
+        self._reader_running = False
+        self._awaiting_response = threading.Event()
+        self._command_lock = threading.Lock()
+
+        # Optional binary record streaming, negotiated with set_stream_format()
+        self.binary_mode = False
+        self.record_queue = queue.Queue(maxsize=Config.SERIAL_LINE_QUEUE_SIZE)
+        self._decoder = BinaryStreamDecoder()
+
     def connect(self):
         """Connect to the device"""
         try:
@@ -61,7 +90,10 @@ class SCPIHandler:
                         timeout=1
                     )
                     self.is_connected = True
+                    self.start_reader()
                     logger.info(f"Connected to {self.port} at {self.baud_rate} baud")
+                    if Config.SERIAL_BINARY_STREAM:
+                        self.set_stream_format(binary=True)
                     return True
                 except Exception as e:
                     if attempt < max_retries - 1:
@@ -78,6 +110,11 @@ class SCPIHandler:
     def disconnect(self):
         """Disconnect from the device"""
         try:
+            if self.binary_mode:
+                # Leave the device in its default ASCII mode for the next session
+                self.set_stream_format(binary=False)
+            self.stop_reader()
+
             if self.serial and self.serial.is_open:
                 # Flush buffers before closing
                 self.serial.reset_input_buffer()
@@ -113,12 +150,9 @@ class SCPIHandler:
             if not command.endswith('\n'):
                 command += '\n'
 
-            # Send command
-            self.serial.write(command.encode())
-            
             # Read response if command ends with '?'
             if '?' in command:
-                response = self.serial.readline().decode().strip()
+                response = self._send_and_wait_response(command)
                 return {
                     'success': True,
                     'command': command.strip(),
@@ -126,6 +160,9 @@ class SCPIHandler:
                     'error': None
                 }
             
+            # Send command
+            self.serial.write(command.encode())
+
             return {
                 'success': True,
                 'command': command.strip(),
@@ -142,6 +179,77 @@ class SCPIHandler:
                 'error': str(e)
             }
 
+    def _send_and_wait_response(self, command):
+        """Write a query and return its response line"""
+        if not self.is_reader_running():
+            self.serial.write(command.encode())
+            return self.serial.readline().decode().strip()
+
+        with self._command_lock:
+            # Discard stale responses left over from earlier commands
+            self._drain(self.response_queue)
+            self._awaiting_response.set()
+            try:
+                self.serial.write(command.encode())
+                return self.response_queue.get(timeout=Config.SERIAL_RESPONSE_TIMEOUT)
+            except queue.Empty:
+                raise TimeoutError(f"No response to '{command.strip()}' "
+                                   f"within {Config.SERIAL_RESPONSE_TIMEOUT}s")
+            finally:
+                self._awaiting_response.clear()
+
+    def set_stream_format(self, binary=True):
+        """Negotiate binary or ASCII measurement data streaming
+
+        Binary mode is only enabled when the device confirms it through the
+        format query; firmware without binary support answers with an error
+        and the stream stays ASCII.
+
+        The reader splits off binary records for the whole switch, since the
+        device may send records before its reply to the format query (or
+        after the ASCII command was written). Text passes through the decoder
+        unchanged, so this is safe while the device still sends ASCII.
+
+        Returns:
+            True if the requested format is active
+        """
+        if not binary:
+            if self.is_connected and self.serial:
+                self.send_custom_command(ASCII_FORMAT_COMMAND)
+                try:
+                    # Any reply means the device has processed the switch
+                    self.query(FORMAT_QUERY)
+                except Exception as e:
+                    logger.warning(f"ASCII stream confirmation failed: {e}")
+            self.binary_mode = False
+            return True
+
+        self._decoder.reset()
+        self.binary_mode = True
+        response = None
+        try:
+            result = self.send_custom_command(BINARY_FORMAT_COMMAND)
+            if result['success']:
+                response = self.query(FORMAT_QUERY)
+        except Exception as e:
+            logger.warning(f"Binary stream negotiation failed: {e}")
+
+        if response and response.strip().upper().startswith('BIN'):
+            logger.info("Binary measurement streaming enabled")
+            return True
+
+        logger.info(f"Device does not support binary streaming ({response!r}), using ASCII")
+        self.binary_mode = False
+        return False
+
+    def get_stream_stats(self):
+        """Get reader counters, including binary frame loss and CRC errors"""
+        return {
+            'binary_mode': self.binary_mode,
+            'dropped_lines': self.dropped_lines,
+            **self._decoder.stats()
+        }
+
     def query(self, command):
         """Send a query command and return the response"""
         result = self.send_custom_command(command)
@@ -149,11 +257,173 @@ class SCPIHandler:
             return result['response']
         raise Exception(result['error'])
     
+    def start_reader(self):
+        """Start the background thread that continuously reads the serial port"""
+        if self.is_reader_running():
+            return
+        self._drain(self.data_queue)
+        self._drain(self.response_queue)
+        self._drain(self.record_queue)
+        self._decoder.reset()
+        self._reader_running = True
+        self._reader_thread = threading.Thread(
+            target=self._reader_worker,
+            name='scpi-reader',
+            daemon=True
+        )
+        self._reader_thread.start()
+
+    def stop_reader(self):
+        """Stop the background reader thread"""
+        self._reader_running = False
+        if (self._reader_thread and self._reader_thread.is_alive()
+                and self._reader_thread is not threading.current_thread()):
+            self._reader_thread.join(timeout=2.0)
+        self._reader_thread = None
+
+    def is_reader_running(self):
+        """Check whether the background reader thread is active"""
+        return bool(self._reader_running and self._reader_thread
+                    and self._reader_thread.is_alive())
+
+    def read_lines(self, timeout=None, max_lines=None):
+        """Get complete data lines from the device
+
+        Blocks up to ``timeout`` seconds (forever if None) for the first line,
+        then returns every further line already queued, up to ``max_lines``.
+        Returns an empty list on timeout.
+        """
+        try:
+            lines = [self.data_queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+
+        while max_lines is None or len(lines) < max_lines:
+            try:
+                lines.append(self.data_queue.get_nowait())
+            except queue.Empty:
+                break
+        return lines
+
+    def read_stream(self, timeout=None):
+        """Get binary records and text lines received since the last call
+
+        Blocks up to ``timeout`` seconds (forever if None) until either channel
+        has data. In ASCII mode the record array is always empty.
+
+        Returns:
+            (records, lines): RECORD_DTYPE array and list of text lines
+        """
+        if self.data_queue.empty() and self.record_queue.empty():
+            self._data_event.wait(timeout)
+        self._data_event.clear()
+
+        batches = []
+        while True:
+            try:
+                batches.append(self.record_queue.get_nowait())
+            except queue.Empty:
+                break
+        lines = self.read_lines(timeout=0)
+
+        if not batches:
+            records = np.empty(0, dtype=RECORD_DTYPE)
+        else:
+            records = batches[0] if len(batches) == 1 else np.concatenate(batches)
+        return records, lines
+
+    def _reader_worker(self):
+        """Read raw bytes and frame them into complete lines"""
+        logger.info("Serial reader thread started")
+        pending = bytearray()
+
+        try:
+            while self._reader_running:
+                ser = self.serial
+                if not ser or not ser.is_open:
+                    break
+
+                # Block for the first byte, then take whatever else is waiting
+                chunk = ser.read(max(1, ser.in_waiting))
+                if not chunk:
+                    continue
+
+                if self.binary_mode:
+                    # Split off binary records; the rest is ASCII text
+                    records, chunk = self._decoder.feed(chunk)
+                    if len(records):
+                        self._put(self.record_queue, records)
+
+                pending.extend(chunk)
+                start = 0
+                while True:
+                    end = pending.find(b'\n', start)
+                    if end < 0:
+                        break
+                    line = pending[start:end].decode('utf-8', errors='ignore').strip()
+                    start = end + 1
+                    if line:
+                        self._route_line(line)
+                del pending[:start]
+
+        except Exception as e:
+            if self._reader_running:
+                logger.error(f"Serial reader error: {e}")
+        finally:
+            self._reader_running = False
+            logger.info("Serial reader thread stopped")
+
+    def _route_line(self, line):
+        """Dispatch a framed line to the data or response channel
+
+        Completion and error lines always reach the data channel, so a
+        measurement still sees them when they arrive during a query. An error
+        line is also the query's reply if one is pending.
+        """
+        if (line.startswith(DATA_LINE_PREFIXES) or not self._awaiting_response.is_set()
+                or any(signal in line for signal in COMPLETION_SIGNALS)):
+            self._put(self.data_queue, line)
+        elif line.startswith(ERROR_LINE_PREFIX):
+            self._put(self.data_queue, line)
+            self._put(self.response_queue, line)
+        else:
+            self._put(self.response_queue, line)
+
+    def _put(self, target, item):
+        """Queue an item, discarding the oldest one if the queue is full"""
+        try:
+            target.put_nowait(item)
+        except queue.Full:
+            # Keep the newest items; the consumer has fallen behind
+            try:
+                target.get_nowait()
+            except queue.Empty:
+                pass
+            target.put_nowait(item)
+            self.dropped_lines += 1
+            if self.dropped_lines % 1000 == 1:
+                logger.warning(f"Serial line queue full, dropped {self.dropped_lines} items")
+        if target is not self.response_queue:
+            self._data_event.set()
+
+    @staticmethod
+    def _drain(line_queue):
+        """Remove every queued line"""
+        while True:
+            try:
+                line_queue.get_nowait()
+            except queue.Empty:
+                return
+
     def get_buffered_data(self):
         """Get any buffered data that came from STM32 automatically"""
         try:
             if not self.is_connected or not self.serial or not self.serial.is_open:
                 return None
+
+            if self.is_reader_running():
+                lines = self.read_lines(timeout=0)
+                return '\n'.join(lines) + '\n' if lines else None
                 
             # Check if there's any data waiting in the serial buffer
             if self.serial.in_waiting > 0:
@@ -177,13 +447,18 @@ class SCPIHandler:
             if self.serial and self.serial.is_open:
                 self.serial.reset_input_buffer()
                 self.data_buffer.clear()
+            self._drain(self.data_queue)
+            self._drain(self.response_queue)
+            self._drain(self.record_queue)
         except Exception as e:
             logger.error(f"Error clearing buffer: {e}")
     
     def has_data_available(self):
         """Check if there's data available in the buffer"""
         try:
-            if self.serial and self.serial.is_open:
+            if not self.data_queue.empty() or not self.record_queue.empty():
+                return True
+            if self.serial and self.serial.is_open and not self.is_reader_running():
                 return self.serial.in_waiting > 0
             return False
         except Exception as e:
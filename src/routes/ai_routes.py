@@ -3,12 +3,13 @@ AI Dashboard Routes for H743Poten-Web
 Migrated from PyPiPo Working-AI-Dashboard-V1
 """
 
-from flask import Blueprint, render_template, jsonify, request
+from flask import Blueprint, render_template, jsonify, request, current_app
 import sys
 import os
 import logging
 import numpy as np
 from pathlib import Path
+from types import SimpleNamespace
 
 # Configure logger with more detailed settings
 logger = logging.getLogger(__name__)
@@ -30,162 +31,187 @@ current_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(current_dir))
 
 try:
-    from ai.ml_models.electrochemical_intelligence import ElectrochemicalIntelligence
-    from ai.ml_models.peak_classifier import PeakClassifier
-    from ai.ml_models.concentration_predictor import ConcentrationPredictor
-    from ai.ml_models.signal_processor import SignalProcessor
-except ImportError as e:
-    print(f"Warning: AI modules not available: {e}")
-    import numpy as np
-    
-    # Create mock classes for development with more realistic data
-    class ElectrochemicalIntelligence:
-        def analyze_cv_data(self, data):
-            voltage = np.array(data['voltage'])
-            current = np.array(data['current'])
-            # Generate mock peaks
-            peaks = [
-                {'voltage': 0.25, 'current': 2.1, 'width': 0.12, 'type': 'oxidation'},
-                {'voltage': -0.15, 'current': -1.8, 'width': 0.15, 'type': 'reduction'}
-            ]
-            return {
-                'voltage': voltage.tolist(),
-                'current': current.tolist(),
-                'peaks': peaks,
-                'analysis': {
-                    'num_peaks': len(peaks),
-                    'reversibility': 0.92,
-                    'peak_separation': 0.4
+    from ..services.result_cache import array_digest
+    from ..services.lazy_imports import LazyObject, lazy_object
+except ImportError:
+    from services.result_cache import array_digest
+    from services.lazy_imports import LazyObject, lazy_object
+
+
+def _create_ai_modules():
+    """Import the AI models (or the development mocks) and create the shared instances
+
+    Runs on the first AI request or in the warm-up thread: the models pull in
+    scikit-learn and SciPy, which would dominate app startup time.
+    """
+    try:
+        from ai.ml_models.electrochemical_intelligence import ElectrochemicalIntelligence
+        from ai.ml_models.peak_classifier import PeakClassifier
+        from ai.ml_models.concentration_predictor import ConcentrationPredictor
+        from ai.ml_models.signal_processor import SignalProcessor
+    except ImportError as e:
+        print(f"Warning: AI modules not available: {e}")
+        import numpy as np
+
+        # Create mock classes for development with more realistic data
+        class ElectrochemicalIntelligence:
+            def analyze_cv_data(self, data):
+                voltage = np.array(data['voltage'])
+                current = np.array(data['current'])
+                # Generate mock peaks
+                peaks = [
+                    {'voltage': 0.25, 'current': 2.1, 'width': 0.12, 'type': 'oxidation'},
+                    {'voltage': -0.15, 'current': -1.8, 'width': 0.15, 'type': 'reduction'}
+                ]
+                return {
+                    'voltage': voltage.tolist(),
+                    'current': current.tolist(),
+                    'peaks': peaks,
+                    'analysis': {
+                        'num_peaks': len(peaks),
+                        'reversibility': 0.92,
+                        'peak_separation': 0.4
+                    }
                 }
-            }
-    
-    class PeakClassifier:
-        def __init__(self):
-            self.is_trained = False
-            self.classification_count = 0
-            self.feature_names = ['height', 'width', 'potential', 'area', 
-                                'symmetry', 'sharpness', 'prominence', 'noise_level']
-            
-        def extract_features(self, voltages, currents, peak_indices):
-            # Mock implementation for development
-            from dataclasses import dataclass
-            
-            @dataclass
-            class PeakFeatures:
-                height: float
-                width: float
-                potential: float
-                area: float
-                symmetry: float
-                sharpness: float
-                prominence: float
-                noise_level: float
-                
-            features_list = []
-            for idx in peak_indices:
-                features = PeakFeatures(
-                    height=abs(currents[idx]),
-                    width=5.0,  # Mock fixed width
-                    potential=voltages[idx],
-                    area=abs(currents[idx]) * 5.0,
-                    symmetry=0.8,
-                    sharpness=abs(currents[idx]) / 5.0,
-                    prominence=abs(currents[idx]),
-                    noise_level=1e-9
-                )
-                features_list.append(features)
-                
-            return features_list
-            
-        def classify_peaks(self, peaks):
-            from dataclasses import dataclass
-            from datetime import datetime
-            
-            @dataclass
-            class PeakClassification:
-                peak_type: str
-                confidence: float
-                analyte_class: str
-                timestamp: datetime
-                
-            classifications = []
-            for peak in peaks:
-                if peak.potential > 0:
-                    peak_type = "oxidation"
-                else:
-                    peak_type = "reduction"
-                    
-                classification = PeakClassification(
-                    peak_type=peak_type,
-                    confidence=0.95,
-                    analyte_class="unknown",
-                    timestamp=datetime.now()
-                )
-                classifications.append(classification)
-                
-            return classifications
-            
-        def get_model_info(self):
-            return {
-                'sklearn_available': False,
-                'is_trained': self.is_trained,
-                'classification_count': self.classification_count,
-                'feature_names': self.feature_names,
-                'accuracy_history': []
-            }
-    
-    class ConcentrationPredictor:
-        def predict_concentration(self, data):
-            return {
-                'concentration': 47.3,
-                'unit': 'μM',
-                'confidence_interval': {
-                    'lower': 45.2,
-                    'upper': 49.4
-                },
-                'r_squared': 0.994
-            }
-    
-    class SignalProcessor:
-        def enhance_signal(self, data):
-            voltage = np.array(data['voltage'])
-            current = np.array(data['current'])
-            # Mock signal processing
-            enhanced_current = current + np.random.normal(0, 0.1, len(current))
-            
-            return {
-                'voltage': voltage.tolist(),
-                'current': enhanced_current.tolist(),
-                'quality': {
-                    'snr_db': 35.2,
-                    'baseline_drift': 0.002,
-                    'noise_level': 1e-9,
-                    'quality_score': 0.92,
-                    'recommendations': ['Signal quality is good for quantitative analysis']
-                },
-                'filter_info': {
-                    'method': 'Savitzky-Golay',
-                    'quality_improvement': 15.2
+
+        class PeakClassifier:
+            def __init__(self):
+                self.is_trained = False
+                self.classification_count = 0
+                self.feature_names = ['height', 'width', 'potential', 'area', 
+                                    'symmetry', 'sharpness', 'prominence', 'noise_level']
+
+            def extract_features(self, voltages, currents, peak_indices):
+                # Mock implementation for development
+                from dataclasses import dataclass
+
+                @dataclass
+                class PeakFeatures:
+                    height: float
+                    width: float
+                    potential: float
+                    area: float
+                    symmetry: float
+                    sharpness: float
+                    prominence: float
+                    noise_level: float
+
+                features_list = []
+                for idx in peak_indices:
+                    features = PeakFeatures(
+                        height=abs(currents[idx]),
+                        width=5.0,  # Mock fixed width
+                        potential=voltages[idx],
+                        area=abs(currents[idx]) * 5.0,
+                        symmetry=0.8,
+                        sharpness=abs(currents[idx]) / 5.0,
+                        prominence=abs(currents[idx]),
+                        noise_level=1e-9
+                    )
+                    features_list.append(features)
+
+                return features_list
+
+            def classify_peaks(self, peaks):
+                from dataclasses import dataclass
+                from datetime import datetime
+
+                @dataclass
+                class PeakClassification:
+                    peak_type: str
+                    confidence: float
+                    analyte_class: str
+                    timestamp: datetime
+
+                classifications = []
+                for peak in peaks:
+                    if peak.potential > 0:
+                        peak_type = "oxidation"
+                    else:
+                        peak_type = "reduction"
+
+                    classification = PeakClassification(
+                        peak_type=peak_type,
+                        confidence=0.95,
+                        analyte_class="unknown",
+                        timestamp=datetime.now()
+                    )
+                    classifications.append(classification)
+
+                return classifications
+
+            def get_model_info(self):
+                return {
+                    'sklearn_available': False,
+                    'is_trained': self.is_trained,
+                    'classification_count': self.classification_count,
+                    'feature_names': self.feature_names,
+                    'accuracy_history': []
                 }
-            }
+
+        class ConcentrationPredictor:
+            def predict_concentration(self, data):
+                return {
+                    'concentration': 47.3,
+                    'unit': 'μM',
+                    'confidence_interval': {
+                        'lower': 45.2,
+                        'upper': 49.4
+                    },
+                    'r_squared': 0.994
+                }
+
+        class SignalProcessor:
+            def enhance_signal(self, data):
+                voltage = np.array(data['voltage'])
+                current = np.array(data['current'])
+                # Mock signal processing
+                enhanced_current = current + np.random.normal(0, 0.1, len(current))
+
+                return {
+                    'voltage': voltage.tolist(),
+                    'current': enhanced_current.tolist(),
+                    'quality': {
+                        'snr_db': 35.2,
+                        'baseline_drift': 0.002,
+                        'noise_level': 1e-9,
+                        'quality_score': 0.92,
+                        'recommendations': ['Signal quality is good for quantitative analysis']
+                    },
+                    'filter_info': {
+                        'method': 'Savitzky-Golay',
+                        'quality_improvement': 15.2
+                    }
+                }
+
+    # Initialize AI modules
+    try:
+        electrochemical_ai = ElectrochemicalIntelligence()
+        peak_classifier = PeakClassifier()
+        concentration_predictor = ConcentrationPredictor()
+        signal_processor = SignalProcessor()
+    except Exception as e:
+        print(f"Warning: Failed to initialize AI modules: {e}")
+        # Use mock instances
+        electrochemical_ai = ElectrochemicalIntelligence()
+        peak_classifier = PeakClassifier()
+        concentration_predictor = ConcentrationPredictor()
+        signal_processor = SignalProcessor()
+
+    return SimpleNamespace(electrochemical_ai=electrochemical_ai, peak_classifier=peak_classifier,
+                           concentration_predictor=concentration_predictor,
+                           signal_processor=signal_processor)
+
+
+_ai_modules = lazy_object('ai.ml_models', _create_ai_modules)
+electrochemical_ai = LazyObject(lambda: _ai_modules.electrochemical_ai)
+peak_classifier = LazyObject(lambda: _ai_modules.peak_classifier)
+concentration_predictor = LazyObject(lambda: _ai_modules.concentration_predictor)
+signal_processor = LazyObject(lambda: _ai_modules.signal_processor)
 
 # Create Blueprint with standard RESTful API prefix
 ai_bp = Blueprint('ai', __name__, url_prefix='/api/ai')
 
-# Initialize AI modules
-try:
-    electrochemical_ai = ElectrochemicalIntelligence()
-    peak_classifier = PeakClassifier()
-    concentration_predictor = ConcentrationPredictor()
-    signal_processor = SignalProcessor()
-except Exception as e:
-    print(f"Warning: Failed to initialize AI modules: {e}")
-    # Use mock instances
-    electrochemical_ai = ElectrochemicalIntelligence()
-    peak_classifier = PeakClassifier()
-    concentration_predictor = ConcentrationPredictor()
-    signal_processor = SignalProcessor()
-
 @ai_bp.route('/')
 @ai_bp.route('/dashboard')
 def ai_dashboard():
@@ -267,6 +293,49 @@ def analyze_data():
             'error': f'Analysis failed: {str(e)}'
         }), 500
 
+def _extract_peak_features(voltages, currents):
+    """Detect peaks and extract their features (deterministic for a given input)"""
+    # Find peaks using scipy
+    from scipy.signal import find_peaks
+    peak_indices, _ = find_peaks(np.abs(currents), height=np.std(currents))
+    logger.info(f"Found {len(peak_indices)} potential peaks")
+
+    # Extract features from detected peaks
+    extracted_peaks = peak_classifier.extract_features(
+        voltages=voltages,
+        currents=currents, 
+        peak_indices=peak_indices
+    )
+    logger.info(f"Extracted features for {len(extracted_peaks)} peaks")
+    return extracted_peaks
+
+def _classify_peaks_response(extracted_peaks):
+    """Classify extracted peaks with the current model and format the response"""
+    logger.info("Starting peak classification...")
+    peak_classifications = peak_classifier.classify_peaks(extracted_peaks)
+    logger.info(f"Classified {len(peak_classifications)} peaks")
+
+    # Format response
+    return {
+        'success': True,
+        'peaks': [
+            {
+                'voltage': peak.potential,
+                'current': peak.height,
+                'width': peak.width,
+                'type': classification.peak_type,
+                'confidence': classification.confidence,
+                'area': peak.area,
+                'symmetry': peak.symmetry,
+                'sharpness': peak.sharpness,
+                'prominence': peak.prominence,
+                'noise_level': peak.noise_level
+            }
+            for peak, classification in zip(extracted_peaks, peak_classifications)
+        ],
+        'model_info': peak_classifier.get_model_info()
+    }
+
 @ai_bp.route('/analyze-peaks', methods=['POST'])
 def analyze_peaks():
     """Detect and classify peaks in electrochemical data"""
@@ -298,51 +367,21 @@ def analyze_peaks():
         logger.info(f"Voltage sample: {data['voltage'][:5]}")
         logger.info(f"Current sample: {data['current'][:5]}")
         
-        # Extract peaks from the voltammogram data
-        logger.info("Starting peak extraction...")
-        
         # Convert data to numpy arrays
         voltages = np.array(data['voltage'])
         currents = np.array(data['current'])
         
-        # Find peaks using scipy
-        from scipy.signal import find_peaks
-        peak_indices, _ = find_peaks(np.abs(currents), height=np.std(currents))
-        logger.info(f"Found {len(peak_indices)} potential peaks")
-        
-        # Extract features from detected peaks
-        extracted_peaks = peak_classifier.extract_features(
-            voltages=voltages,
-            currents=currents, 
-            peak_indices=peak_indices
-        )
-        logger.info(f"Extracted features for {len(extracted_peaks)} peaks")
-        
-        # Classify the detected peaks
-        logger.info("Starting peak classification...")
-        peak_classifications = peak_classifier.classify_peaks(extracted_peaks)
-        logger.info(f"Classified {len(peak_classifications)} peaks")
-        
-        # Format response
-        response = {
-            'success': True,
-            'peaks': [
-                {
-                    'voltage': peak.potential,
-                    'current': peak.height,
-                    'width': peak.width,
-                    'type': classification.peak_type,
-                    'confidence': classification.confidence,
-                    'area': peak.area,
-                    'symmetry': peak.symmetry,
-                    'sharpness': peak.sharpness,
-                    'prominence': peak.prominence,
-                    'noise_level': peak.noise_level
-                }
-                for peak, classification in zip(extracted_peaks, peak_classifications)
-            ],
-            'model_info': peak_classifier.get_model_info()
-        }
+        # Extract peaks from the voltammogram data, reusing the features for identical input.
+        # Classification always runs, so a retrained or reloaded model is used at once.
+        logger.info("Starting peak extraction...")
+        cache = current_app.config.get('peak_cache')
+        if cache is None:
+            extracted_peaks = _extract_peak_features(voltages, currents)
+        else:
+            key = array_digest(voltages, currents, method='ai-peak-features')
+            extracted_peaks = cache.get_or_compute(
+                key, lambda: _extract_peak_features(voltages, currents))
+        response = _classify_peaks_response(extracted_peaks)
         
         logger.info("Peak analysis completed successfully")
         return jsonify(response)
@@ -2,7 +2,7 @@
 CV Measurement Routes for H743Poten Web Interface
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app
 import logging
 import time
 
@@ -33,6 +33,30 @@ def set_simulation_mode():
         logger.error(f"Failed to set simulation mode: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@cv_bp.route('/storage', methods=['GET', 'POST'])
+def cv_storage_mode():
+    """Get or set the storage mode ('memory' or 'ring' with spill to disk)"""
+    try:
+        cv_service = current_app.config.get('cv_service')
+        if not cv_service:
+            return jsonify({'success': False, 'error': 'CV service not available'}), 500
+
+        if request.method == 'POST':
+            data = request.get_json() or {}
+            success, message = cv_service.set_storage_mode(data.get('mode', 'memory'))
+            if not success:
+                return jsonify({'success': False, 'error': message}), 400
+
+        return jsonify({
+            'success': True,
+            'storage_mode': cv_service.storage_mode,
+            'points_on_disk': getattr(cv_service.data_store, 'spilled_count', 0)
+        })
+
+    except Exception as e:
+        logger.error(f"Failed to set storage mode: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @cv_bp.route('/setup', methods=['POST'])
 def setup_cv_measurement():
     """Setup CV measurement parameters"""
@@ -146,14 +170,19 @@ def get_cv_status():
 def get_cv_data():
     """Get CV measurement data"""
     try:
-        # Get optional limit parameter
+        # Get optional limit and downsampling parameters
         limit = request.args.get('limit', type=int)
+        max_points = request.args.get('max_points', type=int)
+        method = request.args.get('method', 'lttb')
         
         cv_service = current_app.config.get('cv_service')
         if not cv_service:
             return jsonify({'error': 'CV service not available'}), 500
         
-        data_points = cv_service.get_data_points(limit=limit)
+        try:
+            data_points = cv_service.get_data_points(limit=limit, max_points=max_points, method=method)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         return jsonify({
             'data_points': data_points,
             'count': len(data_points),
@@ -166,39 +195,40 @@ def get_cv_data():
 
 @cv_bp.route('/data/stream')
 def stream_cv_data():
-    """Get real-time CV data stream"""
+    """Get real-time CV data stream
+    
+    Query parameters:
+        since: sequence cursor from the previous response's ``next_since``;
+               only points at or after it are returned. Omit to get all points
+               of the current measurement.
+        limit: maximum number of points to return in this response
+        max_points: downsample the returned points to about this many
+        method: downsampling method, lttb (default) or minmax
+    """
     try:
+        since = request.args.get('since', type=int)
+        limit = request.args.get('limit', type=int)
+        max_points = request.args.get('max_points', type=int)
+        method = request.args.get('method', 'lttb')
+        
         cv_service = current_app.config.get('cv_service')
         if not cv_service:
             return jsonify({'error': 'CV service not available'}), 500
         
-        # Get ALL data points for proper CV plotting (remove limit)
-        # Frontend will handle incremental updates efficiently
-        print(f"[CV DEBUG] About to call get_data_points() without limit")
-        data_points = cv_service.get_data_points()  # No limit = all data
+        try:
+            data_points, first_sequence, next_sequence = cv_service.get_data_since(
+                since, limit=limit, max_points=max_points, method=method)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         status = cv_service.get_status()
         
-        # Debug logging for data sync issues
-        total_points = len(data_points)
-        backend_count = status.get('data_points_count', 0)
-        
-        print(f"[CV DEBUG] Streaming API - returning {total_points} points, backend has {backend_count}")
-        logger.info(f"[DEBUG] Streaming API called - returning {total_points} points, backend has {backend_count}")
-        
-        if total_points != backend_count:
-            print(f"[CV DEBUG] MISMATCH: returning {total_points} vs backend {backend_count}")
-            logger.warning(f"Data count mismatch: returning {total_points} points but status says {backend_count}")
-        
-        # Check voltage range for debugging
-        if data_points:
-            voltages = [p.get('potential', 0) for p in data_points]
-            min_v, max_v = min(voltages), max(voltages)
-            negative_count = sum(1 for v in voltages if v < 0)
-            print(f"[CV DEBUG] V range: {min_v:.4f} to {max_v:.4f}, negative: {negative_count}/{total_points}")
-            logger.info(f"[DEBUG] V range: {min_v:.4f} to {max_v:.4f}, negative: {negative_count}/{total_points}")
-        
         return jsonify({
             'data_points': data_points,
+            'since': since,
+            'first_sequence': first_sequence,
+            'next_since': next_sequence,
+            # Cursor does not continue the current measurement: client must drop old points
+            'reset': first_sequence != since,
             'status': status,
             'timestamp': time.time()
         })
@@ -207,6 +237,59 @@ def stream_cv_data():
         logger.error(f"Failed to stream CV data: {e}")
         return jsonify({'error': str(e)}), 500
 
+@cv_bp.route('/peaks')
+def get_cv_live_peaks():
+    """Get peaks detected so far in the running measurement (Epa, Epc, ΔEp)"""
+    try:
+        cv_service = current_app.config.get('cv_service')
+        if not cv_service:
+            return jsonify({'error': 'CV service not available'}), 500
+        
+        peaks = cv_service.get_live_peaks()
+        if peaks is None:
+            return jsonify({'error': 'Live peak detection is disabled'}), 404
+        return jsonify(peaks)
+        
+    except Exception as e:
+        logger.error(f"Failed to get live CV peaks: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@cv_bp.route('/events')
+def cv_events():
+    """Push live CV data and status as Server-Sent Events
+    
+    Event types:
+        data:   {data_points, first_sequence, next_since, reset}, id = next_since
+        status: same payload as /api/cv/status, sent on change and periodically
+        peaks:  same payload as /api/cv/peaks, sent when candidates or peaks change
+    
+    Reconnecting clients resume from the Last-Event-ID header (sent
+    automatically by EventSource) or the ``last_event_id`` query parameter.
+    ``rate`` overrides the maximum number of frames per second.
+    """
+    broker = current_app.config.get('cv_event_broker')
+    if not broker:
+        return jsonify({'error': 'CV event stream not available'}), 500
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id is not None else None
+    except ValueError:
+        last_event_id = None
+    
+    rate = request.args.get('rate', type=float)
+    if rate is not None and rate <= 0:
+        rate = None
+    
+    return Response(
+        broker.events(last_event_id, frame_rate=rate),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Disable proxy buffering (nginx)
+        }
+    )
+
 @cv_bp.route('/export/csv')
 def export_cv_csv():
     """Export CV data as CSV"""
@@ -220,7 +303,6 @@ def export_cv_csv():
             return jsonify({'error': 'No data to export'}), 400
         
         # Return CSV data
-        from flask import Response
         timestamp = time.strftime('%Y%m%d_%H%M%S')
         filename = f'cv_measurement_{timestamp}.csv'
         
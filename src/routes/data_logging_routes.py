@@ -3,7 +3,10 @@ Data Logging Routes for H743Poten Web Interface
 Handles CV measurement data logging and browsing
 """
 
-from flask import Blueprint, request, jsonify, current_app, send_file
+from flask import Blueprint, Response, request, jsonify, current_app, send_file, stream_with_context
+import csv
+import io
+import json
 import logging
 import os
 from pathlib import Path
@@ -35,11 +38,11 @@ def save_measurement():
             if not cv_service:
                 return jsonify({'success': False, 'error': 'CV service not available and no frontend data provided'}), 500
             
-            # Get current measurement data from service
-            data_points = cv_service.get_data_points()
+            # Get current measurement data from service as columns
+            data_points = cv_service.get_data_columns(decode_direction=True)
             status = cv_service.get_status()
             
-            if not data_points:
+            if not len(data_points['timestamp']):
                 return jsonify({'success': False, 'error': 'No measurement data to save'}), 400
             
             # Get parameters from status
@@ -54,43 +57,116 @@ def save_measurement():
         if not data_logging_service:
             return jsonify({'success': False, 'error': 'Data logging service not available'}), 500
         
-        logger.info(f"Saving measurement: {len(data_points)} points, session_id: {session_id}")
-        
-        # Save data
-        result = data_logging_service.save_cv_measurement(
+        point_count = (len(data_points['timestamp']) if isinstance(data_points, dict)
+                       else len(data_points))
+        logger.info(f"Saving measurement: {point_count} points, session_id: {session_id}")
+        
+        # Synchronous save on request (includes the PNG plot)
+        if data.get('wait'):
+            result = data_logging_service.save_cv_measurement(
+                data_points=data_points,
+                parameters=parameters,
+                session_id=session_id
+            )
+            return jsonify(result)
+        
+        # Queue the save; the client polls the job for completion
+        job = data_logging_service.submit_save(
             data_points=data_points,
             parameters=parameters,
             session_id=session_id
         )
         
-        return jsonify(result)
+        return jsonify({
+            'success': True,
+            'queued': True,
+            'job_id': job['job_id'],
+            'session_id': job['session_id'],
+            'state': job['state'],
+            'status_url': f"/api/data-logging/jobs/{job['job_id']}",
+            'message': f"Save queued for session {job['session_id']}"
+        }), 202
         
     except Exception as e:
         logger.error(f"Failed to save measurement: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@data_logging_bp.route('/jobs/<job_id>')
+def get_save_job(job_id):
+    """Get the status of a queued save"""
+    try:
+        data_logging_service = current_app.config.get('data_logging_service')
+        if not data_logging_service:
+            return jsonify({'error': 'Data logging service not available'}), 500
+        
+        job = data_logging_service.get_save_job(job_id)
+        if not job:
+            return jsonify({'error': f'Save job {job_id} not found'}), 404
+        
+        return jsonify(job)
+        
+    except Exception as e:
+        logger.error(f"Failed to get save job {job_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @data_logging_bp.route('/sessions')
 def list_sessions():
-    """List all saved measurement sessions"""
+    """List saved measurement sessions (paged, sorted and filtered by the session index)"""
     try:
         # Get optional parameters
         limit = request.args.get('limit', type=int)
+        offset = request.args.get('offset', default=0, type=int)
+        sort = request.args.get('sort', default='timestamp')
+        descending = request.args.get('order', default='desc').lower() != 'asc'
+        filters = {
+            'search': request.args.get('q'),
+            'since': request.args.get('since'),
+            'until': request.args.get('until'),
+            'min_points': request.args.get('min_points', type=int),
+            'max_points': request.args.get('max_points', type=int),
+            'cycles': request.args.get('cycles', type=int),
+            'measurement_type': request.args.get('type'),
+        }
         
         data_logging_service = current_app.config.get('data_logging_service')
         if not data_logging_service:
             return jsonify({'error': 'Data logging service not available'}), 500
         
-        sessions = data_logging_service.list_sessions(limit=limit)
+        try:
+            sessions, total = data_logging_service.query_sessions(
+                limit=limit, offset=offset, sort=sort, descending=descending, **filters)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
             'sessions': sessions,
-            'count': len(sessions)
+            'count': len(sessions),
+            'total': total,
+            'offset': offset
         })
         
     except Exception as e:
         logger.error(f"Failed to list sessions: {e}")
         return jsonify({'error': str(e)}), 500
 
+@data_logging_bp.route('/index/reconcile', methods=['POST'])
+def reconcile_index():
+    """Re-sync the session index with the session directories"""
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        data_logging_service = current_app.config.get('data_logging_service')
+        if not data_logging_service:
+            return jsonify({'error': 'Data logging service not available'}), 500
+        
+        counts = data_logging_service.reconcile_index(rebuild=bool(data.get('rebuild')))
+        
+        return jsonify({'success': True, **counts})
+        
+    except Exception as e:
+        logger.error(f"Failed to reconcile session index: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @data_logging_bp.route('/sessions/<session_id>')
 def get_session(session_id):
     """Get detailed information about a specific session"""
@@ -99,7 +175,11 @@ def get_session(session_id):
         if not data_logging_service:
             return jsonify({'error': 'Data logging service not available'}), 500
         
-        session_data = data_logging_service.get_session_data(session_id)
+        # Optional column projection, e.g. ?columns=potential,current
+        columns = request.args.get('columns')
+        columns = [name.strip() for name in columns.split(',') if name.strip()] if columns else None
+        
+        session_data = data_logging_service.get_session_data(session_id, columns=columns)
         
         if not session_data:
             return jsonify({'error': f'Session {session_id} not found'}), 404
@@ -110,6 +190,90 @@ def get_session(session_id):
         logger.error(f"Failed to get session {session_id}: {e}")
         return jsonify({'error': str(e)}), 500
 
+@data_logging_bp.route('/sessions/<session_id>/data')
+def stream_session_data(session_id):
+    """Stream a range of session data straight from the stored file
+    
+    Query parameters: columns (comma separated), offset, limit, t0/t1 (time
+    range), cycle, max_points with method (minmax or lttb downsampling for
+    plotting) and format (json or csv). The JSON body is {"session_id", "fields", "rows", "count"}
+    with one array per row.
+    """
+    try:
+        data_logging_service = current_app.config.get('data_logging_service')
+        if not data_logging_service:
+            return jsonify({'error': 'Data logging service not available'}), 500
+        
+        columns = request.args.get('columns')
+        columns = [name.strip() for name in columns.split(',') if name.strip()] if columns else None
+        output_format = request.args.get('format', 'json')
+        if output_format not in ('json', 'csv'):
+            return jsonify({'error': 'Invalid format. Use json or csv'}), 400
+        
+        chunks = data_logging_service.iter_session_data(
+            session_id,
+            columns=columns,
+            offset=request.args.get('offset', default=0, type=int),
+            limit=request.args.get('limit', type=int),
+            t_start=request.args.get('t0', type=float),
+            t_end=request.args.get('t1', type=float),
+            cycle=request.args.get('cycle', type=int),
+            max_points=request.args.get('max_points', type=int),
+            method=request.args.get('method', 'minmax')
+        )
+        
+        # Read the first chunk now so missing sessions and bad arguments get a proper status
+        try:
+            first = next(chunks, None)
+        except FileNotFoundError:
+            return jsonify({'error': f'Session {session_id} not found'}), 404
+        except (KeyError, ValueError) as e:
+            return jsonify({'error': f'Invalid request: {e}'}), 400
+        
+        fields = list(first) if first else (columns or [])
+        
+        def all_chunks():
+            if first:
+                yield first
+                yield from chunks
+        
+        def rows_of(chunk):
+            return zip(*(chunk[name].tolist() for name in fields))
+        
+        if output_format == 'csv':
+            def generate_csv():
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(fields)
+                for chunk in all_chunks():
+                    writer.writerows(rows_of(chunk))
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                if buffer.tell():
+                    # Header only (no rows selected)
+                    yield buffer.getvalue()
+            
+            return Response(stream_with_context(generate_csv()), mimetype='text/csv',
+                            headers={'Content-Disposition': f'attachment; filename={session_id}.csv'})
+        
+        def generate_json():
+            yield (f'{{"session_id":{json.dumps(session_id)},'
+                   f'"fields":{json.dumps(fields)},"rows":[')
+            count = 0
+            for chunk in all_chunks():
+                rows = json.dumps([list(row) for row in rows_of(chunk)], separators=(',', ':'))
+                if len(rows) > 2:
+                    yield (',' if count else '') + rows[1:-1]
+                    count += len(chunk[fields[0]])
+            yield f'],"count":{count}}}'
+        
+        return Response(stream_with_context(generate_json()), mimetype='application/json')
+        
+    except Exception as e:
+        logger.error(f"Failed to stream data for session {session_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @data_logging_bp.route('/sessions/<session_id>/download/<file_type>')
 def download_session_file(session_id, file_type):
     """Download session file (csv or png)"""
@@ -128,9 +292,9 @@ def download_session_file(session_id, file_type):
         if not session_dir.exists():
             return jsonify({'error': f'Session {session_id} not found'}), 404
         
-        # Determine file path
+        # Determine file path (CSV is exported from the session data file on demand)
         if file_type == 'csv':
-            file_path = session_dir / f"{session_id}.csv"
+            file_path = data_logging_service.export_session_csv(session_id) or session_dir / f"{session_id}.csv"
             mimetype = 'text/csv'
         else:  # png
             file_path = session_dir / f"{session_id}.png"
@@ -1,10 +1,23 @@
-from flask import Blueprint, jsonify, send_file, current_app, request
+from flask import Blueprint, Response, jsonify, send_file, current_app, request, stream_with_context
 import os
+import json
+import time
 import numpy as np
-import pandas as pd
-from scipy.signal import find_peaks
 import logging
 
+try:
+    from ..config.settings import Config
+    from ..services.result_cache import array_digest
+    from ..services.peak_batch import resolve_data_file
+    from ..services.peak_detection import DEFAULT_PROMINENCE, DEFAULT_WIDTH, METHODS
+    from ..services.peak_detection import detect_cv_peaks as _detect_cv_peaks
+except ImportError:
+    from config.settings import Config
+    from services.result_cache import array_digest
+    from services.peak_batch import resolve_data_file
+    from services.peak_detection import DEFAULT_PROMINENCE, DEFAULT_WIDTH, METHODS
+    from services.peak_detection import detect_cv_peaks as _detect_cv_peaks
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -28,8 +41,14 @@ def get_peaks(method):
         voltage = np.array(data['voltage'])
         current = np.array(data['current'])
 
-        # Find peaks using specified method
-        results = detect_cv_peaks(voltage, current, method=method)
+        # Find peaks using specified method, reusing the result for identical input
+        cache = current_app.config.get('peak_cache')
+        if cache is None:
+            results = detect_cv_peaks(voltage, current, method=method)
+        else:
+            key = array_digest(voltage, current, method=method, **_peak_settings())
+            results = cache.get_or_compute(
+                key, lambda: detect_cv_peaks(voltage, current, method=method))
 
         return jsonify({
             'success': True,
@@ -43,6 +62,138 @@ def get_peaks(method):
             'error': str(e)
         })
 
+@peak_detection_bp.route('/batch', methods=['POST'])
+def batch_peaks():
+    """
+    Detect peaks in many curves in parallel worker processes
+    
+    Body: {"method": "prominence", "stream": false, "curves": [...]} where each
+    curve is {"id", "voltage", "current"}, {"id", "session_id"} or {"id", "file"}
+    (a CSV path relative to the upload or data-log directory, PEAK_BATCH_FILE_ROOTS). Every curve gets a result
+    with its index, id, success, elapsed_ms and either the peaks or an error.
+    With "stream" the results are sent as newline-delimited JSON in completion
+    order, followed by a summary line.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        method = data.get('method', 'prominence')
+        curves = data.get('curves')
+        if method not in METHODS:
+            return jsonify({'success': False, 'error': f"Unknown method: {method}"}), 400
+        if not isinstance(curves, list) or not curves:
+            return jsonify({'success': False, 'error': 'Missing curves in request'}), 400
+        if len(curves) > Config.PEAK_BATCH_MAX_CURVES:
+            return jsonify({
+                'success': False,
+                'error': f"Too many curves ({len(curves)}), maximum is {Config.PEAK_BATCH_MAX_CURVES}"
+            }), 400
+
+        runner = current_app.config.get('peak_batch_runner')
+        if runner is None:
+            return jsonify({'success': False, 'error': 'Peak batch runner not available'}), 500
+
+        started = time.perf_counter()
+        results = _batch_results(runner, curves, method)
+
+        if data.get('stream'):
+            def generate():
+                failed = 0
+                for result in results:
+                    failed += not result['success']
+                    yield json.dumps(result) + '\n'
+                yield json.dumps({'done': True, 'count': len(curves), 'failed': failed,
+                                  'elapsed_ms': (time.perf_counter() - started) * 1000.0}) + '\n'
+
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+        ordered = sorted(results, key=lambda result: result['index'])
+        return jsonify({
+            'success': True,
+            'results': ordered,
+            'count': len(ordered),
+            'failed': sum(not result['success'] for result in ordered),
+            'elapsed_ms': (time.perf_counter() - started) * 1000.0
+        })
+
+    except Exception as e:
+        logger.error(f"Error in batch peak detection: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def _batch_results(runner, curves, method):
+    """Resolve the curves, serve cached results and run the rest on the runner
+    
+    Returns a generator of per-curve results in completion order. Input is
+    resolved up front, so request-dependent state is not needed while the
+    results are streamed.
+    """
+    settings = _peak_settings()
+    cache = current_app.config.get('peak_cache')
+    data_logging_service = current_app.config.get('data_logging_service')
+
+    ready, jobs, keys = [], [], {}
+    for index, curve in enumerate(curves):
+        curve_id = curve.get('id', index) if isinstance(curve, dict) else index
+        job = {'index': index, 'curve_id': curve_id, 'method': method, **settings}
+        try:
+            if not isinstance(curve, dict):
+                raise ValueError('Curve must be an object')
+            if 'voltage' in curve and 'current' in curve:
+                job['voltage'] = np.array(curve['voltage'])
+                job['current'] = np.array(curve['current'])
+            elif 'session_id' in curve:
+                if data_logging_service is None:
+                    raise ValueError('Data logging service not available')
+                columns, _ = data_logging_service.load_session_columns(
+                    curve['session_id'], ['potential', 'current'])
+                job['voltage'] = np.array(columns['potential'])
+                job['current'] = np.array(columns['current'])
+            elif 'file' in curve:
+                job['path'] = str(resolve_data_file(curve['file'], Config.PEAK_BATCH_FILE_ROOTS))
+            else:
+                raise ValueError('Curve needs voltage/current, session_id or file')
+        except Exception as e:
+            ready.append({'index': index, 'id': curve_id, 'success': False,
+                          'error': str(e), 'elapsed_ms': 0.0})
+            continue
+
+        if cache is not None and 'voltage' in job:
+            key = array_digest(job['voltage'], job['current'], method=method, **settings)
+            cached = cache.get(key)
+            if cached is not None:
+                ready.append({'index': index, 'id': curve_id, **cached,
+                              'success': True, 'cached': True, 'elapsed_ms': 0.0})
+                continue
+            keys[index] = key
+        jobs.append(job)
+
+    def generate():
+        yield from ready
+        for result in runner.run(jobs):
+            key = keys.get(result['index'])
+            if key is not None and result['success']:
+                cache.put(key, {name: result[name] for name in ('peaks', 'method', 'params')})
+            yield result
+
+    return generate()
+
+@peak_detection_bp.route('/cache', methods=['GET', 'DELETE'])
+def peak_cache_stats():
+    """Get peak result cache statistics, or clear the cache (DELETE)"""
+    cache = current_app.config.get('peak_cache')
+    if cache is None:
+        return jsonify({'success': False, 'error': 'Peak cache not available'}), 500
+
+    if request.method == 'DELETE':
+        cache.clear()
+
+    return jsonify({
+        'success': True,
+        'cache': cache.stats()
+    })
+
 @peak_detection_bp.route('/get-settings', methods=['GET'])
 def get_settings():
     """Get current peak detection settings"""
@@ -92,159 +243,11 @@ def update_settings():
         })
 
 def detect_cv_peaks(voltage, current, method='prominence'):
-    """
-    Detect peaks in CV data using specified method
-    Returns list of peaks with their characteristics
-    """
-    try:
-        if method == 'prominence':
-            return detect_peaks_prominence(voltage, current)
-        elif method == 'derivative':
-            return detect_peaks_derivative(voltage, current)
-        elif method == 'ml':
-            return detect_peaks_ml(voltage, current)
-        else:
-            raise ValueError(f"Unknown method: {method}")
-    except Exception as e:
-        logger.error(f"Error in CV peak detection: {str(e)}")
-        raise
-
-def detect_peaks_prominence(voltage, current):
-    """Detect peaks using prominence method"""
-    try:
-        # Get settings from config or use defaults
-        prominence = current_app.config.get('PEAK_PROMINENCE', 0.1)
-        width = current_app.config.get('PEAK_WIDTH', 5)
-        
-        # Normalize current for peak detection
-        current_norm = current / np.abs(current).max()
-        
-        # Find positive peaks (oxidation)
-        pos_peaks, pos_properties = find_peaks(
-            current_norm,
-            prominence=prominence,
-            width=width
-        )
-        
-        # Find negative peaks (reduction)
-        neg_peaks, neg_properties = find_peaks(
-            -current_norm,
-            prominence=prominence,
-            width=width
-        )
-        
-        # Format peak data
-        peaks = []
-        
-        # Add oxidation peaks
-        for i, peak_idx in enumerate(pos_peaks):
-            peaks.append({
-                'voltage': float(voltage[peak_idx]),
-                'current': float(current[peak_idx]),
-                'type': 'oxidation',
-                'confidence': float(pos_properties['prominences'][i] * 100)
-            })
-        
-        # Add reduction peaks
-        for i, peak_idx in enumerate(neg_peaks):
-            peaks.append({
-                'voltage': float(voltage[peak_idx]),
-                'current': float(current[peak_idx]),
-                'type': 'reduction',
-                'confidence': float(neg_properties['prominences'][i] * 100)
-            })
-        
-        return {
-            'peaks': peaks,
-            'method': 'prominence',
-            'params': {
-                'prominence': prominence,
-                'width': width
-            }
-        }
-
-    except Exception as e:
-        logger.error(f"Error in prominence peak detection: {str(e)}")
-        raise
-
-def detect_peaks_derivative(voltage, current):
-    """Detect peaks using derivative method"""
-    try:
-        # Calculate first derivative
-        dv = np.gradient(voltage)
-        di = np.gradient(current)
-        slope = di/dv
-        
-        # Find zero crossings in second derivative
-        d2i = np.gradient(slope)
-        zero_crossings = np.where(np.diff(np.signbit(d2i)))[0]
-        
-        peaks = []
-        for idx in zero_crossings:
-            peak_type = 'oxidation' if slope[idx] > 0 else 'reduction'
-            confidence = min(100.0, abs(d2i[idx]) * 100)
-            
-            peaks.append({
-                'voltage': float(voltage[idx]),
-                'current': float(current[idx]),
-                'type': peak_type,
-                'confidence': float(confidence)
-            })
-            
-        return {
-            'peaks': peaks,
-            'method': 'derivative',
-            'params': {
-                'smoothing': 'savgol_filter',
-                'window': 5
-            }
-        }
-        
-    except Exception as e:
-        logger.error(f"Error in derivative peak detection: {str(e)}")
-        raise
-
-def detect_peaks_ml(voltage, current):
-    """Detect peaks using ML-enhanced method"""
-    try:
-        # Start with prominence method as baseline
-        base_results = detect_peaks_prominence(voltage, current)
-        base_peaks = base_results['peaks']
-        
-        # Add ML enhancements (feature extraction)
-        enhanced_peaks = []
-        for peak in base_peaks:
-            # Find peak width at half height
-            peak_idx = np.where((voltage == peak['voltage']) & (current == peak['current']))[0][0]
-            half_height = peak['current'] / 2
-            left_idx = right_idx = peak_idx
-            
-            while left_idx > 0 and abs(current[left_idx]) > abs(half_height):
-                left_idx -= 1
-            while right_idx < len(current)-1 and abs(current[right_idx]) > abs(half_height):
-                right_idx += 1
-                
-            width = voltage[right_idx] - voltage[left_idx]
-            area = np.trapz(current[left_idx:right_idx], voltage[left_idx:right_idx])
-            
-            enhanced_peaks.append({
-                'voltage': peak['voltage'],
-                'current': peak['current'],
-                'type': peak['type'],
-                'confidence': min(100.0, peak['confidence'] * 1.1),  # ML confidence boost
-                'width': float(width),
-                'area': float(area)
-            })
-            
-        return {
-            'peaks': enhanced_peaks,
-            'method': 'ml',
-            'params': {
-                'feature_extraction': ['width', 'area'],
-                'confidence_boost': 1.1
-            }
-        }
-        
-    except Exception as e:
-        logger.error(f"Error in ML peak detection: {str(e)}")
-        raise
\ No newline at end of file
+    """Detect peaks with the application's current prominence/width settings"""
+    return _detect_cv_peaks(voltage, current, method=method, **_peak_settings())
+
+def _peak_settings():
+    return {
+        'prominence': current_app.config.get('PEAK_PROMINENCE', DEFAULT_PROMINENCE),
+        'width': current_app.config.get('PEAK_WIDTH', DEFAULT_WIDTH)
+    }
@@ -22,14 +22,28 @@ import sys
 sys.path.append('validation_data')
 
 try:
-    from cross_instrument_calibration import CrossInstrumentCalibrator, FeatureExtractor
-    from execute_validation_fixed import load_cv_data_robust, simple_peak_detection_enhanced
-    ANALYSIS_AVAILABLE = True
+    from ..services.downsampling import METHODS as DOWNSAMPLING_METHODS, downsample
+    from ..services.lazy_imports import lazy_object, resolve
 except ImportError:
-    ANALYSIS_AVAILABLE = False
+    from services.downsampling import METHODS as DOWNSAMPLING_METHODS, downsample
+    from services.lazy_imports import lazy_object, resolve
 
 logger = logging.getLogger(__name__)
 
+
+def _import_analysis_modules() -> bool:
+    """Whether the validation analysis modules (pandas, scikit-learn) import cleanly"""
+    try:
+        import cross_instrument_calibration  # noqa: F401
+        import execute_validation_fixed  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+# Imported on first use, not at startup
+_analysis_modules = lazy_object('validation analysis modules', _import_analysis_modules)
+
 workflow_bp = Blueprint('workflow', __name__)
 
 @workflow_bp.route('/workflow')
@@ -553,6 +567,12 @@ def get_preview_data():
     """Get sample data for preview chart"""
     print("=== PREVIEW DATA ENDPOINT HIT ===")
     
+    # Reject bad downsampling options up front; the fallback below would hide them behind mock data
+    max_points = request.args.get('max_points', default=500, type=int)
+    method = request.args.get('method', 'lttb')
+    if method not in DOWNSAMPLING_METHODS:
+        return jsonify({'success': False, 'error': f"Unknown downsampling method: {method}"}), 400
+    
     try:
         # Get session data
         file_info = session.get('workflow_files', {})
@@ -716,12 +736,13 @@ def get_preview_data():
                 
                 if voltage_col and current_col:
                     logger.info(f"Found columns - Voltage: '{voltage_col}', Current: '{current_col}'")
-                    # Get sample of data (max 500 points for performance)
-                    sample_size = min(500, len(df))
-                    step = len(df) // sample_size
+                    # Downsample for the preview chart, keeping the peaks
+                    voltage, current = downsample(df[voltage_col].to_numpy(dtype=float),
+                                                  df[current_col].to_numpy(dtype=float),
+                                                  max_points, method)
                     
-                    voltage_data = df[voltage_col][::step].tolist()
-                    current_data = df[current_col][::step].tolist()
+                    voltage_data = voltage.tolist()
+                    current_data = current.tolist()
                     
                     result = {
                         'success': True,
@@ -806,7 +827,7 @@ def get_workflow_status():
             'preprocessing_done': bool(session.get('preprocessing_results')),
             'peaks_detected': bool(session.get('peak_detection_results')),
             'calibration_applied': bool(session.get('calibration_results')),
-            'analysis_available': ANALYSIS_AVAILABLE
+            'analysis_available': resolve(_analysis_modules)
         }
         
         return jsonify({
@@ -830,7 +851,7 @@ def get_workflow_status():
 def run_full_analysis():
     """Run the complete analysis pipeline"""
     try:
-        if not ANALYSIS_AVAILABLE:
+        if not resolve(_analysis_modules):
             return jsonify({
                 'success': False,
                 'error': 'Analysis modules not available'
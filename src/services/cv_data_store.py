@@ -0,0 +1,301 @@
+"""
+Columnar CV Data Store for H743Poten Web Interface
+Growable array-backed storage for CV measurement points
+"""
+
+import os
+import time
+import logging
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+try:
+    from .spill_store import ColumnSpillFile
+except ImportError:
+    from services.spill_store import ColumnSpillFile
+
+logger = logging.getLogger(__name__)
+
+# Scan direction encoding (matches the STM32 legacy format: 1=forward, 0=reverse)
+DIRECTION_CODES = {'forward': 1, 'reverse': 0}
+DIRECTION_NAMES = np.array(['reverse', 'forward'])
+
+# Column name -> dtype, ~27 bytes per point
+CV_COLUMNS = {
+    'timestamp': np.float64,
+    'potential': np.float64,
+    'current': np.float64,
+    'cycle': np.int16,
+    'direction': np.int8,
+}
+
+
+def encode_direction(direction) -> int:
+    """Convert 'forward'/'reverse' (or an int code) to the stored int8 code"""
+    if isinstance(direction, str):
+        return DIRECTION_CODES.get(direction, 1)
+    return 1 if direction else 0
+
+
+def decode_directions(codes: np.ndarray) -> np.ndarray:
+    """Convert stored direction codes back to 'forward'/'reverse' strings"""
+    return DIRECTION_NAMES[np.asarray(codes, dtype=np.intp)]
+
+
+def columns_to_records(columns: Dict[str, np.ndarray]) -> List[Dict]:
+    """Convert CV column arrays to a list of dicts (for JSON responses)"""
+    return [
+        {
+            'timestamp': t,
+            'potential': p,
+            'current': c,
+            'cycle': cy,
+            'direction': d
+        }
+        for t, p, c, cy, d in zip(
+            columns['timestamp'].tolist(),
+            columns['potential'].tolist(),
+            columns['current'].tolist(),
+            columns['cycle'].tolist(),
+            decode_directions(columns['direction']).tolist()
+        )
+    ]
+
+
+class CVDataStore:
+    """Append-only columnar store with amortized O(1) growth
+
+    Columns are preallocated NumPy arrays whose capacity doubles when full.
+    Readers get slice views of the filled region without copying. Callers are
+    responsible for locking; the store itself is not thread-safe.
+    """
+
+    def __init__(self, initial_capacity: int = 4096):
+        self.initial_capacity = max(1, int(initial_capacity))
+        self._length = 0
+        self._columns: Dict[str, np.ndarray] = {}
+        self._allocate(self.initial_capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        """Allocate fresh, empty columns"""
+        self._columns = {
+            name: np.empty(capacity, dtype=dtype) for name, dtype in CV_COLUMNS.items()
+        }
+        self._length = 0
+
+    def _reserve(self, required: int) -> None:
+        """Grow every column to hold at least ``required`` points"""
+        capacity = self.capacity
+        if required <= capacity:
+            return
+        while capacity < required:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._length] = column[:self._length]
+            self._columns[name] = grown
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def capacity(self) -> int:
+        return len(self._columns['timestamp'])
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes allocated by all columns"""
+        return sum(column.nbytes for column in self._columns.values())
+
+    def append(self, timestamp: float, potential: float, current: float,
+               cycle: int, direction) -> None:
+        """Append a single data point"""
+        self._reserve(self._length + 1)
+        i = self._length
+        columns = self._columns
+        columns['timestamp'][i] = timestamp
+        columns['potential'][i] = potential
+        columns['current'][i] = current
+        columns['cycle'][i] = cycle
+        columns['direction'][i] = encode_direction(direction)
+        self._length = i + 1
+
+    def extend(self, timestamp: Sequence[float], potential: Sequence[float],
+               current: Sequence[float], cycle, direction) -> None:
+        """Append a block of data points given as equal-length columns
+
+        ``cycle`` and ``direction`` may be scalars, which are broadcast.
+        ``direction`` may hold int codes or 'forward'/'reverse' strings.
+        """
+        timestamp = np.asarray(timestamp, dtype=np.float64)
+        count = len(timestamp)
+        if count == 0:
+            return
+
+        direction = np.asarray(direction)
+        if direction.dtype.kind in 'US':
+            direction = (direction == 'forward').astype(np.int8)
+
+        self._reserve(self._length + count)
+        start, stop = self._length, self._length + count
+        columns = self._columns
+        columns['timestamp'][start:stop] = timestamp
+        columns['potential'][start:stop] = potential
+        columns['current'][start:stop] = current
+        columns['cycle'][start:stop] = cycle
+        columns['direction'][start:stop] = direction
+        self._length = stop
+
+    def clear(self) -> None:
+        """Remove all points
+
+        New arrays are allocated so views handed out earlier keep their data.
+        """
+        self._allocate(self.initial_capacity)
+
+    def drop_head(self, count: int) -> None:
+        """Remove the oldest ``count`` points
+
+        The remaining points are copied into new arrays, so views handed out
+        earlier keep their data.
+        """
+        count = min(max(0, count), self._length)
+        if count == 0:
+            return
+        remaining = {name: column[count:self._length] for name, column in self._columns.items()}
+        self._allocate(max(self.initial_capacity, self._length - count))
+        self.extend(**remaining)
+
+    def _resolve(self, start: Optional[int], stop: Optional[int]) -> slice:
+        return slice(*slice(start, stop).indices(self._length)[:2])
+
+    def view(self, start: Optional[int] = None, stop: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Zero-copy column views of points [start:stop] (negative indices allowed)"""
+        window = self._resolve(start, stop)
+        return {name: column[window] for name, column in self._columns.items()}
+
+    def column(self, name: str, start: Optional[int] = None, stop: Optional[int] = None) -> np.ndarray:
+        """Zero-copy view of a single column"""
+        return self._columns[name][self._resolve(start, stop)]
+
+    def tail(self, count: int) -> Dict[str, np.ndarray]:
+        """Zero-copy views of the last ``count`` points"""
+        return self.view(max(0, self._length - count))
+
+    def to_records(self, start: Optional[int] = None, stop: Optional[int] = None) -> List[Dict]:
+        """Points [start:stop] as a list of dicts (for JSON responses)"""
+        return columns_to_records(self.view(start, stop))
+
+
+class SpillingCVDataStore:
+    """Bounded CVDataStore that spills its oldest points to disk
+
+    The newest ``ring_size`` points always stay in memory for live display.
+    Once ``ring_size + chunk_size`` points are held, everything older than the
+    ring is appended to a per-measurement ColumnSpillFile and dropped from
+    memory, so memory stays flat however long the measurement runs. Reads
+    use the same global indices as CVDataStore and combine the disk and
+    memory parts transparently; reads that fall entirely in memory remain
+    zero-copy.
+    """
+
+    def __init__(self, directory: str, ring_size: int = 100000, chunk_size: int = 10000):
+        self.directory = directory
+        self.ring_size = max(1, int(ring_size))
+        self.chunk_size = max(1, int(chunk_size))
+        self._memory = CVDataStore(initial_capacity=self.ring_size + self.chunk_size)
+        self._spill: Optional[ColumnSpillFile] = None
+        self._session = 0
+
+    def __len__(self) -> int:
+        return self.spilled_count + len(self._memory)
+
+    @property
+    def spilled_count(self) -> int:
+        """Number of points stored on disk"""
+        return len(self._spill) if self._spill is not None else 0
+
+    @property
+    def memory_count(self) -> int:
+        """Number of points held in memory"""
+        return len(self._memory)
+
+    @property
+    def spill_path(self) -> Optional[str]:
+        return str(self._spill.directory) if self._spill is not None else None
+
+    @property
+    def capacity(self) -> int:
+        return self._memory.capacity
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes allocated in memory (the spilled data is not counted)"""
+        return self._memory.nbytes
+
+    def append(self, timestamp: float, potential: float, current: float,
+               cycle: int, direction) -> None:
+        """Append a single data point"""
+        self._memory.append(timestamp, potential, current, cycle, direction)
+        self._maybe_spill()
+
+    def extend(self, timestamp: Sequence[float], potential: Sequence[float],
+               current: Sequence[float], cycle, direction) -> None:
+        """Append a block of data points (see CVDataStore.extend)"""
+        self._memory.extend(timestamp, potential, current, cycle, direction)
+        self._maybe_spill()
+
+    def _maybe_spill(self) -> None:
+        held = len(self._memory)
+        if held < self.ring_size + self.chunk_size:
+            return
+        count = held - self.ring_size
+        if self._spill is None:
+            self._session += 1
+            path = os.path.join(self.directory,
+                                f"cv_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{self._session}")
+            self._spill = ColumnSpillFile(path, CV_COLUMNS)
+            logger.info(f"Spilling CV data to {path}")
+        self._spill.append(self._memory.view(0, count))
+        self._memory.drop_head(count)
+
+    def clear(self) -> None:
+        """Remove all points, including the spilled data of the previous measurement"""
+        if self._spill is not None:
+            self._spill.delete()
+            self._spill = None
+        self._memory.clear()
+
+    def close(self) -> None:
+        """Remove the spill files (call on shutdown)"""
+        self.clear()
+
+    def _resolve(self, start: Optional[int], stop: Optional[int]) -> slice:
+        return slice(*slice(start, stop).indices(len(self))[:2])
+
+    def _read(self, name: str, window: slice) -> np.ndarray:
+        spilled = self.spilled_count
+        if window.start >= spilled:
+            return self._memory.column(name, window.start - spilled, window.stop - spilled)
+        disk = self._spill.read(name, window.start, min(window.stop, spilled))
+        if window.stop <= spilled:
+            return disk
+        return np.concatenate([disk, self._memory.column(name, 0, window.stop - spilled)])
+
+    def view(self, start: Optional[int] = None, stop: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Column arrays of points [start:stop] (negative indices allowed)
+
+        Windows inside the in-memory ring are zero-copy views; windows reaching
+        into the spilled part are read from disk.
+        """
+        window = self._resolve(start, stop)
+        return {name: self._read(name, window) for name in CV_COLUMNS}
+
+    def column(self, name: str, start: Optional[int] = None, stop: Optional[int] = None) -> np.ndarray:
+        return self._read(name, self._resolve(start, stop))
+
+    def tail(self, count: int) -> Dict[str, np.ndarray]:
+        return self.view(max(0, len(self) - count))
+
+    def to_records(self, start: Optional[int] = None, stop: Optional[int] = None) -> List[Dict]:
+        return columns_to_records(self.view(start, stop))
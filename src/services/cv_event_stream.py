@@ -0,0 +1,151 @@
+"""
+CV Event Stream for H743Poten Web Interface
+Pushes live CV data and status to browsers as Server-Sent Events
+"""
+
+import json
+import time
+import threading
+import logging
+from typing import Iterator, Optional
+
+try:
+    from ..config.settings import Config
+except ImportError:
+    from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+# Status fields whose change triggers an immediate status frame
+STATUS_CHANGE_KEYS = ('is_measuring', 'is_paused', 'current_cycle', 'scan_direction',
+                      'device_connected', 'sequence_start')
+
+
+def format_sse(data: Optional[dict] = None, event: Optional[str] = None,
+               event_id: Optional[int] = None, retry: Optional[int] = None) -> str:
+    """Format a single Server-Sent Events message"""
+    lines = []
+    if retry is not None:
+        lines.append(f"retry: {retry}")
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    if data is not None:
+        lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class CVEventBroker:
+    """Fans out CVMeasurementService updates to Server-Sent Event clients
+
+    The broker registers itself as the service's stream callback. Each
+    notification only wakes the waiting client generators; every client then
+    reads its own backlog from the service with its sequence cursor, so slow
+    clients never hold up the measurement thread.
+    """
+
+    def __init__(self, cv_service, frame_rate: float = Config.CV_EVENT_FRAME_RATE):
+        self.cv_service = cv_service
+        self.frame_rate = frame_rate
+        self._condition = threading.Condition()
+        self._version = 0
+        self.client_count = 0
+
+        cv_service.enable_streaming(self.notify)
+
+    def notify(self, *args) -> None:
+        """Stream callback: wake every client waiting for new data"""
+        with self._condition:
+            self._version += 1
+            self._condition.notify_all()
+
+    def _wait(self, version: int, timeout: float) -> int:
+        """Block until a notification newer than ``version`` or timeout"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._version != version, timeout=timeout)
+            return self._version
+
+    def events(self, last_event_id: Optional[int] = None,
+               frame_rate: Optional[float] = None) -> Iterator[str]:
+        """Generate the SSE stream for one client
+
+        Data frames carry the points added since the previous frame and use the
+        next sequence cursor as their event id, so a reconnecting EventSource
+        resumes from ``Last-Event-ID`` without gaps or duplicates.
+        """
+        frame_interval = 1.0 / (frame_rate or self.frame_rate)
+        cursor = last_event_id
+        last_status_key = None
+        last_status_time = 0.0
+        last_peaks_version = None
+        last_send_time = time.time()
+        version = -1
+
+        with self._condition:
+            self.client_count += 1
+        logger.info(f"CV event client connected (resume from {last_event_id}), "
+                    f"{self.client_count} active")
+
+        try:
+            yield format_sse(retry=2000)
+
+            while True:
+                frame_start = time.time()
+                # Wake at least once per status interval so idle clients still get status frames
+                version = self._wait(version, min(Config.CV_EVENT_STATUS_INTERVAL,
+                                                  Config.CV_EVENT_KEEPALIVE))
+                sent = False
+
+                # Drain the backlog in bounded frames
+                while True:
+                    points, first_sequence, next_sequence = self.cv_service.get_data_since(
+                        cursor, limit=Config.CV_EVENT_MAX_POINTS_PER_FRAME)
+                    # A new measurement never continues an old cursor, so this also marks run boundaries
+                    reset = first_sequence != cursor
+                    if not points and not reset:
+                        break
+                    yield format_sse({
+                        'data_points': points,
+                        'first_sequence': first_sequence,
+                        'next_since': next_sequence,
+                        'reset': reset
+                    }, event='data', event_id=next_sequence)
+                    cursor = next_sequence
+                    sent = True
+                    if len(points) < Config.CV_EVENT_MAX_POINTS_PER_FRAME:
+                        break
+
+                # Status goes after data so clients see the final points first
+                status = self.cv_service.get_status()
+                status_key = tuple(status.get(key) for key in STATUS_CHANGE_KEYS)
+                now = time.time()
+                if (status_key != last_status_key
+                        or now - last_status_time >= Config.CV_EVENT_STATUS_INTERVAL):
+                    yield format_sse(status, event='status')
+                    last_status_key = status_key
+                    last_status_time = now
+                    sent = True
+                
+                # Live peaks only when the detector reported a change
+                peaks = self.cv_service.get_live_peaks()
+                if peaks is not None and peaks['version'] != last_peaks_version:
+                    yield format_sse(peaks, event='peaks')
+                    last_peaks_version = peaks['version']
+                    sent = True
+
+                if sent:
+                    last_send_time = now
+                elif now - last_send_time >= Config.CV_EVENT_KEEPALIVE:
+                    yield ": keepalive\n\n"
+                    last_send_time = now
+
+                # Batch whatever arrives during the rest of this frame
+                remaining = frame_interval - (time.time() - frame_start)
+                if remaining > 0:
+                    time.sleep(remaining)
+
+        finally:
+            with self._condition:
+                self.client_count -= 1
+            logger.info(f"CV event client disconnected, {self.client_count} active")
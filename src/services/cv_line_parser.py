@@ -0,0 +1,249 @@
+"""
+CV Line Parser for H743Poten Web Interface
+Vectorized parsing of STM32 "CV," data lines in blocks
+"""
+
+import io
+import logging
+import numpy as np
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Desktop format: "CV, time_ms, voltage, current, current_gain, cycle, adc0_raw, dac1_raw, point_no, dac0_raw"
+DESKTOP_FIELDS = 10
+DESKTOP_INT_COLUMNS = (4, 5, 6, 7, 8)  # cycle, adc0_raw, dac1_raw, point_no, dac0_raw (after 'CV')
+
+# Legacy format: "CV, timestamp, potential, current, cycle, direction"
+LEGACY_FIELDS = 6
+LEGACY_INT_COLUMNS = (3, 4)  # cycle, direction (1=forward, 0=reverse)
+
+COMPLETION_SIGNALS = ('CV Operation Finished', 'CV Operation Complete', 'CV_COMPLETE', 'COMPLETE')
+
+# Stream validation (same thresholds as the Desktop version)
+DIRECTION_THRESHOLD = 0.001  # V change needed to infer a new scan direction
+VOLTAGE_JUMP_LIMIT = 0.5     # V
+CURRENT_JUMP_LIMIT = 0.001   # A
+
+# Direction codes; INFER marks Desktop-format rows whose direction comes from the potential
+FORWARD = 1
+REVERSE = 0
+INFER = -1
+
+
+@dataclass
+class CVLineBlock:
+    """Parsed CV data points from a block of lines, in arrival order"""
+    time_ms: np.ndarray
+    potential: np.ndarray
+    current: np.ndarray
+    cycle: np.ndarray
+    direction: np.ndarray          # FORWARD/REVERSE, or INFER for Desktop-format rows
+    completion: Optional[str] = None  # Completion line; lines after it are not parsed
+    errors: List[str] = field(default_factory=list)   # '**ERROR' lines
+    invalid: List[str] = field(default_factory=list)  # Unparseable 'CV' lines
+
+    def __len__(self) -> int:
+        return len(self.potential)
+
+
+@dataclass
+class CVBlockResult:
+    """Outcome of applying direction inference and jump filtering to a block"""
+    accepted: np.ndarray       # Boolean mask of points that passed validation
+    direction: np.ndarray      # FORWARD/REVERSE code for every point
+    last_potential: Optional[float]  # Last Desktop-format potential, for the next block
+
+
+def _is_completion(line: str) -> bool:
+    return any(signal in line for signal in COMPLETION_SIGNALS)
+
+
+def _parse_rows(lines: Sequence[str], width: int, int_columns: Sequence[int],
+                invalid: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Parse 'CV,' lines into a (n, width - 1) float array
+
+    Lines carrying more than ``width`` fields are truncated. Rows that fail to
+    parse, or have non-integral values in ``int_columns``, are dropped and
+    appended to ``invalid``.
+
+    Returns:
+        (values of the valid rows, boolean mask of valid rows)
+    """
+    columns = width - 1
+    if not lines:
+        return np.empty((0, columns)), np.ones(0, dtype=bool)
+
+    text = '\n'.join(
+        line[3:] if line.count(',') == columns else ','.join(line.split(',', width)[1:width])
+        for line in lines
+    )
+    try:
+        values = np.loadtxt(io.StringIO(text), delimiter=',', ndmin=2)
+    except ValueError:
+        # Rare: parse line by line so only the bad rows are lost
+        rows = []
+        for line in lines:
+            try:
+                rows.append([float(part) for part in line.split(',', width)[1:width]])
+            except ValueError:
+                rows.append([np.nan] * columns)
+        values = np.array(rows, dtype=np.float64).reshape(-1, columns)
+
+    valid = np.isfinite(values).all(axis=1)
+    int_values = values[:, list(int_columns)]
+    valid &= (int_values == np.floor(int_values)).all(axis=1)
+    if not valid.all():
+        invalid.extend(line for line, ok in zip(lines, valid) if not ok)
+    return values[valid], valid
+
+
+def parse_cv_lines(lines: Sequence[str], records: Optional[np.ndarray] = None) -> CVLineBlock:
+    """Parse a block of raw STM32 lines in one vectorized pass
+
+    Supports the 10-field Desktop format and the 6-field legacy format.
+    '**ERROR' lines are collected, and parsing stops at the first completion
+    signal, like the line-by-line reader it replaces.
+
+    ``records`` are decoded binary stream records (fields time_ms, potential,
+    current, cycle) received before ``lines``; their points come first and
+    their direction is inferred like Desktop rows.
+    """
+    errors: List[str] = []
+    invalid: List[str] = []
+    completion = None
+
+    # Classify lines; the common case is a block of Desktop-format data only
+    if all(line.startswith('CV,') and line.count(',') == DESKTOP_FIELDS - 1 for line in lines):
+        desktop_idx = list(range(len(lines)))
+        legacy_idx = []
+    else:
+        desktop_idx, legacy_idx = [], []
+        for i, line in enumerate(lines):
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('**ERROR'):
+                errors.append(line)
+                continue
+            if line.startswith('CV,'):
+                fields = line.count(',') + 1
+                if fields >= DESKTOP_FIELDS:
+                    desktop_idx.append(i)
+                    continue
+                if fields >= LEGACY_FIELDS:
+                    legacy_idx.append(i)
+                    continue
+            if _is_completion(line):
+                completion = line
+                break
+            if line.startswith(('CV,', 'CV ')):
+                invalid.append(line)
+
+    desktop_lines = [lines[i].strip() for i in desktop_idx]
+    legacy_lines = [lines[i].strip() for i in legacy_idx]
+    desktop, desktop_ok = _parse_rows(desktop_lines, DESKTOP_FIELDS, DESKTOP_INT_COLUMNS, invalid)
+    legacy, legacy_ok = _parse_rows(legacy_lines, LEGACY_FIELDS, LEGACY_INT_COLUMNS, invalid)
+
+    time_ms = np.concatenate([desktop[:, 0], legacy[:, 0]])
+    potential = np.concatenate([desktop[:, 1], legacy[:, 1]])
+    current = np.concatenate([desktop[:, 2], legacy[:, 2]])
+    cycle = np.concatenate([desktop[:, 4], legacy[:, 3]]).astype(np.int64)
+    direction = np.concatenate([
+        np.full(len(desktop), INFER, dtype=np.int8),
+        np.where(legacy[:, 4] == 1, FORWARD, REVERSE).astype(np.int8)
+    ])
+
+    # Restore arrival order when both formats are present
+    if len(desktop) and len(legacy):
+        line_index = np.concatenate([np.asarray(desktop_idx)[desktop_ok],
+                                     np.asarray(legacy_idx)[legacy_ok]])
+        order = np.argsort(line_index, kind='stable')
+        time_ms, potential, current = time_ms[order], potential[order], current[order]
+        cycle, direction = cycle[order], direction[order]
+
+    if records is not None and len(records):
+        time_ms = np.concatenate([records['time_ms'], time_ms])
+        potential = np.concatenate([records['potential'].astype(np.float64), potential])
+        current = np.concatenate([records['current'].astype(np.float64), current])
+        cycle = np.concatenate([records['cycle'], cycle]).astype(np.int64)
+        direction = np.concatenate([np.full(len(records), INFER, dtype=np.int8), direction])
+
+    return CVLineBlock(time_ms, potential, current, cycle, direction,
+                       completion=completion, errors=errors, invalid=invalid)
+
+
+def validate_cv_block(block: CVLineBlock,
+                      last_potential: Optional[float],
+                      last_valid_potential: Optional[float],
+                      last_valid_current: Optional[float],
+                      scan_direction: int) -> CVBlockResult:
+    """Infer scan directions and filter voltage jumps / current spikes
+
+    Semantics match the per-point Desktop logic:
+    - Desktop rows take their direction from the potential change since the
+      previous Desktop row (filtered or not) when it exceeds
+      DIRECTION_THRESHOLD, otherwise they keep the direction of the last
+      accepted point. The very first row defaults to forward.
+    - A point is rejected when it jumps more than VOLTAGE_JUMP_LIMIT or
+      CURRENT_JUMP_LIMIT from the last accepted point.
+    """
+    count = len(block)
+    potential, current = block.potential, block.current
+    direction = block.direction.copy()
+
+    # Direction from potential progression over the Desktop rows
+    infer_idx = np.flatnonzero(direction == INFER)
+    if len(infer_idx):
+        infer_potential = potential[infer_idx]
+        previous = np.empty(len(infer_idx))
+        previous[0] = np.nan if last_potential is None else last_potential
+        previous[1:] = infer_potential[:-1]
+        change = infer_potential - previous
+
+        inferred = np.full(len(infer_idx), INFER, dtype=np.int8)
+        moving = np.abs(change) > DIRECTION_THRESHOLD
+        inferred[moving] = np.where(change[moving] > 0, FORWARD, REVERSE)
+        if last_potential is None:
+            inferred[0] = FORWARD  # Default for first point
+        direction[infer_idx] = inferred
+        last_potential = float(infer_potential[-1])
+
+    # Fast path: no point jumps away from its predecessor, so every point is accepted
+    if count:
+        previous_potential = np.concatenate([[np.nan if last_valid_potential is None
+                                              else last_valid_potential], potential[:-1]])
+        previous_current = np.concatenate([[np.nan if last_valid_current is None
+                                            else last_valid_current], current[:-1]])
+        jumps = ((np.abs(potential - previous_potential) > VOLTAGE_JUMP_LIMIT)
+                 | (np.abs(current - previous_current) > CURRENT_JUMP_LIMIT))
+    else:
+        jumps = np.zeros(0, dtype=bool)
+
+    if not jumps.any():
+        accepted = np.ones(count, dtype=bool)
+        # Rows without a direction keep the previous point's direction
+        filled = np.where(direction != INFER, np.arange(count), -1)
+        np.maximum.accumulate(filled, out=filled)
+        direction = np.where(filled >= 0, direction[np.maximum(filled, 0)],
+                             scan_direction).astype(np.int8)
+        return CVBlockResult(accepted, direction, last_potential)
+
+    # Slow path: a rejection changes the reference point for everything after it
+    accepted = np.zeros(count, dtype=bool)
+    for i in range(count):
+        p, c = potential[i], current[i]
+        if direction[i] == INFER:
+            direction[i] = scan_direction
+        if last_valid_potential is not None and abs(p - last_valid_potential) > VOLTAGE_JUMP_LIMIT:
+            logger.warning(f"Filtered large voltage jump: {abs(p - last_valid_potential):.3f}V")
+            continue
+        if last_valid_current is not None and abs(c - last_valid_current) > CURRENT_JUMP_LIMIT:
+            logger.warning(f"Filtered large current spike: {abs(c - last_valid_current):.6f}A")
+            continue
+        accepted[i] = True
+        last_valid_potential, last_valid_current = p, c
+        scan_direction = int(direction[i])
+
+    return CVBlockResult(accepted, direction, last_potential)
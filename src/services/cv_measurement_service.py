@@ -7,10 +7,26 @@ import time
 import threading
 import logging
 import json
+import numpy as np
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
+try:
+    from .cv_data_store import (CVDataStore, SpillingCVDataStore, columns_to_records,
+                                decode_directions, encode_direction)
+    from .downsampling import downsample_indices
+    from .live_peak_detector import LivePeakDetector
+    from .cv_line_parser import parse_cv_lines, validate_cv_block
+    from ..config.settings import Config
+except ImportError:
+    from services.cv_data_store import (CVDataStore, SpillingCVDataStore, columns_to_records,
+                                        decode_directions, encode_direction)
+    from services.downsampling import downsample_indices
+    from services.live_peak_detector import LivePeakDetector
+    from services.cv_line_parser import parse_cv_lines, validate_cv_block
+    from config.settings import Config
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -53,15 +69,6 @@ class CVParameters:
         """
         return f"POTEn:CV:Start:ALL {self.begin},{self.upper},{self.lower},{self.rate},{self.cycles}"
 
-@dataclass  
-class CVDataPoint:
-    """Single CV data point"""
-    timestamp: float
-    potential: float    # Applied potential (V)
-    current: float      # Measured current (A)
-    cycle: int          # Current cycle number
-    direction: str      # Scan direction: 'forward' or 'reverse'
-
 class CVMeasurementService:
     """Service for managing CV measurements"""
     
@@ -70,7 +77,8 @@ class CVMeasurementService:
         self.is_measuring = False
         self.is_paused = False
         self.measurement_thread = None
-        self.data_points: List[CVDataPoint] = []
+        self.data_store = self._create_store(Config.MEASUREMENT_STORAGE_MODE)  # Columnar point storage
+        self.sequence_base = 0  # Sequence number of the first stored point
         self.current_params: Optional[CVParameters] = None
         self.start_time = None
         self.current_cycle = 1
@@ -88,12 +96,51 @@ class CVMeasurementService:
         # Timeout handling
         self.last_data_time = None
         self.data_timeout = 10.0  # seconds without data before considering measurement complete
+        self.line_wait_timeout = 0.1  # seconds to block waiting for new serial lines
         
         # Data validation filters (similar to Desktop version)
         self.last_validated_potential = None
         self.last_validated_current = None
         self.last_potential = None  # For direction inference
         
+        # Online Epa/Epc detection, fed with every accepted block
+        self.peak_detector = LivePeakDetector() if Config.LIVE_PEAK_DETECTION else None
+        
+    def _start_new_sequence(self):
+        """Move the sequence base past the stored points (call with data_lock held)
+        
+        Sequence numbers keep increasing across measurements. One number is
+        skipped at each boundary, so the cursor a client holds at the end of a
+        measurement never continues into the next one.
+        """
+        self.sequence_base += len(self.data_store) + 1
+
+    @staticmethod
+    def _create_store(mode: str):
+        if mode == 'ring':
+            return SpillingCVDataStore(Config.MEASUREMENT_SPILL_DIR,
+                                       ring_size=Config.CV_RING_SIZE,
+                                       chunk_size=Config.CV_SPILL_CHUNK)
+        return CVDataStore()
+
+    def set_storage_mode(self, mode: str) -> Tuple[bool, str]:
+        """Select 'memory' (all points in RAM) or 'ring' (bounded RAM, spill to disk)"""
+        if mode not in ('memory', 'ring'):
+            return False, f"Unknown storage mode: {mode}"
+        with self.data_lock:
+            if self.is_measuring:
+                return False, "Cannot change storage mode during a measurement"
+            self._start_new_sequence()
+            if isinstance(self.data_store, SpillingCVDataStore):
+                self.data_store.close()
+            self.data_store = self._create_store(mode)
+        logger.info(f"CV storage mode set to {mode}")
+        return True, f"Storage mode set to {mode}"
+
+    @property
+    def storage_mode(self) -> str:
+        return 'ring' if isinstance(self.data_store, SpillingCVDataStore) else 'memory'
+
     def set_simulation_mode(self, enabled: bool) -> None:
         """Enable or disable simulation mode"""
         self.simulation_mode = enabled
@@ -138,7 +185,10 @@ class CVMeasurementService:
             
             # Clear previous data
             with self.data_lock:
-                self.data_points.clear()
+                self._start_new_sequence()
+                self.data_store.clear()
+                if self.peak_detector:
+                    self.peak_detector.reset()
                 self.current_cycle = 1
                 self.scan_direction = 'forward'
                 self.current_potential = self.current_params.begin
@@ -155,6 +205,7 @@ class CVMeasurementService:
                     daemon=True
                 )
                 self.measurement_thread.start()
+                self._notify_stream()
                 return True, "CV measurement started (simulation mode)"
             else:
                 # Send SCPI command to start measurement on real device
@@ -173,6 +224,7 @@ class CVMeasurementService:
                         daemon=True
                     )
                     self.measurement_thread.start()
+                    self._notify_stream()
                     return True, "CV measurement started (simulation mode - device not responding)"
                 
                 # Device accepted command, start measurement worker
@@ -187,6 +239,7 @@ class CVMeasurementService:
                 self.measurement_thread.start()
                 
                 logger.info("CV measurement started on device")
+                self._notify_stream()
                 return True, "CV measurement started successfully"
             
         except Exception as e:
@@ -218,6 +271,7 @@ class CVMeasurementService:
                 self.measurement_thread.join(timeout=2.0)
             
             logger.info("CV measurement stopped")
+            self._notify_stream()
             return True, "CV measurement stopped successfully"
             
         except Exception as e:
@@ -235,6 +289,7 @@ class CVMeasurementService:
             
             self.is_paused = True
             logger.info("CV measurement paused")
+            self._notify_stream()
             return True, "CV measurement paused"
             
         except Exception as e:
@@ -252,6 +307,7 @@ class CVMeasurementService:
             
             self.is_paused = False
             logger.info("CV measurement resumed")
+            self._notify_stream()
             return True, "CV measurement resumed"
             
         except Exception as e:
@@ -272,7 +328,11 @@ class CVMeasurementService:
                 'current_cycle': self.current_cycle,
                 'scan_direction': self.scan_direction,
                 'current_potential': self.current_potential,
-                'data_points_count': len(self.data_points),
+                'data_points_count': len(self.data_store),
+                'storage_mode': self.storage_mode,
+                'points_on_disk': getattr(self.data_store, 'spilled_count', 0),
+                'sequence_start': self.sequence_base,
+                'next_sequence': self.sequence_base + len(self.data_store),
                 'elapsed_time': time.time() - self.start_time if self.start_time else 0,
                 'time_since_last_data': time_since_last_data,
                 'data_timeout': self.data_timeout,
@@ -286,36 +346,90 @@ class CVMeasurementService:
                 } if self.current_params else None
             }
     
-    def get_data_points(self, limit: Optional[int] = None) -> List[Dict]:
-        """Get measurement data points"""
-        print(f"[CV SERVICE] get_data_points called with limit={limit}")
+    def get_live_peaks(self) -> Optional[Dict]:
+        """Peaks found so far in the running measurement (None if disabled)
+        
+        Returns the LivePeakDetector summary: confirmed Epa/Epc and ΔEp per
+        cycle, the open candidate, and a version that changes with either.
+        """
+        if not self.peak_detector:
+            return None
         with self.data_lock:
-            total_points = len(self.data_points)
-            print(f"[CV SERVICE] Total data points available: {total_points}")
-            
-            points = self.data_points[-limit:] if limit else self.data_points
-            result_count = len(points)
-            print(f"[CV SERVICE] Returning {result_count} points (limit={limit})")
-            
-            result = [
-                {
-                    'timestamp': point.timestamp,
-                    'potential': point.potential,
-                    'current': point.current,
-                    'cycle': point.cycle,
-                    'direction': point.direction
-                }
-                for point in points
-            ]
-            
-            if result:
-                voltages = [p['potential'] for p in result]
-                print(f"[CV SERVICE] Voltage range: {min(voltages):.4f} to {max(voltages):.4f}")
-            
-            return result
+            return self.peak_detector.summary()
+    
+    def _records(self, start: Optional[int], stop: Optional[int] = None,
+                 max_points: Optional[int] = None, method: str = 'lttb') -> List[Dict]:
+        """Points [start:stop] as dicts, downsampled to ~max_points for plotting"""
+        if not max_points:
+            return self.data_store.to_records(start, stop)
+        columns = self.data_store.view(start, stop)
+        index = downsample_indices(columns['potential'], columns['current'], max_points, method)
+        return columns_to_records({name: values[index] for name, values in columns.items()})
+    
+    def get_data_points(self, limit: Optional[int] = None, max_points: Optional[int] = None,
+                        method: str = 'lttb') -> List[Dict]:
+        """Get measurement data points
+        
+        ``limit`` selects the newest points; ``max_points`` then downsamples
+        them ('lttb' or 'minmax', see services.downsampling).
+        """
+        with self.data_lock:
+            start = -limit if limit else None
+            result = self._records(start, max_points=max_points, method=method)
+            
+        logger.debug(f"[CV SERVICE] Returning {len(result)} points (limit={limit})")
+        return result
+    
+    def get_data_since(self, since: Optional[int] = None,
+                       limit: Optional[int] = None, max_points: Optional[int] = None,
+                       method: str = 'lttb') -> Tuple[List[Dict], int, int]:
+        """Get data points with sequence number >= since
+        
+        Every stored point has a sequence number that increases monotonically
+        for the lifetime of the service, including across measurements. A new
+        measurement starts one past the previous one's next_sequence.
+        
+        Returns:
+            (points, first_sequence, next_sequence) where first_sequence is the
+            sequence number of points[0] and next_sequence is the cursor to
+            pass as ``since`` on the next call. first_sequence differs from
+            ``since`` when the cursor did not match the current measurement.
+            With ``max_points`` the points of this batch are downsampled; the
+            cursor still advances past every point.
+        """
+        with self.data_lock:
+            base = self.sequence_base
+            total = len(self.data_store)
+            # Unknown cursors (None, or ahead of us after a restart) start over
+            start = since - base if since is not None and 0 <= since - base <= total else 0
+            stop = min(total, start + limit) if limit else total
+            points = self._records(start, stop, max_points=max_points, method=method)
+            
+        return points, base + start, base + stop
+    
+    def get_data_columns(self, limit: Optional[int] = None,
+                         decode_direction: bool = False) -> Dict[str, np.ndarray]:
+        """Get measurement data as column arrays
+        
+        The arrays are zero-copy views into the data store and must be treated
+        as read-only. With decode_direction the direction column holds
+        'forward'/'reverse' strings instead of int8 codes (1=forward, 0=reverse).
+        """
+        with self.data_lock:
+            columns = self.data_store.tail(limit) if limit else self.data_store.view()
+            
+        if decode_direction:
+            columns['direction'] = decode_directions(columns['direction'])
+        return columns
     
     def enable_streaming(self, callback=None):
-        """Enable real-time data streaming"""
+        """Enable real-time data streaming
+        
+        The callback is called with the next point sequence number whenever
+        new data may be available or the measurement state changes. It runs on
+        the measurement thread, so it should only signal consumers, which then
+        fetch their backlog with get_data_since().
+        """
         self.streaming_enabled = True
         self.stream_callback = callback
         
@@ -324,20 +438,33 @@ class CVMeasurementService:
         self.streaming_enabled = False
         self.stream_callback = None
     
+    def _notify_stream(self):
+        """Signal the stream callback, if any"""
+        if self.streaming_enabled and self.stream_callback:
+            try:
+                self.stream_callback(self.sequence_base + len(self.data_store))
+            except Exception as e:
+                logger.error(f"Streaming callback error: {e}")
+    
     def export_data_csv(self) -> str:
         """Export data as CSV string"""
-        with self.data_lock:
-            if not self.data_points:
-                return ""
-            
-            lines = ["Timestamp,Potential(V),Current(A),Cycle,Direction"]
-            for point in self.data_points:
-                lines.append(
-                    f"{point.timestamp},{point.potential},{point.current},"
-                    f"{point.cycle},{point.direction}"
-                )
-            
-            return "\n".join(lines)
+        columns = self.get_data_columns(decode_direction=True)
+        if not len(columns['timestamp']):
+            return ""
+        
+        lines = ["Timestamp,Potential(V),Current(A),Cycle,Direction"]
+        lines.extend(
+            f"{t},{p},{c},{cy},{d}"
+            for t, p, c, cy, d in zip(
+                columns['timestamp'].tolist(),
+                columns['potential'].tolist(),
+                columns['current'].tolist(),
+                columns['cycle'].tolist(),
+                columns['direction'].tolist()
+            )
+        )
+        
+        return "\n".join(lines)
     
     def _measurement_worker(self):
         """Background thread for monitoring measurement progress"""
@@ -354,19 +481,26 @@ class CVMeasurementService:
                 # For now, we'll simulate the measurement
                 if self._read_measurement_data():
                     # Stream data if enabled
-                    if self.streaming_enabled and self.stream_callback:
-                        try:
-                            self.stream_callback(self.get_data_points(limit=10))
-                        except Exception as e:
-                            logger.error(f"Streaming callback error: {e}")
+                    self._notify_stream()
                 
-                time.sleep(0.1)  # 10 Hz sampling rate to avoid queue overflow
+                # The serial reader thread blocks in read_lines(); only poll-based
+                # sources (simulation, legacy handlers) need to be throttled here
+                if not self._uses_line_reader():
+                    time.sleep(0.1)  # 10 Hz sampling rate to avoid queue overflow
                 
         except Exception as e:
             logger.error(f"CV measurement worker error: {e}")
         finally:
+            self._notify_stream()
             logger.info("CV measurement worker stopped")
     
+    def _uses_line_reader(self) -> bool:
+        """Check if the SCPI handler delivers framed lines from a reader thread"""
+        if self.simulation_mode or not getattr(self.scpi_handler, 'is_connected', False):
+            return False
+        is_running = getattr(self.scpi_handler, 'is_reader_running', None)
+        return bool(is_running and is_running())
+    
     def _read_measurement_data(self) -> bool:
         """Read measurement data from device"""
         try:
@@ -397,127 +531,83 @@ class CVMeasurementService:
             # We just need to listen for incoming data from the SCPI handler
             
             # Check if there's any incoming data from STM32
-            # The SCPI handler should buffer incoming data
-            incoming_data = getattr(self.scpi_handler, 'get_buffered_data', lambda: None)()
+            # The SCPI handler frames complete lines (and decodes binary
+            # records, if negotiated) in its reader thread
+            records = None
+            if self._uses_line_reader():
+                records, lines = self.scpi_handler.read_stream(timeout=self.line_wait_timeout)
+            else:
+                incoming_data = getattr(self.scpi_handler, 'get_buffered_data', lambda: None)()
+                lines = incoming_data.strip().split('\n') if incoming_data else []
             
-            if not incoming_data:
+            if not lines and (records is None or not len(records)):
                 # No new data available, just continue
                 return True
                 
-            logger.debug(f"STM32 incoming data: '{incoming_data.strip()}'")
-            
-            # Handle multiple lines of data if received
-            lines = incoming_data.strip().split('\n')
-            data_processed = False
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
+            logger.debug(f"STM32 incoming lines: {len(lines)}, binary records: "
+                         f"{0 if records is None else len(records)}")
+            
+            # Parse CV data for the whole block at once. Expected formats from STM32:
+            # Old format: "CV, timestamp, potential, current, cycle, direction, ..."
+            # New format (Desktop compatible): "CV, time_ms, voltage, current, current_gain, cycle, adc0_raw, dac1_raw, point_no, dac0_raw"
+            block = parse_cv_lines(lines, records=records)
+            
+            # Handle SCPI error responses
+            for error_line in block.errors:
+                logger.warning(f"STM32 SCPI error: {error_line}")
+            for invalid_line in block.invalid:
+                logger.warning(f"Invalid CV data format: {invalid_line}")
+            
+            if len(block):
+                # Direction inference and data validation (similar to Desktop version)
+                result = validate_cv_block(
+                    block,
+                    self.last_potential,
+                    self.last_validated_potential,
+                    self.last_validated_current,
+                    encode_direction(self.scan_direction)
+                )
+                self.last_potential = result.last_potential
+                accepted = result.accepted
+                
+                if accepted.any():
+                    potential = block.potential[accepted]
+                    current = block.current[accepted]
+                    cycle = block.cycle[accepted]
+                    direction = result.direction[accepted]
                     
-                logger.debug(f"Processing line: '{line}'")
+                    # Update validated values for next comparison
+                    self.last_validated_potential = float(potential[-1])
+                    self.last_validated_current = float(current[-1])
                     
-                # Handle SCPI error responses
-                if line.startswith('**ERROR'):
-                    logger.warning(f"STM32 SCPI error: {line}")
-                    continue
-                
-                # Parse CV data: Expected format from STM32
-                # Old format: "CV, timestamp, potential, current, cycle, direction, ..."
-                # New format (Desktop compatible): "CV, time_ms, voltage, current, current_gain, cycle, adc0_raw, dac1_raw, point_no, dac0_raw"
-                if line.startswith('CV,') or line.startswith('CV '):
-                    try:
-                        parts = line.split(',')
-                        logger.debug(f"Parsed CV data parts: {parts}")
-                        
-                        # Desktop format with 10+ fields: "CV, time_ms, voltage, current, current_gain, cycle, adc0_raw, dac1_raw, point_no, dac0_raw"
-                        if len(parts) >= 10 and parts[0].strip() == 'CV':
-                            # Extract data from STM32 Desktop format
-                            time_ms = float(parts[1].strip())           # STM32 timestamp (ms)
-                            potential = float(parts[2].strip())         # Potential (V)
-                            current = float(parts[3].strip())           # Current (A)  
-                            current_gain = float(parts[4].strip())      # Current gain
-                            cycle = int(parts[5].strip())               # Cycle number
-                            adc0_raw = int(parts[6].strip())            # ADC0 raw
-                            dac1_raw = int(parts[7].strip())            # DAC1 raw
-                            point_no = int(parts[8].strip())            # Point number
-                            dac0_raw = int(parts[9].strip())            # DAC0 raw
-                            
-                            # Infer scan direction from voltage progression
-                            if hasattr(self, 'last_potential') and self.last_potential is not None:
-                                voltage_change = potential - self.last_potential
-                                if abs(voltage_change) > 0.001:  # Threshold for direction change
-                                    direction = 'forward' if voltage_change > 0 else 'reverse'
-                                else:
-                                    direction = self.scan_direction  # Keep current direction
-                            else:
-                                direction = 'forward'  # Default for first point
-                            
-                            self.last_potential = potential
-                            
-                        # Fallback to simple format: "CV, timestamp, potential, current, cycle, direction, ..."
-                        elif len(parts) >= 6 and parts[0].strip() == 'CV':
-                            time_ms = float(parts[1].strip())           # STM32 timestamp
-                            potential = float(parts[2].strip())         # Potential (V)
-                            current = float(parts[3].strip())           # Current (A)  
-                            cycle = int(parts[4].strip())               # Cycle number
-                            direction_code = int(parts[5].strip())      # Direction (1=forward, 0=reverse)
-                            direction = 'forward' if direction_code == 1 else 'reverse'
-                        else:
-                            logger.warning(f"Invalid CV data format: {line}")
-                            continue
-                        
-                        logger.info(f"STM32 Data: V={potential:.3f}V, I={current:.6f}A, Cycle={cycle}, Dir={direction}, Time={time_ms}ms")
-                        
-                        # Data validation and filtering (similar to Desktop version)
-                        if hasattr(self, 'last_validated_potential') and self.last_validated_potential is not None:
-                            voltage_jump = abs(potential - self.last_validated_potential)
-                            if voltage_jump > 0.5:  # Filter large voltage jumps
-                                logger.warning(f"Filtered large voltage jump: {voltage_jump:.3f}V")
-                                continue
-                        
-                        if hasattr(self, 'last_validated_current') and self.last_validated_current is not None:
-                            current_jump = abs(current - self.last_validated_current)
-                            if current_jump > 0.001:  # Filter large current spikes (1mA)
-                                logger.warning(f"Filtered large current spike: {current_jump:.6f}A")
-                                continue
-                        
-                        # Update validated values for next comparison
-                        self.last_validated_potential = potential
-                        self.last_validated_current = current
-                        
-                        # Update last data time when we receive valid data
-                        self.last_data_time = time.time()
-                        
-                        # Update current state
-                        self.current_potential = potential
-                        self.current_cycle = cycle
-                        self.scan_direction = direction
-                        
-                        # Add data point
-                        with self.data_lock:
-                            data_point = CVDataPoint(
-                                timestamp=time.time(),  # Use system time for consistency
-                                potential=potential,
-                                current=current,
-                                cycle=cycle,
-                                direction=direction
-                            )
-                            self.data_points.append(data_point)
-                            logger.debug(f"Added data point #{len(self.data_points)}: {data_point}")
-                            
-                        data_processed = True
-                        
-                    except (ValueError, IndexError) as e:
-                        logger.warning(f"Failed to parse CV data '{line}': {e}")
-                        continue
-                
-                # Check for measurement completion signals from STM32
-                elif any(completion_signal in line for completion_signal in 
-                        ['CV Operation Finished', 'CV Operation Complete', 'CV_COMPLETE', 'COMPLETE']):
-                    logger.info(f"CV measurement completed by STM32: {line.strip()}")
-                    self.is_measuring = False
-                    return False
+                    # Update last data time when we receive valid data
+                    self.last_data_time = time.time()
+                    
+                    # Update current state
+                    self.current_potential = float(potential[-1])
+                    self.current_cycle = int(cycle[-1])
+                    self.scan_direction = 'forward' if direction[-1] else 'reverse'
+                    
+                    # Add data points (system time for consistency)
+                    with self.data_lock:
+                        self.data_store.extend(
+                            np.full(len(potential), self.last_data_time),
+                            potential,
+                            current,
+                            cycle,
+                            direction
+                        )
+                        if self.peak_detector:
+                            self.peak_detector.update(potential, current, cycle, direction)
+                    
+                    logger.debug(f"STM32 Data: {len(potential)} points, last V={self.current_potential:.3f}V, "
+                                 f"Cycle={self.current_cycle}, Dir={self.scan_direction}")
+            
+            # Check for measurement completion signals from STM32
+            if block.completion:
+                logger.info(f"CV measurement completed by STM32: {block.completion}")
+                self.is_measuring = False
+                return False
             
             return True
             
@@ -599,14 +689,16 @@ class CVMeasurementService:
             
             # Add data point
             with self.data_lock:
-                data_point = CVDataPoint(
-                    timestamp=current_time,
-                    potential=self.current_potential,
-                    current=simulated_current,
-                    cycle=self.current_cycle,
-                    direction=self.scan_direction
+                self.data_store.append(
+                    current_time,
+                    self.current_potential,
+                    simulated_current,
+                    self.current_cycle,
+                    self.scan_direction
                 )
-                self.data_points.append(data_point)
+                if self.peak_detector:
+                    self.peak_detector.update([self.current_potential], [simulated_current],
+                                              [self.current_cycle], [encode_direction(self.scan_direction)])
             
             return True
             
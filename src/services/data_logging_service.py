@@ -5,33 +5,81 @@ Handles automatic saving of CV measurements as CSV and PNG files
 
 import os
 import json
+import time
 import logging
-import pandas as pd
-
-# Configure matplotlib to use Agg backend (non-interactive)
-import matplotlib
-matplotlib.use('Agg')  # Set backend before importing pyplot
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
+import sqlite3
+import threading
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
 import io
 import base64
 
+try:
+    from ..config.settings import Config
+    from .plot_renderer import PlotRenderer
+    from .session_index import SessionIndex
+    from .session_format import SESSION_DATA_SUFFIX, read_session_file, write_session_file
+    from .cv_data_store import CV_COLUMNS, decode_directions
+    from .downsampling import METHODS, bucket_minmax_indices, lttb_indices
+    from .lazy_imports import lazy_import
+except ImportError:
+    from config.settings import Config
+    from services.plot_renderer import PlotRenderer
+    from services.session_index import SessionIndex
+    from services.session_format import SESSION_DATA_SUFFIX, read_session_file, write_session_file
+    from services.cv_data_store import CV_COLUMNS, decode_directions
+    from services.downsampling import METHODS, bucket_minmax_indices, lttb_indices
+    from services.lazy_imports import lazy_import
+
 logger = logging.getLogger(__name__)
 
+pd = lazy_import('pandas')
+
+# Save job states, in order
+JOB_QUEUED = 'queued'        # Waiting for a save worker
+JOB_WRITING = 'writing'      # Writing CSV and metadata
+JOB_SAVED = 'saved'          # CSV and metadata are on disk; plot queued or rendering
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+# Smallest max_points accepted when streaming session data
+MIN_STREAM_POINTS = 2
+
 class DataLoggingService:
     """Service for logging CV measurement data and plots"""
     
-    def __init__(self, base_data_dir: str = "data_logs"):
+    def __init__(self, base_data_dir: str = "data_logs", plot_renderer: Optional[PlotRenderer] = None):
         self.base_data_dir = Path(base_data_dir)
         self.ensure_data_directory()
         
         # Metadata tracking
         self.session_metadata = {}
         
+        # Persistent session index; reconciled with the session directories on start
+        self.index = SessionIndex(self.base_data_dir / Config.SESSION_INDEX_FILE,
+                                  self.base_data_dir / "sessions")
+        self._reconcile_thread = None
+        if self.index.totals()['session_count'] == 0:
+            self.index.reconcile()
+        elif Config.SESSION_INDEX_RECONCILE_ON_START:
+            self._reconcile_thread = threading.Thread(target=self.index.reconcile, daemon=True,
+                                                      name='session-index')
+            self._reconcile_thread.start()
+        
+        # Asynchronous save pipeline: CSV/metadata workers, then PNG
+        # rendering in the plot renderer's low-priority worker processes
+        self.plot_renderer = plot_renderer or PlotRenderer()
+        self._save_executor = ThreadPoolExecutor(max_workers=Config.SAVE_WORKERS,
+                                                 thread_name_prefix='save')
+        self._jobs = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._job_counter = 0
+        
     def ensure_data_directory(self):
         """Create data directory structure"""
         try:
@@ -56,76 +104,24 @@ class DataLoggingService:
         return f"CV_{timestamp}"
     
     def save_cv_measurement(self, 
-                          data_points: List[Dict], 
+                          data_points: Union[List[Dict], Dict[str, List]], 
                           parameters: Dict,
                           session_id: Optional[str] = None) -> Dict:
         """
-        Save CV measurement data and generate plot
+        Save CV measurement data and generate plot (synchronously)
+        
+        data_points may be a list of point dicts or a dict of equal-length
+        columns (as returned by CVMeasurementService.get_data_columns).
+        Request handlers should use submit_save instead.
         
         Returns:
             Dict with file paths and session info
         """
         try:
-            if not data_points:
-                raise ValueError("No data points to save")
-            
-            # Generate session ID if not provided
-            if not session_id:
-                session_id = self.generate_session_id()
-            
-            # Create session directory
-            session_dir = self.base_data_dir / "sessions" / session_id
-            session_dir.mkdir(exist_ok=True)
-            
-            # Prepare data for saving
-            df = pd.DataFrame(data_points)
-            
-            # Generate file paths
-            csv_path = session_dir / f"{session_id}.csv"
-            png_path = session_dir / f"{session_id}.png"
-            metadata_path = session_dir / f"{session_id}_metadata.json"
-            
-            # Save CSV data
-            csv_result = self._save_csv_data(df, csv_path, parameters)
-            
-            # Generate and save PNG plot
-            png_result = self._save_png_plot(df, png_path, parameters, session_id)
-            
-            # Save metadata
-            metadata = {
-                'session_id': session_id,
-                'timestamp': datetime.now().isoformat(),
-                'parameters': parameters,
-                'data_points_count': len(data_points),
-                'csv_file': str(csv_path.relative_to(self.base_data_dir)),
-                'png_file': str(png_path.relative_to(self.base_data_dir)),
-                'voltage_range': {
-                    'min': float(df['potential'].min()),
-                    'max': float(df['potential'].max())
-                },
-                'current_range': {
-                    'min': float(df['current'].min()),
-                    'max': float(df['current'].max())
-                },
-                'cycles': int(df['cycle'].max()) if 'cycle' in df.columns else 1
-            }
-            
-            metadata_result = self._save_metadata(metadata, metadata_path)
-            
-            # Store session info
-            self.session_metadata[session_id] = metadata
-            
-            logger.info(f"CV measurement saved successfully: {session_id}")
-            
-            return {
-                'success': True,
-                'session_id': session_id,
-                'csv_file': str(csv_path),
-                'png_file': str(png_path),
-                'metadata_file': str(metadata_path),
-                'data_points_count': len(data_points),
-                'message': f"Data saved to session {session_id}"
-            }
+            df, session_id = self._prepare(data_points, session_id)
+            result = self._write_session(df, parameters, session_id)
+            self._save_png_plot(df, Path(result['png_file']), parameters, session_id)
+            return result
             
         except Exception as e:
             logger.error(f"Failed to save CV measurement: {e}")
@@ -135,7 +131,196 @@ class DataLoggingService:
                 'message': f"Failed to save measurement: {e}"
             }
     
-    def _save_csv_data(self, df: pd.DataFrame, csv_path: Path, parameters: Dict) -> bool:
+    def submit_save(self,
+                    data_points: Union[List[Dict], Dict[str, List]],
+                    parameters: Dict,
+                    session_id: Optional[str] = None) -> Dict:
+        """
+        Queue a CV measurement save and return immediately
+        
+        The CSV and metadata are written first by a save worker (state
+        'saved'); the PNG plot is then rendered by the plot renderer's
+        low-priority processes (state 'done'). Poll get_save_job for progress.
+        
+        Returns:
+            The job status dict
+        """
+        if not session_id:
+            session_id = self.generate_session_id()
+        
+        with self._jobs_lock:
+            self._job_counter += 1
+            job_id = f"save_{int(time.time() * 1000)}_{self._job_counter}"
+            job = {
+                'job_id': job_id,
+                'session_id': session_id,
+                'state': JOB_QUEUED,
+                'csv_saved': False,
+                'png_saved': False,
+                'error': None,
+                'submitted_at': time.time(),
+                'saved_at': None,
+                'finished_at': None,
+                'result': None
+            }
+            self._jobs[job_id] = job
+            while len(self._jobs) > Config.SAVE_JOB_HISTORY:
+                self._jobs.popitem(last=False)
+        
+        self._save_executor.submit(self._run_save_job, job_id, data_points, parameters, session_id)
+        logger.info(f"Save job queued: {job_id} ({session_id})")
+        return self.get_save_job(job_id)
+    
+    def get_save_job(self, job_id: str) -> Optional[Dict]:
+        """Get a copy of a save job's status"""
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+    
+    def _update_job(self, job_id: str, **changes) -> None:
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job.update(changes)
+    
+    def _run_save_job(self, job_id: str, data_points, parameters: Dict, session_id: str) -> None:
+        """Save worker: write CSV and metadata, then hand the plot to the PNG worker"""
+        try:
+            self._update_job(job_id, state=JOB_WRITING)
+            df, session_id = self._prepare(data_points, session_id)
+            result = self._write_session(df, parameters, session_id)
+            self._update_job(job_id, state=JOB_SAVED, csv_saved=True,
+                             saved_at=time.time(), result=result)
+            future = self._submit_plot(df, Path(result['png_file']), parameters, session_id)
+            future.add_done_callback(lambda f: self._finish_plot_job(job_id, f))
+        except Exception as e:
+            logger.error(f"Save job {job_id} failed: {e}")
+            self._update_job(job_id, state=JOB_FAILED, error=str(e), finished_at=time.time())
+    
+    def _finish_plot_job(self, job_id: str, future) -> None:
+        error = future.exception()
+        if error:
+            logger.error(f"Failed to render plot for save job {job_id}: {error}")
+        job = self.get_save_job(job_id)
+        if job:
+            self.index.refresh_files(job['session_id'])
+        self._update_job(job_id, state=JOB_DONE, png_saved=error is None,
+                         finished_at=time.time(),
+                         error=f"PNG rendering failed: {error}" if error else None)
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the save workers and plot renderer, finishing queued jobs if wait is True"""
+        self._save_executor.shutdown(wait=wait)
+        self.plot_renderer.shutdown(wait=wait)
+        # The startup reconcile must not find the index closed under it
+        if self._reconcile_thread is not None:
+            self._reconcile_thread.join()
+        self.index.close()
+    
+    def _prepare(self, data_points, session_id: Optional[str]) -> Tuple['pd.DataFrame', str]:
+        """Build the DataFrame and session ID for a save"""
+        df = pd.DataFrame(data_points)
+        if df.empty:
+            raise ValueError("No data points to save")
+        
+        # Generate session ID if not provided
+        if not session_id:
+            session_id = self.generate_session_id()
+        return df, session_id
+    
+    def _session_paths(self, session_id: str) -> Dict[str, Path]:
+        session_dir = self.base_data_dir / "sessions" / session_id
+        return {
+            'dir': session_dir,
+            'data': session_dir / f"{session_id}{SESSION_DATA_SUFFIX}",
+            'csv': session_dir / f"{session_id}.csv",
+            'png': session_dir / f"{session_id}.png",
+            'metadata': session_dir / f"{session_id}_metadata.json",
+        }
+    
+    @staticmethod
+    def _typed_columns(df: 'pd.DataFrame') -> Dict[str, np.ndarray]:
+        """DataFrame -> typed CV columns for the binary session file
+        
+        Directions are stored as int8 codes (1=forward, 0=reverse).
+        """
+        columns = {}
+        for name, dtype in CV_COLUMNS.items():
+            if name not in df.columns:
+                continue
+            values = df[name].to_numpy()
+            if name == 'direction' and values.dtype.kind in 'OUS':
+                values = values == 'forward'
+            columns[name] = values.astype(dtype)
+        return columns
+    
+    def _write_session(self, df: 'pd.DataFrame', parameters: Dict, session_id: str) -> Dict:
+        """Write the data files and metadata of a session (no plot)
+        
+        Config.SESSION_FORMAT selects the binary session file ('npz'), the
+        CSV ('csv') or both. Without a CSV, export_session_csv creates it on
+        demand.
+        """
+        # Create session directory
+        paths = self._session_paths(session_id)
+        paths['dir'].mkdir(exist_ok=True)
+        
+        # Generate file paths
+        data_path = paths['data']
+        csv_path = paths['csv']
+        png_path = paths['png']
+        metadata_path = paths['metadata']
+        
+        # Save metadata
+        metadata = {
+            'session_id': session_id,
+            'timestamp': datetime.now().isoformat(),
+            'parameters': parameters,
+            'data_points_count': len(df),
+            'csv_file': str(csv_path.relative_to(self.base_data_dir)),
+            'png_file': str(png_path.relative_to(self.base_data_dir)),
+            'voltage_range': {
+                'min': float(df['potential'].min()),
+                'max': float(df['potential'].max())
+            },
+            'current_range': {
+                'min': float(df['current'].min()),
+                'max': float(df['current'].max())
+            },
+            'cycles': int(df['cycle'].max()) if 'cycle' in df.columns else 1
+        }
+        
+        session_format = Config.SESSION_FORMAT
+        if session_format in ('npz', 'both'):
+            metadata['data_file'] = str(data_path.relative_to(self.base_data_dir))
+            write_session_file(data_path, self._typed_columns(df), metadata)
+            logger.info(f"Session data saved: {data_path}")
+        
+        # Save CSV data
+        if session_format in ('csv', 'both') and not self._save_csv_data(df, csv_path, parameters):
+            raise IOError(f"Failed to write {csv_path}")
+        
+        if not self._save_metadata(metadata, metadata_path):
+            raise IOError(f"Failed to write {metadata_path}")
+        
+        # Store session info
+        self.session_metadata[session_id] = metadata
+        self.index.upsert(metadata)
+        
+        logger.info(f"CV measurement saved successfully: {session_id}")
+        
+        return {
+            'success': True,
+            'session_id': session_id,
+            'csv_file': str(csv_path),
+            'data_file': str(data_path) if 'data_file' in metadata else None,
+            'png_file': str(png_path),
+            'metadata_file': str(metadata_path),
+            'data_points_count': len(df),
+            'message': f"Data saved to session {session_id}"
+        }
+    
+    def _save_csv_data(self, df: 'pd.DataFrame', csv_path: Path, parameters: Dict) -> bool:
         """Save CV data as CSV file"""
         try:
             # Add header with measurement parameters
@@ -147,12 +332,12 @@ class DataLoggingService:
                 ""
             ]
             
-            # Write header and data
-            with open(csv_path, 'w') as f:
+            # Write header and data, and make sure they reach the disk
+            with open(csv_path, 'w', newline='') as f:
                 f.write('\n'.join(header_lines))
-                
-            # Append DataFrame
-            df.to_csv(csv_path, mode='a', index=False)
+                df.to_csv(f, index=False)
+                f.flush()
+                os.fsync(f.fileno())
             
             logger.info(f"CSV data saved: {csv_path}")
             return True
@@ -161,67 +346,79 @@ class DataLoggingService:
             logger.error(f"Failed to save CSV data: {e}")
             return False
     
-    def _save_png_plot(self, df: pd.DataFrame, png_path: Path, parameters: Dict, session_id: str) -> bool:
-        """Generate and save CV plot as PNG"""
+    def _submit_plot(self, columns, png_path: Path, parameters: Dict,
+                     session_id: str, preset: str = 'publication'):
+        """Queue a plot render of a DataFrame or dict of columns; returns a future"""
+        return self.plot_renderer.submit(
+            np.asarray(columns['potential']), np.asarray(columns['current']),
+            np.asarray(columns['cycle']) if 'cycle' in columns else None,
+            png_path, parameters, session_id, preset=preset)
+    
+    def _save_png_plot(self, df: 'pd.DataFrame', png_path: Path, parameters: Dict, session_id: str,
+                       preset: str = 'publication') -> bool:
+        """Generate and save CV plot as PNG (waits for the renderer)"""
         try:
-            # Create matplotlib figure
-            plt.style.use('default')
-            fig, ax = plt.subplots(figsize=(10, 8))
-            
-            # Check if we have cycle information
-            if 'cycle' in df.columns and df['cycle'].nunique() > 1:
-                # Plot multiple cycles with different colors
-                cycles = sorted(df['cycle'].unique())
-                # Use different colors for each cycle
-                color_list = ['blue', 'red', 'green', 'orange', 'purple', 'brown', 'pink', 'gray', 'olive', 'cyan']
-                colors = [color_list[i % len(color_list)] for i in range(len(cycles))]
-                
-                for i, cycle in enumerate(cycles):
-                    cycle_data = df[df['cycle'] == cycle]
-                    ax.plot(cycle_data['potential'], cycle_data['current'], 
-                           color=colors[i], label=f'Cycle {cycle}', linewidth=2)
-            else:
-                # Single cycle or no cycle info
-                ax.plot(df['potential'], df['current'], 'b-', linewidth=2, label='CV Scan')
-            
-            # Customize plot
-            ax.set_xlabel('Potential (V)', fontsize=12)
-            ax.set_ylabel('Current (A)', fontsize=12)
-            ax.set_title(f'Cyclic Voltammogram - {session_id}\\n'
-                        f'Scan Rate: {parameters.get("rate", "N/A")} V/s, '
-                        f'Range: {parameters.get("lower", "N/A")} to {parameters.get("upper", "N/A")} V', 
-                        fontsize=14)
-            
-            # Add grid and legend
-            ax.grid(True, alpha=0.3)
-            ax.legend()
-            
-            # Format axes
-            ax.ticklabel_format(style='scientific', axis='y', scilimits=(0,0))
-            
-            # Add timestamp
-            timestamp_text = f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-            fig.text(0.02, 0.02, timestamp_text, fontsize=10, alpha=0.7)
-            
-            # Save with high DPI
-            plt.tight_layout()
-            plt.savefig(png_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            
+            self._submit_plot(df, png_path, parameters, session_id, preset).result()
+            self.index.refresh_files(session_id)
             logger.info(f"PNG plot saved: {png_path}")
             return True
             
         except Exception as e:
             logger.error(f"Failed to save PNG plot: {e}")
-            # Make sure to close the figure even on error
-            plt.close('all')
             return False
     
+    def rerender_sessions(self, preset: str = 'publication',
+                          session_ids: Optional[List[str]] = None) -> Dict[str, bool]:
+        """Re-render the PNG plot of saved sessions (all sessions by default)
+        
+        Sessions are rendered in parallel by the plot renderer's worker processes.
+        At most two renders per process are in flight, so only their session
+        data is held in memory however many sessions there are.
+        
+        Returns:
+            Dict of session ID -> whether its plot was rendered
+        """
+        if session_ids is None:
+            session_ids = [s['session_id'] for s in self.list_sessions()]
+        
+        max_in_flight = 2 * max(1, self.plot_renderer.processes)
+        in_flight = {}
+        results = {}
+        
+        def collect(done):
+            for future in done:
+                session_id = in_flight.pop(future)
+                try:
+                    results[session_id] = bool(future.result())
+                    self.index.refresh_files(session_id)
+                except Exception as e:
+                    logger.error(f"Failed to re-render {session_id}: {e}")
+                    results[session_id] = False
+        
+        for session_id in session_ids:
+            if len(in_flight) >= max_in_flight:
+                collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+            try:
+                columns, metadata = self.load_session_columns(session_id)
+                future = self._submit_plot(
+                    columns, self._session_paths(session_id)['png'],
+                    metadata.get('parameters') or {}, session_id, preset)
+                in_flight[future] = session_id
+            except Exception as e:
+                logger.error(f"Failed to re-render {session_id}: {e}")
+                results[session_id] = False
+        collect(wait(in_flight).done)
+        
+        logger.info(f"Re-rendered {sum(results.values())}/{len(results)} session plots")
+        return results
+    
     def _save_metadata(self, metadata: Dict, metadata_path: Path) -> bool:
         """Save session metadata as JSON"""
         try:
             with open(metadata_path, 'w') as f:
                 json.dump(metadata, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
             
             logger.info(f"Metadata saved: {metadata_path}")
             return True
@@ -230,83 +427,265 @@ class DataLoggingService:
             logger.error(f"Failed to save metadata: {e}")
             return False
     
-    def list_sessions(self, limit: Optional[int] = None) -> List[Dict]:
-        """List all saved measurement sessions"""
+    def list_sessions(self, limit: Optional[int] = None, offset: int = 0,
+                      sort: str = 'timestamp', descending: bool = True,
+                      **filters) -> List[Dict]:
+        """List saved measurement sessions from the session index
+        
+        See SessionIndex.query for the sort keys and filters.
+        """
+        return self.query_sessions(limit, offset, sort, descending, **filters)[0]
+    
+    def query_sessions(self, limit: Optional[int] = None, offset: int = 0,
+                       sort: str = 'timestamp', descending: bool = True,
+                       **filters) -> Tuple[List[Dict], int]:
+        """Page through saved sessions
+        
+        Returns:
+            (sessions on this page, total number of matching sessions)
+        """
         try:
-            sessions = []
-            sessions_dir = self.base_data_dir / "sessions"
-            
-            if not sessions_dir.exists():
-                return sessions
-            
-            # Get all session directories
-            for session_dir in sessions_dir.iterdir():
-                if session_dir.is_dir():
-                    metadata_file = session_dir / f"{session_dir.name}_metadata.json"
-                    
-                    if metadata_file.exists():
-                        try:
-                            with open(metadata_file, 'r') as f:
-                                metadata = json.load(f)
-                            
-                            # Add file existence checks
-                            csv_file = session_dir / f"{session_dir.name}.csv"
-                            png_file = session_dir / f"{session_dir.name}.png"
-                            
-                            metadata['files_exist'] = {
-                                'csv': csv_file.exists(),
-                                'png': png_file.exists()
-                            }
-                            
-                            sessions.append(metadata)
-                            
-                        except Exception as e:
-                            logger.warning(f"Failed to load metadata for {session_dir.name}: {e}")
-            
-            # Sort by timestamp (newest first)
-            sessions.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-            
-            # Apply limit if specified
-            if limit:
-                sessions = sessions[:limit]
-            
-            return sessions
-            
-        except Exception as e:
+            return self.index.query(limit=limit, offset=offset, sort=sort,
+                                    descending=descending, **filters)
+        except sqlite3.Error as e:
             logger.error(f"Failed to list sessions: {e}")
-            return []
+            return [], 0
+    
+    def reconcile_index(self, rebuild: bool = False) -> Dict[str, int]:
+        """Re-sync the session index with the session directories"""
+        return self.index.rebuild() if rebuild else self.index.reconcile()
+    
+    def load_session_columns(self, session_id: str, columns: Optional[List[str]] = None,
+                             mmap: bool = True) -> Tuple[Dict[str, np.ndarray], Dict]:
+        """Load session data as typed columns
+        
+        Reads (and by default memory-maps) the binary session file, loading
+        only the requested columns; sessions saved before it existed fall
+        back to their CSV. Directions are int8 codes in the binary file and
+        strings in CSV sessions.
+        
+        Returns:
+            (column name -> array, metadata)
+        """
+        paths = self._session_paths(session_id)
+        if paths['data'].exists():
+            return read_session_file(paths['data'], columns, mmap=mmap)
+        
+        if not paths['csv'].exists():
+            raise FileNotFoundError(f"No data file for session {session_id}")
+        df = pd.read_csv(paths['csv'], comment='#', usecols=columns)
+        metadata = {}
+        if paths['metadata'].exists():
+            with open(paths['metadata'], 'r') as f:
+                metadata = json.load(f)
+        return {name: df[name].to_numpy() for name in df.columns}, metadata
+    
+    def _session_chunks(self, session_id: str, names: List[str], chunk_size: int,
+                        t_start: Optional[float], t_end: Optional[float]) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield the session's columns in order, ``chunk_size`` rows at a time
+        
+        Binary sessions are read through memory maps, and a time range is
+        located with a binary search on the (ascending) timestamp column, so
+        only the selected rows are touched. CSV sessions are read in chunks.
+        """
+        paths = self._session_paths(session_id)
+        if paths['data'].exists():
+            data, _ = read_session_file(paths['data'], names)
+            count = len(data[names[0]])
+            start, stop = 0, count
+            if t_start is not None or t_end is not None:
+                timestamp, _ = read_session_file(paths['data'], ['timestamp'])
+                timestamp = timestamp['timestamp']
+                if t_start is not None:
+                    start = int(np.searchsorted(timestamp, t_start, side='left'))
+                if t_end is not None:
+                    stop = int(np.searchsorted(timestamp, t_end, side='right'))
+            for i in range(start, stop, chunk_size):
+                yield {name: np.asarray(data[name][i:min(i + chunk_size, stop)]) for name in names}
+            return
+        
+        if not paths['csv'].exists():
+            raise FileNotFoundError(f"No data file for session {session_id}")
+        for df in pd.read_csv(paths['csv'], comment='#', usecols=names, chunksize=chunk_size):
+            chunk = {name: df[name].to_numpy() for name in names}
+            if t_start is not None or t_end is not None:
+                mask = np.ones(len(df), dtype=bool)
+                if t_start is not None:
+                    mask &= chunk['timestamp'] >= t_start
+                if t_end is not None:
+                    mask &= chunk['timestamp'] <= t_end
+                chunk = {name: values[mask] for name, values in chunk.items()}
+            yield chunk
+    
+    def _selected_chunks(self, session_id: str, names: List[str], offset: int,
+                         limit: Optional[int], t_start: Optional[float], t_end: Optional[float],
+                         cycle: Optional[int], chunk_size: int) -> Iterator[Dict[str, np.ndarray]]:
+        """Session chunks after the time range, cycle filter and offset/limit window"""
+        read_names = list(names)
+        for name in ['timestamp'] * (t_start is not None or t_end is not None) + ['cycle'] * (cycle is not None):
+            if name not in read_names:
+                read_names.append(name)
+        
+        skip, remaining = max(0, offset), limit
+        for chunk in self._session_chunks(session_id, read_names, chunk_size, t_start, t_end):
+            if cycle is not None:
+                mask = chunk['cycle'] == cycle
+                chunk = {name: values[mask] for name, values in chunk.items()}
+            count = len(chunk[read_names[0]])
+            if skip >= count:
+                skip -= count
+                continue
+            stop = count if remaining is None else min(count, skip + remaining)
+            if stop > skip:
+                yield {name: chunk[name][skip:stop] for name in names}
+            if remaining is not None:
+                remaining -= stop - skip
+                if remaining <= 0:
+                    return
+            skip = 0
+    
+    @classmethod
+    def _decimate_chunks(cls, chunks: Iterator[Dict[str, np.ndarray]], bucket: int,
+                         method: str, chunk_size: int) -> Iterator[Dict[str, np.ndarray]]:
+        """Reduce every ``bucket`` rows to their current min/max ('minmax') or to
+        about one row with LTTB on potential/current ('lttb')
+        
+        Buckets wider than ``chunk_size`` are reduced in several passes of at
+        most ``chunk_size`` rows each, so no more than a chunk is buffered.
+        """
+        step = min(bucket, chunk_size)
+        chunks = cls._decimate_pass(chunks, step, method)
+        if bucket > step:
+            # A pass keeps up to two rows per bucket (min/max, or LTTB's end points)
+            remaining = -(-bucket * 2 // step)
+            if remaining > 1:
+                chunks = cls._decimate_chunks(chunks, remaining, method, chunk_size)
+        return chunks
+    
+    @staticmethod
+    def _decimate_pass(chunks: Iterator[Dict[str, np.ndarray]], bucket: int,
+                       method: str) -> Iterator[Dict[str, np.ndarray]]:
+        """One reduction pass of ``bucket`` rows at a time"""
+        def reduce(block, width):
+            count = len(block['current'])
+            if method == 'minmax':
+                index = bucket_minmax_indices(block['current'], width)
+            else:
+                index = lttb_indices(block.get('potential'), block['current'],
+                                     max(2, count // width))
+            return {name: values[index] for name, values in block.items()}
+        
+        carry = None
+        for chunk in chunks:
+            if carry is not None:
+                chunk = {name: np.concatenate([carry[name], values]) for name, values in chunk.items()}
+            full = len(chunk['current']) // bucket * bucket
+            carry = {name: values[full:] for name, values in chunk.items()}
+            if full:
+                yield reduce({name: values[:full] for name, values in chunk.items()}, bucket)
+        
+        # Last, partial bucket
+        if carry is not None and len(carry['current']):
+            yield reduce(carry, len(carry['current']))
+    
+    def iter_session_data(self, session_id: str, columns: Optional[List[str]] = None,
+                          offset: int = 0, limit: Optional[int] = None,
+                          t_start: Optional[float] = None, t_end: Optional[float] = None,
+                          cycle: Optional[int] = None, max_points: Optional[int] = None,
+                          method: str = 'minmax',
+                          chunk_size: int = Config.SESSION_STREAM_CHUNK) -> Iterator[Dict[str, np.ndarray]]:
+        """Stream a range of a session's data as chunks of column arrays
+        
+        Rows are selected by time range [t_start, t_end], cycle and then
+        offset/limit. With ``max_points`` the selection is downsampled to
+        about that many rows for plotting ('minmax' keeps every bucket's
+        current extremes, 'lttb' the visual shape of the potential/current
+        trace, applied per chunk). Memory use depends on ``chunk_size``, not on
+        the session size. Directions are returned as 'forward'/'reverse' strings.
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown downsampling method: {method}")
+        if max_points is not None and max_points < MIN_STREAM_POINTS:
+            raise ValueError(f"max_points must be at least {MIN_STREAM_POINTS}")
+        names = list(columns) if columns else list(CV_COLUMNS)
+        extra = [name for name in ('current', 'potential')
+                 if max_points and name not in names and (name == 'current' or method == 'lttb')]
+        names.extend(extra)
+        
+        def selected(read_names):
+            return self._selected_chunks(session_id, read_names, offset, limit,
+                                         t_start, t_end, cycle, chunk_size)
+        
+        chunks = selected(names)
+        if max_points:
+            # Counting pass over a single column to size the buckets
+            total = sum(len(chunk['current']) for chunk in selected(['current']))
+            # min/max keeps two rows per bucket, LTTB one
+            bucket = -(-total // max(1, max_points // (2 if method == 'minmax' else 1)))
+            if bucket > 1:
+                chunks = self._decimate_chunks(chunks, bucket, method, chunk_size)
+        
+        for chunk in chunks:
+            if 'direction' in chunk and chunk['direction'].dtype.kind in 'iu':
+                chunk['direction'] = decode_directions(chunk['direction'])
+            for name in extra:
+                chunk.pop(name)
+            yield chunk
+    
+    def export_session_csv(self, session_id: str) -> Optional[Path]:
+        """Path of the session's CSV, writing it from the binary session file if needed"""
+        paths = self._session_paths(session_id)
+        if paths['csv'].exists():
+            return paths['csv']
+        if not paths['data'].exists():
+            return None
+        
+        columns, metadata = read_session_file(paths['data'])
+        if 'direction' in columns:
+            columns['direction'] = decode_directions(columns['direction'])
+        if not self._save_csv_data(pd.DataFrame(columns), paths['csv'],
+                                   metadata.get('parameters') or {}):
+            return None
+        self.index.refresh_files(session_id)
+        return paths['csv']
     
-    def get_session_data(self, session_id: str) -> Optional[Dict]:
-        """Get complete session data including CSV content"""
+    def get_session_data(self, session_id: str, columns: Optional[List[str]] = None) -> Optional[Dict]:
+        """Get complete session data including the data points
+        
+        ``columns`` limits csv_data to the given columns (e.g. potential and current).
+        """
         try:
-            session_dir = self.base_data_dir / "sessions" / session_id
+            paths = self._session_paths(session_id)
             
-            if not session_dir.exists():
+            if not paths['dir'].exists():
                 return None
             
             # Load metadata
-            metadata_file = session_dir / f"{session_id}_metadata.json"
+            metadata_file = paths['metadata']
             if not metadata_file.exists():
                 return None
             
             with open(metadata_file, 'r') as f:
                 metadata = json.load(f)
             
-            # Load CSV data
-            csv_file = session_dir / f"{session_id}.csv"
+            # Load data points
             csv_data = None
-            if csv_file.exists():
-                # Skip header lines starting with #
-                csv_data = pd.read_csv(csv_file, comment='#').to_dict('records')
+            if paths['data'].exists() or paths['csv'].exists():
+                data, _ = self.load_session_columns(session_id, columns)
+                if 'direction' in data and data['direction'].dtype.kind in 'iu':
+                    data['direction'] = decode_directions(data['direction'])
+                names = list(data)
+                csv_data = [dict(zip(names, row))
+                            for row in zip(*(data[name].tolist() for name in names))]
             
             # Check PNG file
-            png_file = session_dir / f"{session_id}.png"
+            png_file = paths['png']
             png_exists = png_file.exists()
             
             return {
                 'metadata': metadata,
                 'csv_data': csv_data,
-                'csv_file': str(csv_file),
+                'csv_file': str(paths['csv']),
                 'png_file': str(png_file),
                 'png_exists': png_exists
             }
@@ -327,9 +706,10 @@ class DataLoggingService:
             import shutil
             shutil.rmtree(session_dir)
             
-            # Remove from memory cache
+            # Remove from memory cache and index
             if session_id in self.session_metadata:
                 del self.session_metadata[session_id]
+            self.index.remove(session_id)
             
             logger.info(f"Session deleted: {session_id}")
             return True, f"Session {session_id} deleted successfully"
@@ -339,30 +719,13 @@ class DataLoggingService:
             return False, f"Failed to delete session: {e}"
     
     def get_data_directory_info(self) -> Dict:
-        """Get information about data directory"""
+        """Get information about data directory (sizes of indexed session files)"""
         try:
-            sessions_dir = self.base_data_dir / "sessions"
-            
-            if not sessions_dir.exists():
-                return {
-                    'total_sessions': 0,
-                    'total_size_mb': 0,
-                    'data_directory': str(self.base_data_dir)
-                }
-            
-            # Count sessions and calculate total size
-            total_sessions = len([d for d in sessions_dir.iterdir() if d.is_dir()])
-            
-            total_size = 0
-            for item in self.base_data_dir.rglob('*'):
-                if item.is_file():
-                    total_size += item.stat().st_size
-            
-            total_size_mb = total_size / (1024 * 1024)  # Convert to MB
+            totals = self.index.totals()
             
             return {
-                'total_sessions': total_sessions,
-                'total_size_mb': round(total_size_mb, 2),
+                'total_sessions': totals['session_count'],
+                'total_size_mb': round(totals['total_bytes'] / (1024 * 1024), 2),
                 'data_directory': str(self.base_data_dir),
                 'directory_exists': self.base_data_dir.exists()
             }
@@ -2,15 +2,35 @@
 Data service for managing measurement data
 """
 
+import os
+import time
 import logging
+import numpy as np
 from datetime import datetime
 
+try:
+    from .spill_store import ColumnSpillFile
+except ImportError:
+    from services.spill_store import ColumnSpillFile
+
 logger = logging.getLogger(__name__)
 
+# Columns of spilled points; 'mode' is stored as an index into the mode names
+SPILL_COLUMNS = {
+    'timestamp': np.float64,
+    'voltage': np.float64,
+    'current': np.float64,
+    'mode': np.int8,
+}
+
 class DataService:
-    def __init__(self):
+    def __init__(self, spill_dir=None):
         self.current_data = {'points': []}
-        self.max_points = 1000  # Maximum number of points to store
+        self.max_points = 1000  # Maximum number of points to keep in memory
+        # With a spill directory, points beyond max_points go to disk instead of being dropped
+        self.spill_dir = spill_dir
+        self._spill = None
+        self._mode_names = []
 
     def update_measurement_data(self, new_data):
         """Update the current measurement data"""
@@ -27,16 +47,62 @@ class DataService:
 
             # Update current data, maintaining max_points limit
             self.current_data['points'].extend(points)
-            if len(self.current_data['points']) > self.max_points:
-                self.current_data['points'] = self.current_data['points'][-self.max_points:]
+            excess = len(self.current_data['points']) - self.max_points
+            if excess > 0:
+                if self.spill_dir:
+                    self._spill_points(self.current_data['points'][:excess])
+                self.current_data['points'] = self.current_data['points'][excess:]
 
         except Exception as e:
             logger.error(f"Error updating measurement data: {e}")
 
+    def _mode_code(self, mode):
+        if mode not in self._mode_names:
+            self._mode_names.append(mode)
+        return self._mode_names.index(mode)
+
+    def _spill_points(self, points):
+        """Append points leaving memory to the session spill file"""
+        if self._spill is None:
+            path = os.path.join(self.spill_dir, f"data_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}")
+            self._spill = ColumnSpillFile(path, SPILL_COLUMNS)
+        self._spill.append({
+            'timestamp': [p.get('timestamp', 0.0) for p in points],
+            'voltage': [p.get('voltage', 0.0) for p in points],
+            'current': [p.get('current', 0.0) for p in points],
+            'mode': [self._mode_code(p.get('mode')) for p in points],
+        })
+
     def get_current_data(self):
-        """Get the current measurement data"""
+        """Get the current measurement data (the most recent max_points points)"""
         return self.current_data
 
+    @property
+    def total_points(self):
+        """Points stored on disk and in memory"""
+        spilled = len(self._spill) if self._spill is not None else 0
+        return spilled + len(self.current_data['points'])
+
+    def get_points(self, start=None, stop=None):
+        """Get points [start:stop] of the whole session, reading spilled points from disk"""
+        spilled = len(self._spill) if self._spill is not None else 0
+        start, stop = slice(start, stop).indices(self.total_points)[:2]
+        points = []
+        if start < spilled:
+            end = min(stop, spilled)
+            columns = {name: self._spill.read(name, start, end).tolist() for name in SPILL_COLUMNS}
+            points = [
+                {'timestamp': t, 'voltage': v, 'current': c, 'mode': self._mode_names[m]}
+                for t, v, c, m in zip(columns['timestamp'], columns['voltage'],
+                                      columns['current'], columns['mode'])
+            ]
+        memory = self.current_data['points']
+        points.extend(memory[max(0, start - spilled):max(0, stop - spilled)])
+        return points
+
     def clear_data(self):
         """Clear all stored data"""
+        if self._spill is not None:
+            self._spill.delete()
+            self._spill = None
         self.current_data = {'points': []}
@@ -0,0 +1,115 @@
+"""
+Downsampling for H743Poten Web Interface
+Shape-preserving point reduction (LTTB, min/max per bucket) for plot payloads
+"""
+
+import numpy as np
+from typing import Optional
+
+METHODS = ('lttb', 'minmax')
+
+
+def bucket_minmax_indices(y: np.ndarray, width: int) -> np.ndarray:
+    """Indices of the min and max of every ``width`` consecutive values
+
+    ``len(y)`` must be a multiple of ``width``. Indices are ascending; a
+    bucket whose min and max coincide contributes one index.
+    """
+    rows = np.asarray(y).reshape(-1, width)
+    base = np.arange(len(rows))[:, None] * width
+    index = np.sort(np.hstack([base + rows.argmin(axis=1)[:, None],
+                               base + rows.argmax(axis=1)[:, None]]), axis=1).ravel()
+    return index[np.r_[True, np.diff(index) != 0]]
+
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """Indices keeping the extremes of ``y`` in about ``max_points`` points
+
+    The series is split into max_points // 2 buckets and each contributes
+    its min and max, so narrow peaks always survive. NaNs are ignored.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    count = len(y)
+    if max_points <= 0 or count <= max_points:
+        return np.arange(count)
+    buckets = max(1, max_points // 2)
+    width = -(-count // buckets)
+    padded = np.full(buckets * width, np.nan)
+    padded[:count] = y
+    rows = padded.reshape(buckets, width)
+    valid = ~np.isnan(rows).all(axis=1)
+    base = np.arange(buckets)[valid] * width
+    return np.unique(np.concatenate([base + np.nanargmin(rows[valid], axis=1),
+                                     base + np.nanargmax(rows[valid], axis=1)]))
+
+
+def lttb_indices(x: Optional[np.ndarray], y: np.ndarray, max_points: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of ``max_points`` representative points
+
+    Keeps the first and last point and, from every bucket in between, the
+    point forming the largest triangle with the point kept from the previous
+    bucket and the mean of the next bucket. ``x`` defaults to the index.
+    The per-bucket selection is vectorized over padded bucket rows; only the
+    dependency on the previously kept point is iterated.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    count = len(y)
+    if max_points <= 2 or count <= max_points:
+        return np.arange(count) if count <= max_points else np.array([0, count - 1])
+    x = np.arange(count, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+
+    # Bucket edges over the interior points 1..count-2
+    edges = np.linspace(1, count - 1, max_points - 1).astype(np.intp)
+    starts, stops = edges[:-1], edges[1:]
+    widths = stops - starts
+    width = int(widths.max())
+
+    # Padded (bucket, width) views; padding repeats the bucket's last point
+    offsets = np.minimum(starts[:, None] + np.arange(width), (stops - 1)[:, None])
+    bx, by = x[offsets], y[offsets]
+
+    # Mean of the following bucket (the last bucket looks at the final point)
+    sums_x = np.add.reduceat(x[1:count - 1], starts - 1)
+    sums_y = np.add.reduceat(y[1:count - 1], starts - 1)
+    next_x = np.append((sums_x / widths)[1:], x[-1])
+    next_y = np.append((sums_y / widths)[1:], y[-1])
+
+    selected = np.empty(max_points, dtype=np.intp)
+    selected[0], selected[-1] = 0, count - 1
+    ax, ay = x[0], y[0]
+    for i in range(len(starts)):
+        area = np.abs((ax - next_x[i]) * (by[i] - ay) - (ax - bx[i]) * (next_y[i] - ay))
+        j = int(np.nanargmax(area)) if not np.isnan(area).all() else 0
+        selected[i + 1] = offsets[i, j]
+        ax, ay = bx[i, j], by[i, j]
+    return selected
+
+
+def downsample_indices(x: Optional[np.ndarray], y: np.ndarray, max_points: Optional[int],
+                       method: str = 'lttb') -> np.ndarray:
+    """Indices of the points to keep so at most ~``max_points`` remain
+
+    ``method`` is 'lttb' (visual shape, exactly max_points points) or
+    'minmax' (every local extreme kept). With no ``max_points``, or fewer
+    points than that, every index is returned.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    count = len(y)
+    if not max_points or count <= max_points:
+        return np.arange(count)
+    if method == 'minmax':
+        return minmax_indices(y, max_points)
+    if count > 4 * max_points:
+        # Min/max preselection keeps LTTB's cost proportional to max_points
+        keep = minmax_indices(y, 4 * max_points)
+        return keep[lttb_indices(None if x is None else np.asarray(x)[keep],
+                                 np.asarray(y)[keep], max_points)]
+    return lttb_indices(x, y, max_points)
+
+
+def downsample(x: np.ndarray, y: np.ndarray, max_points: Optional[int], method: str = 'lttb'):
+    """Downsample a trace; returns (x, y)"""
+    x, y = np.asarray(x), np.asarray(y)
+    index = downsample_indices(x, y, max_points, method)
+    return x[index], y[index]
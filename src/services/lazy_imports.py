@@ -0,0 +1,193 @@
+"""
+Lazy Imports for H743Poten Web Interface
+Defers heavy scientific modules to first use and reports what each import cost
+"""
+
+import sys
+import time
+import logging
+import builtins
+import importlib
+import importlib.util
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.RLock()
+_timings: Dict[str, Dict] = {}       # module -> {seconds, phase}
+_startup: Dict[str, float] = {}      # startup step -> seconds
+_registry: Dict[str, 'LazyObject'] = {}
+_warmup_state = {'status': 'not started', 'started_at': None, 'seconds': None}
+
+
+def record_import(name: str, seconds: float, phase: str) -> None:
+    """Record the cost of importing ``name`` ('startup', 'first_use' or 'warmup')"""
+    with _lock:
+        if name not in _timings:
+            _timings[name] = {'seconds': round(seconds, 4), 'phase': phase}
+
+
+def record_startup(step: str, seconds: float) -> None:
+    with _lock:
+        _startup[step] = round(seconds, 4)
+
+
+class LazyObject:
+    """Proxy for an object built by ``factory`` on first attribute access
+
+    Named objects (see ``lazy_object``) record how long the factory took and
+    are included in the warm-up. ``resolve`` returns the object itself.
+    """
+
+    def __init__(self, factory: Callable[[], Any], name: Optional[str] = None):
+        self._factory = factory
+        self._name = name
+        self._target = None
+        self._load_lock = threading.Lock()
+
+    def _load(self, phase: str = 'first_use') -> Any:
+        if self._target is None:
+            with self._load_lock:
+                if self._target is None:
+                    started = time.perf_counter()
+                    target = self._factory()
+                    if self._name is not None:
+                        record_import(self._name, time.perf_counter() - started, phase)
+                    self._target = target
+        return self._target
+
+    # Underscored so they cannot shadow attributes of the proxied object
+    @property
+    def _loaded(self) -> bool:
+        return self._target is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self._target is not None else 'not loaded'
+        return f"<lazy {self._name or 'object'} ({state})>"
+
+
+class LazyModule(LazyObject):
+    """Stand-in for a module that imports it on first attribute access
+
+    ``signal = lazy_import('scipy.signal')`` followed by ``signal.find_peaks``
+    behaves like the plain import, but the import cost is paid by the first
+    request that needs it (or by the warm-up thread) instead of at startup.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(lambda: importlib.import_module(name), name=name)
+
+    def _load(self, phase: str = 'first_use') -> Any:
+        # Imported elsewhere in the meantime: nothing left to pay or record
+        module = sys.modules.get(self._name)
+        if self._target is None and module is not None and \
+                not getattr(getattr(module, '__spec__', None), '_initializing', False):
+            self._target = module
+        return super()._load(phase)
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Shared lazy stand-in for module ``name``"""
+    with _lock:
+        module = _registry.get(name)
+        if module is None:
+            module = _registry[name] = LazyModule(name)
+        return module
+
+
+def lazy_object(name: str, factory: Callable[[], Any]) -> LazyObject:
+    """Lazily built object whose construction is timed under ``name``"""
+    with _lock:
+        _registry[name] = LazyObject(factory, name=name)
+        return _registry[name]
+
+
+def resolve(lazy: LazyObject) -> Any:
+    """The module or object behind a lazy stand-in, loading it if needed"""
+    return lazy._load()
+
+
+class StartupImportTimer:
+    """Times each import statement executed directly inside the ``with`` block
+
+    Nested imports are included in the cost of the statement that triggered
+    them, so the report shows which of the app's own imports are expensive.
+    """
+
+    def __init__(self, package: Optional[str] = None):
+        self.package = package
+        self._depth = 0
+        self._original_import = None
+
+    def __enter__(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        builtins.__import__ = self._original_import
+        record_startup('module_imports', time.perf_counter() - self._started)
+        return False
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if self._depth:
+            return self._original_import(name, globals, locals, fromlist, level)
+        self._depth += 1
+        started = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._depth -= 1
+            if level:
+                package = (globals or {}).get('__package__') or self.package
+                name = '.' * level + name
+                if package:
+                    name = importlib.util.resolve_name(name, package)
+            record_import(name, time.perf_counter() - started, 'startup')
+
+
+def warm_up(names: Optional[Iterable[str]] = None) -> None:
+    """Load the given (default: all registered) lazy modules and objects now"""
+    _warmup_state.update(status='running', started_at=time.time())
+    started = time.perf_counter()
+    for name in list(names if names is not None else _registry):
+        try:
+            (_registry.get(name) or lazy_import(name))._load(phase='warmup')
+        except Exception as e:
+            logger.warning(f"Warm-up import of {name} failed: {e}")
+    _warmup_state.update(status='done', seconds=round(time.perf_counter() - started, 4))
+
+
+def start_warmup(delay: float = 0.0, names: Optional[Iterable[str]] = None) -> Optional[threading.Thread]:
+    """Warm up lazy modules in a daemon thread after ``delay`` seconds
+
+    Only the first call per process starts a thread; later calls return None.
+    """
+    def run():
+        time.sleep(delay)
+        warm_up(names)
+
+    with _lock:
+        if _warmup_state['status'] != 'not started':
+            return None
+        _warmup_state['status'] = 'scheduled'
+    thread = threading.Thread(target=run, name='lazy-import-warmup', daemon=True)
+    thread.start()
+    return thread
+
+
+def import_report() -> Dict:
+    """Startup steps, per-import costs (slowest first) and what is loaded yet"""
+    with _lock:
+        imports = sorted(_timings.items(), key=lambda item: item[1]['seconds'], reverse=True)
+        return {
+            'startup': dict(_startup),
+            'imports': [{'module': name, **timing} for name, timing in imports],
+            'lazy': {name: item._loaded for name, item in sorted(_registry.items())},
+            'warmup': dict(_warmup_state)
+        }
@@ -0,0 +1,210 @@
+"""
+Live Peak Detector for H743Poten Web Interface
+Incremental anodic/cathodic peak detection while a CV scan is running
+"""
+
+import logging
+import numpy as np
+from typing import Dict, List, Optional
+
+try:
+    from ..config.settings import Config
+    from .lazy_imports import lazy_import
+except ImportError:
+    from config.settings import Config
+    from services.lazy_imports import lazy_import
+
+logger = logging.getLogger(__name__)
+
+scipy_signal = lazy_import('scipy.signal')
+
+
+class _Sweep:
+    """Detection state of one contiguous sweep (constant cycle and direction)
+
+    Works on the signed smoothed current (negated on reverse sweeps), so both
+    anodic and cathodic peaks are maxima. The sweep alternates between
+    looking for a valley and looking for a peak; a peak is confirmed once the
+    signal has risen by ``delta`` before it and fallen by ``delta`` after it.
+    """
+
+    def __init__(self, cycle: int, forward: bool):
+        self.cycle = cycle
+        self.forward = forward
+        self.sign = 1.0 if forward else -1.0
+        self.seeking_peak = False
+        self.low = np.inf
+        self.best = -np.inf
+        self.best_point = None  # (potential, current) of the candidate
+        self.last = None
+        self.peaks: List[Dict] = []
+
+    @property
+    def kind(self) -> str:
+        return 'anodic' if self.forward else 'cathodic'
+
+    def scan(self, signal: np.ndarray, potential: np.ndarray, current: np.ndarray,
+             delta: float) -> bool:
+        """Advance over new points; returns True if the candidate or peaks changed
+
+        Each iteration handles everything up to the next confirmation or
+        valley with cumulative max/min, so the cost is one vectorized pass per
+        event rather than Python work per point.
+        """
+        changed = False
+        i, n = 0, len(signal)
+        while i < n:
+            rest = signal[i:]
+            if self.seeking_peak:
+                run = np.maximum(np.maximum.accumulate(rest), self.best)
+                drops = np.flatnonzero(rest < run - delta)
+                end = drops[0] if len(drops) else len(rest)
+                if end:
+                    j = int(np.argmax(rest[:end]))
+                    if rest[j] > self.best:
+                        self.best = float(rest[j])
+                        self.best_point = (float(potential[i + j]), float(current[i + j]))
+                        changed = True
+                if not len(drops):
+                    break
+                self._confirm()
+                self.low = float(rest[end])
+                changed = True
+            else:
+                run = np.minimum(np.minimum.accumulate(rest), self.low)
+                rises = np.flatnonzero(rest > run + delta)
+                if not len(rises):
+                    self.low = float(run[-1])
+                    break
+                end = rises[0]
+                self.seeking_peak = True
+                self.best = float(rest[end])
+                self.best_point = (float(potential[i + end]), float(current[i + end]))
+                changed = True
+            i += end + 1
+        self.last = float(signal[-1])
+        return changed
+
+    def _confirm(self) -> None:
+        potential, current = self.best_point
+        self.peaks.append({'potential': potential, 'current': current, 'height': self.best})
+        self.seeking_peak = False
+        self.best = -np.inf
+        self.best_point = None
+
+    def close(self, delta: float) -> None:
+        """End of sweep: keep a candidate that had started to turn over"""
+        if self.seeking_peak and self.last is not None and self.last < self.best - delta / 2:
+            self._confirm()
+        self.seeking_peak = False
+        self.best_point = None
+
+    def candidate(self) -> Optional[Dict]:
+        if not self.seeking_peak or self.best_point is None:
+            return None
+        potential, current = self.best_point
+        return {'type': self.kind, 'cycle': self.cycle, 'potential': potential, 'current': current}
+
+
+class LivePeakDetector:
+    """Online CV peak detector fed block by block during acquisition
+
+    Current is smoothed with a causal exponential filter whose state carries
+    across blocks, then split into sweeps at every change of cycle or scan
+    direction. Forward sweeps yield anodic peaks (Epa), reverse sweeps
+    cathodic ones (Epc). The threshold is a fraction of the current range
+    seen so far, so it adapts to the cell without configuration. A peak is
+    reported as a candidate while the current is still rising and confirmed
+    once it has fallen by the threshold, or turned over by the end of the
+    sweep.
+    """
+
+    def __init__(self, smoothing: int = Config.LIVE_PEAK_SMOOTHING,
+                 threshold: float = Config.LIVE_PEAK_THRESHOLD):
+        self.alpha = 2.0 / (max(1, smoothing) + 1)
+        self.threshold = threshold
+        self.version = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new measurement; the version keeps increasing"""
+        self.sweeps: List[_Sweep] = []
+        self.version += 1
+        self._smoothed = None
+        self._low = np.inf
+        self._high = -np.inf
+
+    def _smooth(self, current: np.ndarray) -> np.ndarray:
+        if self._smoothed is None:
+            self._smoothed = float(current[0])
+        smoothed, _ = scipy_signal.lfilter([self.alpha], [1.0, self.alpha - 1.0], current,
+                                           zi=[(1.0 - self.alpha) * self._smoothed])
+        self._smoothed = float(smoothed[-1])
+        return smoothed
+
+    def update(self, potential, current, cycle, direction) -> bool:
+        """Feed new points; ``direction`` holds 1 (forward) / 0 (reverse) codes
+
+        Returns True if candidates or confirmed peaks changed.
+        """
+        potential = np.asarray(potential, dtype=np.float64)
+        current = np.asarray(current, dtype=np.float64)
+        if not len(current):
+            return False
+        cycle = np.asarray(cycle)
+        forward = np.asarray(direction) != 0
+
+        smoothed = self._smooth(current)
+        self._low = min(self._low, float(smoothed.min()))
+        self._high = max(self._high, float(smoothed.max()))
+        delta = self.threshold * (self._high - self._low)
+
+        # Split the block into runs of constant (cycle, direction)
+        breaks = np.flatnonzero((np.diff(cycle) != 0) | (np.diff(forward) != 0)) + 1
+        changed = False
+        for start, stop in zip(np.r_[0, breaks], np.r_[breaks, len(current)]):
+            sweep = self.sweeps[-1] if self.sweeps else None
+            if sweep is None or sweep.cycle != int(cycle[start]) or sweep.forward != bool(forward[start]):
+                if sweep is not None:
+                    # Closing drops the candidate, confirmed or not
+                    changed |= sweep.candidate() is not None
+                    sweep.close(delta)
+                sweep = _Sweep(int(cycle[start]), bool(forward[start]))
+                self.sweeps.append(sweep)
+            if delta > 0:
+                changed |= sweep.scan(sweep.sign * smoothed[start:stop],
+                                      potential[start:stop], current[start:stop], delta)
+            else:
+                sweep.last = float(sweep.sign * smoothed[stop - 1])
+
+        if changed:
+            self.version += 1
+        return changed
+
+    def summary(self) -> Dict:
+        """Confirmed Epa/Epc and ΔEp per cycle, plus the open candidate"""
+        cycles: Dict[int, Dict] = {}
+        for sweep in self.sweeps:
+            if not sweep.peaks:
+                continue
+            peak = max(sweep.peaks, key=lambda p: p['height'])
+            entry = cycles.setdefault(sweep.cycle, {'cycle': sweep.cycle})
+            prefix = 'a' if sweep.forward else 'c'
+            if f'ep{prefix}' not in entry or peak['height'] > entry[f'_h{prefix}']:
+                entry[f'ep{prefix}'] = peak['potential']
+                entry[f'ip{prefix}'] = peak['current']
+                entry[f'_h{prefix}'] = peak['height']
+
+        results = []
+        for entry in cycles.values():
+            entry.pop('_ha', None)
+            entry.pop('_hc', None)
+            if 'epa' in entry and 'epc' in entry:
+                entry['delta_ep'] = abs(entry['epa'] - entry['epc'])
+            results.append(entry)
+
+        return {
+            'version': self.version,
+            'cycles': results,
+            'candidate': self.sweeps[-1].candidate() if self.sweeps else None
+        }
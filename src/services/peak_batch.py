@@ -0,0 +1,199 @@
+"""
+Peak Batch Runner for H743Poten Web Interface
+Runs peak detection over many CV curves in a pool of worker processes
+"""
+
+import os
+import time
+import logging
+import multiprocessing
+import threading
+import numpy as np
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+try:
+    from ..config.settings import Config
+    from .peak_detection import detect_cv_peaks
+    from .lazy_imports import lazy_import
+except ImportError:
+    from config.settings import Config
+    from services.peak_detection import detect_cv_peaks
+    from services.lazy_imports import lazy_import
+
+logger = logging.getLogger(__name__)
+
+pd = lazy_import('pandas')
+
+_VOLTAGE_NAMES = ('v', 'e', 'voltage', 'potential', 'potential (v)', 'voltage (v)', 'we(1).potential (v)')
+_CURRENT_NAMES = ('a', 'ua', 'ma', 'na', 'i', 'current', 'current (a)', 'current (ua)', 'we(1).current (a)')
+
+
+def _find_column(columns, names, keywords) -> Optional[str]:
+    lowered = {str(column).strip().lower(): column for column in columns}
+    for name in names:
+        if name in lowered:
+            return lowered[name]
+    for name, column in lowered.items():
+        if any(keyword in name for keyword in keywords):
+            return column
+    return None
+
+
+def load_cv_file(path) -> Tuple[np.ndarray, np.ndarray]:
+    """Read (voltage, current) from a CV CSV file
+
+    Handles the instrument exports used in the lab: an optional
+    'FileName: ...' first line, then a header row such as 'V,uA',
+    'voltage,current' or 'Potential (V),Current (A)'.
+    """
+    with open(path, 'r') as f:
+        first_line = f.readline()
+    skiprows = 1 if first_line.lower().startswith('filename') else 0
+    df = pd.read_csv(path, skiprows=skiprows)
+
+    voltage_col = _find_column(df.columns, _VOLTAGE_NAMES, ('volt', 'potential'))
+    current_col = _find_column(df.columns, _CURRENT_NAMES, ('current',))
+    if voltage_col is None or current_col is None:
+        raise ValueError(f"Cannot find voltage/current columns in {Path(path).name}")
+    return df[voltage_col].to_numpy(dtype=np.float64), df[current_col].to_numpy(dtype=np.float64)
+
+
+def resolve_data_file(reference: str, roots: Iterable) -> Path:
+    """Resolve a CSV file reference relative to one of the allowed ``roots``
+
+    The roots are tried in order. Raises ValueError for references that
+    escape every root or are not CSV files, FileNotFoundError otherwise.
+    """
+    if Path(reference).suffix.lower() != '.csv':
+        raise ValueError(f"Not a CSV file reference: {reference}")
+    inside = False
+    for root in roots:
+        root = Path(root).resolve()
+        path = (root / reference).resolve()
+        if root not in path.parents:
+            continue
+        inside = True
+        if path.is_file():
+            return path
+    if not inside:
+        raise ValueError(f"File reference outside the data directories: {reference}")
+    raise FileNotFoundError(f"File not found: {reference}")
+
+
+def detect_curve(index: int, curve_id, method: str, prominence: float, width: int,
+                 voltage=None, current=None, path: Optional[str] = None) -> Dict:
+    """Detect peaks in one curve (runs inside a worker process)
+
+    The curve is given either as arrays or as a CSV path that is loaded in
+    the worker. Errors are returned in the result instead of raised, so one
+    bad curve does not fail the batch.
+    """
+    started = time.perf_counter()
+    result = {'index': index, 'id': curve_id}
+    try:
+        if path is not None:
+            voltage, current = load_cv_file(path)
+        voltage = np.asarray(voltage, dtype=np.float64)
+        current = np.asarray(current, dtype=np.float64)
+        if len(voltage) != len(current) or len(voltage) == 0:
+            raise ValueError('Voltage and current must be non-empty and of equal length')
+        result.update(detect_cv_peaks(voltage, current, method=method,
+                                      prominence=prominence, width=width))
+        result['success'] = True
+        result['points'] = len(voltage)
+    except Exception as e:
+        result['success'] = False
+        result['error'] = str(e)
+    result['elapsed_ms'] = (time.perf_counter() - started) * 1000.0
+    return result
+
+
+def _init_worker(niceness: int) -> None:
+    try:
+        os.nice(niceness)
+    except (AttributeError, OSError):
+        pass
+
+
+class PeakBatchRunner:
+    """Runs detect_curve jobs in a pool of worker processes
+
+    The pool is created on first use and sized to the available cores. With
+    ``processes=0`` (or if the pool cannot be started) curves are processed
+    in the calling process. A pool broken by a dead worker is discarded and
+    the next job starts a fresh one.
+    """
+
+    def __init__(self, processes: int = Config.PEAK_BATCH_PROCESSES,
+                 niceness: int = Config.PEAK_BATCH_NICENESS):
+        self.processes = processes
+        self.niceness = niceness
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Guards pool creation and replacement across request threads
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        with self._pool_lock:
+            if self._pool is None and self.processes > 0:
+                try:
+                    # 'spawn' avoids forking the threaded web server
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.processes,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_worker, initargs=(self.niceness,))
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Peak batch process pool unavailable, running in-process: {e}")
+                    self.processes = 0
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Drop a pool broken by a dead worker, unless it was already replaced"""
+        with self._pool_lock:
+            if self._pool is not pool:
+                return
+            logger.warning("Peak batch worker died, restarting the process pool")
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, **job) -> Future:
+        """Queue one detect_curve job; the future resolves to its result dict"""
+        pool = self._get_pool()
+        if pool is not None:
+            try:
+                return pool.submit(detect_curve, **job)
+            except BrokenProcessPool:
+                self._discard_pool(pool)
+                return self.submit(**job)
+
+        future = Future()
+        future.set_result(detect_curve(**job))
+        return future
+
+    def run(self, jobs: Iterable[Dict]) -> Iterator[Dict]:
+        """Process all jobs, yielding each result as soon as it completes"""
+        pool = self._get_pool()
+        if pool is None:
+            for job in jobs:
+                yield detect_curve(**job)
+            return
+
+        futures = {self.submit(**job): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                # The worker process died (e.g. out of memory)
+                if isinstance(e, BrokenProcessPool):
+                    self._discard_pool(pool)
+                job = futures[future]
+                yield {'index': job['index'], 'id': job['curve_id'], 'success': False,
+                       'error': f"Worker failed: {e}", 'elapsed_ms': None}
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
@@ -0,0 +1,200 @@
+"""
+Peak Detection for H743Poten Web Interface
+CV peak detection algorithms, independent of the Flask application
+"""
+
+import logging
+import numpy as np
+
+try:
+    from .lazy_imports import lazy_import
+except ImportError:
+    from services.lazy_imports import lazy_import
+
+logger = logging.getLogger(__name__)
+
+scipy_signal = lazy_import('scipy.signal')
+
+METHODS = ('prominence', 'derivative', 'ml')
+
+# Defaults for the PEAK_PROMINENCE / PEAK_WIDTH settings
+DEFAULT_PROMINENCE = 0.1
+DEFAULT_WIDTH = 5
+
+
+def detect_cv_peaks(voltage, current, method='prominence',
+                    prominence=DEFAULT_PROMINENCE, width=DEFAULT_WIDTH):
+    """
+    Detect peaks in CV data using specified method
+    Returns list of peaks with their characteristics
+    """
+    try:
+        if method == 'prominence':
+            return detect_peaks_prominence(voltage, current, prominence, width)
+        elif method == 'derivative':
+            return detect_peaks_derivative(voltage, current)
+        elif method == 'ml':
+            return detect_peaks_ml(voltage, current, prominence, width)
+        else:
+            raise ValueError(f"Unknown method: {method}")
+    except Exception as e:
+        logger.error(f"Error in CV peak detection: {str(e)}")
+        raise
+
+def find_cv_peaks(current, prominence=DEFAULT_PROMINENCE, width=DEFAULT_WIDTH):
+    """
+    Find oxidation and reduction peaks in the normalized current
+    Returns (indices, types, prominences) with oxidation peaks first
+    """
+    # Normalize current for peak detection
+    current_norm = current / np.abs(current).max()
+    
+    # Find positive peaks (oxidation) and negative peaks (reduction)
+    pos_peaks, pos_properties = scipy_signal.find_peaks(current_norm, prominence=prominence, width=width)
+    neg_peaks, neg_properties = scipy_signal.find_peaks(-current_norm, prominence=prominence, width=width)
+    
+    indices = np.concatenate([pos_peaks, neg_peaks])
+    types = ['oxidation'] * len(pos_peaks) + ['reduction'] * len(neg_peaks)
+    prominences = np.concatenate([pos_properties['prominences'], neg_properties['prominences']])
+    return indices, types, prominences
+
+def detect_peaks_prominence(voltage, current, prominence=DEFAULT_PROMINENCE, width=DEFAULT_WIDTH):
+    """Detect peaks using prominence method"""
+    try:
+        indices, types, prominences = find_cv_peaks(current, prominence, width)
+        
+        # Format peak data
+        peaks = [
+            {
+                'voltage': v,
+                'current': c,
+                'type': peak_type,
+                'confidence': confidence
+            }
+            for v, c, peak_type, confidence in zip(
+                voltage[indices].astype(float).tolist(),
+                current[indices].astype(float).tolist(),
+                types,
+                (prominences * 100).tolist()
+            )
+        ]
+        
+        return {
+            'peaks': peaks,
+            'method': 'prominence',
+            'params': {
+                'prominence': prominence,
+                'width': width
+            }
+        }
+
+    except Exception as e:
+        logger.error(f"Error in prominence peak detection: {str(e)}")
+        raise
+
+def detect_peaks_derivative(voltage, current):
+    """Detect peaks using derivative method"""
+    try:
+        # Calculate first derivative
+        dv = np.gradient(voltage)
+        di = np.gradient(current)
+        slope = di/dv
+        
+        # Find zero crossings in second derivative
+        d2i = np.gradient(slope)
+        zero_crossings = np.where(np.diff(np.signbit(d2i)))[0]
+        
+        peaks = []
+        for idx in zero_crossings:
+            peak_type = 'oxidation' if slope[idx] > 0 else 'reduction'
+            confidence = min(100.0, abs(d2i[idx]) * 100)
+            
+            peaks.append({
+                'voltage': float(voltage[idx]),
+                'current': float(current[idx]),
+                'type': peak_type,
+                'confidence': float(confidence)
+            })
+            
+        return {
+            'peaks': peaks,
+            'method': 'derivative',
+            'params': {
+                'smoothing': 'savgol_filter',
+                'window': 5
+            }
+        }
+        
+    except Exception as e:
+        logger.error(f"Error in derivative peak detection: {str(e)}")
+        raise
+
+def half_height_bounds(current, indices):
+    """
+    Sample indices around each peak where |current| first drops to half the
+    peak's |current| (or the ends of the curve), found in one peak_widths pass
+    """
+    magnitude = np.abs(current)
+    heights = magnitude[indices]
+    bases = (np.zeros(len(indices), dtype=np.intp),
+             np.full(len(indices), len(current) - 1, dtype=np.intp))
+    # With prominence = height, rel_height 0.5 evaluates at half the height above zero
+    _, _, left_ips, right_ips = scipy_signal.peak_widths(magnitude, indices, rel_height=0.5,
+                                                         prominence_data=(heights, *bases))
+    left = np.minimum(np.floor(left_ips).astype(np.intp), indices)
+    right = np.maximum(np.ceil(right_ips).astype(np.intp), indices)
+    return left, right
+
+def cumulative_area(current, voltage):
+    """Running trapezoid integral of current over voltage, starting at 0"""
+    steps = np.diff(voltage) * (current[1:] + current[:-1]) / 2
+    return np.concatenate([[0.0], np.cumsum(steps)])
+
+def detect_peaks_ml(voltage, current, prominence=DEFAULT_PROMINENCE, width=DEFAULT_WIDTH):
+    """Detect peaks using ML-enhanced method"""
+    try:
+        voltage = np.asarray(voltage, dtype=np.float64)
+        current = np.asarray(current, dtype=np.float64)
+        
+        # Start with prominence peaks as baseline, kept as indices
+        indices, types, prominences = find_cv_peaks(current, prominence, width)
+        
+        # Add ML enhancements (feature extraction), all peaks at once:
+        # width at half height and area over [left, right)
+        left, right = half_height_bounds(current, indices)
+        widths = voltage[right] - voltage[left]
+        areas = cumulative_area(current, voltage)
+        peak_areas = np.where(right - 1 > left, areas[np.maximum(right - 1, 0)] - areas[left], 0.0)
+        confidences = np.minimum(100.0, prominences * 100 * 1.1)  # ML confidence boost
+        
+        enhanced_peaks = [
+            {
+                'voltage': v,
+                'current': c,
+                'type': peak_type,
+                'confidence': confidence,
+                'width': w,
+                'area': area
+            }
+            for v, c, peak_type, confidence, w, area in zip(
+                voltage[indices].tolist(),
+                current[indices].tolist(),
+                types,
+                confidences.tolist(),
+                widths.tolist(),
+                peak_areas.tolist()
+            )
+        ]
+            
+        return {
+            'peaks': enhanced_peaks,
+            'method': 'ml',
+            'params': {
+                'feature_extraction': ['width', 'area'],
+                'confidence_boost': 1.1
+            }
+        }
+        
+    except Exception as e:
+        logger.error(f"Error in ML peak detection: {str(e)}")
+        raise
@@ -0,0 +1,231 @@
+"""
+Plot Renderer for H743Poten Web Interface
+Renders CV plots to PNG in worker processes with the Figure/Agg API
+"""
+
+import os
+import logging
+import multiprocessing
+import threading
+import numpy as np
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, Optional
+
+try:
+    from ..config.settings import Config
+    from .downsampling import minmax_indices
+    from .lazy_imports import lazy_import
+except ImportError:
+    from config.settings import Config
+    from services.downsampling import minmax_indices
+    from services.lazy_imports import lazy_import
+
+logger = logging.getLogger(__name__)
+
+# Loaded on first render, in whichever process does the drawing
+mpl_figure = lazy_import('matplotlib.figure')
+mpl_backend_agg = lazy_import('matplotlib.backends.backend_agg')
+
+# Preset name -> (figure size in inches, dpi)
+DPI_PRESETS = {
+    'thumbnail': ((4, 3), 72),
+    'preview': ((10, 8), 100),
+    'publication': ((10, 8), 300),
+}
+
+CYCLE_COLORS = ['blue', 'red', 'green', 'orange', 'purple', 'brown', 'pink', 'gray', 'olive', 'cyan']
+
+# Per-process cache of pre-built figures, keyed by preset
+_templates: Dict[str, tuple] = {}
+# Serializes renders on the shared templates when they run on caller threads
+_render_lock = threading.Lock()
+
+
+def decimate_minmax(x: np.ndarray, y: np.ndarray, max_points: int):
+    """Reduce a trace to about max_points points, keeping each bucket's y extremes"""
+    if len(y) <= max_points:
+        return x, y
+    index = minmax_indices(y, max_points)
+    return x[index], y[index]
+
+
+def _get_template(preset: str):
+    """Figure, axes and canvas for a preset, built once per process"""
+    template = _templates.get(preset)
+    if template is None:
+        figsize, _ = DPI_PRESETS[preset]
+        fig = mpl_figure.Figure(figsize=figsize)
+        canvas = mpl_backend_agg.FigureCanvasAgg(fig)
+        ax = fig.add_subplot(1, 1, 1)
+        small = preset == 'thumbnail'
+        ax.set_xlabel('Potential (V)', fontsize=8 if small else 12)
+        ax.set_ylabel('Current (A)', fontsize=8 if small else 12)
+        ax.grid(True, alpha=0.3)
+        ax.ticklabel_format(style='scientific', axis='y', scilimits=(0, 0))
+        footer = fig.text(0.02, 0.02, '', fontsize=6 if small else 10, alpha=0.7)
+        fig.tight_layout()
+        template = (fig, ax, canvas, footer)
+        _templates[preset] = template
+    return template
+
+
+def render_cv_plot(potential, current, cycle, png_path: str, parameters: Dict,
+                   session_id: str, preset: str = 'publication',
+                   max_points: Optional[int] = None) -> bool:
+    """Render a cyclic voltammogram to PNG (runs inside a worker process)
+
+    Reuses the preset's pre-built figure: only the traces, title and footer
+    change between renders. Renders in one process are serialized, since the
+    in-process fallback calls this from several threads.
+    """
+    if preset not in DPI_PRESETS:
+        raise ValueError(f"Unknown plot preset: {preset}")
+    if max_points is None:
+        max_points = Config.PLOT_MAX_POINTS
+
+    potential = np.asarray(potential, dtype=np.float64)
+    current = np.asarray(current, dtype=np.float64)
+    cycle = np.asarray(cycle) if cycle is not None else None
+
+    with _render_lock:
+        return _draw(potential, current, cycle, png_path, parameters, session_id,
+                     preset, max_points)
+
+
+def _draw(potential, current, cycle, png_path, parameters, session_id, preset, max_points):
+    fig, ax, canvas, footer = _get_template(preset)
+    _, dpi = DPI_PRESETS[preset]
+    small = preset == 'thumbnail'
+
+    try:
+        line_width = 1 if small else 2
+        cycles = np.unique(cycle) if cycle is not None and len(cycle) else np.array([])
+        if len(cycles) > 1:
+            # Plot multiple cycles with different colors
+            per_cycle = max(2, max_points // len(cycles))
+            for i, number in enumerate(cycles):
+                mask = cycle == number
+                x, y = decimate_minmax(potential[mask], current[mask], per_cycle)
+                ax.plot(x, y, color=CYCLE_COLORS[i % len(CYCLE_COLORS)],
+                        label=f'Cycle {number}', linewidth=line_width)
+        else:
+            # Single cycle or no cycle info
+            x, y = decimate_minmax(potential, current, max_points)
+            ax.plot(x, y, 'b-', linewidth=line_width, label='CV Scan')
+
+        ax.relim()
+        ax.autoscale_view()
+        ax.set_title(f'Cyclic Voltammogram - {session_id}\n'
+                     f'Scan Rate: {parameters.get("rate", "N/A")} V/s, '
+                     f'Range: {parameters.get("lower", "N/A")} to {parameters.get("upper", "N/A")} V',
+                     fontsize=8 if small else 14)
+        if not small:
+            ax.legend()
+        footer.set_text(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+        fig.savefig(png_path, dpi=dpi, bbox_inches='tight')
+        return True
+
+    finally:
+        # Return the template to its empty state for the next render
+        for line in list(ax.lines):
+            line.remove()
+        legend = ax.get_legend()
+        if legend is not None:
+            legend.remove()
+
+
+def _init_worker(niceness: int) -> None:
+    try:
+        os.nice(niceness)
+    except (AttributeError, OSError):
+        pass
+
+
+class PlotRenderer:
+    """Renders CV plots in a pool of worker processes
+
+    Rendering happens outside the web process, so a 300-DPI plot neither
+    holds the GIL nor touches pyplot's global state. The pool is created on
+    first use. With ``processes=0`` (or if the pool cannot be started) plots
+    are rendered in the calling process instead. A pool broken by a dead
+    worker (e.g. out of memory) is dropped and the next render starts a
+    fresh one.
+    """
+
+    def __init__(self, processes: int = Config.PLOT_PROCESSES,
+                 niceness: int = Config.PLOT_RENDER_NICENESS):
+        self.processes = processes
+        self.niceness = niceness
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Guards pool creation and replacement across save and request threads
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        with self._pool_lock:
+            if self._pool is None and self.processes > 0:
+                try:
+                    # 'spawn' avoids forking the threaded web server
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.processes,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_worker, initargs=(self.niceness,))
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Plot process pool unavailable, rendering in-process: {e}")
+                    self.processes = 0
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Drop a pool broken by a dead worker, unless it was already replaced
+
+        A broken executor has already terminated its workers, so nothing waits
+        on it here (this may run on its management thread).
+        """
+        with self._pool_lock:
+            if self._pool is pool:
+                logger.warning("Plot worker died, restarting the process pool")
+                self._pool = None
+
+    def _check_pool(self, pool: ProcessPoolExecutor, future: Future) -> None:
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._discard_pool(pool)
+
+    def submit(self, potential, current, cycle, png_path, parameters: Dict,
+               session_id: str, preset: str = 'publication') -> Future:
+        """Queue a render; the future resolves to True on success"""
+        args = (np.asarray(potential, dtype=np.float64), np.asarray(current, dtype=np.float64),
+                None if cycle is None else np.asarray(cycle), str(png_path),
+                dict(parameters or {}), session_id, preset)
+        pool = self._get_pool()
+        if pool is not None:
+            try:
+                future = pool.submit(render_cv_plot, *args)
+            except BrokenProcessPool:
+                self._discard_pool(pool)
+                return self.submit(*args)
+            future.add_done_callback(lambda done: self._check_pool(pool, done))
+            return future
+
+        future = Future()
+        try:
+            future.set_result(render_cv_plot(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def render(self, *args, **kwargs) -> bool:
+        """Render synchronously; returns False (and logs) on failure"""
+        try:
+            return self.submit(*args, **kwargs).result()
+        except Exception as e:
+            logger.error(f"Failed to render plot: {e}")
+            return False
+
+    def shutdown(self, wait: bool = True) -> None:
+        # Shut down outside the lock: done callbacks of the pool's futures take it
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
@@ -0,0 +1,109 @@
+"""
+Session Format for H743Poten Web Interface
+Columnar binary session files (uncompressed .npz) with embedded metadata
+"""
+
+import os
+import json
+import struct
+import zipfile
+import logging
+import numpy as np
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SESSION_DATA_SUFFIX = '.npz'
+METADATA_MEMBER = '_metadata'
+
+# Local file header: signature, version, flags, method, time, date, crc,
+# sizes, then the file name and extra field lengths
+_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+
+
+def write_session_file(path, columns: Dict[str, np.ndarray], metadata: Dict) -> None:
+    """Write columns and metadata to an uncompressed .npz file
+
+    Members are stored uncompressed so read_session_file can memory-map each
+    column. The file is written to a temporary name, fsynced and renamed, so
+    a session file is either complete or absent.
+    """
+    path = Path(path)
+    arrays = {name: np.ascontiguousarray(values) for name, values in columns.items()}
+    arrays[METADATA_MEMBER] = np.frombuffer(json.dumps(metadata).encode('utf-8'), dtype=np.uint8)
+
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _member_offset(f, info: zipfile.ZipInfo) -> int:
+    """Offset of a stored member's data within the zip file"""
+    f.seek(info.header_offset)
+    fields = _LOCAL_HEADER.unpack(f.read(_LOCAL_HEADER.size))
+    name_length, extra_length = fields[-2], fields[-1]
+    return info.header_offset + _LOCAL_HEADER.size + name_length + extra_length
+
+
+def _map_member(path: Path, f, info: zipfile.ZipInfo) -> np.ndarray:
+    """Memory-map the .npy array stored in an uncompressed member"""
+    f.seek(_member_offset(f, info))
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+    if dtype.hasobject:
+        raise ValueError(f"Cannot memory-map object column {info.filename}")
+    if not shape or 0 in shape:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                     order='F' if fortran_order else 'C')
+
+
+def read_session_metadata(path) -> Dict:
+    """Read only the embedded metadata of a session file"""
+    with zipfile.ZipFile(path) as archive:
+        with archive.open(METADATA_MEMBER + '.npy') as member:
+            raw = np.lib.format.read_array(member)
+    return json.loads(raw.tobytes().decode('utf-8'))
+
+
+def read_session_file(path, columns: Optional[Iterable[str]] = None,
+                      mmap: bool = True) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """Load a session file
+
+    Args:
+        columns: names of the columns to load (default: all)
+        mmap: memory-map the columns instead of reading them into memory
+
+    Returns:
+        (column name -> array, metadata). Memory-mapped arrays are read-only.
+    """
+    path = Path(path)
+    data: Dict[str, np.ndarray] = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        members = {name[:-4]: archive.getinfo(name) for name in archive.namelist()
+                   if name.endswith('.npy')}
+        wanted = [name for name in members if name != METADATA_MEMBER] if columns is None else list(columns)
+
+        for name in wanted:
+            info = members.get(name)
+            if info is None:
+                raise KeyError(f"Session file {path.name} has no column '{name}'")
+            if mmap and info.compress_type == zipfile.ZIP_STORED:
+                data[name] = _map_member(path, f, info)
+            else:
+                with archive.open(info) as member:
+                    data[name] = np.lib.format.read_array(member)
+
+        metadata = {}
+        if METADATA_MEMBER in members:
+            with archive.open(members[METADATA_MEMBER]) as member:
+                metadata = json.loads(np.lib.format.read_array(member).tobytes().decode('utf-8'))
+
+    return data, metadata
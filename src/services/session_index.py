@@ -0,0 +1,353 @@
+"""
+Session Index for H743Poten Web Interface
+Persistent SQLite index of saved measurement sessions for the data browser
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .session_format import SESSION_DATA_SUFFIX
+except ImportError:
+    from services.session_format import SESSION_DATA_SUFFIX
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    timestamp TEXT,
+    measurement_type TEXT,
+    rate REAL,
+    lower REAL,
+    upper REAL,
+    cycles INTEGER,
+    data_points_count INTEGER,
+    voltage_min REAL,
+    voltage_max REAL,
+    current_min REAL,
+    current_max REAL,
+    data_size INTEGER NOT NULL DEFAULT 0,
+    csv_size INTEGER NOT NULL DEFAULT 0,
+    png_size INTEGER NOT NULL DEFAULT 0,
+    metadata_size INTEGER NOT NULL DEFAULT 0,
+    metadata_mtime REAL,
+    metadata TEXT NOT NULL,
+    indexed_at REAL
+);
+CREATE INDEX IF NOT EXISTS sessions_timestamp ON sessions(timestamp);
+CREATE INDEX IF NOT EXISTS sessions_points ON sessions(data_points_count);
+
+-- Aggregates maintained by triggers, so totals never need a directory walk
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    session_count INTEGER NOT NULL,
+    total_bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO totals VALUES (1, 0, 0);
+
+CREATE TRIGGER IF NOT EXISTS sessions_insert AFTER INSERT ON sessions BEGIN
+    UPDATE totals SET session_count = session_count + 1,
+        total_bytes = total_bytes + NEW.data_size + NEW.csv_size + NEW.png_size + NEW.metadata_size;
+END;
+CREATE TRIGGER IF NOT EXISTS sessions_delete AFTER DELETE ON sessions BEGIN
+    UPDATE totals SET session_count = session_count - 1,
+        total_bytes = total_bytes - OLD.data_size - OLD.csv_size - OLD.png_size - OLD.metadata_size;
+END;
+CREATE TRIGGER IF NOT EXISTS sessions_update AFTER UPDATE ON sessions BEGIN
+    UPDATE totals SET total_bytes = total_bytes
+        - OLD.data_size - OLD.csv_size - OLD.png_size - OLD.metadata_size
+        + NEW.data_size + NEW.csv_size + NEW.png_size + NEW.metadata_size;
+END;
+"""
+
+# Bumped when SCHEMA changes; older index files are dropped and rebuilt
+SCHEMA_VERSION = 2
+
+# Session files whose sizes are tracked, in column order
+SIZE_KINDS = ('data', 'csv', 'png', 'metadata')
+REFRESH_SIZES_SQL = ("UPDATE sessions SET data_size = ?, csv_size = ?, png_size = ?, "
+                     "metadata_size = ? WHERE session_id = ?")
+
+# Sort keys accepted by query(); values are SQL expressions
+SORT_COLUMNS = {
+    'timestamp': 'timestamp',
+    'session_id': 'session_id',
+    'data_points_count': 'data_points_count',
+    'cycles': 'cycles',
+    'rate': 'rate',
+    'size': 'data_size + csv_size + png_size + metadata_size',
+}
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class SessionIndex:
+    """SQLite index of session metadata and file sizes
+
+    The index mirrors ``<sessions_dir>/<id>/<id>_metadata.json``. It is kept
+    current by DataLoggingService on save and delete; reconcile() picks up
+    sessions added, changed or removed outside the app.
+    """
+
+    def __init__(self, db_path, sessions_dir):
+        self.db_path = Path(db_path)
+        self.sessions_dir = Path(sessions_dir)
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # WAL stays consistent with NORMAL; avoids an fsync per commit on SD cards
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                # Empty index is refilled by reconcile()
+                self._conn.executescript("DROP TABLE IF EXISTS sessions; DROP TABLE IF EXISTS totals;")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _session_files(self, session_id: str) -> Dict[str, Path]:
+        session_dir = self.sessions_dir / session_id
+        return {
+            'data': session_dir / f"{session_id}{SESSION_DATA_SUFFIX}",
+            'csv': session_dir / f"{session_id}.csv",
+            'png': session_dir / f"{session_id}.png",
+            'metadata': session_dir / f"{session_id}_metadata.json",
+        }
+
+    def _row_values(self, metadata: Dict) -> Dict:
+        session_id = metadata['session_id']
+        files = self._session_files(session_id)
+        parameters = metadata.get('parameters') or {}
+        voltage = metadata.get('voltage_range') or {}
+        current = metadata.get('current_range') or {}
+        try:
+            metadata_mtime = files['metadata'].stat().st_mtime
+        except OSError:
+            metadata_mtime = None
+        return {
+            'session_id': session_id,
+            'timestamp': metadata.get('timestamp'),
+            'measurement_type': parameters.get('measurement_type', 'CV'),
+            'rate': _float(parameters.get('rate')),
+            'lower': _float(parameters.get('lower')),
+            'upper': _float(parameters.get('upper')),
+            'cycles': metadata.get('cycles'),
+            'data_points_count': metadata.get('data_points_count'),
+            'voltage_min': _float(voltage.get('min')),
+            'voltage_max': _float(voltage.get('max')),
+            'current_min': _float(current.get('min')),
+            'current_max': _float(current.get('max')),
+            'data_size': _file_size(files['data']),
+            'csv_size': _file_size(files['csv']),
+            'png_size': _file_size(files['png']),
+            'metadata_size': _file_size(files['metadata']),
+            'metadata_mtime': metadata_mtime,
+            'metadata': json.dumps(metadata),
+            'indexed_at': time.time(),
+        }
+
+    def upsert(self, metadata: Dict) -> None:
+        """Add or refresh a session from its metadata (file sizes are read from disk)"""
+        values = self._row_values(metadata)
+        columns = ', '.join(values)
+        placeholders = ', '.join(f':{name}' for name in values)
+        updates = ', '.join(f'{name} = excluded.{name}' for name in values if name != 'session_id')
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO sessions ({columns}) VALUES ({placeholders}) "
+                f"ON CONFLICT(session_id) DO UPDATE SET {updates}", values)
+
+    def _file_sizes(self, session_id: str) -> Tuple[int, int, int, int]:
+        """(data, csv, png, metadata) sizes of a session's files on disk"""
+        files = self._session_files(session_id)
+        return tuple(_file_size(files[kind]) for kind in SIZE_KINDS)
+
+    def refresh_files(self, session_id: str) -> None:
+        """Update the stored file sizes of a session (e.g. after its plot is rendered)"""
+        sizes = self._file_sizes(session_id)
+        with self._lock, self._conn:
+            self._conn.execute(REFRESH_SIZES_SQL, sizes + (session_id,))
+
+    def remove(self, session_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM sessions WHERE session_id = ?",
+                                     (session_id,)).fetchone()
+        return self._to_session(row) if row else None
+
+    @staticmethod
+    def _to_session(row: sqlite3.Row) -> Dict:
+        """Row -> metadata dict as returned by list_sessions"""
+        session = json.loads(row['metadata'])
+        # CSV downloads are exported on demand from the binary data file
+        session['files_exist'] = {
+            'data': row['data_size'] > 0,
+            'csv': row['csv_size'] > 0 or row['data_size'] > 0,
+            'png': row['png_size'] > 0
+        }
+        session['file_sizes'] = {
+            'data': row['data_size'],
+            'csv': row['csv_size'],
+            'png': row['png_size'],
+            'metadata': row['metadata_size'],
+        }
+        return session
+
+    def query(self, limit: Optional[int] = None, offset: int = 0,
+              sort: str = 'timestamp', descending: bool = True,
+              search: Optional[str] = None, since: Optional[str] = None,
+              until: Optional[str] = None, min_points: Optional[int] = None,
+              max_points: Optional[int] = None, cycles: Optional[int] = None,
+              measurement_type: Optional[str] = None) -> Tuple[List[Dict], int]:
+        """Page through sessions
+
+        ``since``/``until`` are ISO timestamps (inclusive) and ``search``
+        matches a substring of the session ID.
+
+        Returns:
+            (sessions on this page, total number of matching sessions)
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort key: {sort}")
+
+        clauses, args = [], []
+        if search:
+            clauses.append("session_id LIKE ? ESCAPE '\\'")
+            escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            args.append(f"%{escaped}%")
+        if since:
+            clauses.append("timestamp >= ?")
+            args.append(since)
+        if until:
+            clauses.append("timestamp <= ?")
+            args.append(until)
+        if min_points is not None:
+            clauses.append("data_points_count >= ?")
+            args.append(min_points)
+        if max_points is not None:
+            clauses.append("data_points_count <= ?")
+            args.append(max_points)
+        if cycles is not None:
+            clauses.append("cycles = ?")
+            args.append(cycles)
+        if measurement_type:
+            clauses.append("measurement_type = ?")
+            args.append(measurement_type)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        order = f"ORDER BY {SORT_COLUMNS[sort]} {'DESC' if descending else 'ASC'}, session_id"
+        page = "LIMIT ? OFFSET ?"
+        page_args = [limit if limit else -1, max(0, offset)]
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM sessions {where}", args).fetchone()[0]
+            rows = self._conn.execute(f"SELECT * FROM sessions {where} {order} {page}",
+                                      args + page_args).fetchall()
+        return [self._to_session(row) for row in rows], total
+
+    def totals(self) -> Dict:
+        """Session count and bytes used by indexed session files"""
+        with self._lock:
+            row = self._conn.execute("SELECT session_count, total_bytes FROM totals").fetchone()
+        return {'session_count': row['session_count'], 'total_bytes': row['total_bytes']}
+
+    def reconcile(self, full: bool = False) -> Dict[str, int]:
+        """Bring the index in line with the session directories
+
+        Only sessions whose metadata file is new or has a different mtime are
+        parsed, unless ``full`` is set. File sizes of unchanged sessions are
+        refreshed from a stat of each file; the ones that differ are written
+        in a single transaction.
+
+        Returns:
+            Counts of added, updated and removed sessions
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id, metadata_mtime, data_size, csv_size, png_size, metadata_size "
+                "FROM sessions").fetchall()
+        known = {row['session_id']: row['metadata_mtime'] for row in rows}
+        stored_sizes = {row['session_id']: tuple(row[f'{kind}_size'] for kind in SIZE_KINDS)
+                        for row in rows}
+        size_updates = []
+
+        counts = {'added': 0, 'updated': 0, 'removed': 0}
+        seen = set()
+        try:
+            entries = list(os.scandir(self.sessions_dir))
+        except FileNotFoundError:
+            entries = []
+
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            session_id = entry.name
+            metadata_file = self._session_files(session_id)['metadata']
+            try:
+                mtime = metadata_file.stat().st_mtime
+            except OSError:
+                continue
+            seen.add(session_id)
+
+            if not full and session_id in known and known[session_id] == mtime:
+                sizes = self._file_sizes(session_id)
+                if sizes != stored_sizes[session_id]:
+                    size_updates.append(sizes + (session_id,))
+                continue
+            try:
+                with open(metadata_file, 'r') as f:
+                    metadata = json.load(f)
+                # Rows are keyed on the directory name, whatever the JSON says
+                metadata['session_id'] = session_id
+                self.upsert(metadata)
+                counts['updated' if session_id in known else 'added'] += 1
+            except Exception as e:
+                logger.warning(f"Failed to index session {session_id}: {e}")
+
+        if size_updates:
+            with self._lock, self._conn:
+                self._conn.executemany(REFRESH_SIZES_SQL, size_updates)
+
+        removed = set(known) - seen
+        if removed:
+            with self._lock, self._conn:
+                self._conn.executemany("DELETE FROM sessions WHERE session_id = ?",
+                                       [(session_id,) for session_id in removed])
+            counts['removed'] = len(removed)
+
+        logger.info(f"Session index reconciled: {counts}")
+        return counts
+
+    def rebuild(self) -> Dict[str, int]:
+        """Drop and recreate the index from the session directories"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions")
+        return self.reconcile(full=True)
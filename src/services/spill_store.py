@@ -0,0 +1,76 @@
+"""
+Spill Store for H743Poten Web Interface
+Append-only on-disk columnar files for measurement data that leaves memory
+"""
+
+import json
+import shutil
+import logging
+import numpy as np
+from pathlib import Path
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class ColumnSpillFile:
+    """Append-only columnar storage on disk
+
+    Each column is a raw little-endian file (``<name>.bin``) next to a
+    ``columns.json`` schema, so a column can be read or memory-mapped by
+    offset without touching the others.
+    """
+
+    def __init__(self, directory, columns: Dict[str, np.dtype]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.dtypes = {name: np.dtype(dtype).newbyteorder('<') for name, dtype in columns.items()}
+        self._length = 0
+
+        with open(self.directory / 'columns.json', 'w') as f:
+            json.dump({name: dtype.str for name, dtype in self.dtypes.items()}, f)
+
+        self._files = {name: open(self._path(name), 'ab') for name in self.dtypes}
+
+    def _path(self, name: str) -> Path:
+        return self.directory / f"{name}.bin"
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def nbytes(self) -> int:
+        return sum(self._length * dtype.itemsize for dtype in self.dtypes.values())
+
+    def append(self, columns: Dict[str, np.ndarray]) -> None:
+        """Append equal-length column arrays"""
+        count = None
+        for name, dtype in self.dtypes.items():
+            values = np.ascontiguousarray(columns[name], dtype=dtype)
+            if count is None:
+                count = len(values)
+            elif len(values) != count:
+                raise ValueError(f"Column '{name}' has {len(values)} rows, expected {count}")
+            self._files[name].write(values.tobytes())
+        # Make the data visible to readers (memmap) without waiting for close
+        for f in self._files.values():
+            f.flush()
+        self._length += count or 0
+
+    def read(self, name: str, start: int, stop: int) -> np.ndarray:
+        """Read rows [start:stop) of a column as a read-only memory map"""
+        start, stop = max(0, start), min(stop, self._length)
+        dtype = self.dtypes[name]
+        if stop <= start:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self._path(name), dtype=dtype, mode='r',
+                         offset=start * dtype.itemsize, shape=(stop - start,))
+
+    def close(self) -> None:
+        for f in self._files.values():
+            f.close()
+
+    def delete(self) -> None:
+        """Close and remove the files"""
+        self.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -17,6 +17,8 @@ class CVMeasurement {
         this.dataUpdateInterval = null;
         this.statusUpdateInterval = null;
         this.plotInitialized = false; // Track plot initialization
+        this.streamCursor = null; // Sequence cursor for incremental /data/stream fetches
+        this.eventSource = null; // Server-Sent Events push channel (/api/cv/events)
         
         // Plot update throttling
         this.lastPlotUpdate = 0;
@@ -64,6 +66,7 @@ class CVMeasurement {
         // Get status elements
         this.statusText = document.getElementById('connection-status');
         this.progressText = document.getElementById('data-table-body');
+        this.livePeaksText = document.getElementById('live-peaks');
         
         // Bind event listeners
         this.startBtn?.addEventListener('click', () => this.startMeasurement());
@@ -481,6 +484,12 @@ class CVMeasurement {
     }
     
     startDataUpdates() {
+        // Prefer the server push channel; fall back to polling without EventSource
+        if (window.EventSource) {
+            this.startEventStream();
+            return;
+        }
+        
         // Update data every 200ms for real-time plotting (reduced frequency)
         this.dataUpdateInterval = setInterval(async () => {
             await this.updateData();
@@ -492,7 +501,42 @@ class CVMeasurement {
         }, 1000);
     }
     
+    startEventStream() {
+        this.stopEventStream();
+        
+        // EventSource reconnects on its own and resumes via Last-Event-ID
+        const url = this.streamCursor === null
+            ? '/api/cv/events'
+            : `/api/cv/events?last_event_id=${this.streamCursor}`;
+        this.eventSource = new EventSource(url);
+        
+        this.eventSource.addEventListener('data', (event) => {
+            this.applyDataFrame(JSON.parse(event.data));
+        });
+        
+        this.eventSource.addEventListener('status', (event) => {
+            this.applyStatus(JSON.parse(event.data));
+        });
+        
+        this.eventSource.addEventListener('peaks', (event) => {
+            this.applyLivePeaks(JSON.parse(event.data));
+        });
+        
+        this.eventSource.onerror = () => {
+            console.warn('[CV] Event stream interrupted, browser will reconnect');
+        };
+    }
+    
+    stopEventStream() {
+        if (this.eventSource) {
+            this.eventSource.close();
+            this.eventSource = null;
+        }
+    }
+    
     stopDataUpdates() {
+        this.stopEventStream();
+        
         if (this.dataUpdateInterval) {
             clearInterval(this.dataUpdateInterval);
             this.dataUpdateInterval = null;
@@ -506,63 +550,50 @@ class CVMeasurement {
     
     async updateData() {
         try {
-            console.log('[DEBUG] Fetching data from /api/cv/data/stream...');
-            const response = await fetch('/api/cv/data/stream');
-            
-            console.log('[DEBUG] Response status:', response.status, response.statusText);
+            const url = this.streamCursor === null
+                ? '/api/cv/data/stream'
+                : `/api/cv/data/stream?since=${this.streamCursor}`;
+            const response = await fetch(url);
             
             if (!response.ok) {
                 console.warn('[DEBUG] Response not OK, skipping data update');
                 return;
             }
             
-            const result = await response.json();
-            console.log('[DEBUG] Full response from server:', result);
-            
-            const dataPoints = result.data_points || [];
-            console.log('[DEBUG] Data points extracted:', dataPoints.length, 'points');
-            
-            if (dataPoints.length > 0) {
-                // Get only new points since last update
-                const currentDataLength = this.plotData.x.length;
-                
-                console.log(`[DEBUG] Total points from server: ${dataPoints.length}, Current local points: ${currentDataLength}`);
-                
-                // If server has more points than we have locally, add the new ones
-                if (dataPoints.length > currentDataLength) {
-                    const newPoints = dataPoints.slice(currentDataLength);
-                    console.log(`[DEBUG] Adding ${newPoints.length} new data points:`, newPoints.slice(0, 3));
-                    
-                    // Add new data points to plot
-                    newPoints.forEach((point, index) => {
-                        this.plotData.x.push(point.potential);
-                        this.plotData.y.push(point.current);
-                        this.plotData.cycle.push(point.cycle);
-                        this.plotData.direction.push(point.direction);
-                    });
-                    
-                    // Force complete plot update after adding all new points
-                    console.log(`[DEBUG] Forcing complete plot update with ${this.plotData.x.length} total points`);
-                    console.log(`[DEBUG] Plot container exists:`, !!this.plotDiv);
-                    console.log(`[DEBUG] Plot initialized:`, this.plotInitialized);
-                    
-                    if (this.plotDiv && this.plotInitialized) {
-                        this.updatePlotComplete();
-                    } else {
-                        console.error('[DEBUG] Cannot update plot - container or initialization missing');
-                    }
-                } else {
-                    console.log('[DEBUG] No new data points to add');
-                }
-            } else {
-                console.log('[DEBUG] No data points in response');
-            }
+            this.applyDataFrame(await response.json());
             
         } catch (error) {
             console.error('[DEBUG] Failed to update data:', error);
         }
     }
     
+    applyDataFrame(result) {
+        // Server could not continue from our cursor (new measurement or restart)
+        if (result.reset) {
+            this.plotData = { x: [], y: [], cycle: [], direction: [] };
+        }
+        this.streamCursor = result.next_since;
+        
+        // Frame holds only the points added since the previous one
+        const newPoints = result.data_points || [];
+        if (newPoints.length === 0) {
+            return;
+        }
+        
+        newPoints.forEach((point) => {
+            this.plotData.x.push(point.potential);
+            this.plotData.y.push(point.current);
+            this.plotData.cycle.push(point.cycle);
+            this.plotData.direction.push(point.direction);
+        });
+        
+        if (this.plotDiv && this.plotInitialized) {
+            this.updatePlotComplete();
+        } else {
+            console.error('[DEBUG] Cannot update plot - container or initialization missing');
+        }
+    }
+    
     updatePlotIncremental(newPoint) {
         if (!this.plotDiv) return;
         
@@ -878,9 +909,33 @@ class CVMeasurement {
                 return;
             }
             
-            const status = await response.json();
-            console.log('[DEBUG] Status response:', status);
+            this.applyStatus(await response.json());
             
+        } catch (error) {
+            console.error('[DEBUG] Failed to update status:', error);
+        }
+    }
+    
+    applyLivePeaks(peaks) {
+        // Epa/Epc/ΔEp of the latest cycle with a confirmed peak, plus the open candidate
+        if (!this.livePeaksText) return;
+        
+        const parts = [];
+        const latest = peaks.cycles[peaks.cycles.length - 1];
+        if (latest) {
+            if (latest.epa !== undefined) parts.push(`Epa: ${latest.epa.toFixed(3)}V`);
+            if (latest.epc !== undefined) parts.push(`Epc: ${latest.epc.toFixed(3)}V`);
+            if (latest.delta_ep !== undefined) parts.push(`ΔEp: ${(latest.delta_ep * 1000).toFixed(0)}mV`);
+            parts.unshift(`Cycle ${latest.cycle}`);
+        }
+        if (peaks.candidate) {
+            parts.push(`${peaks.candidate.type} candidate: ${peaks.candidate.potential.toFixed(3)}V`);
+        }
+        this.livePeaksText.textContent = parts.join(' | ');
+    }
+    
+    applyStatus(status) {
+        try {
             // Update status text with connection info
             if (this.statusText) {
                 let statusStr = `Status: ${status.is_measuring ? 'Running' : 'Stopped'}`;
@@ -933,7 +988,7 @@ class CVMeasurement {
             }
             
         } catch (error) {
-            console.error('[DEBUG] Failed to update status:', error);
+            console.error('[DEBUG] Failed to apply status:', error);
         }
     }
     
@@ -1002,6 +1057,7 @@ class CVMeasurement {
     clearPlotData() {
         console.log('[CV] Clearing plot data...');
         this.plotData = { x: [], y: [], cycle: [], direction: [] };
+        this.streamCursor = null;
         
         if (this.plotDiv && this.plotInitialized) {
             // Clear the plot data but keep the plot structure
@@ -1387,7 +1443,13 @@ CVMeasurement.prototype.saveMeasurement = async function() {
             throw new Error(errorData.error || `HTTP ${response.status}`);
         }
         
-        const data = await response.json();
+        let data = await response.json();
+        
+        // Queued saves: wait until the session data is saved
+        if (data.success && data.queued) {
+            const job = await waitForSaveJob(data.job_id);
+            data = { ...data, success: job.state !== 'failed', error: job.error };
+        }
         
         if (data.success) {
             this.showMessage(`Measurement saved as ${data.session_id}`, 'success');
@@ -1493,7 +1555,13 @@ CVMeasurement.prototype.autoSaveMeasurement = async function() {
             throw new Error(errorData.error || `HTTP ${response.status}`);
         }
         
-        const data = await response.json();
+        let data = await response.json();
+        
+        // Queued saves: wait until the session data is saved
+        if (data.success && data.queued) {
+            const job = await waitForSaveJob(data.job_id);
+            data = { ...data, success: job.state !== 'failed', error: job.error };
+        }
         
         if (data.success) {
             this.showMessage(`✓ Data auto-saved as ${data.session_id}`, 'success');
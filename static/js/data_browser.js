@@ -6,6 +6,8 @@
 // Global variables
 let currentSessions = [];
 let currentSessionId = null;
+let totalSessions = 0;  // Sessions matching the list query, loaded or not
+const SESSION_PAGE_SIZE = 500;  // Sessions fetched per page, newest first
 
 // DOM Elements
 const autoSaveToggle = document.getElementById('auto-save-toggle');
@@ -19,6 +21,8 @@ const loadingIndicator = document.getElementById('loading-indicator');
 const noDataMessage = document.getElementById('no-data-message');
 const sessionsContainer = document.getElementById('sessions-container');
 const sessionsTableBody = document.getElementById('sessions-table-body');
+const sessionsShownSpan = document.getElementById('sessions-shown');
+const loadMoreSessionsBtn = document.getElementById('load-more-sessions-btn');
 
 // Modal elements
 const sessionDetailModal = new bootstrap.Modal(document.getElementById('session-detail-modal'));
@@ -58,6 +62,10 @@ function setupEventListeners() {
         await loadSessions();
     });
     
+    loadMoreSessionsBtn.addEventListener('click', async () => {
+        await loadMoreSessions();
+    });
+    
     // Save current measurement
     saveCurrentBtn.addEventListener('click', async () => {
         await saveCurrentMeasurement();
@@ -161,21 +169,24 @@ async function setAutoSave(enabled) {
     }
 }
 
-// Load sessions list
+// Fetch one page of the sessions list
+async function fetchSessionsPage(offset) {
+    const response = await fetch(`/api/data-logging/sessions?limit=${SESSION_PAGE_SIZE}&offset=${offset}`);
+    const data = await response.json();
+    if (data.error) {
+        throw new Error(data.error);
+    }
+    return data;
+}
+
+// Load sessions list (first page)
 async function loadSessions() {
     try {
         showLoading(true);
         
-        const response = await fetch('/api/data-logging/sessions');
-        const data = await response.json();
-        
-        if (data.error) {
-            console.error('Failed to load sessions:', data.error);
-            showError('Failed to load sessions');
-            return;
-        }
-        
+        const data = await fetchSessionsPage(0);
         currentSessions = data.sessions || [];
+        totalSessions = data.total ?? currentSessions.length;
         renderSessions(currentSessions);
         
     } catch (error) {
@@ -186,6 +197,33 @@ async function loadSessions() {
     }
 }
 
+// Append the next page of older sessions
+async function loadMoreSessions() {
+    loadMoreSessionsBtn.disabled = true;
+    try {
+        const data = await fetchSessionsPage(currentSessions.length);
+        const sessions = data.sessions || [];
+        totalSessions = data.total ?? totalSessions;
+        currentSessions = currentSessions.concat(sessions);
+        sessions.forEach(session => {
+            sessionsTableBody.appendChild(createSessionRow(session));
+        });
+        updateSessionPaging();
+        
+    } catch (error) {
+        console.error('Error loading more sessions:', error);
+        showToast('Error loading more sessions', 'error');
+    } finally {
+        loadMoreSessionsBtn.disabled = false;
+    }
+}
+
+// Show how many sessions are listed and whether more can be loaded
+function updateSessionPaging() {
+    sessionsShownSpan.textContent = `Showing ${currentSessions.length} of ${totalSessions} sessions`;
+    loadMoreSessionsBtn.style.display = currentSessions.length < totalSessions ? 'inline-block' : 'none';
+}
+
 // Render sessions in table
 function renderSessions(sessions) {
     if (sessions.length === 0) {
@@ -201,6 +239,8 @@ function renderSessions(sessions) {
         const row = createSessionRow(session);
         sessionsTableBody.appendChild(row);
     });
+    
+    updateSessionPaging();
 }
 
 // Create session table row
@@ -462,7 +502,13 @@ async function saveCurrentMeasurement() {
             body: JSON.stringify({ session_id: sessionId })
         });
         
-        const data = await response.json();
+        let data = await response.json();
+        
+        // Queued saves: wait until the session data is saved
+        if (data.success && data.queued) {
+            const job = await waitForSaveJob(data.job_id);
+            data = { ...data, success: job.state !== 'failed', error: job.error };
+        }
         
         if (data.success) {
             showToast(`Measurement saved as ${data.session_id}`, 'success');
@@ -0,0 +1,20 @@
+/**
+ * Queued session save jobs (see /api/data-logging/jobs)
+ */
+
+// Poll a queued save job until its data is saved (or it failed)
+async function waitForSaveJob(jobId, intervalMs = 200, timeoutMs = 60000) {
+    const deadline = Date.now() + timeoutMs;
+    while (Date.now() < deadline) {
+        const response = await fetch(`/api/data-logging/jobs/${jobId}`);
+        const job = await response.json();
+        if (!response.ok) {
+            return { state: 'failed', error: job.error };
+        }
+        if (['saved', 'done', 'failed'].includes(job.state)) {
+            return job;
+        }
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+    return { state: 'failed', error: 'Timed out waiting for save' };
+}
@@ -0,0 +1,24 @@
+"""
+Synthetic CV curve files shared by the validation_data tests
+"""
+
+import numpy as np
+
+
+def write_cv_csv(path, peak=0.1, points=200, header='voltage,current', preamble=None):
+    """Write a forward/reverse sweep with one anodic and one cathodic peak
+
+    ``preamble`` lines go above the header, e.g. the "FileName: ..." line of
+    PalmSens exports. Returns the (voltages, currents) as read back from the file.
+    """
+    preamble = list(preamble or [])
+    voltage = np.concatenate([np.linspace(-0.4, 0.4, points // 2), np.linspace(0.4, -0.4, points // 2)])
+    current = np.concatenate([np.exp(-((voltage[:points // 2] - peak) / 0.05) ** 2),
+                              -np.exp(-((voltage[points // 2:] - peak + 0.06) / 0.05) ** 2)]) * 1e-5
+    with open(path, 'w') as f:
+        for line in preamble:
+            f.write(line + '\n')
+        f.write(header + '\n')
+        for v, i in zip(voltage, current):
+            f.write(f'{v:.6f},{i:.6e}\n')
+    return np.loadtxt(path, delimiter=',', skiprows=len(preamble) + 1).T
@@ -0,0 +1,95 @@
+"""
+Tests for binary CV stream decoding
+"""
+
+import unittest
+
+import numpy as np
+
+from hardware.binary_stream import (
+    BinaryStreamDecoder, RECORD_SIZE, crc16_ccitt, encode_records
+)
+
+
+def make_records(start, count):
+    seq = np.arange(start, start + count)
+    return encode_records(seq, seq * 10, seq * 0.01, seq * 1e-6, 1)
+
+
+class TestBinaryStreamDecoder(unittest.TestCase):
+
+    def test_crc_reference_value(self):
+        # CRC-16/CCITT-FALSE check value
+        self.assertEqual(crc16_ccitt(b'123456789'), 0x29B1)
+
+    def test_decodes_contiguous_records(self):
+        decoder = BinaryStreamDecoder()
+        records, text = decoder.feed(make_records(0, 50))
+
+        self.assertEqual(len(records), 50)
+        self.assertEqual(text, b'')
+        np.testing.assert_allclose(records['potential'], np.arange(50) * 0.01, rtol=1e-6)
+        self.assertEqual(decoder.frames_lost, 0)
+
+    def test_records_split_across_chunks(self):
+        decoder = BinaryStreamDecoder()
+        data = make_records(0, 3)
+
+        first, _ = decoder.feed(data[:RECORD_SIZE + 7])
+        second, _ = decoder.feed(data[RECORD_SIZE + 7:])
+
+        self.assertEqual(len(first), 1)
+        self.assertEqual(second['seq'].tolist(), [1, 2])
+
+    def test_text_between_records_is_returned(self):
+        decoder = BinaryStreamDecoder()
+        data = make_records(0, 2) + b'CV Operation Finished\r\n' + make_records(2, 1)
+
+        records, text = decoder.feed(data)
+
+        self.assertEqual(records['seq'].tolist(), [0, 1, 2])
+        self.assertEqual(text, b'CV Operation Finished\r\n')
+
+    def test_corrupt_record_is_dropped_and_counted(self):
+        decoder = BinaryStreamDecoder()
+        data = bytearray(make_records(0, 3))
+        data[RECORD_SIZE + 9] ^= 0xFF  # Corrupt the potential of record 1
+
+        records, _ = decoder.feed(bytes(data))
+
+        self.assertEqual(records['seq'].tolist(), [0, 2])
+        self.assertGreaterEqual(decoder.crc_errors, 1)
+        self.assertEqual(decoder.frames_lost, 1)
+
+    def test_corrupt_record_does_not_leak_into_text(self):
+        decoder = BinaryStreamDecoder()
+        data = bytearray(make_records(0, 1))
+        data[9] ^= 0xFF
+
+        records, text = decoder.feed(bytes(data) + b'CV_COMPLETE\n')
+
+        self.assertEqual(len(records), 0)
+        self.assertEqual(text, b'CV_COMPLETE\n')
+        self.assertEqual(decoder.crc_errors, 1)
+
+    def test_resyncs_on_record_after_truncated_one(self):
+        decoder = BinaryStreamDecoder()
+        data = make_records(0, 3)
+        data = data[:RECORD_SIZE + 5] + data[2 * RECORD_SIZE:]  # Record 1 truncated
+
+        records, text = decoder.feed(data)
+
+        self.assertEqual(records['seq'].tolist(), [0, 2])
+        self.assertEqual(text, b'')
+
+    def test_sequence_gap_across_feeds_with_wraparound(self):
+        decoder = BinaryStreamDecoder()
+        decoder.feed(make_records(65534, 2))   # 65534, 65535
+        decoder.feed(make_records(65536 + 3, 1))  # wraps to 3: 0, 1, 2 lost
+
+        self.assertEqual(decoder.frames_lost, 3)
+        self.assertEqual(decoder.frames_received, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+"""
+Tests for SCPI handler background reader and line framing
+"""
+
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from hardware.binary_stream import encode_records
+from hardware.scpi_handler import SCPIHandler
+
+
+class FakeSerial:
+    """Minimal serial port stand-in fed from a list of byte chunks"""
+
+    def __init__(self, chunks=None, replies=None):
+        self.is_open = True
+        self.written = []
+        self._chunks = list(chunks or [])
+        self._replies = dict(replies or {})
+        self._lock = threading.Lock()
+
+    @property
+    def in_waiting(self):
+        with self._lock:
+            return len(self._chunks[0]) if self._chunks else 0
+
+    def read(self, size=1):
+        with self._lock:
+            if self._chunks:
+                return self._chunks.pop(0)
+        time.sleep(0.01)
+        return b''
+
+    def write(self, data):
+        self.written.append(data)
+        reply = self._replies.get(data.decode().strip())
+        if reply:
+            with self._lock:
+                self._chunks.append(reply)
+
+    def feed(self, chunk):
+        with self._lock:
+            self._chunks.append(chunk)
+
+    def close(self):
+        self.is_open = False
+
+
+class TestSCPIReader(unittest.TestCase):
+
+    def _make_handler(self, fake):
+        handler = SCPIHandler(port='TEST')
+        handler.serial = fake
+        handler.is_connected = True
+        handler.start_reader()
+        self.addCleanup(handler.stop_reader)
+        return handler
+
+    def _collect(self, handler, count, timeout=2.0):
+        lines = []
+        deadline = time.time() + timeout
+        while len(lines) < count and time.time() < deadline:
+            lines.extend(handler.read_lines(timeout=0.1))
+        return lines
+
+    def test_lines_split_across_reads_are_reassembled(self):
+        fake = FakeSerial([b'CV, 1, 0.1', b'00, 1e-6\r\nCV, 2, 0.2', b'00, 2e-6\r\n'])
+        handler = self._make_handler(fake)
+
+        lines = self._collect(handler, 2)
+
+        self.assertEqual(lines, ['CV, 1, 0.100, 1e-6', 'CV, 2, 0.200, 2e-6'])
+
+    def test_partial_line_is_held_until_terminated(self):
+        fake = FakeSerial([b'CV, 1, 0.1'])
+        handler = self._make_handler(fake)
+
+        self.assertEqual(handler.read_lines(timeout=0.2), [])
+        fake.feed(b', 1e-6\n')
+        self.assertEqual(self._collect(handler, 1), ['CV, 1, 0.1, 1e-6'])
+
+    def test_query_response_routed_separately_from_data(self):
+        fake = FakeSerial(replies={'*IDN?': b'CV, 1, 0.1, 1e-6\nH743Poten,v1.0\n'})
+        handler = self._make_handler(fake)
+
+        result = handler.send_custom_command('*IDN?')
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['response'], 'H743Poten,v1.0')
+        self.assertEqual(self._collect(handler, 1), ['CV, 1, 0.1, 1e-6'])
+
+    def test_unsolicited_status_lines_go_to_data_channel(self):
+        fake = FakeSerial([b'CV Operation Finished\r\n'])
+        handler = self._make_handler(fake)
+
+        self.assertEqual(self._collect(handler, 1), ['CV Operation Finished'])
+        self.assertTrue(handler.response_queue.empty())
+
+    def test_completion_during_query_goes_to_data_channel(self):
+        fake = FakeSerial(replies={'*IDN?': b'CV Operation Finished\r\nH743Poten,v1.0\r\n'})
+        handler = self._make_handler(fake)
+
+        result = handler.send_custom_command('*IDN?')
+
+        self.assertEqual(result['response'], 'H743Poten,v1.0')
+        self.assertEqual(self._collect(handler, 1), ['CV Operation Finished'])
+
+    def test_error_during_query_reaches_both_channels(self):
+        fake = FakeSerial(replies={'*IDN?': b'**ERROR: -113, "Undefined header"\r\n'})
+        handler = self._make_handler(fake)
+
+        result = handler.send_custom_command('*IDN?')
+
+        self.assertEqual(result['response'], '**ERROR: -113, "Undefined header"')
+        self.assertEqual(self._collect(handler, 1), ['**ERROR: -113, "Undefined header"'])
+
+
+class TestBinaryNegotiation(unittest.TestCase):
+
+    def _make_handler(self, fake):
+        handler = SCPIHandler(port='TEST')
+        handler.serial = fake
+        handler.is_connected = True
+        handler.start_reader()
+        self.addCleanup(handler.stop_reader)
+        return handler
+
+    def test_binary_mode_enabled_when_device_confirms(self):
+        fake = FakeSerial(replies={'POTEn:STReam:FORMat?': b'BIN\r\n'})
+        handler = self._make_handler(fake)
+
+        self.assertTrue(handler.set_stream_format(binary=True))
+        self.assertTrue(handler.binary_mode)
+
+        fake.feed(encode_records(np.arange(4), np.arange(4), [0.1, 0.2, 0.3, 0.4], 1e-6, 1)
+                  + b'CV Operation Finished\r\n')
+        records, lines = [], []
+        deadline = time.time() + 2.0
+        while (len(records) < 4 or not lines) and time.time() < deadline:
+            batch, new_lines = handler.read_stream(timeout=0.1)
+            records.extend(batch['seq'].tolist())
+            lines.extend(new_lines)
+
+        self.assertEqual(records, [0, 1, 2, 3])
+        self.assertEqual(lines, ['CV Operation Finished'])
+
+    def _collect_stream(self, handler, count, timeout=2.0):
+        records, lines = [], []
+        deadline = time.time() + timeout
+        while len(records) < count and time.time() < deadline:
+            batch, new_lines = handler.read_stream(timeout=0.1)
+            records.extend(batch['seq'].tolist())
+            lines.extend(new_lines)
+        return records, lines
+
+    def test_records_sent_before_confirmation_are_decoded(self):
+        # The device starts streaming as soon as it switches, ahead of the query reply
+        records = encode_records(np.arange(4), np.arange(4), [0.1, 0.2, 0.3, 0.4], 1e-6, 1)
+        fake = FakeSerial(replies={'POTEn:STReam:FORMat BINary': records,
+                                   'POTEn:STReam:FORMat?': b'BIN\r\n'})
+        handler = self._make_handler(fake)
+
+        self.assertTrue(handler.set_stream_format(binary=True))
+        self.assertEqual(self._collect_stream(handler, 4), ([0, 1, 2, 3], []))
+        self.assertEqual(handler.get_stream_stats()['crc_errors'], 0)
+
+    def test_records_sent_before_ascii_switch_are_decoded(self):
+        fake = FakeSerial(replies={'POTEn:STReam:FORMat?': b'BIN\r\n'})
+        handler = self._make_handler(fake)
+        self.assertTrue(handler.set_stream_format(binary=True))
+
+        fake._replies = {
+            'POTEn:STReam:FORMat ASCii': encode_records(np.arange(3), np.arange(3), [0.1, 0.2, 0.3], 1e-6, 1),
+            'POTEn:STReam:FORMat?': b'ASC\r\n'
+        }
+        self.assertTrue(handler.set_stream_format(binary=False))
+        self.assertFalse(handler.binary_mode)
+        self.assertEqual(self._collect_stream(handler, 3), ([0, 1, 2], []))
+
+    def test_falls_back_to_ascii_on_error(self):
+        fake = FakeSerial(replies={'POTEn:STReam:FORMat?': b'**ERROR: -113, "Undefined header"\r\n'})
+        handler = self._make_handler(fake)
+
+        self.assertFalse(handler.set_stream_format(binary=True))
+        self.assertFalse(handler.binary_mode)
+
+
+if __name__ == '__main__':
+    unittest.main()
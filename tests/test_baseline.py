@@ -0,0 +1,74 @@
+"""
+Tests for the AsLS / arPLS baseline solver
+"""
+
+import unittest
+
+import numpy as np
+from scipy import sparse
+
+from ai.ml_models.baseline import (
+    BaselineSolver, _difference_penalty, asymmetric_baseline, asymmetric_baselines
+)
+from ai.ml_models.signal_processor import SignalProcessor
+
+
+class TestBaseline(unittest.TestCase):
+
+    def setUp(self):
+        x = np.linspace(0, 1, 2000)
+        self.base = 2 * x ** 2 - x + 0.3
+        self.peaks = np.exp(-((x - 0.4) / 0.02) ** 2) + 0.6 * np.exp(-((x - 0.7) / 0.03) ** 2)
+        self.y = self.base + self.peaks + np.random.default_rng(0).normal(0, 0.01, x.size)
+        self.x = x
+
+    def test_penalty_bands_match_sparse_operator(self):
+        for n in (3, 4, 5, 12):
+            D = sparse.diags([1.0, -2.0, 1.0], [0, 1, 2], shape=(n - 2, n))
+            H = (D.T @ D).toarray()
+            bands = _difference_penalty(n)
+            np.testing.assert_allclose(bands[2], np.diag(H))
+            np.testing.assert_allclose(bands[1, 1:], np.diag(H, 1))
+            np.testing.assert_allclose(bands[0, 2:], np.diag(H, 2))
+
+    def test_recovers_smooth_baseline_under_peaks(self):
+        for variant, lam in (('asls', 1e6), ('arpls', 1e8)):
+            with self.subTest(variant=variant):
+                z = asymmetric_baseline(self.y, lam=lam, variant=variant, p=0.001)
+                self.assertLess(np.abs(z - self.base).max(), 0.1)
+
+    def test_converges_before_iteration_limit(self):
+        solver = BaselineSolver(len(self.y), lam=1e8)
+        solver.fit(self.y)
+        self.assertLess(solver.iterations, solver.max_iter)
+
+    def test_batch_matches_single_curves(self):
+        curves = [self.y, self.y[::-1] * 2.0, self.y[:500]]
+        batch = asymmetric_baselines(curves, lam=1e6)
+        for curve, baseline in zip(curves, batch):
+            np.testing.assert_allclose(baseline, asymmetric_baseline(curve, lam=1e6))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            BaselineSolver(100, variant='poly')
+        with self.assertRaises(ValueError):
+            BaselineSolver(2)
+        with self.assertRaises(ValueError):
+            BaselineSolver(100).fit(np.zeros(50))
+
+    def test_signal_processor_asymmetric_method(self):
+        processor = SignalProcessor()
+        processor.config['baseline_lambda'] = 1e8
+        current = self.y.copy()
+        current[10] = np.nan
+        corrected = processor.correct_baseline(self.x, current, method='asymmetric')
+        self.assertTrue(np.isnan(corrected[10]))
+        valid = np.isfinite(corrected)
+        self.assertLess(np.abs(corrected[valid] - self.peaks[valid]).max(), 0.1)
+
+        batch = processor.correct_baselines([self.y, self.y])
+        self.assertLess(np.abs(batch[1] - self.peaks).max(), 0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
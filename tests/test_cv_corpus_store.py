@@ -0,0 +1,142 @@
+"""
+Tests for the memory-mapped CV corpus store (validation_data/cv_corpus_store.py)
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+from cv_csv_fixtures import write_cv_csv
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'validation_data'))
+
+import cv_data_cache  # noqa: E402
+import peak_detection_framework as framework  # noqa: E402
+from cv_corpus_store import CVCorpusStore, build_corpus_store  # noqa: E402
+
+
+class TestCVCorpusStore(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.base = Path(tmp.name)
+        cache_patch = patch.object(cv_data_cache, '_default_cache',
+                                   cv_data_cache.CVDataCache(self.base / 'cache'))
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+
+        data_dir = self.base / 'data'
+        data_dir.mkdir()
+        # The last name is longer than any fixed-width catalog field would allow
+        names = ['Palmsens_0.5mM_CV_100mVpS_E1_scan_01.csv', 'STM32_1mM_CV_50mVpS_E2_scan_02.csv',
+                 'Palmsens_5mM_CV_20mVpS_E3_scan_03.csv', 'STM32_' + 'x' * 150 + '_scan_04.csv']
+        self.data, self.metadata = {}, []
+        for i, name in enumerate(names):
+            path = data_dir / name
+            # Corpus export layout: file name line, then a unit header
+            self.data[name] = write_cv_csv(path, peak=0.05 * i, points=100 + 20 * i, header='V,uA',
+                                           preamble=[f'FileName: {name}'])
+            self.metadata.append({
+                'file_path': str(path), 'filename': name,
+                'instrument': name.split('_')[0], 'concentration': 0.5 * (i + 1),
+                'scan_rate': 100, 'electrode': i + 1, 'scan_number': i + 1,
+                'condition_key': 'instrument_' * 5 + str(i)
+            })
+
+        self.splits = {'train': [names[2], names[0]], 'validation': [names[3]], 'test': [names[1], names[3]]}
+        splits_dir = self.base / 'splits'
+        (splits_dir / 'loco_splits').mkdir(parents=True)
+        for split, files in self.splits.items():
+            (splits_dir / f'{split}_files.txt').write_text(
+                '\n'.join(str(data_dir / f) for f in files) + '\n')
+        (splits_dir / 'loco_splits' / 'E1_test.txt').write_text(names[0] + '\n')
+        (splits_dir / 'loco_splits' / 'E3_E2_test.txt').write_text(names[2] + '\n' + names[1] + '\n')
+
+        self.store_path = build_corpus_store(self.metadata, splits_dir, self.base / 'corpus')
+        self.store = CVCorpusStore(self.store_path)
+
+    def test_curves_are_memmap_views_at_catalog_offsets(self):
+        offset = 0
+        for i, entry in enumerate(self.store.catalog):
+            self.assertEqual(entry['offset'], offset)
+            voltages, currents = self.store.curve(i)
+            self.assertIsInstance(voltages, np.memmap)
+            self.assertTrue(np.shares_memory(currents, self.store.curves))
+            expected = self.data[str(entry['filename'])]
+            # pandas and loadtxt may round the last digit differently
+            np.testing.assert_allclose(voltages, expected[0], rtol=1e-12)
+            np.testing.assert_allclose(currents, expected[1], rtol=1e-12)
+            offset += entry['length']
+        self.assertEqual(self.store.curves.shape, (2, offset))
+        self.assertEqual(set(self.store.catalog['current_unit']), {'uA'})
+
+    def test_split_indices_resolve_to_listed_files(self):
+        self.assertEqual(self.store.split_names,
+                         ['loco_splits/E1_test', 'loco_splits/E3_E2_test', 'test', 'train', 'validation'])
+        for split, files in self.splits.items():
+            indices = self.store.split_indices(split)
+            self.assertEqual([str(f) for f in self.store.catalog['filename'][indices]], files)
+        loco = self.store.split_indices('loco_splits/E1_test')
+        self.assertEqual(str(self.store.catalog['filename'][loco[0]]), self.splits['train'][1])
+        with self.assertRaises(KeyError):
+            self.store.split_indices('missing')
+
+    def test_long_strings_are_not_truncated(self):
+        long_name = self.splits['validation'][0]
+        index = self.store.index_of(long_name)
+        self.assertIsNotNone(index)
+        self.assertEqual(str(self.store.catalog['filename'][index]), long_name)
+        self.assertEqual(str(self.store.catalog['condition_key'][index]), 'instrument_' * 5 + '3')
+
+    def test_primary_split_block(self):
+        catalog, block = self.store.block('train')
+        self.assertTrue(np.shares_memory(block, self.store.curves))
+        expected = np.concatenate([self.data[f] for f in self.splits['train']], axis=1)
+        np.testing.assert_allclose(block, expected, rtol=1e-12)
+        self.assertEqual([str(f) for f in catalog['filename']], self.splits['train'])
+        with self.assertRaises(ValueError):
+            self.store.block('loco_splits/E3_E2_test')  # Curves from two primary splits
+
+    def test_unknown_file_is_reported(self):
+        self.assertIsNone(self.store.index_of('missing.csv'))
+        record = framework.validate_file('missing.csv', {}, self.store)
+        self.assertFalse(record['success'])
+        self.assertIn('missing.csv is not in the corpus store', record['error'])
+
+    def test_validator_matches_csv_path(self):
+        def results(validator):
+            with patch('builtins.print'):
+                validator.run_validation('test', resume=False)
+            analyzers = validator._analyzers()
+            records = {}
+            for path in self.splits['test']:
+                source = path if validator.corpus is not None else str(self.base / 'data' / path)
+                record = framework.validate_file(source, analyzers, validator.corpus)
+                records[path] = [{k: v for k, v in r.items() if k not in ('processing_time', 'timestamp')}
+                                 for r in record['results']]
+            return records
+
+        with patch('builtins.print'):
+            csv_validator = framework.PeakDetectionValidator(str(self.base))
+            corpus_validator = framework.PeakDetectionValidator(str(self.base),
+                                                                corpus_path=str(self.store_path))
+        self.assertEqual(results(corpus_validator), results(csv_validator))
+
+        with patch('builtins.print'):
+            csv_metrics = csv_validator.run_validation('test')
+            corpus_metrics = corpus_validator.run_validation('test')
+        for method in framework.METHOD_NAMES:
+            self.assertEqual(corpus_metrics[method].total_files, csv_metrics[method].total_files)
+            self.assertEqual(corpus_metrics[method].average_peaks_per_file,
+                             csv_metrics[method].average_peaks_per_file)
+            self.assertEqual(corpus_metrics[method].peak_potential_std,
+                             csv_metrics[method].peak_potential_std)
+
+
+if __name__ == '__main__':
+    unittest.main()
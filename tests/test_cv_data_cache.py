@@ -0,0 +1,178 @@
+"""
+Tests for the binary cache of parsed CV data files (validation_data/cv_data_cache.py)
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+from cv_csv_fixtures import write_cv_csv
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'validation_data'))
+
+import cv_data_cache  # noqa: E402
+from cv_data_cache import CVDataCache, detect_current_unit, get_cache  # noqa: E402
+
+
+class CountingParser:
+    """Parser double that records how often it ran"""
+
+    def __init__(self, error=None, exception=ValueError):
+        self.calls = 0
+        self.error = error
+        self.exception = exception
+
+    def __call__(self, path):
+        self.calls += 1
+        if self.error:
+            raise self.exception(self.error)
+        data = np.loadtxt(path, delimiter=',', skiprows=1)
+        return data[:, 0], data[:, 1], {'rows': len(data)}
+
+
+class TestCVDataCache(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.csv = self.dir / 'cv.csv'
+        write_cv_csv(self.csv, points=50)
+        self.cache = CVDataCache(self.dir / 'cache')
+
+    def test_miss_then_hit_round_trip(self):
+        parser = CountingParser()
+        first = self.cache.get_or_parse(self.csv, parser, loader='test')
+        second = self.cache.get_or_parse(self.csv, parser, loader='test')
+
+        self.assertEqual(parser.calls, 1)
+        self.assertEqual((self.cache.misses, self.cache.hits), (1, 1))
+        np.testing.assert_array_equal(second[0], first[0])
+        np.testing.assert_array_equal(second[1], first[1])
+        self.assertEqual(second[2], {'rows': 50})
+
+    def test_loaders_keep_separate_entries(self):
+        parser = CountingParser()
+        self.cache.get_or_parse(self.csv, parser, loader='a')
+        self.cache.get_or_parse(self.csv, parser, loader='b')
+        self.assertEqual(parser.calls, 2)
+
+    def test_changed_mtime_or_size_invalidates(self):
+        parser = CountingParser()
+        self.cache.get_or_parse(self.csv, parser, loader='test')
+
+        stat = self.csv.stat()
+        os.utime(self.csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.cache.get_or_parse(self.csv, parser, loader='test')
+        self.assertEqual(parser.calls, 2)
+
+        write_cv_csv(self.csv, points=60)
+        os.utime(self.csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        _, _, metadata = self.cache.get_or_parse(self.csv, parser, loader='test')
+        self.assertEqual(parser.calls, 3)
+        self.assertEqual(metadata['rows'], 60)
+
+    def test_parser_version_invalidates(self):
+        parser = CountingParser()
+        self.cache.get_or_parse(self.csv, parser, loader='test', version=1)
+        self.cache.get_or_parse(self.csv, parser, loader='test', version=2)
+        self.cache.get_or_parse(self.csv, parser, loader='test', version=2)
+        self.assertEqual(parser.calls, 2)
+
+    def test_parse_errors_are_cached(self):
+        broken = CountingParser(error='no current column')
+        for _ in range(2):
+            with self.assertRaisesRegex(ValueError, 'no current column'):
+                self.cache.get_or_parse(self.csv, broken, loader='test')
+        self.assertEqual(broken.calls, 1)
+
+        # A fixed parser version is tried again
+        fixed = CountingParser()
+        voltages, _, _ = self.cache.get_or_parse(self.csv, fixed, loader='test', version=2)
+        self.assertEqual(len(voltages), 50)
+
+    def test_io_errors_are_not_cached(self):
+        flaky = CountingParser(error='device busy', exception=OSError)
+        for _ in range(2):
+            with self.assertRaisesRegex(OSError, 'device busy'):
+                self.cache.get_or_parse(self.csv, flaky, loader='test')
+        self.assertEqual(flaky.calls, 2)
+
+        from peak_detection.utils import CVDataLoader
+        with patch('peak_detection.utils.pd.read_csv', side_effect=PermissionError('locked')):
+            with self.assertRaises(PermissionError):
+                self.cache.get_or_parse(self.csv, CVDataLoader._parse_cv_file, loader='peak_detection')
+        voltages, _, _ = self.cache.get_or_parse(self.csv, CVDataLoader._parse_cv_file,
+                                                 loader='peak_detection')
+        self.assertEqual(len(voltages), 50)
+
+    def test_disabled_cache_always_parses(self):
+        cache = CVDataCache(self.dir / 'cache', enabled=False)
+        parser = CountingParser()
+        cache.get_or_parse(self.csv, parser, loader='test')
+        cache.get_or_parse(self.csv, parser, loader='test')
+        self.assertEqual(parser.calls, 2)
+        self.assertFalse((self.dir / 'cache').exists())
+
+    def test_detect_current_unit(self):
+        self.assertEqual(detect_current_unit('uA'), 'uA')
+        self.assertEqual(detect_current_unit('Current (mA)'), 'mA')
+        self.assertEqual(detect_current_unit('WE(1).Current (A)'), 'A')
+        self.assertIsNone(detect_current_unit('current'))
+
+
+class TestWiredLoaders(unittest.TestCase):
+    """Every loader returns the same arrays with and without the cache"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.csv = self.dir / 'cv.csv'
+        write_cv_csv(self.csv, points=50, header='voltage,current (uA)')
+
+    def _load_all(self, load):
+        """(uncached, first cached, second cached) results of ``load``"""
+        with patch.dict(os.environ, {'CV_DATA_CACHE': '0'}), \
+                patch.object(cv_data_cache, '_default_cache', None):
+            self.assertFalse(get_cache().enabled)
+            uncached = load(self.csv)
+
+        cache = CVDataCache(self.dir / 'cache')
+        with patch.object(cv_data_cache, '_default_cache', cache):
+            results = [load(self.csv), load(self.csv)]
+        self.assertEqual((cache.misses, cache.hits), (1, 1))
+        return [uncached] + results
+
+    def _assert_same(self, results):
+        for voltages, currents in results[1:]:
+            np.testing.assert_array_equal(voltages, results[0][0])
+            np.testing.assert_array_equal(currents, results[0][1])
+        self.assertEqual(len(results[0][0]), 50)
+
+    def test_framework_loader(self):
+        from peak_detection_framework import load_cv_data
+        self._assert_same(self._load_all(load_cv_data))
+
+    def test_robust_loader(self):
+        from execute_validation_fixed import load_cv_data_robust
+        with patch('builtins.print'):
+            self._assert_same(self._load_all(load_cv_data_robust))
+
+    def test_peak_detection_loader(self):
+        from peak_detection.utils import CVDataLoader
+
+        def load(path):
+            df = CVDataLoader.load_cv_file(path)
+            return df['V'].to_numpy(), df['I'].to_numpy()
+
+        self._assert_same(self._load_all(load))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+"""
+Tests for the columnar CV data store
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from services.cv_data_store import CVDataStore, SpillingCVDataStore, decode_directions
+from services.data_service import DataService
+
+
+class TestCVDataStore(unittest.TestCase):
+
+    def test_append_grows_capacity_by_doubling(self):
+        store = CVDataStore(initial_capacity=2)
+        for i in range(5):
+            store.append(float(i), i * 0.1, i * 1e-6, 1, 'forward')
+
+        self.assertEqual(len(store), 5)
+        self.assertEqual(store.capacity, 8)
+        np.testing.assert_allclose(store.column('potential'), [0.0, 0.1, 0.2, 0.3, 0.4])
+
+    def test_view_is_zero_copy(self):
+        store = CVDataStore()
+        store.extend([0.0, 1.0, 2.0], [0.1, 0.2, 0.3], [1e-6, 2e-6, 3e-6], 1, 1)
+
+        view = store.view(1)
+
+        self.assertTrue(np.shares_memory(view['potential'], store.column('potential')))
+        np.testing.assert_allclose(view['timestamp'], [1.0, 2.0])
+
+    def test_extend_accepts_direction_strings(self):
+        store = CVDataStore()
+        store.extend([0.0, 1.0], [0.1, 0.0], [0.0, 0.0], [1, 2], ['forward', 'reverse'])
+
+        self.assertEqual(store.column('direction').tolist(), [1, 0])
+        self.assertEqual(store.column('cycle').tolist(), [1, 2])
+
+    def test_to_records_matches_point_dicts(self):
+        store = CVDataStore()
+        store.append(10.0, -0.2, 5e-6, 2, 'reverse')
+
+        self.assertEqual(store.to_records(), [{
+            'timestamp': 10.0,
+            'potential': -0.2,
+            'current': 5e-6,
+            'cycle': 2,
+            'direction': 'reverse'
+        }])
+
+    def test_clear_keeps_previous_views_intact(self):
+        store = CVDataStore(initial_capacity=4)
+        store.append(1.0, 0.5, 1e-6, 1, 'forward')
+        view = store.view()
+
+        store.clear()
+        store.append(2.0, 0.9, 2e-6, 1, 'forward')
+
+        self.assertEqual(len(store), 1)
+        self.assertEqual(view['potential'].tolist(), [0.5])
+
+    def test_bytes_per_point(self):
+        store = CVDataStore(initial_capacity=1000)
+        self.assertLess(store.nbytes / store.capacity, 30)
+
+    def test_decode_directions(self):
+        self.assertEqual(decode_directions(np.array([1, 0, 1], dtype=np.int8)).tolist(),
+                         ['forward', 'reverse', 'forward'])
+
+
+class TestSpillingCVDataStore(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+
+    def _fill(self, store, count, block=7):
+        for start in range(0, count, block):
+            idx = np.arange(start, min(start + block, count))
+            store.extend(idx.astype(float), idx * 1e-3, idx * 1e-9, idx // 100, idx % 2)
+
+    def test_memory_stays_bounded(self):
+        store = SpillingCVDataStore(self.directory, ring_size=50, chunk_size=20)
+        self._fill(store, 1000)
+        nbytes = store.nbytes
+
+        self._fill(store, 1000)
+
+        self.assertEqual(len(store), 2000)
+        self.assertLess(store.memory_count, 70)
+        self.assertEqual(store.nbytes, nbytes)
+
+    def test_range_reads_span_disk_and_memory(self):
+        store = SpillingCVDataStore(self.directory, ring_size=50, chunk_size=20)
+        self._fill(store, 1000)
+
+        self.assertEqual(store.column('timestamp').tolist(), list(np.arange(1000.0)))
+        view = store.view(900, 990)
+        np.testing.assert_array_equal(view['cycle'], np.arange(900, 990) // 100)
+        np.testing.assert_array_equal(view['direction'], np.arange(900, 990) % 2)
+        self.assertEqual(store.to_records(-1)[0]['timestamp'], 999.0)
+        self.assertEqual(store.tail(3)['timestamp'].tolist(), [997.0, 998.0, 999.0])
+
+    def test_clear_removes_spill_files(self):
+        store = SpillingCVDataStore(self.directory, ring_size=10, chunk_size=10)
+        self._fill(store, 100)
+        path = store.spill_path
+        self.assertTrue(os.path.isdir(path))
+
+        store.clear()
+
+        self.assertEqual(len(store), 0)
+        self.assertFalse(os.path.exists(path))
+
+
+class TestDataServiceSpill(unittest.TestCase):
+
+    def test_points_beyond_max_points_are_kept_on_disk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            service = DataService(spill_dir=directory)
+            service.max_points = 10
+            for i in range(5):
+                service.update_measurement_data({'points': [
+                    {'timestamp': float(j), 'voltage': j * 0.1, 'current': 0.0, 'mode': 'CA'}
+                    for j in range(i * 8, i * 8 + 8)
+                ]})
+
+            self.assertEqual(len(service.get_current_data()['points']), 10)
+            self.assertEqual(service.total_points, 40)
+            points = service.get_points()
+            self.assertEqual([p['timestamp'] for p in points], [float(j) for j in range(40)])
+            self.assertEqual(points[0]['mode'], 'CA')
+            service.clear_data()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+Tests for the CV Server-Sent Events stream
+"""
+
+import json
+import time
+import unittest
+from unittest.mock import patch
+
+from services.cv_measurement_service import CVMeasurementService
+from services.cv_event_stream import CVEventBroker, Config, format_sse
+
+
+class DisconnectedHandler:
+    is_connected = False
+
+
+def parse_sse(message):
+    fields = {}
+    for line in message.strip().split('\n'):
+        key, _, value = line.partition(': ')
+        fields[key] = value
+    if 'data' in fields:
+        fields['data'] = json.loads(fields['data'])
+    return fields
+
+
+class TestCVEventStream(unittest.TestCase):
+
+    def setUp(self):
+        self.service = CVMeasurementService(DisconnectedHandler())
+        self.broker = CVEventBroker(self.service, frame_rate=1000)
+
+    def _add_points(self, count):
+        for i in range(count):
+            self.service.data_store.append(float(i), i * 0.01, i * 1e-6, 1, 'forward')
+
+    def test_broker_registers_as_stream_callback(self):
+        self.assertTrue(self.service.streaming_enabled)
+        self.assertEqual(self.service.stream_callback, self.broker.notify)
+
+    def test_stream_sends_backlog_then_status(self):
+        self._add_points(3)
+        events = self.broker.events()
+
+        self.assertEqual(next(events), 'retry: 2000\n\n')
+        data = parse_sse(next(events))
+        status = parse_sse(next(events))
+        events.close()
+
+        self.assertEqual(data['event'], 'data')
+        self.assertEqual(data['id'], '3')
+        self.assertEqual(len(data['data']['data_points']), 3)
+        self.assertTrue(data['data']['reset'])
+        self.assertEqual(status['event'], 'status')
+        self.assertEqual(status['data']['data_points_count'], 3)
+        self.assertEqual(self.broker.client_count, 0)
+
+    def test_resume_from_last_event_id(self):
+        self._add_points(5)
+        events = self.broker.events(last_event_id=3)
+
+        next(events)
+        data = parse_sse(next(events))
+        events.close()
+
+        self.assertEqual(data['data']['first_sequence'], 3)
+        self.assertEqual(len(data['data']['data_points']), 2)
+        self.assertFalse(data['data']['reset'])
+
+    def test_back_to_back_measurements_reset_the_client(self):
+        self._add_points(3)
+        events = self.broker.events()
+        next(events)
+        self.assertEqual(parse_sse(next(events))['id'], '3')
+
+        for _ in range(2):
+            self.service.setup_measurement({'cycles': 1})
+            self.service.set_simulation_mode(True)
+            self.service.start_measurement()
+            self.service.stop_measurement()
+            self._add_points(2)
+
+            message = parse_sse(next(events))
+            while message.get('event') != 'data':
+                message = parse_sse(next(events))
+            self.assertTrue(message['data']['reset'])
+            self.assertEqual(message['data']['first_sequence'],
+                             self.service.get_status()['sequence_start'])
+        events.close()
+
+    def test_live_peaks_follow_status(self):
+        self._add_points(3)
+        events = self.broker.events()
+
+        next(events)
+        next(events)  # data
+        next(events)  # status
+        peaks = parse_sse(next(events))
+        events.close()
+
+        self.assertEqual(peaks['event'], 'peaks')
+        self.assertEqual(peaks['data'], self.service.get_live_peaks())
+
+    def test_idle_stream_sends_status_every_interval(self):
+        events = self.broker.events()
+        next(events)
+        with patch.object(Config, 'CV_EVENT_STATUS_INTERVAL', 0.05), \
+                patch.object(Config, 'CV_EVENT_KEEPALIVE', 15.0):
+            next(events)  # data (reset)
+            self.assertEqual(parse_sse(next(events))['event'], 'status')
+            started = time.time()
+            event = None
+            while event != 'status':
+                event = parse_sse(next(events)).get('event')
+            elapsed = time.time() - started
+        events.close()
+
+        self.assertLess(elapsed, 1.0)
+
+    def test_format_sse(self):
+        self.assertEqual(format_sse({'a': 1}, event='data', event_id=7),
+                         'id: 7\nevent: data\ndata: {"a":1}\n\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
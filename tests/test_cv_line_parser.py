@@ -0,0 +1,95 @@
+"""
+Tests for the vectorized STM32 CV line parser
+"""
+
+import unittest
+
+import numpy as np
+
+from services.cv_line_parser import (
+    FORWARD, REVERSE, INFER, parse_cv_lines, validate_cv_block
+)
+
+
+def desktop_line(time_ms, voltage, current, cycle=1, point_no=0):
+    return f"CV, {time_ms}, {voltage}, {current}, 1.0, {cycle}, 100, 200, {point_no}, 300"
+
+
+class TestParseCVLines(unittest.TestCase):
+
+    def test_desktop_block(self):
+        block = parse_cv_lines([desktop_line(i, 0.1 * i, 1e-6 * i, point_no=i) for i in range(4)])
+
+        self.assertEqual(len(block), 4)
+        np.testing.assert_allclose(block.potential, [0.0, 0.1, 0.2, 0.3])
+        np.testing.assert_allclose(block.current, [0.0, 1e-6, 2e-6, 3e-6])
+        self.assertEqual(block.cycle.tolist(), [1, 1, 1, 1])
+        self.assertTrue((block.direction == INFER).all())
+
+    def test_mixed_formats_keep_arrival_order(self):
+        block = parse_cv_lines([
+            "CV, 0, 0.5, 1e-6, 2, 0",
+            desktop_line(1, 0.1, 2e-6),
+            "**ERROR: -113, Undefined header",
+            "CV, 2, 0.3, 3e-6, 2, 1",
+        ])
+
+        np.testing.assert_allclose(block.potential, [0.5, 0.1, 0.3])
+        self.assertEqual(block.direction.tolist(), [REVERSE, INFER, FORWARD])
+        self.assertEqual(block.errors, ["**ERROR: -113, Undefined header"])
+
+    def test_invalid_lines_are_reported_not_parsed(self):
+        block = parse_cv_lines([desktop_line(0, 0.1, 1e-6), "CV, 1, abc, 1e-6, 1, 1", "CV, 2"])
+
+        self.assertEqual(len(block), 1)
+        self.assertEqual(sorted(block.invalid), ["CV, 1, abc, 1e-6, 1, 1", "CV, 2"])
+
+    def test_parsing_stops_at_completion_signal(self):
+        block = parse_cv_lines([desktop_line(0, 0.1, 1e-6), "CV Operation Finished",
+                                desktop_line(1, 0.2, 1e-6)])
+
+        self.assertEqual(len(block), 1)
+        self.assertEqual(block.completion, "CV Operation Finished")
+
+
+class TestValidateCVBlock(unittest.TestCase):
+
+    def test_direction_inferred_from_potential(self):
+        block = parse_cv_lines([desktop_line(i, v, 1e-6) for i, v in
+                                enumerate([0.0, 0.1, 0.2, 0.2005, 0.1, 0.0])])
+
+        result = validate_cv_block(block, None, None, None, FORWARD)
+
+        self.assertTrue(result.accepted.all())
+        self.assertEqual(result.direction.tolist(),
+                         [FORWARD, FORWARD, FORWARD, FORWARD, REVERSE, REVERSE])
+        self.assertEqual(result.last_potential, 0.0)
+
+    def test_small_change_keeps_previous_block_direction(self):
+        block = parse_cv_lines([desktop_line(0, 0.1, 1e-6)])
+
+        result = validate_cv_block(block, 0.1002, 0.1002, 1e-6, REVERSE)
+
+        self.assertEqual(result.direction.tolist(), [REVERSE])
+
+    def test_jumps_filtered_against_last_accepted_point(self):
+        block = parse_cv_lines([desktop_line(i, v, c) for i, (v, c) in enumerate([
+            (0.1, 1e-6), (0.9, 1e-6), (0.2, 1e-6), (0.3, 5e-3), (0.4, 2e-6)])])
+
+        result = validate_cv_block(block, None, None, None, FORWARD)
+
+        self.assertEqual(result.accepted.tolist(), [True, False, True, False, True])
+
+    def test_large_block_fast_path(self):
+        voltages = np.concatenate([np.linspace(-0.5, 0.5, 500), np.linspace(0.5, -0.5, 500)])
+        block = parse_cv_lines([desktop_line(i, f"{v:.6f}", 1e-6) for i, v in enumerate(voltages)])
+
+        result = validate_cv_block(block, None, None, None, FORWARD)
+
+        self.assertTrue(result.accepted.all())
+        # The repeated 0.5 V turning point keeps the forward direction
+        self.assertEqual(int((result.direction == FORWARD).sum()), 501)
+
+
+if __name__ == '__main__':
+    unittest.main()
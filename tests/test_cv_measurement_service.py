@@ -0,0 +1,81 @@
+"""
+Tests for CV measurement service data access
+"""
+
+import unittest
+
+from services.cv_measurement_service import CVMeasurementService
+
+
+class DisconnectedHandler:
+    is_connected = False
+
+
+class TestCVDataCursor(unittest.TestCase):
+
+    def setUp(self):
+        self.service = CVMeasurementService(DisconnectedHandler())
+
+    def _add_points(self, count):
+        for i in range(count):
+            self.service.data_store.append(float(i), i * 0.01, i * 1e-6, 1, 'forward')
+
+    def test_since_returns_only_new_points(self):
+        self._add_points(5)
+        points, first, next_since = self.service.get_data_since(None)
+        self.assertEqual((len(points), first, next_since), (5, 0, 5))
+
+        self._add_points(2)
+        points, first, next_since = self.service.get_data_since(next_since)
+        self.assertEqual((len(points), first, next_since), (2, 5, 7))
+
+        points, first, next_since = self.service.get_data_since(next_since)
+        self.assertEqual((points, first, next_since), ([], 7, 7))
+
+    def test_limit_pages_through_points(self):
+        self._add_points(5)
+        points, first, next_since = self.service.get_data_since(0, limit=3)
+        self.assertEqual((len(points), first, next_since), (3, 0, 3))
+
+    def test_max_points_downsamples_but_advances_cursor(self):
+        self._add_points(1000)
+        points, first, next_since = self.service.get_data_since(0, max_points=100)
+        self.assertEqual(len(points), 100)
+        self.assertEqual((first, next_since), (0, 1000))
+        self.assertEqual(points[-1]['timestamp'], 999.0)
+
+    def _run_measurement(self):
+        self.service.setup_measurement({'cycles': 1})
+        self.service.set_simulation_mode(True)
+        self.service.start_measurement()
+        self.service.stop_measurement()
+
+    def test_sequence_continues_across_measurements(self):
+        self._add_points(4)
+        self._run_measurement()
+
+        status = self.service.get_status()
+        self.assertEqual(status['sequence_start'], 5)
+
+        # A stale cursor from the previous run restarts at the new run's first point
+        points, first, next_since = self.service.get_data_since(2)
+        self.assertEqual(first, 5)
+        self.assertEqual(next_since, 5 + len(points))
+
+    def test_caught_up_cursor_sees_back_to_back_measurements(self):
+        self._add_points(4)
+        _, _, cursor = self.service.get_data_since(None)
+
+        for _ in range(2):
+            self._run_measurement()
+            self._add_points(3)
+            # The cursor ends the previous run exactly; the new run must still reset
+            points, first, next_since = self.service.get_data_since(cursor)
+            self.assertNotEqual(first, cursor)
+            self.assertEqual(first, self.service.get_status()['sequence_start'])
+            self.assertEqual(next_since - first, len(points))
+            self.assertEqual(points[0], self.service.get_data_points()[0])
+            cursor = next_since
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,239 @@
+"""
+Tests for the asynchronous save pipeline of DataLoggingService
+"""
+
+import json
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import Future
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from flask import Flask
+
+from routes.data_logging_routes import data_logging_bp
+from services.data_logging_service import DataLoggingService
+from services.plot_renderer import PlotRenderer
+from services.session_index import SessionIndex
+
+
+def _columns(count=50):
+    return {
+        'timestamp': [i * 0.1 for i in range(count)],
+        'potential': [-0.5 + i * 0.02 for i in range(count)],
+        'current': [i * 1e-6 for i in range(count)],
+        'cycle': [1] * count,
+        'direction': ['forward'] * count,
+    }
+
+
+class DelayedRenderer:
+    """Renderer double that finishes each render shortly after submission"""
+
+    processes = 1
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def submit(self, *args, **kwargs):
+        future = Future()
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        def finish():
+            with self.lock:
+                self.in_flight -= 1
+            future.set_result(True)
+
+        threading.Timer(0.01, finish).start()
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class TestAsyncSave(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.service = DataLoggingService(tmp.name, plot_renderer=PlotRenderer(processes=0))
+        self.addCleanup(self.service.shutdown)
+
+    def _wait_for(self, job_id, states, timeout=30.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = self.service.get_save_job(job_id)
+            if job['state'] in states:
+                return job
+            time.sleep(0.02)
+        self.fail(f"Job {job_id} did not reach {states}")
+
+    def test_submit_returns_before_files_are_written(self):
+        job = self.service.submit_save(_columns(), {'rate': 0.1}, session_id='CV_test')
+
+        self.assertEqual(job['session_id'], 'CV_test')
+        self.assertIn(job['state'], ('queued', 'writing'))
+
+        done = self._wait_for(job['job_id'], ('done', 'failed'))
+        self.assertEqual(done['state'], 'done')
+        self.assertTrue(done['csv_saved'])
+        self.assertTrue(done['png_saved'])
+        self.assertTrue(Path(done['result']['data_file']).exists())
+        self.assertTrue(Path(done['result']['png_file']).exists())
+        self.assertEqual(self.service.list_sessions()[0]['data_points_count'], 50)
+
+    def test_empty_data_fails_job(self):
+        job = self.service.submit_save([], {})
+
+        failed = self._wait_for(job['job_id'], ('done', 'failed'))
+        self.assertEqual(failed['state'], 'failed')
+        self.assertIn('No data points', failed['error'])
+
+    def test_metadata_write_failure_fails_job(self):
+        with mock.patch.object(self.service, '_save_metadata', return_value=False):
+            job = self.service.submit_save(_columns(), {'rate': 0.1}, session_id='CV_nometa')
+            failed = self._wait_for(job['job_id'], ('done', 'failed'))
+
+        self.assertEqual(failed['state'], 'failed')
+        self.assertIn('CV_nometa_metadata.json', failed['error'])
+        self.assertIsNone(self.service.index.get('CV_nometa'))
+
+    def test_rerender_sessions(self):
+        self.service.save_cv_measurement(_columns(), {'rate': 0.1}, session_id='CV_a')
+        self.service.save_cv_measurement(_columns(), {'rate': 0.1}, session_id='CV_b')
+
+        results = self.service.rerender_sessions('thumbnail')
+
+        self.assertEqual(results, {'CV_a': True, 'CV_b': True})
+
+    def test_rerender_bounds_renders_in_flight(self):
+        session_ids = [f'CV_{i}' for i in range(6)]
+        for session_id in session_ids:
+            self.service.save_cv_measurement(_columns(), {'rate': 0.1}, session_id=session_id)
+        renderer = DelayedRenderer()
+        self.service.plot_renderer = renderer
+
+        results = self.service.rerender_sessions('thumbnail')
+
+        self.assertEqual(results, dict.fromkeys(session_ids, True))
+        self.assertEqual(renderer.max_in_flight, 2)
+
+    def test_binary_session_load_and_csv_export(self):
+        self.service.save_cv_measurement(_columns(), {'rate': 0.1}, session_id='CV_bin')
+
+        columns, metadata = self.service.load_session_columns('CV_bin', ['potential', 'current'])
+        self.assertEqual(sorted(columns), ['current', 'potential'])
+        self.assertEqual(len(columns['potential']), 50)
+        self.assertEqual(metadata['parameters'], {'rate': 0.1})
+
+        session = self.service.get_session_data('CV_bin')
+        self.assertEqual(session['csv_data'][0]['direction'], 'forward')
+        self.assertTrue(self.service.list_sessions()[0]['files_exist']['csv'])
+
+        csv_path = self.service.export_session_csv('CV_bin')
+        self.assertTrue(csv_path.exists())
+        self.assertEqual(len(self.service.load_session_columns('CV_bin')[0]['timestamp']), 50)
+
+    def test_shutdown_waits_for_startup_reconcile(self):
+        self.service.save_cv_measurement(_columns(), {'rate': 0.1}, session_id='CV_a')
+        finished = threading.Event()
+        original = SessionIndex.reconcile
+
+        def slow_reconcile(index, *args, **kwargs):
+            time.sleep(0.2)
+            result = original(index, *args, **kwargs)
+            finished.set()
+            return result
+
+        with mock.patch.object(SessionIndex, 'reconcile', slow_reconcile):
+            service = DataLoggingService(str(self.service.base_data_dir),
+                                         plot_renderer=PlotRenderer(processes=0))
+            service.shutdown()
+
+        self.assertTrue(finished.is_set())
+
+    def test_unknown_job(self):
+        self.assertIsNone(self.service.get_save_job('save_missing'))
+
+
+class TestSessionStreaming(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.service = DataLoggingService(tmp.name, plot_renderer=PlotRenderer(processes=0))
+        self.addCleanup(self.service.shutdown)
+        count = 10000
+        self.columns = {
+            'timestamp': np.arange(count) * 0.01,
+            'potential': np.sin(np.arange(count) / 500.0),
+            'current': np.cos(np.arange(count) / 50.0) * 1e-6,
+            'cycle': np.repeat([1, 2], count // 2),
+            'direction': ['forward'] * count,
+        }
+        self.service.save_cv_measurement(self.columns, {}, session_id='CV_big')
+
+    def _collect(self, **kwargs):
+        chunks = list(self.service.iter_session_data('CV_big', chunk_size=777, **kwargs))
+        return {name: np.concatenate([c[name] for c in chunks]) for name in chunks[0]}
+
+    def test_offset_limit_across_chunks(self):
+        data = self._collect(columns=['timestamp'], offset=700, limit=1000)
+        np.testing.assert_allclose(data['timestamp'], self.columns['timestamp'][700:1700])
+
+    def test_time_range_and_cycle_filter(self):
+        data = self._collect(t_start=45.0, t_end=55.0, cycle=2)
+        self.assertEqual(data['timestamp'][0], 50.0)
+        self.assertAlmostEqual(data['timestamp'][-1], 55.0)
+        self.assertTrue(np.all(data['cycle'] == 2))
+        self.assertEqual(data['direction'][0], 'forward')
+
+    def test_decimation_keeps_extremes(self):
+        data = self._collect(columns=['timestamp', 'current'], max_points=200)
+        self.assertLessEqual(len(data['current']), 200)
+        self.assertAlmostEqual(data['current'].max(), self.columns['current'].max())
+        self.assertAlmostEqual(data['current'].min(), self.columns['current'].min())
+        self.assertTrue(np.all(np.diff(data['timestamp']) > 0))
+
+    def test_decimation_to_fewer_points_than_a_chunk_bucket(self):
+        for method in ('minmax', 'lttb'):
+            data = self._collect(columns=['timestamp', 'current'], max_points=2, method=method)
+            self.assertLessEqual(len(data['current']), 4)
+            self.assertTrue(np.all(np.diff(data['timestamp']) > 0))
+        data = self._collect(columns=['current'], max_points=2)
+        self.assertAlmostEqual(data['current'].max(), self.columns['current'].max())
+        self.assertAlmostEqual(data['current'].min(), self.columns['current'].min())
+
+        with self.assertRaises(ValueError):
+            self._collect(max_points=1)
+
+    def test_route_streams_json_and_csv(self):
+        app = Flask(__name__)
+        app.config['data_logging_service'] = self.service
+        app.register_blueprint(data_logging_bp)
+        client = app.test_client()
+
+        response = client.get('/api/data-logging/sessions/CV_big/data'
+                              '?columns=potential,current&offset=10&limit=5')
+        body = json.loads(response.get_data(as_text=True))
+        self.assertEqual(body['fields'], ['potential', 'current'])
+        self.assertEqual(body['count'], 5)
+        self.assertAlmostEqual(body['rows'][0][0], self.columns['potential'][10])
+
+        response = client.get('/api/data-logging/sessions/CV_big/data?format=csv&limit=3')
+        self.assertEqual(len(response.get_data(as_text=True).strip().splitlines()), 4)
+
+        self.assertEqual(client.get('/api/data-logging/sessions/CV_none/data').status_code, 404)
+        self.assertEqual(client.get('/api/data-logging/sessions/CV_big/data?columns=bogus').status_code, 400)
+        self.assertEqual(client.get('/api/data-logging/sessions/CV_big/data?max_points=1').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Tests for shape-preserving downsampling
+"""
+
+import unittest
+
+import numpy as np
+from flask import Flask
+
+from services.downsampling import downsample, downsample_indices, lttb_indices, minmax_indices
+from routes.workflow_routes import workflow_bp
+
+
+class TestLTTB(unittest.TestCase):
+
+    def test_keeps_endpoints_and_count(self):
+        x = np.linspace(0, 1, 10000)
+        y = np.sin(x * 40)
+        index = lttb_indices(x, y, 500)
+
+        self.assertEqual(len(index), 500)
+        self.assertEqual((index[0], index[-1]), (0, 9999))
+        self.assertTrue(np.all(np.diff(index) > 0))
+
+    def test_spike_survives(self):
+        y = np.zeros(50000)
+        y[31415] = 1.0
+        _, dy = downsample(np.arange(50000.0), y, 200)
+
+        self.assertEqual(len(dy), 200)
+        self.assertIn(1.0, dy)
+
+    def test_short_traces_are_unchanged(self):
+        index = downsample_indices(None, np.arange(10.0), 100)
+        np.testing.assert_array_equal(index, np.arange(10))
+
+
+class TestMinMax(unittest.TestCase):
+
+    def test_extremes_are_kept(self):
+        y = np.sin(np.arange(100000) / 3000.0)
+        y[777], y[88888] = 5.0, -5.0
+        index = minmax_indices(y, 1000)
+
+        self.assertLessEqual(len(index), 1000)
+        self.assertIn(777, index)
+        self.assertIn(88888, index)
+
+    def test_unknown_method_raises(self):
+        with self.assertRaises(ValueError):
+            downsample_indices(None, np.arange(1000.0), 10, method='nearest')
+
+
+class TestPreviewRoute(unittest.TestCase):
+
+    def test_unknown_method_is_rejected(self):
+        app = Flask(__name__)
+        app.secret_key = 'test'
+        app.register_blueprint(workflow_bp)
+        client = app.test_client()
+
+        response = client.get('/api/workflow/get-preview-data?method=nearest')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('nearest', response.get_json()['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
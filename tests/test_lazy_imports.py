@@ -0,0 +1,80 @@
+"""
+Tests for deferred imports and the startup import report
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from services import lazy_imports
+from services.lazy_imports import (
+    LazyObject, StartupImportTimer, import_report, lazy_import, lazy_object, resolve, warm_up
+)
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        sys.path.insert(0, self.tmp.name)
+        self.addCleanup(sys.path.remove, self.tmp.name)
+
+    def _module(self, name, source='VALUE = 42\n'):
+        Path(self.tmp.name, f'{name}.py').write_text(source)
+        self.addCleanup(sys.modules.pop, name, None)
+        self.addCleanup(lazy_imports._registry.pop, name, None)
+        self.addCleanup(lazy_imports._timings.pop, name, None)
+        return name
+
+    def test_imports_on_first_attribute_access(self):
+        name = self._module('lazy_probe_first_use')
+        module = lazy_import(name)
+        self.assertIs(lazy_import(name), module)
+        self.assertNotIn(name, sys.modules)
+        self.assertFalse(import_report()['lazy'][name])
+
+        self.assertEqual(module.VALUE, 42)
+        self.assertIn(name, sys.modules)
+        timing = next(entry for entry in import_report()['imports'] if entry['module'] == name)
+        self.assertEqual(timing['phase'], 'first_use')
+
+    def test_warm_up_loads_registered_modules(self):
+        name = self._module('lazy_probe_warmup')
+        module = lazy_import(name)
+        warm_up([name])
+        self.assertIs(resolve(module), sys.modules[name])
+        self.assertEqual(import_report()['lazy'][name], True)
+        timing = next(entry for entry in import_report()['imports'] if entry['module'] == name)
+        self.assertEqual(timing['phase'], 'warmup')
+
+    def test_warm_up_survives_failing_import(self):
+        name = self._module('lazy_probe_broken', 'raise ImportError("missing dependency")\n')
+        lazy_import(name)
+        warm_up([name])
+        self.assertFalse(import_report()['lazy'][name])
+
+    def test_lazy_object_builds_once(self):
+        calls = []
+        self.addCleanup(lazy_imports._registry.pop, 'probe object', None)
+        self.addCleanup(lazy_imports._timings.pop, 'probe object', None)
+        target = lazy_object('probe object', lambda: calls.append(1) or {'x': 1})
+        view = LazyObject(lambda: resolve(target))
+        self.assertEqual(calls, [])
+        self.assertEqual(view.get('x'), 1)
+        self.assertEqual(target.keys(), {'x': 1}.keys())
+        self.assertEqual(calls, [1])
+
+    def test_startup_timer_records_top_level_imports(self):
+        name = self._module('lazy_probe_startup', 'import json\n')
+        with StartupImportTimer():
+            __import__(name)
+        report = import_report()
+        modules = {entry['module']: entry['phase'] for entry in report['imports']}
+        self.assertEqual(modules[name], 'startup')
+        self.assertIn('module_imports', report['startup'])
+
+
+if __name__ == '__main__':
+    unittest.main()
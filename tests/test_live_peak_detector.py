@@ -0,0 +1,94 @@
+"""
+Tests for the online CV peak detector
+"""
+
+import unittest
+
+import numpy as np
+
+from services.cv_measurement_service import CVMeasurementService
+from services.live_peak_detector import LivePeakDetector
+
+
+def synthetic_cv(cycles=2, points=1000, noise=1e-7):
+    """Forward sweep with an anodic peak at 0.25 V, reverse with a cathodic peak at 0.15 V"""
+    forward = np.linspace(-0.4, 0.6, points)
+    reverse = forward[::-1]
+    anodic = 1e-5 * np.exp(-((forward - 0.25) / 0.05) ** 2) + 2e-6 * forward
+    cathodic = -0.8e-5 * np.exp(-((reverse - 0.15) / 0.05) ** 2) + 2e-6 * reverse
+    potential = np.tile(np.concatenate([forward, reverse]), cycles)
+    current = np.tile(np.concatenate([anodic, cathodic]), cycles)
+    current = current + np.random.default_rng(0).normal(0, noise, current.size)
+    cycle = np.repeat(np.arange(1, cycles + 1), 2 * points)
+    direction = np.tile(np.r_[np.ones(points), np.zeros(points)], cycles).astype(np.int8)
+    return potential, current, cycle, direction
+
+
+class TestLivePeakDetector(unittest.TestCase):
+
+    def test_epa_epc_and_delta_ep(self):
+        detector = LivePeakDetector()
+        detector.update(*synthetic_cv())
+        cycles = detector.summary()['cycles']
+
+        self.assertEqual([c['cycle'] for c in cycles], [1, 2])
+        for entry in cycles:
+            self.assertAlmostEqual(entry['epa'], 0.25, delta=0.01)
+            self.assertAlmostEqual(entry['epc'], 0.15, delta=0.01)
+            self.assertAlmostEqual(entry['delta_ep'], 0.1, delta=0.02)
+            self.assertGreater(entry['ipa'], 0)
+            self.assertLess(entry['ipc'], 0)
+
+    def test_block_feeding_matches_single_pass(self):
+        potential, current, cycle, direction = synthetic_cv()
+        whole = LivePeakDetector()
+        whole.update(potential, current, cycle, direction)
+
+        incremental = LivePeakDetector()
+        for start in range(0, len(potential), 7):
+            block = slice(start, start + 7)
+            incremental.update(potential[block], current[block], cycle[block], direction[block])
+
+        self.assertEqual(incremental.summary()['cycles'], whole.summary()['cycles'])
+
+    def test_candidate_before_confirmation(self):
+        potential, current, cycle, direction = synthetic_cv(cycles=1)
+        detector = LivePeakDetector()
+        # Stop just past the anodic peak, before the current has fallen back
+        stop = int(np.searchsorted(potential[:1000], 0.26))
+        detector.update(potential[:stop], current[:stop], cycle[:stop], direction[:stop])
+        summary = detector.summary()
+
+        self.assertEqual(summary['cycles'], [])
+        self.assertEqual(summary['candidate']['type'], 'anodic')
+        self.assertAlmostEqual(summary['candidate']['potential'], 0.25, delta=0.01)
+
+        detector.update(potential[stop:1100], current[stop:1100], cycle[stop:1100], direction[stop:1100])
+        self.assertAlmostEqual(detector.summary()['cycles'][0]['epa'], 0.25, delta=0.01)
+
+    def test_reset_clears_peaks_and_bumps_version(self):
+        detector = LivePeakDetector()
+        detector.update(*synthetic_cv(cycles=1))
+        version = detector.version
+        detector.reset()
+
+        self.assertEqual(detector.summary()['cycles'], [])
+        self.assertGreater(detector.version, version)
+
+
+class DisconnectedHandler:
+    is_connected = False
+
+
+class TestServiceIntegration(unittest.TestCase):
+
+    def test_service_publishes_live_peaks(self):
+        service = CVMeasurementService(DisconnectedHandler())
+        service.peak_detector.update(*synthetic_cv(cycles=1))
+
+        peaks = service.get_live_peaks()
+        self.assertAlmostEqual(peaks['cycles'][0]['epa'], 0.25, delta=0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+"""
+Tests for batch peak detection
+"""
+
+import json
+import os
+import signal
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+from flask import Flask
+
+from services.peak_batch import PeakBatchRunner, load_cv_file, resolve_data_file
+from services.result_cache import ResultCache
+from routes.peak_detection import peak_detection_bp
+
+
+def make_curve(center):
+    voltage = np.linspace(-0.5, 0.5, 500)
+    current = np.exp(-((voltage - center) / 0.04) ** 2) - np.exp(-((voltage + center) / 0.04) ** 2)
+    return voltage, current
+
+
+class TestFileLoading(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+
+    def _write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_instrument_export_with_filename_line(self):
+        path = self._write('scan_01.csv', 'FileName: scan_01.csv\nV,uA\n-0.4,-41.6\n-0.39,-40.1\n')
+        voltage, current = load_cv_file(path)
+        np.testing.assert_allclose(voltage, [-0.4, -0.39])
+        np.testing.assert_allclose(current, [-41.6, -40.1])
+
+    def test_named_columns(self):
+        path = self._write('cv.csv', 'time,voltage,current\n0,0.1,1e-6\n1,0.2,2e-6\n')
+        voltage, current = load_cv_file(path)
+        np.testing.assert_allclose(voltage, [0.1, 0.2])
+        np.testing.assert_allclose(current, [1e-6, 2e-6])
+
+    def test_missing_columns_error_does_not_echo_the_header(self):
+        path = self._write('other.csv', 'secret_a,secret_b\n1,2\n')
+        with self.assertRaises(ValueError) as context:
+            load_cv_file(path)
+        self.assertNotIn('secret', str(context.exception))
+
+    def test_reference_outside_roots_is_rejected(self):
+        uploads = os.path.join(self.directory, 'uploads')
+        logs = os.path.join(self.directory, 'logs')
+        os.makedirs(uploads)
+        os.makedirs(os.path.join(logs, 'sessions'))
+        self._write('uploads/ok.csv', 'V,A\n0,0\n')
+        self._write('logs/sessions/log.csv', 'V,A\n0,0\n')
+        self._write('private.csv', 'V,A\n0,0\n')
+        roots = [uploads, logs]
+
+        self.assertEqual(resolve_data_file('ok.csv', roots).name, 'ok.csv')
+        self.assertEqual(resolve_data_file('sessions/log.csv', roots).name, 'log.csv')
+        with self.assertRaises(ValueError):
+            resolve_data_file('../private.csv', roots)
+        with self.assertRaises(ValueError):
+            resolve_data_file('../../etc/passwd', roots)
+        with self.assertRaises(ValueError):
+            resolve_data_file('sessions.db', [logs])
+        with self.assertRaises(FileNotFoundError):
+            resolve_data_file('missing.csv', roots)
+
+
+class TestPeakBatchRunner(unittest.TestCase):
+
+    def _jobs(self, count):
+        jobs = []
+        for index in range(count):
+            voltage, current = make_curve(0.1 + 0.02 * index)
+            jobs.append({'index': index, 'curve_id': f'scan_{index:02d}', 'method': 'prominence',
+                         'prominence': 0.1, 'width': 5, 'voltage': voltage, 'current': current})
+        return jobs
+
+    def test_in_process(self):
+        results = list(PeakBatchRunner(processes=0).run(self._jobs(3)))
+        self.assertEqual([r['index'] for r in results], [0, 1, 2])
+        self.assertTrue(all(r['success'] and len(r['peaks']) == 2 for r in results))
+
+    def test_process_pool(self):
+        runner = PeakBatchRunner(processes=2)
+        self.addCleanup(runner.shutdown)
+        results = sorted(runner.run(self._jobs(4)), key=lambda r: r['index'])
+        self.assertEqual([r['id'] for r in results], ['scan_00', 'scan_01', 'scan_02', 'scan_03'])
+        self.assertTrue(all(r['success'] for r in results))
+        self.assertTrue(all(r['elapsed_ms'] >= 0 for r in results))
+
+    def test_pool_restarts_after_worker_dies(self):
+        runner = PeakBatchRunner(processes=1)
+        self.addCleanup(runner.shutdown)
+        list(runner.run(self._jobs(1)))
+        pool = runner._pool
+        for process in list(pool._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+            process.join()
+
+        # Jobs caught by the broken pool fail or are resubmitted to a new one...
+        results = list(runner.run(self._jobs(2)))
+        self.assertEqual(len(results), 2)
+        self.assertIsNot(runner._pool, pool)
+
+        # ...and later batches run normally again
+        results = list(runner.run(self._jobs(3)))
+        self.assertTrue(all(r['success'] for r in results))
+
+    def test_concurrent_first_use_creates_one_pool(self):
+        created = []
+
+        class SlowPool:
+            def __init__(self, **kwargs):
+                time.sleep(0.05)  # Let the other threads reach _get_pool meanwhile
+                created.append(self)
+
+            def shutdown(self, wait=True):
+                pass
+
+        runner = PeakBatchRunner(processes=2)
+        with mock.patch('services.peak_batch.ProcessPoolExecutor', SlowPool):
+            pools = []
+            threads = [threading.Thread(target=lambda: pools.append(runner._get_pool()))
+                       for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(created), 1)
+        self.assertTrue(all(pool is created[0] for pool in pools))
+
+    def test_errors_are_reported_per_curve(self):
+        job = self._jobs(1)[0]
+        job['current'] = job['current'][:10]
+        result, = PeakBatchRunner(processes=0).run([job])
+        self.assertFalse(result['success'])
+        self.assertIn('equal length', result['error'])
+
+
+class TestBatchRoute(unittest.TestCase):
+
+    def setUp(self):
+        app = Flask(__name__)
+        app.config['peak_cache'] = ResultCache(1024 * 1024)
+        app.config['peak_batch_runner'] = PeakBatchRunner(processes=0)
+        app.register_blueprint(peak_detection_bp, url_prefix='/api/peak-detection')
+        self.client = app.test_client()
+        self.curves = []
+        for index in range(3):
+            voltage, current = make_curve(0.1 + 0.05 * index)
+            self.curves.append({'id': index, 'voltage': voltage.tolist(), 'current': current.tolist()})
+
+    def test_results_in_request_order_with_errors(self):
+        curves = self.curves + [{'id': 'bad'}]
+        body = self.client.post('/api/peak-detection/batch', json={'curves': curves}).get_json()
+
+        self.assertEqual(body['count'], 4)
+        self.assertEqual(body['failed'], 1)
+        self.assertEqual([r['id'] for r in body['results']], [0, 1, 2, 'bad'])
+        self.assertFalse(body['results'][3]['success'])
+
+    def test_stream_and_cache(self):
+        self.client.post('/api/peak-detection/batch', json={'curves': self.curves})
+        response = self.client.post('/api/peak-detection/batch',
+                                    json={'curves': self.curves, 'stream': True})
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(all(line.get('cached') for line in lines[:3]))
+        self.assertEqual(lines[-1]['done'], True)
+
+    def test_unknown_method(self):
+        response = self.client.post('/api/peak-detection/batch',
+                                    json={'method': 'magic', 'curves': self.curves})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
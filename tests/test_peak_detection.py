@@ -0,0 +1,63 @@
+"""
+Tests for CV peak detection feature extraction
+"""
+
+import unittest
+
+import numpy as np
+
+from services.peak_detection import detect_peaks_ml, detect_peaks_prominence, find_cv_peaks
+
+
+def walk_features(voltage, current):
+    """Per-peak half-height walk, as the ML method originally computed it"""
+    features = []
+    for index in find_cv_peaks(current)[0]:
+        half_height = abs(current[index] / 2)
+        left = right = index
+        while left > 0 and abs(current[left]) > half_height:
+            left -= 1
+        while right < len(current) - 1 and abs(current[right]) > half_height:
+            right += 1
+        segment = slice(left, right)
+        area = np.sum(np.diff(voltage[segment]) * (current[segment][1:] + current[segment][:-1]) / 2)
+        features.append((voltage[right] - voltage[left], area))
+    return features
+
+
+class TestMLFeatures(unittest.TestCase):
+
+    def test_matches_half_height_walk(self):
+        rng = np.random.default_rng(0)
+        for _ in range(5):
+            voltage = np.concatenate([np.linspace(-0.5, 0.5, 1500), np.linspace(0.5, -0.5, 1500)])
+            current = np.sin(voltage * rng.uniform(10, 60)) + rng.normal(0, 0.05, voltage.size)
+
+            peaks = detect_peaks_ml(voltage, current)['peaks']
+            expected = walk_features(voltage, current)
+
+            self.assertEqual(len(peaks), len(expected))
+            for peak, (width, area) in zip(peaks, expected):
+                self.assertEqual(peak['width'], width)
+                self.assertAlmostEqual(peak['area'], area, places=10)
+
+    def test_fields_match_prominence_method(self):
+        voltage = np.linspace(-0.5, 0.5, 2000)
+        current = np.exp(-((voltage - 0.2) / 0.03) ** 2) - np.exp(-((voltage + 0.1) / 0.03) ** 2)
+
+        base = detect_peaks_prominence(voltage, current)['peaks']
+        peaks = detect_peaks_ml(voltage, current)['peaks']
+
+        self.assertEqual([p['type'] for p in peaks], ['oxidation', 'reduction'])
+        for peak, reference in zip(peaks, base):
+            self.assertEqual((peak['voltage'], peak['current']), (reference['voltage'], reference['current']))
+            self.assertAlmostEqual(peak['confidence'], min(100.0, reference['confidence'] * 1.1))
+        self.assertGreater(peaks[0]['area'], 0)
+        self.assertAlmostEqual(peaks[0]['width'], 2 * 0.03 * np.sqrt(np.log(2)), delta=2 * (voltage[1] - voltage[0]))
+
+    def test_no_peaks(self):
+        self.assertEqual(detect_peaks_ml(np.arange(10.0), np.ones(10))['peaks'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
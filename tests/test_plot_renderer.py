@@ -0,0 +1,148 @@
+"""
+Tests for the process-pool plot renderer
+"""
+
+import os
+import signal
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from services.plot_renderer import PlotRenderer, decimate_minmax, render_cv_plot
+
+
+class TestDecimation(unittest.TestCase):
+
+    def test_extremes_are_kept(self):
+        x = np.arange(100000, dtype=float)
+        y = np.sin(x / 5000.0)
+        y[12345] = 10.0
+        y[54321] = -10.0
+
+        dx, dy = decimate_minmax(x, y, 1000)
+
+        self.assertLessEqual(len(dy), 1000)
+        self.assertIn(10.0, dy)
+        self.assertIn(-10.0, dy)
+        self.assertTrue(np.all(np.diff(dx) > 0))
+
+    def test_short_traces_are_unchanged(self):
+        x, y = np.arange(10.0), np.arange(10.0)
+        dx, dy = decimate_minmax(x, y, 100)
+        self.assertIs(dy, y)
+
+
+class TestRendering(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+        potential = np.concatenate([np.linspace(-0.5, 0.5, 500), np.linspace(0.5, -0.5, 500)])
+        self.columns = (potential, potential * 1e-5, np.repeat([1, 2], 500))
+
+    def test_template_is_reused_without_leftover_traces(self):
+        first = os.path.join(self.directory, 'a.png')
+        second = os.path.join(self.directory, 'b.png')
+
+        self.assertTrue(render_cv_plot(*self.columns, first, {'rate': 0.1}, 'A', 'thumbnail'))
+        self.assertTrue(render_cv_plot(*self.columns, second, {'rate': 0.1}, 'B', 'thumbnail'))
+
+        from services.plot_renderer import _templates
+        fig, ax, _, _ = _templates['thumbnail']
+        self.assertEqual(len(ax.lines), 0)
+        self.assertGreater(os.path.getsize(second), 0)
+
+    def test_concurrent_in_process_renders_do_not_mix(self):
+        from matplotlib.figure import Figure
+        renderer = PlotRenderer(processes=0)
+        saved = {}
+        original_savefig = Figure.savefig
+
+        def savefig(fig, path, **kwargs):
+            time.sleep(0.01)  # Give another render the chance to draw meanwhile
+            ax = fig.axes[0]
+            saved[os.path.basename(path)] = (ax.get_title(), len(ax.lines))
+            return original_savefig(fig, path, **kwargs)
+
+        def render(index):
+            # Even sessions have two cycles (two traces), odd ones a single trace
+            cycle = self.columns[2] if index % 2 == 0 else None
+            path = os.path.join(self.directory, f'{index}.png')
+            renderer.render(self.columns[0], self.columns[1], cycle, path, {},
+                            f'S{index}', preset='thumbnail')
+
+        # Build the shared template up front
+        renderer.render(*self.columns, os.path.join(self.directory, 'warm.png'), {}, 'W',
+                        preset='thumbnail')
+        saved.clear()
+        with mock.patch.object(Figure, 'savefig', savefig):
+            threads = [threading.Thread(target=render, args=(i,)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(saved), 8)
+        for index in range(8):
+            title, lines = saved[f'{index}.png']
+            self.assertIn(f'S{index}\n', title)
+            self.assertEqual(lines, 2 if index % 2 == 0 else 1)
+
+    def test_concurrent_first_use_creates_one_pool(self):
+        created = []
+
+        class SlowPool:
+            def __init__(self, **kwargs):
+                time.sleep(0.05)  # Let the other threads reach _get_pool meanwhile
+                created.append(self)
+
+            def shutdown(self, wait=True):
+                pass
+
+        renderer = PlotRenderer(processes=1)
+        with mock.patch('services.plot_renderer.ProcessPoolExecutor', SlowPool):
+            threads = [threading.Thread(target=renderer._get_pool) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(created), 1)
+        self.assertIs(renderer._pool, created[0])
+
+    def test_process_pool_render(self):
+        renderer = PlotRenderer(processes=1)
+        self.addCleanup(renderer.shutdown)
+        path = os.path.join(self.directory, 'pool.png')
+
+        self.assertTrue(renderer.render(*self.columns, path, {}, 'S', preset='preview'))
+        self.assertTrue(os.path.exists(path))
+
+    def test_pool_restarts_after_worker_dies(self):
+        renderer = PlotRenderer(processes=1)
+        self.addCleanup(renderer.shutdown)
+        path = os.path.join(self.directory, 'pool.png')
+        self.assertTrue(renderer.render(*self.columns, path, {}, 'S', preset='thumbnail'))
+        pool = renderer._pool
+        for process in list(pool._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+            process.join()
+
+        # The render caught by the broken pool may fail; the next ones get a fresh pool
+        renderer.render(*self.columns, path, {}, 'S', preset='thumbnail')
+        self.assertTrue(renderer.render(*self.columns, path, {}, 'S', preset='thumbnail'))
+        self.assertIsNot(renderer._pool, pool)
+
+    def test_unknown_preset_fails(self):
+        renderer = PlotRenderer(processes=0)
+        path = os.path.join(self.directory, 'x.png')
+        self.assertFalse(renderer.render(*self.columns, path, {}, 'S', preset='poster'))
+
+
+if __name__ == '__main__':
+    unittest.main()
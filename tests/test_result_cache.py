@@ -0,0 +1,146 @@
+"""
+Tests for the content-hash keyed result cache
+"""
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+from flask import Flask
+
+from services.result_cache import ResultCache, array_digest
+from routes import ai_routes
+from routes.peak_detection import peak_detection_bp
+
+
+class TestArrayDigest(unittest.TestCase):
+
+    def test_equal_content_gives_equal_key(self):
+        a = np.linspace(0, 1, 1000)
+        self.assertEqual(array_digest(a, method='x'), array_digest(a.copy(), method='x'))
+
+    def test_data_and_params_change_key(self):
+        a = np.linspace(0, 1, 1000)
+        b = a.copy()
+        b[500] += 1e-12
+        self.assertNotEqual(array_digest(a), array_digest(b))
+        self.assertNotEqual(array_digest(a, width=5), array_digest(a, width=6))
+
+
+class TestResultCache(unittest.TestCase):
+
+    def test_hits_and_misses(self):
+        cache = ResultCache(1024 * 1024)
+        calls = []
+        compute = lambda: calls.append(1) or {'peaks': [1, 2, 3]}
+
+        first = cache.get_or_compute('k', compute)
+        second = cache.get_or_compute('k', compute)
+
+        self.assertIs(first, second)
+        self.assertEqual(len(calls), 1)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 1, 1))
+
+    def test_lru_eviction_by_memory_budget(self):
+        cache = ResultCache(3000)
+        for key in 'abc':
+            cache.put(key, np.zeros(100))  # ~900 bytes each
+        cache.get('a')
+        cache.put('d', np.zeros(100))
+
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertLessEqual(cache.stats()['bytes'], 3000)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_oversized_values_are_not_stored(self):
+        cache = ResultCache(100)
+        cache.put('big', np.zeros(1000))
+        self.assertEqual(cache.stats()['entries'], 0)
+
+
+class TestPeakRouteCache(unittest.TestCase):
+
+    def setUp(self):
+        app = Flask(__name__)
+        app.config['peak_cache'] = ResultCache(1024 * 1024)
+        app.register_blueprint(peak_detection_bp, url_prefix='/api/peak-detection')
+        self.app = app
+        self.client = app.test_client()
+        voltage = np.linspace(-0.5, 0.5, 400)
+        current = np.exp(-((voltage - 0.1) / 0.05) ** 2) - np.exp(-((voltage + 0.2) / 0.05) ** 2)
+        self.payload = {'voltage': voltage.tolist(), 'current': current.tolist()}
+
+    def test_repeated_request_is_served_from_cache(self):
+        first = self.client.post('/api/peak-detection/get-peaks/prominence', json=self.payload).get_json()
+        second = self.client.post('/api/peak-detection/get-peaks/prominence', json=self.payload).get_json()
+
+        self.assertEqual(first, second)
+        stats = self.client.get('/api/peak-detection/cache').get_json()['cache']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_settings_change_misses(self):
+        self.client.post('/api/peak-detection/get-peaks/prominence', json=self.payload)
+        self.client.post('/api/peak-detection/update-settings', json={'width': 2})
+        self.client.post('/api/peak-detection/get-peaks/prominence', json=self.payload)
+
+        stats = self.app.config['peak_cache'].stats()
+        self.assertEqual((stats['hits'], stats['misses']), (0, 2))
+
+
+class FakeClassifier:
+    """Peak classifier double whose model can be 'retrained'"""
+
+    def __init__(self):
+        self.version = 1
+        self.extract_calls = 0
+        self.classify_calls = 0
+
+    def extract_features(self, voltages, currents, peak_indices):
+        self.extract_calls += 1
+        return [SimpleNamespace(potential=float(voltages[i]), height=float(abs(currents[i])), width=5,
+                                area=1.0, symmetry=1.0, sharpness=1.0, prominence=1.0, noise_level=0.0)
+                for i in peak_indices]
+
+    def classify_peaks(self, peaks):
+        self.classify_calls += 1
+        return [SimpleNamespace(peak_type=f'model_{self.version}', confidence=0.9) for _ in peaks]
+
+    def get_model_info(self):
+        return {'version': self.version}
+
+
+class TestAIPeakRouteCache(unittest.TestCase):
+
+    def setUp(self):
+        app = Flask(__name__)
+        app.config['peak_cache'] = ResultCache(1024 * 1024)
+        app.register_blueprint(ai_routes.ai_bp)
+        self.app = app
+        self.client = app.test_client()
+        voltage = np.linspace(-0.5, 0.5, 400)
+        current = np.exp(-((voltage - 0.1) / 0.05) ** 2) - np.exp(-((voltage + 0.2) / 0.05) ** 2)
+        self.payload = {'voltage': voltage.tolist(), 'current': current.tolist()}
+        self.classifier = FakeClassifier()
+        classifier_patch = patch.object(ai_routes, 'peak_classifier', self.classifier)
+        classifier_patch.start()
+        self.addCleanup(classifier_patch.stop)
+
+    def test_features_are_cached_but_classification_is_not(self):
+        first = self.client.post('/api/ai/analyze-peaks', json=self.payload).get_json()
+        self.classifier.version = 2  # Model retrained or loaded
+        second = self.client.post('/api/ai/analyze-peaks', json=self.payload).get_json()
+
+        self.assertEqual(first['model_info'], {'version': 1})
+        self.assertEqual(second['model_info'], {'version': 2})
+        self.assertEqual({peak['type'] for peak in second['peaks']}, {'model_2'})
+        self.assertEqual([p['voltage'] for p in first['peaks']], [p['voltage'] for p in second['peaks']])
+        self.assertEqual((self.classifier.extract_calls, self.classifier.classify_calls), (1, 2))
+        stats = self.app.config['peak_cache'].stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
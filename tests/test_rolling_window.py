@@ -0,0 +1,80 @@
+"""
+Tests for the vectorized rolling-window kernels
+"""
+
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from scipy.signal import medfilt
+
+from ai.ml_models.rolling_window import (
+    rolling_max, rolling_mean, rolling_median, rolling_min, rolling_std
+)
+from ai.ml_models.signal_processor import SignalProcessor
+
+
+def _reference(x, window, statistic):
+    """Per-index loop with windows truncated at the edges"""
+    half = window // 2
+    return np.array([statistic(x[max(0, i - half):min(len(x), i + half + 1)])
+                     for i in range(len(x))])
+
+
+class TestRollingWindow(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.x = np.cumsum(rng.normal(size=997)) + 1e3
+
+    def test_matches_loop_reference(self):
+        kernels = [(rolling_median, np.median), (rolling_mean, np.mean), (rolling_std, np.std),
+                   (rolling_min, np.min), (rolling_max, np.max)]
+        for window in (1, 4, 5, 20, 51):
+            for kernel, statistic in kernels:
+                with self.subTest(kernel=kernel.__name__, window=window):
+                    np.testing.assert_allclose(kernel(self.x, window),
+                                               _reference(self.x, window, statistic),
+                                               rtol=1e-9, atol=1e-9)
+
+    def test_signal_shorter_than_window(self):
+        x = self.x[:7]
+        np.testing.assert_allclose(rolling_median(x, 21), _reference(x, 21, np.median))
+        self.assertEqual(len(rolling_mean(x, 21, edges='valid')), 0)
+
+    def test_edge_modes(self):
+        window = 9
+        keep = rolling_median(self.x, window, edges='keep')
+        valid = rolling_median(self.x, window, edges='valid')
+        self.assertEqual(len(valid), len(self.x) - window + 1)
+        np.testing.assert_array_equal(keep[:4], self.x[:4])
+        np.testing.assert_array_equal(keep[-4:], self.x[-4:])
+        np.testing.assert_array_equal(keep[4:-4], valid)
+        np.testing.assert_allclose(rolling_mean(self.x, window, edges='keep')[4:-4],
+                                   rolling_mean(self.x, window, edges='valid'))
+
+    def test_batch_along_last_axis(self):
+        batch = np.stack([self.x, self.x[::-1], -self.x])
+        for kernel in (rolling_median, rolling_mean, rolling_std, rolling_min, rolling_max):
+            for edges in ('shrink', 'keep', 'valid'):
+                with self.subTest(kernel=kernel.__name__, edges=edges):
+                    result = kernel(batch, 11, edges=edges)
+                    for row, curve in zip(result, batch):
+                        np.testing.assert_allclose(row, kernel(curve, 11, edges=edges))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            rolling_median(self.x, 0)
+        with self.assertRaises(ValueError):
+            rolling_mean(self.x, 5, edges='wrap')
+
+    def test_median_fallback_matches_scipy_interior(self):
+        processor = SignalProcessor()
+        with patch('ai.ml_models.signal_processor.SCIPY_AVAILABLE', False):
+            filtered = processor._apply_median_filter(self.x, kernel_size=5)
+        np.testing.assert_allclose(filtered[2:-2], medfilt(self.x, 5)[2:-2])
+        np.testing.assert_array_equal(filtered[:2], self.x[:2])
+
+
+if __name__ == '__main__':
+    unittest.main()
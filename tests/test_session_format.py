@@ -0,0 +1,56 @@
+"""
+Tests for the columnar binary session format
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from services.session_format import read_session_file, read_session_metadata, write_session_file
+
+
+class TestSessionFormat(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'CV_test.npz')
+        self.columns = {
+            'timestamp': np.arange(1000, dtype=np.float64),
+            'potential': np.linspace(-0.5, 0.5, 1000),
+            'current': np.linspace(0, 1e-5, 1000),
+            'cycle': np.ones(1000, dtype=np.int16),
+            'direction': np.ones(1000, dtype=np.int8),
+        }
+        self.metadata = {'session_id': 'CV_test', 'parameters': {'rate': 0.1, 'cycles': 1}}
+        write_session_file(self.path, self.columns, self.metadata)
+
+    def test_columns_are_memory_mapped_with_their_dtypes(self):
+        data, metadata = read_session_file(self.path)
+
+        self.assertEqual(metadata, self.metadata)
+        for name, values in self.columns.items():
+            self.assertIsInstance(data[name], np.memmap)
+            self.assertEqual(data[name].dtype, values.dtype)
+            np.testing.assert_array_equal(data[name], values)
+
+    def test_column_projection(self):
+        data, _ = read_session_file(self.path, ['potential', 'current'], mmap=False)
+
+        self.assertEqual(sorted(data), ['current', 'potential'])
+        self.assertNotIsInstance(data['current'], np.memmap)
+
+    def test_file_is_standard_npz(self):
+        with np.load(self.path) as archive:
+            np.testing.assert_array_equal(archive['cycle'], self.columns['cycle'])
+        self.assertEqual(read_session_metadata(self.path)['parameters']['rate'], 0.1)
+
+    def test_missing_column(self):
+        with self.assertRaises(KeyError):
+            read_session_file(self.path, ['temperature'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Tests for the SQLite session index
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from services.session_index import SessionIndex
+
+
+def _write_session(sessions_dir, session_id, timestamp, points, cycles=1, rate=0.1):
+    session_dir = Path(sessions_dir) / session_id
+    session_dir.mkdir(parents=True, exist_ok=True)
+    (session_dir / f"{session_id}.csv").write_text('x' * points)
+    metadata = {
+        'session_id': session_id,
+        'timestamp': timestamp,
+        'parameters': {'rate': rate, 'lower': -0.5, 'upper': 0.5},
+        'data_points_count': points,
+        'cycles': cycles,
+        'voltage_range': {'min': -0.5, 'max': 0.5},
+        'current_range': {'min': -1e-6, 'max': 1e-6},
+    }
+    (session_dir / f"{session_id}_metadata.json").write_text(json.dumps(metadata))
+    return metadata
+
+
+class TestSessionIndex(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.sessions = self.root / 'sessions'
+        self.index = SessionIndex(self.root / 'sessions.db', self.sessions)
+        self.addCleanup(self.index.close)
+
+    def test_paging_sorting_and_filters(self):
+        for i in range(10):
+            self.index.upsert(_write_session(self.sessions, f"CV_{i:02d}",
+                                             f"2025-01-{i + 1:02d}T10:00:00", 100 * (i + 1),
+                                             cycles=1 + i % 2))
+
+        page, total = self.index.query(limit=3, offset=3)
+        self.assertEqual(total, 10)
+        self.assertEqual([s['session_id'] for s in page], ['CV_06', 'CV_05', 'CV_04'])
+
+        page, total = self.index.query(sort='data_points_count', descending=False,
+                                       min_points=500, cycles=2)
+        self.assertEqual([s['session_id'] for s in page], ['CV_05', 'CV_07', 'CV_09'])
+        self.assertEqual(total, 3)
+
+        page, _ = self.index.query(since='2025-01-09', search='_0')
+        self.assertEqual([s['session_id'] for s in page], ['CV_09', 'CV_08'])
+        self.assertTrue(page[0]['files_exist']['csv'])
+        self.assertFalse(page[0]['files_exist']['png'])
+
+    def test_totals_are_maintained_incrementally(self):
+        self.index.upsert(_write_session(self.sessions, 'CV_a', '2025-01-01', 1000))
+        self.index.upsert(_write_session(self.sessions, 'CV_b', '2025-01-02', 500))
+        before = self.index.totals()
+        self.assertEqual(before['session_count'], 2)
+
+        (self.sessions / 'CV_a' / 'CV_a.png').write_bytes(b'p' * 200)
+        self.index.refresh_files('CV_a')
+        self.assertEqual(self.index.totals()['total_bytes'], before['total_bytes'] + 200)
+
+        self.index.remove('CV_b')
+        totals = self.index.totals()
+        self.assertEqual(totals['session_count'], 1)
+        self.assertEqual(totals['total_bytes'], before['total_bytes'] + 200 - 500
+                         - (self.sessions / 'CV_b' / 'CV_b_metadata.json').stat().st_size)
+
+    def test_reconcile_picks_up_external_changes(self):
+        self.index.upsert(_write_session(self.sessions, 'CV_a', '2025-01-01', 10))
+        self.index.upsert(_write_session(self.sessions, 'CV_b', '2025-01-02', 10))
+
+        shutil.rmtree(self.sessions / 'CV_b')
+        _write_session(self.sessions, 'CV_c', '2025-01-03', 10)
+
+        counts = self.index.reconcile()
+
+        self.assertEqual(counts, {'added': 1, 'updated': 0, 'removed': 1})
+        self.assertEqual(self.index.totals()['session_count'], 2)
+        self.assertIsNone(self.index.get('CV_b'))
+
+        self.assertEqual(self.index.rebuild(), {'added': 2, 'updated': 0, 'removed': 0})
+
+    def test_reconcile_refreshes_changed_sizes_only(self):
+        self.index.upsert(_write_session(self.sessions, 'CV_a', '2025-01-01', 10))
+        self.index.upsert(_write_session(self.sessions, 'CV_b', '2025-01-02', 10))
+        before = self.index.totals()['total_bytes']
+        (self.sessions / 'CV_a' / 'CV_a.png').write_bytes(b'x' * 300)
+
+        changes = self.index._conn.total_changes
+        self.assertEqual(self.index.reconcile(), {'added': 0, 'updated': 0, 'removed': 0})
+
+        self.assertEqual(self.index.totals()['total_bytes'], before + 300)
+        # One row update plus its totals trigger; CV_b is left alone
+        self.assertEqual(self.index._conn.total_changes - changes, 2)
+
+    def test_reconcile_keys_rows_on_directory_name(self):
+        # Hand-copied session whose JSON still names the original
+        metadata = _write_session(self.sessions, 'CV_copy', '2025-01-01', 10)
+        metadata['session_id'] = 'CV_original'
+        (self.sessions / 'CV_copy' / 'CV_copy_metadata.json').write_text(json.dumps(metadata))
+
+        self.assertEqual(self.index.reconcile(), {'added': 1, 'updated': 0, 'removed': 0})
+        self.assertEqual(self.index.reconcile(), {'added': 0, 'updated': 0, 'removed': 0})
+        self.assertEqual(self.index.get('CV_copy')['session_id'], 'CV_copy')
+        self.assertIsNone(self.index.get('CV_original'))
+
+    def test_unknown_sort_key(self):
+        with self.assertRaises(ValueError):
+            self.index.query(sort='size; DROP TABLE sessions')
+
+
+if __name__ == '__main__':
+    unittest.main()
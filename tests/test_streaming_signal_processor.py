@@ -0,0 +1,61 @@
+"""
+Tests for chunk-by-chunk signal filtering
+"""
+
+import unittest
+
+import numpy as np
+from scipy import signal
+
+from ai.ml_models.signal_processor import SignalProcessor, StreamingSignalProcessor
+
+
+class TestStreamingSignalProcessor(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.clean = np.sin(np.linspace(0, 20, 5000))
+        self.noisy = self.clean + rng.normal(0, 0.1, self.clean.size)
+
+    def test_chunking_does_not_change_output(self):
+        for filter_type in StreamingSignalProcessor.FILTER_TYPES:
+            whole = StreamingSignalProcessor(filter_type).push(self.noisy)
+            stream = StreamingSignalProcessor(filter_type)
+            chunks = [stream.push(self.noisy[i:i + 37]) for i in range(0, len(self.noisy), 37)]
+
+            np.testing.assert_allclose(np.concatenate(chunks), whole, err_msg=filter_type)
+            # Sample-to-sample noise is reduced
+            self.assertLess(np.std(np.diff(whole)), 0.8 * np.std(np.diff(self.noisy)), filter_type)
+
+    def test_lowpass_matches_sosfilt(self):
+        stream = StreamingSignalProcessor('lowpass', sampling_rate=1000.0, cutoff=10.0)
+        sos = signal.butter(4, 10.0 / 500.0, btype='low', output='sos')
+        expected, _ = signal.sosfilt(sos, self.noisy, zi=signal.sosfilt_zi(sos) * self.noisy[0])
+
+        np.testing.assert_allclose(stream.push(self.noisy), expected)
+
+    def test_savgol_and_median_use_trailing_window(self):
+        savgol = StreamingSignalProcessor('savgol', window=11, order=3).push(self.noisy)
+        coeffs = signal.savgol_coeffs(11, 3, pos=10, use='dot')
+        np.testing.assert_allclose(savgol[10:60], [coeffs @ self.noisy[i - 10:i + 1] for i in range(10, 60)])
+
+        median = StreamingSignalProcessor('median', kernel_size=5).push(self.noisy)
+        np.testing.assert_allclose(median[4:60], [np.median(self.noisy[i - 4:i + 1]) for i in range(4, 60)])
+
+    def test_invalid_samples_do_not_poison_state(self):
+        data = self.noisy.copy()
+        data[100] = np.nan
+        filtered = StreamingSignalProcessor('lowpass').push(data)
+
+        self.assertTrue(np.isnan(filtered[100]))
+        self.assertTrue(np.isfinite(filtered[101:]).all())
+
+    def test_created_from_processor_config(self):
+        processor = SignalProcessor({**SignalProcessor._get_default_config(), 'savgol_window': 21})
+        self.assertEqual(processor.create_stream('savgol').window, 21)
+        with self.assertRaises(ValueError):
+            processor.create_stream('gaussian')
+
+
+if __name__ == '__main__':
+    unittest.main()
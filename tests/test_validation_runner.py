@@ -0,0 +1,143 @@
+"""
+Tests for the parallel, resumable validation runner (validation_data/peak_detection_framework.py)
+"""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+from cv_csv_fixtures import write_cv_csv
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'validation_data'))
+
+import cv_data_cache  # noqa: E402
+import peak_detection_framework as framework  # noqa: E402
+from peak_detection_framework import (  # noqa: E402
+    PeakDetectionValidator, TIMING_BIN_EDGES, ValidationCheckpoint, timing_histograms
+)
+
+
+def without_timing(record):
+    """Checkpoint record minus the fields that differ between runs"""
+    return [{k: v for k, v in result.items() if k not in ('processing_time', 'timestamp')}
+            for result in record['results']]
+
+
+class TestValidationRunner(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.base = Path(tmp.name)
+        cache_patch = patch.object(cv_data_cache, '_default_cache',
+                                   cv_data_cache.CVDataCache(self.base / 'cache'))
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+
+        data_dir = self.base / 'data'
+        data_dir.mkdir()
+        self.files = []
+        for i, peak in enumerate((0.0, 0.05, 0.1, 0.15)):
+            path = data_dir / f'cv_{i}.csv'
+            write_cv_csv(path, peak)
+            self.files.append(str(path))
+        (self.base / 'splits').mkdir()
+        (self.base / 'splits' / 'test_files.txt').write_text('\n'.join(self.files) + '\n')
+
+        with patch('builtins.print'):
+            self.validator = PeakDetectionValidator(str(self.base))
+
+    def _run(self, **kwargs):
+        with patch('builtins.print'):
+            return self.validator.run_validation('test', **kwargs)
+
+    def test_checkpoint_load_drops_truncated_last_line(self):
+        checkpoint = ValidationCheckpoint(self.base / 'checkpoint.jsonl')
+        checkpoint.append({'file': 'a.csv', 'success': True})
+        with open(checkpoint.path, 'a') as f:
+            f.write('{"file": "b.csv", "succ')
+
+        self.assertEqual(list(checkpoint.load()), ['a.csv'])
+        checkpoint.append({'file': 'c.csv', 'success': False})
+        self.assertEqual(list(checkpoint.load()), ['a.csv', 'c.csv'])
+        lines = checkpoint.path.read_text().splitlines()
+        self.assertEqual([json.loads(line)['file'] for line in lines], ['a.csv', 'c.csv'])
+
+    def test_resume_skips_completed_files(self):
+        checkpoint = ValidationCheckpoint(self.validator._checkpoint_path('test'))
+        done = framework.validate_file(self.files[0], self.validator._analyzers())
+        checkpoint.append(done)
+
+        with patch.object(framework, 'validate_file', wraps=framework.validate_file) as validate:
+            metrics = self._run()
+        processed = [call.args[0] for call in validate.call_args_list]
+
+        self.assertEqual(processed, self.files[1:])
+        self.assertEqual(metrics['TraditionalCV'].total_files, len(self.files))
+
+    def test_completed_run_clears_checkpoint(self):
+        self._run()
+        self.assertFalse(self.validator._checkpoint_path('test').exists())
+
+        with patch.object(framework, 'validate_file', wraps=framework.validate_file) as validate:
+            self._run()
+        self.assertEqual(validate.call_count, len(self.files))
+
+    def test_checkpoint_keyed_on_settings(self):
+        path = self.validator._checkpoint_path('test')
+        self.assertNotEqual(path, self.validator._checkpoint_path('test', settings={'preset': 'fast'}))
+        self.validator.traditional_analyzer.config['smoothing_window'] = 9
+        self.assertNotEqual(path, self.validator._checkpoint_path('test'))
+
+    def test_checkpoint_keyed_on_deep_training_state(self):
+        deep = self.validator.deep_analyzer
+        untrained = self.validator._checkpoint_path('test')
+        voltages = np.linspace(-0.4, 0.4, 100)
+        deep.add_training_data(voltages, np.sin(10 * voltages), [50])
+        with_sample = self.validator._checkpoint_path('test')
+        deep.is_trained = True
+
+        self.assertEqual(len({untrained, with_sample, self.validator._checkpoint_path('test')}), 3)
+
+    def test_parallel_matches_serial(self):
+        serial = {r['file']: without_timing(r) for r in self.validator._validate_files(self.files, 1)}
+        parallel = {r['file']: without_timing(r) for r in self.validator._validate_files(self.files, 2)}
+        self.assertEqual(parallel, serial)
+
+        serial_metrics = self._run(workers=1)
+        parallel_metrics = self._run(workers=2)
+        for method in framework.METHOD_NAMES:
+            self.assertEqual(parallel_metrics[method].total_files, serial_metrics[method].total_files)
+            self.assertEqual(parallel_metrics[method].successful_detections,
+                             serial_metrics[method].successful_detections)
+
+    def test_timing_histograms(self):
+        def result(seconds):
+            return framework.PeakDetectionResult(
+                method='TraditionalCV', filename='x.csv', peaks_detected=0, peak_potentials=[],
+                peak_currents=[], anodic_peaks=[], cathodic_peaks=[],
+                peak_separation=None, processing_time=seconds, confidence_score=1.0,
+                metadata={}, timestamp=framework.datetime.now())
+
+        times = [1e-5, 2e-3, 2e-3, 0.5, 500.0]
+        histograms = timing_histograms({'TraditionalCV': [result(t) for t in times], 'DeepCV': []})
+        histogram = histograms['TraditionalCV']
+
+        self.assertEqual(histogram['bin_edges_s'], TIMING_BIN_EDGES.tolist())
+        self.assertEqual(sum(histogram['counts']), len(times))
+        self.assertEqual(histogram['counts'][0], 1)    # Below the first edge, clipped in
+        self.assertEqual(histogram['counts'][-1], 1)   # Above the last edge, clipped in
+        self.assertEqual(histogram['counts'][np.searchsorted(TIMING_BIN_EDGES, 2e-3) - 1], 2)
+        self.assertAlmostEqual(histogram['total_s'], sum(times))
+        self.assertAlmostEqual(histogram['p50_s'], 2e-3)
+        self.assertEqual(histograms['DeepCV']['counts'], [0] * (len(TIMING_BIN_EDGES) - 1))
+        self.assertEqual(histograms['DeepCV']['p90_s'], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Tests for the vectorized DeepCV window features (validation_data/peak_detection_framework.py)
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'validation_data'))
+
+from peak_detection_framework import DeepCVAnalyzer, extract_window_features  # noqa: E402
+
+
+def _reference(voltages, currents, window):
+    """The original per-point loop"""
+    features = []
+    for i in range(len(currents)):
+        start = max(0, i - window // 2)
+        end = min(len(currents), i + window // 2 + 1)
+        w = currents[start:end]
+        # np.gradient needs two points; a one-point window has no slope
+        gradient = np.gradient(w).mean() if len(w) > 1 else 0.0
+        features.append([currents[i], voltages[i], np.mean(w), np.std(w),
+                         np.max(w) - np.min(w), gradient, len(w)])
+    return np.array(features)
+
+
+class TestWindowFeatures(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.voltages = np.linspace(-0.5, 0.5, 301)
+        self.currents = (np.exp(-((self.voltages - 0.1) / 0.04) ** 2)
+                         + 0.05 * rng.normal(size=301)) * 1e-6
+
+    def test_matches_loop_reference(self):
+        for window in (1, 2, 3, 4, 5, 10, 21):
+            with self.subTest(window=window):
+                features = extract_window_features(self.voltages, self.currents, window)
+                np.testing.assert_allclose(features, _reference(self.voltages, self.currents, window),
+                                           rtol=1e-10, atol=1e-20)
+
+    def test_edge_window_sizes(self):
+        # window 5 -> two points each side: edge windows of 3 and 4 points
+        sizes = extract_window_features(self.voltages, self.currents, 5)[:, 6]
+        np.testing.assert_array_equal(sizes[:3], [3, 4, 5])
+        np.testing.assert_array_equal(sizes[-3:], [5, 4, 3])
+        # window 3 -> two-point windows at the ends
+        sizes = extract_window_features(self.voltages, self.currents, 3)[:, 6]
+        np.testing.assert_array_equal(sizes[[0, 1, -2, -1]], [2, 3, 3, 2])
+
+    def test_curves_shorter_than_window(self):
+        for n in (2, 3, 4):
+            with self.subTest(points=n):
+                v, c = self.voltages[:n], self.currents[100:100 + n]
+                np.testing.assert_allclose(extract_window_features(v, c, 9), _reference(v, c, 9),
+                                           rtol=1e-10, atol=1e-20)
+
+    def test_batch_matches_single_curves(self):
+        voltages = np.stack([self.voltages, self.voltages, self.voltages[::-1]])
+        currents = np.stack([self.currents, -self.currents, self.currents[::-1] * 2])
+        batch = extract_window_features(voltages, currents, 10)
+
+        self.assertEqual(batch.shape, (3, 301, 7))
+        for i in range(3):
+            np.testing.assert_allclose(batch[i], _reference(voltages[i], currents[i], 10),
+                                       rtol=1e-10, atol=1e-20)
+
+    def test_add_training_batch_matches_add_training_data(self):
+        voltages = np.stack([self.voltages, self.voltages])
+        currents = np.stack([self.currents, self.currents * 0.5])
+        peaks = [[150], [149, 151]]
+
+        batched, single = DeepCVAnalyzer(), DeepCVAnalyzer()
+        batched.add_training_batch(voltages, currents, peaks)
+        for v, c, p in zip(voltages, currents, peaks):
+            single.add_training_data(v, c, p)
+
+        self.assertEqual(len(batched.training_data), 2)
+        for got, expected in zip(batched.training_data, single.training_data):
+            np.testing.assert_allclose(got['features'], expected['features'])
+            np.testing.assert_array_equal(got['labels'], expected['labels'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Consolidated memory-mapped store of the PalmSens/STM32 CV corpus
+Packs every curve into one array file with offset, metadata and split tables
+
+Author: H743Poten Research Team
+Date: 2025-08-17
+"""
+
+import argparse
+import json
+import shutil
+import numpy as np
+from pathlib import Path, PureWindowsPath
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from cv_data_cache import get_cache
+
+CURVES_FILE = "curves.npy"        # float64, shape (2, total_points): voltages, currents
+CATALOG_FILE = "catalog.npy"      # one record per curve, see CATALOG_FIELDS
+SPLITS_FILE = "splits.npz"        # split name -> int64 curve indices
+MANIFEST_FILE = "manifest.json"
+
+# Catalog record layout; str fields are sized to the longest value in the corpus
+CATALOG_FIELDS = [
+    ('offset', 'i8'),
+    ('length', 'i8'),
+    ('instrument', str),
+    ('concentration', 'f8'),
+    ('scan_rate', 'i4'),
+    ('electrode', 'i4'),
+    ('scan_number', 'i4'),
+    ('condition_key', str),
+    ('current_unit', str),
+    ('filename', str),
+]
+
+
+def catalog_dtype(rows: List[tuple]) -> np.dtype:
+    """Catalog dtype whose string fields hold the longest value in ``rows`` untruncated"""
+    fields = []
+    for i, (name, kind) in enumerate(CATALOG_FIELDS):
+        if kind is str:
+            kind = f"U{max((len(row[i]) for row in rows), default=0) or 1}"
+        fields.append((name, kind))
+    return np.dtype(fields)
+
+# Primary splits are packed first and in this order, so each is one contiguous block
+PRIMARY_SPLITS = ("train", "validation", "test")
+
+
+def _file_key(path: str) -> str:
+    """File name of a split entry, whether written on Windows or POSIX"""
+    return PureWindowsPath(path).name
+
+
+def _read_split_files(splits_path: Path) -> Dict[str, List[str]]:
+    """Split name -> file names, e.g. 'test' or 'loco_splits/leave_electrode_out/E1_test'"""
+    splits = {}
+    for split_file in sorted(splits_path.rglob("*.txt")):
+        name = split_file.relative_to(splits_path).with_suffix('').as_posix()
+        if name.endswith("_files") and '/' not in name:
+            name = name[:-len("_files")]
+        with open(split_file, 'r') as f:
+            splits[name] = [_file_key(line.strip()) for line in f if line.strip()]
+    return splits
+
+
+def build_corpus_store(file_metadata: List[Dict], splits_path: Union[str, Path],
+                       output_path: Union[str, Path]) -> Path:
+    """Pack the corpus described by ``file_metadata`` into ``output_path``
+
+    ``file_metadata`` holds StratifiedDataSplitter records (file_path,
+    instrument, concentration, ...). Files are parsed through the CV data
+    cache with the loader validate_file uses on CSV files, so both read the
+    same curves; files that fail to parse are left out and listed in the
+    manifest.
+    """
+    # Imported here: peak_detection_framework imports this module
+    from peak_detection_framework import CV_CSV_PARSER_VERSION, _parse_cv_csv
+
+    output_path = Path(output_path)
+    splits = _read_split_files(Path(splits_path))
+
+    # Order curves as listed in the primary splits, then the rest by file name
+    rank = {key: (i, position) for i, name in enumerate(PRIMARY_SPLITS)
+            for position, key in enumerate(splits.get(name, []))}
+    records = sorted(file_metadata, key=lambda m: (*rank.get(m['filename'], (len(PRIMARY_SPLITS), 0)),
+                                                   m['filename']))
+
+    cache = get_cache()
+    catalog, skipped = [], []
+    offset = 0
+    for meta in records:
+        try:
+            voltages, _, parsed = cache.get_or_parse(meta['file_path'], _parse_cv_csv,
+                                                     loader='framework', version=CV_CSV_PARSER_VERSION)
+        except (OSError, ValueError) as e:
+            skipped.append({'filename': meta['filename'], 'error': str(e)})
+            continue
+        catalog.append((offset, len(voltages), str(meta['instrument']), meta['concentration'],
+                        meta['scan_rate'], meta['electrode'], meta['scan_number'],
+                        str(meta['condition_key']), parsed.get('current_unit') or '', meta['filename']))
+        offset += len(voltages)
+    catalog = np.array(catalog, dtype=catalog_dtype(catalog))
+
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    tmp_path.mkdir(parents=True)
+
+    # Second pass reads back from the cache, so memory stays at one curve
+    curves = np.lib.format.open_memmap(tmp_path / CURVES_FILE, mode='w+', dtype=np.float64,
+                                       shape=(2, offset))
+    by_name = {m['filename']: m for m in records}
+    for entry in catalog:
+        voltages, currents, _ = cache.get_or_parse(by_name[entry['filename']]['file_path'],
+                                                   _parse_cv_csv, loader='framework',
+                                                   version=CV_CSV_PARSER_VERSION)
+        curves[0, entry['offset']:entry['offset'] + entry['length']] = voltages
+        curves[1, entry['offset']:entry['offset'] + entry['length']] = currents
+    curves.flush()
+    del curves
+
+    index = {str(name): i for i, name in enumerate(catalog['filename'])}
+    split_indices, missing = {}, {}
+    for name, files in splits.items():
+        split_indices[name] = np.array([index[f] for f in files if f in index], dtype=np.int64)
+        if len(split_indices[name]) < len(files):
+            missing[name] = len(files) - len(split_indices[name])
+
+    np.save(tmp_path / CATALOG_FILE, catalog)
+    np.savez(tmp_path / SPLITS_FILE, **split_indices)
+    with open(tmp_path / MANIFEST_FILE, 'w') as f:
+        json.dump({'curves': len(catalog), 'points': int(offset), 'splits': sorted(split_indices),
+                   'loader': ['framework', CV_CSV_PARSER_VERSION],
+                   'files_missing_from_splits': missing, 'skipped_files': skipped}, f, indent=2)
+
+    shutil.rmtree(output_path, ignore_errors=True)
+    tmp_path.rename(output_path)
+    return output_path
+
+
+class CVCorpusStore:
+    """Read-only view of a packed corpus
+
+    Curve data is memory-mapped, so curve(i) and primary-split blocks are
+    zero-copy views and the OS page cache is shared between processes.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.curves = np.load(self.path / CURVES_FILE, mmap_mode='r')
+        self.catalog = np.load(self.path / CATALOG_FILE)
+        with np.load(self.path / SPLITS_FILE) as splits:
+            self._splits = {name: splits[name] for name in splits.files}
+        self._index = {str(name): i for i, name in enumerate(self.catalog['filename'])}
+
+    def __len__(self) -> int:
+        return len(self.catalog)
+
+    @property
+    def split_names(self) -> List[str]:
+        return sorted(self._splits)
+
+    def split_indices(self, name: str) -> np.ndarray:
+        if name not in self._splits:
+            raise KeyError(f"Unknown split: {name}")
+        return self._splits[name]
+
+    def index_of(self, filename: str) -> Optional[int]:
+        return self._index.get(_file_key(filename))
+
+    def curve(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(voltages, currents) views of curve ``i``"""
+        entry = self.catalog[i]
+        start, stop = entry['offset'], entry['offset'] + entry['length']
+        return self.curves[0, start:stop], self.curves[1, start:stop]
+
+    def block(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """All points of a primary split as one (catalog, points) view pair
+
+        Catalog offsets stay relative to the whole store; subtract
+        ``catalog['offset'][0]`` to index into the block. Raises ValueError
+        for splits that are not contiguous in the store.
+        """
+        indices = self.split_indices(name)
+        if len(indices) == 0:
+            return self.catalog[:0], self.curves[:, :0]
+        if not np.array_equal(indices, np.arange(indices[0], indices[0] + len(indices))):
+            raise ValueError(f"Split {name} is not contiguous in the store")
+        catalog = self.catalog[indices[0]:indices[-1] + 1]
+        start = catalog['offset'][0]
+        stop = catalog['offset'][-1] + catalog['length'][-1]
+        return catalog, self.curves[:, start:stop]
+
+    def iter_split(self, name: str) -> Iterator[Tuple[np.void, np.ndarray, np.ndarray]]:
+        """Yield (catalog record, voltages, currents) for every curve of a split"""
+        for i in self.split_indices(name):
+            voltages, currents = self.curve(i)
+            yield self.catalog[i], voltages, currents
+
+
+def main():
+    """Pack validation_data/reference_cv_data into a corpus store"""
+    from stratified_data_splitter import StratifiedDataSplitter
+
+    base_path = Path(__file__).resolve().parent
+    parser = argparse.ArgumentParser(description="Pack the CV corpus into a memory-mapped store")
+    parser.add_argument('--output', default=str(base_path / "corpus"),
+                        help='Output directory (default: validation_data/corpus)')
+    args = parser.parse_args()
+
+    splitter = StratifiedDataSplitter(base_path)
+    file_metadata = splitter._collect_file_metadata()
+    print(f"📊 Packing {len(file_metadata)} files...")
+
+    output = build_corpus_store(file_metadata, splitter.splits_path, args.output)
+    store = CVCorpusStore(output)
+    print(f"✅ {len(store)} curves, {store.curves.shape[1]} points -> {output}")
+    for name in store.split_names:
+        print(f"   {name}: {len(store.split_indices(name))} curves")
+
+
+if __name__ == "__main__":
+    main()
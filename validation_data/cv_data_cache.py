@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Binary cache of parsed CV data files
+Parses each CSV once per loader and reuses the arrays on later runs
+
+Author: H743Poten Research Team
+Date: 2025-08-17
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import numpy as np
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Parser result: voltages, currents, metadata (column names, units, strategy, ...)
+ParsedCV = Tuple[np.ndarray, np.ndarray, Dict[str, Any]]
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / ".cv_cache"
+
+# Bump when the entry layout changes; older entries are then re-parsed
+FORMAT_VERSION = 1
+
+_CURRENT_UNITS = {'pa': 'pA', 'na': 'nA', 'ua': 'uA', 'µa': 'uA', 'ma': 'mA', 'a': 'A'}
+
+
+def detect_current_unit(column_name) -> Optional[str]:
+    """Current unit from a header such as 'uA', 'Current (mA)' or 'WE(1).Current (A)'"""
+    name = str(column_name).strip().lower()
+    if '(' in name and name.endswith(')'):
+        name = name[name.rindex('(') + 1:-1].strip()
+    return _CURRENT_UNITS.get(name)
+
+
+class CVDataCache:
+    """Parsed CV files stored as .npz next to a JSON metadata record
+
+    Entries are keyed by resolved path and loader name and remember the
+    source file's mtime and size and the loader's parser version; a changed
+    file or a bumped version is parsed again and its entry overwritten, so
+    stale data is never returned. Entries are written
+    to a temporary file and renamed into place, which keeps concurrent
+    validation workers safe.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path, None] = None, enabled: bool = True):
+        self.cache_dir = Path(cache_dir or os.environ.get('CV_DATA_CACHE_DIR') or DEFAULT_CACHE_DIR)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, source: Path, loader: str) -> Path:
+        digest = hashlib.blake2b(f"{loader}|{source}".encode(), digest_size=16).hexdigest()
+        return self.cache_dir / f"{digest}.npz"
+
+    @staticmethod
+    def _signature(source: Path) -> Dict[str, int]:
+        stat = source.stat()
+        return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+    def load(self, filepath: Union[str, Path], loader: str, version: int = 1) -> Optional[ParsedCV]:
+        """Cached entry for the file as it is now, or None"""
+        source = Path(filepath).resolve()
+        entry = self._entry_path(source, loader)
+        if not self.enabled or not entry.exists() or not source.is_file():
+            return None
+        try:
+            with np.load(entry, allow_pickle=False) as data:
+                record = json.loads(str(data['record']))
+                if (record.get('format_version') != FORMAT_VERSION
+                        or record.get('parser_version') != version
+                        or record.get('source') != str(source)
+                        or record.get('signature') != self._signature(source)):
+                    return None
+                return data['voltages'], data['currents'], record['metadata']
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {entry.name}: {e}")
+            return None
+
+    def store(self, filepath: Union[str, Path], loader: str, voltages: np.ndarray,
+              currents: np.ndarray, metadata: Dict[str, Any], version: int = 1):
+        if not self.enabled:
+            return
+        source = Path(filepath).resolve()
+        record = {
+            'format_version': FORMAT_VERSION,
+            'source': str(source),
+            'loader': loader,
+            'parser_version': version,
+            'signature': self._signature(source),
+            'metadata': metadata
+        }
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, voltages=np.asarray(voltages), currents=np.asarray(currents),
+                         record=np.array(json.dumps(record, default=str)))
+            os.replace(tmp_path, self._entry_path(source, loader))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def get_or_parse(self, filepath: Union[str, Path], parser: Callable[[Path], ParsedCV],
+                     loader: str, version: int = 1) -> ParsedCV:
+        """Cached (voltages, currents, metadata), running ``parser`` on a miss
+
+        ``loader`` names the parsing rules, so loaders with different column
+        heuristics keep separate entries; ``version`` must be bumped whenever
+        those rules change. A ValueError from the parser (an unparseable
+        file) is cached as well and raised again on later calls until the
+        file or the version changes.
+        """
+        cached = self.load(filepath, loader, version)
+        if cached is not None:
+            self.hits += 1
+            voltages, currents, metadata = cached
+            if 'error' in metadata:
+                raise ValueError(metadata['error'])
+            return cached
+
+        self.misses += 1
+        try:
+            voltages, currents, metadata = parser(Path(filepath))
+        except ValueError as e:
+            self._store_quietly(filepath, loader, np.empty(0), np.empty(0), {'error': str(e)}, version)
+            raise
+        self._store_quietly(filepath, loader, voltages, currents, metadata, version)
+        return voltages, currents, metadata
+
+    def _store_quietly(self, filepath, loader, voltages, currents, metadata, version):
+        try:
+            self.store(filepath, loader, voltages, currents, metadata, version)
+        except OSError as e:
+            logger.warning(f"Could not cache {filepath}: {e}")
+
+    def clear(self):
+        """Remove all cache entries"""
+        if self.cache_dir.exists():
+            for entry in self.cache_dir.glob("*.npz"):
+                entry.unlink()
+
+
+_default_cache: Optional[CVDataCache] = None
+
+
+def get_cache() -> CVDataCache:
+    """Process-wide cache; CV_DATA_CACHE=0 disables it"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = CVDataCache(enabled=os.environ.get('CV_DATA_CACHE', '1') != '0')
+    return _default_cache
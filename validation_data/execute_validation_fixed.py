@@ -15,6 +15,129 @@ import numpy as np
 import pandas as pd
 from datetime import datetime
 
+from cv_data_cache import detect_current_unit, get_cache
+
+# Bump when _parse_cv_robust changes, so cached parses are redone
+ROBUST_PARSER_VERSION = 1
+
+def _parse_cv_robust(file_path):
+    """Parse a CV CSV with the fallback read strategies; returns (voltages, currents, metadata)"""
+    # Try different reading strategies
+    strategies = [
+        # Strategy 1: Normal read with header
+        lambda: pd.read_csv(file_path),
+
+        # Strategy 2: Skip first row if it contains units
+        lambda: pd.read_csv(file_path, skiprows=1),
+
+        # Strategy 3: Skip first few rows
+        lambda: pd.read_csv(file_path, skiprows=2),
+
+        # Strategy 4: Read without header
+        lambda: pd.read_csv(file_path, header=None),
+
+        # Strategy 5: Read with different separator
+        lambda: pd.read_csv(file_path, sep=';'),
+
+        # Strategy 6: Read with tab separator
+        lambda: pd.read_csv(file_path, sep='\t')
+    ]
+
+    df = None
+    strategy_used = None
+
+    for i, strategy in enumerate(strategies):
+        try:
+            df = strategy()
+            strategy_used = i + 1
+
+            # Check if we got valid numeric data
+            if df.shape[1] >= 2 and df.shape[0] >= 10:
+                # Try to convert to numeric
+                numeric_cols = []
+                for col in df.columns:
+                    try:
+                        pd.to_numeric(df[col], errors='raise')
+                        numeric_cols.append(col)
+                    except:
+                        continue
+
+                if len(numeric_cols) >= 2:
+                    break
+
+        except OSError:
+            # Unreadable file, not an unparseable one: not cached as a parse error
+            raise
+        except Exception as e:
+            continue
+
+    if df is None or df.shape[1] < 2:
+        raise ValueError("Could not read CSV with any strategy")
+
+    # Flexible column detection
+    voltage_terms = ['voltage', 'potential', 'v', 'e', 'volt']
+    current_terms = ['current', 'i', 'amp', 'a']
+
+    voltage_col = None
+    current_col = None
+
+    # Find voltage column
+    for col in df.columns:
+        col_str = str(col).lower()
+        if any(term in col_str for term in voltage_terms):
+            voltage_col = col
+            break
+
+    # Find current column
+    for col in df.columns:
+        col_str = str(col).lower()
+        if any(term in col_str for term in current_terms):
+            current_col = col
+            break
+
+    # If not found by name, use positional
+    if voltage_col is None or current_col is None:
+        numeric_cols = []
+        for col in df.columns:
+            try:
+                pd.to_numeric(df[col], errors='raise')
+                numeric_cols.append(col)
+            except:
+                continue
+
+        if len(numeric_cols) >= 2:
+            voltage_col = numeric_cols[0]  # First numeric column
+            current_col = numeric_cols[1]  # Second numeric column
+        else:
+            # Last resort: use first two columns
+            voltage_col = df.columns[0]
+            current_col = df.columns[1]
+
+    # Extract and convert data
+    voltages = pd.to_numeric(df[voltage_col], errors='coerce').values
+    currents = pd.to_numeric(df[current_col], errors='coerce').values
+
+    # Remove NaN values
+    valid_mask = ~(np.isnan(voltages) | np.isnan(currents))
+    voltages = voltages[valid_mask]
+    currents = currents[valid_mask]
+
+    # Validate data
+    if len(voltages) != len(currents):
+        raise ValueError("Voltage and current arrays have different lengths")
+
+    if len(voltages) < 10:
+        raise ValueError("Insufficient data points after cleaning")
+
+    metadata = {
+        'strategy': strategy_used,
+        'shape': list(df.shape),
+        'voltage_column': str(voltage_col),
+        'current_column': str(current_col),
+        'current_unit': detect_current_unit(current_col)
+    }
+    return voltages, currents, metadata
+
 def load_cv_data_robust(filepath):
     """Robust CV data loader that handles various formats"""
     try:
@@ -39,114 +162,13 @@ def load_cv_data_robust(filepath):
         
         print(f"   📁 Loading: {file_path.name}")
         
-        # Try different reading strategies
-        strategies = [
-            # Strategy 1: Normal read with header
-            lambda: pd.read_csv(file_path),
-            
-            # Strategy 2: Skip first row if it contains units
-            lambda: pd.read_csv(file_path, skiprows=1),
-            
-            # Strategy 3: Skip first few rows
-            lambda: pd.read_csv(file_path, skiprows=2),
-            
-            # Strategy 4: Read without header
-            lambda: pd.read_csv(file_path, header=None),
-            
-            # Strategy 5: Read with different separator
-            lambda: pd.read_csv(file_path, sep=';'),
-            
-            # Strategy 6: Read with tab separator
-            lambda: pd.read_csv(file_path, sep='\t')
-        ]
-        
-        df = None
-        strategy_used = None
-        
-        for i, strategy in enumerate(strategies):
-            try:
-                df = strategy()
-                strategy_used = i + 1
-                
-                # Check if we got valid numeric data
-                if df.shape[1] >= 2 and df.shape[0] >= 10:
-                    # Try to convert to numeric
-                    numeric_cols = []
-                    for col in df.columns:
-                        try:
-                            pd.to_numeric(df[col], errors='raise')
-                            numeric_cols.append(col)
-                        except:
-                            continue
-                    
-                    if len(numeric_cols) >= 2:
-                        break
-                        
-            except Exception as e:
-                continue
-        
-        if df is None or df.shape[1] < 2:
-            raise ValueError("Could not read CSV with any strategy")
-        
-        print(f"   ✅ Strategy {strategy_used} worked: {df.shape}")
-        
-        # Flexible column detection
-        voltage_terms = ['voltage', 'potential', 'v', 'e', 'volt']
-        current_terms = ['current', 'i', 'amp', 'a']
-        
-        voltage_col = None
-        current_col = None
-        
-        # Find voltage column
-        for col in df.columns:
-            col_str = str(col).lower()
-            if any(term in col_str for term in voltage_terms):
-                voltage_col = col
-                break
-        
-        # Find current column
-        for col in df.columns:
-            col_str = str(col).lower()
-            if any(term in col_str for term in current_terms):
-                current_col = col
-                break
-        
-        # If not found by name, use positional
-        if voltage_col is None or current_col is None:
-            numeric_cols = []
-            for col in df.columns:
-                try:
-                    pd.to_numeric(df[col], errors='raise')
-                    numeric_cols.append(col)
-                except:
-                    continue
-            
-            if len(numeric_cols) >= 2:
-                voltage_col = numeric_cols[0]  # First numeric column
-                current_col = numeric_cols[1]  # Second numeric column
-            else:
-                # Last resort: use first two columns
-                voltage_col = df.columns[0]
-                current_col = df.columns[1]
-        
-        print(f"   📊 Voltage column: {voltage_col}")
-        print(f"   📊 Current column: {current_col}")
-        
-        # Extract and convert data
-        voltages = pd.to_numeric(df[voltage_col], errors='coerce').values
-        currents = pd.to_numeric(df[current_col], errors='coerce').values
-        
-        # Remove NaN values
-        valid_mask = ~(np.isnan(voltages) | np.isnan(currents))
-        voltages = voltages[valid_mask]
-        currents = currents[valid_mask]
-        
-        # Validate data
-        if len(voltages) != len(currents):
-            raise ValueError("Voltage and current arrays have different lengths")
+        # Parsed once, then served from the CV data cache
+        voltages, currents, metadata = get_cache().get_or_parse(file_path, _parse_cv_robust, loader='robust',
+                                                                 version=ROBUST_PARSER_VERSION)
         
-        if len(voltages) < 10:
-            raise ValueError("Insufficient data points after cleaning")
+        print(f"   ✅ Strategy {metadata['strategy']} worked: {tuple(metadata['shape'])}")
+        print(f"   📊 Voltage column: {metadata['voltage_column']}")
+        print(f"   📊 Current column: {metadata['current_column']}")
         
         print(f"   ✅ Data loaded: {len(voltages)} points")
         print(f"   ⚡ V range: {voltages.min():.3f} to {voltages.max():.3f}")
@@ -12,16 +12,66 @@ import matplotlib.pyplot as plt
 from pathlib import Path
 from typing import List, Tuple, Dict, Optional, Union
 import json
+import sys
 import warnings
 
+# The CV data cache lives in validation_data, one level up
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from cv_data_cache import detect_current_unit, get_cache
+
 class CVDataLoader:
     """Utility class for loading CV data files with proper error handling."""
     
+    # Bump when _parse_cv_file changes, so cached parses are redone
+    PARSER_VERSION = 1
+    
+    @staticmethod
+    def _parse_cv_file(filepath: Path) -> Tuple[np.ndarray, np.ndarray, Dict]:
+        """Parse V and current columns, trying 0-2 skipped header rows."""
+        for skiprows in [0, 1, 2]:
+            try:
+                df = pd.read_csv(filepath, skiprows=skiprows)
+                
+                # Check for voltage column
+                voltage_cols = [col for col in df.columns if any(v in col.lower() for v in ['volt', 'v', 'potential'])]
+                if not voltage_cols:
+                    continue
+                    
+                # Check for current column  
+                current_cols = [col for col in df.columns if any(c in col.lower() for c in ['current', 'i', 'ua', 'ma', 'amp'])]
+                if not current_cols:
+                    continue
+                
+                # Remove any NaN values
+                df_clean = pd.DataFrame({'V': df[voltage_cols[0]], 'I': df[current_cols[0]]}).dropna()
+                
+                if len(df_clean) < 10:  # Too few points
+                    continue
+                
+                metadata = {
+                    'skiprows': skiprows,
+                    'voltage_column': str(voltage_cols[0]),
+                    'current_column': str(current_cols[0]),
+                    'current_unit': detect_current_unit(current_cols[0])
+                }
+                return df_clean['V'].to_numpy(), df_clean['I'].to_numpy(), metadata
+                
+            except OSError:
+                # Unreadable file, not an unparseable one: not cached as a parse error
+                raise
+            except Exception:
+                continue
+        
+        raise ValueError("No voltage/current columns with enough data")
+    
     @staticmethod
     def load_cv_file(filepath: Union[str, Path]) -> Optional[pd.DataFrame]:
         """
         Load a single CV file with robust error handling.
         
+        Parsed files are kept in the shared CV data cache, so later loads
+        of an unchanged file skip CSV parsing.
+        
         Args:
             filepath: Path to CV file
             
@@ -29,39 +79,13 @@ class CVDataLoader:
             DataFrame with V and current columns, or None if failed
         """
         try:
-            # Try different loading strategies
-            for skiprows in [0, 1, 2]:
-                try:
-                    df = pd.read_csv(filepath, skiprows=skiprows)
-                    
-                    # Check for voltage column
-                    voltage_cols = [col for col in df.columns if any(v in col.lower() for v in ['volt', 'v', 'potential'])]
-                    if not voltage_cols:
-                        continue
-                        
-                    # Check for current column  
-                    current_cols = [col for col in df.columns if any(c in col.lower() for c in ['current', 'i', 'ua', 'ma', 'amp'])]
-                    if not current_cols:
-                        continue
-                    
-                    # Success - rename columns to standard format
-                    df_clean = pd.DataFrame()
-                    df_clean['V'] = df[voltage_cols[0]]
-                    df_clean['I'] = df[current_cols[0]]
-                    
-                    # Remove any NaN values
-                    df_clean = df_clean.dropna()
-                    
-                    if len(df_clean) < 10:  # Too few points
-                        continue
-                        
-                    return df_clean
-                    
-                except Exception:
-                    continue
-                    
-            return None
+            voltages, currents, _ = get_cache().get_or_parse(
+                filepath, CVDataLoader._parse_cv_file, loader='peak_detection',
+                version=CVDataLoader.PARSER_VERSION)
+            return pd.DataFrame({'V': voltages, 'I': currents})
             
+        except ValueError:
+            return None
         except Exception as e:
             warnings.warn(f"Failed to load {filepath}: {e}")
             return None
@@ -7,15 +7,19 @@ Author: H743Poten Research Team
 Date: 2025-08-17
 """
 
+import os
+import sys
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import json
 import time
+import hashlib
 import logging
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, Iterator, List, Tuple, Optional, Any
 from dataclasses import dataclass, asdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import warnings
 
 # Scientific computing
@@ -32,6 +36,13 @@ except ImportError:
     SCIENTIFIC_LIBS_AVAILABLE = False
     warnings.warn("Scientific libraries not fully available - using fallback implementations")
 
+# Shared rolling-window kernels from the web app's signal processing package
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+from ai.ml_models.rolling_window import rolling_max, rolling_mean, rolling_median, rolling_min, rolling_std
+
+from cv_data_cache import detect_current_unit, get_cache
+from cv_corpus_store import CVCorpusStore
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -160,14 +171,8 @@ class TraditionalCVAnalyzer:
         if len(currents) < window:
             return currents - np.mean(currents)
         
-        # Rolling baseline estimation
-        baseline = np.zeros_like(currents)
-        half_window = window // 2
-        
-        for i in range(len(currents)):
-            start = max(0, i - half_window)
-            end = min(len(currents), i + half_window + 1)
-            baseline[i] = np.median(currents[start:end])
+        # Rolling baseline estimation (windows shrink at the edges)
+        baseline = rolling_median(currents, window)
         
         return currents - baseline
     
@@ -233,6 +238,43 @@ class TraditionalCVAnalyzer:
             timestamp=datetime.now()
         )
 
+def extract_window_features(voltages: np.ndarray, currents: np.ndarray, window: int) -> np.ndarray:
+    """Per-point feature matrix for DeepCV, for one curve or a batch of curves
+    
+    Columns: current, voltage, local mean, local std, local range, mean local
+    gradient and window size. Windows are centered with ``window // 2`` points
+    on each side and truncated at the curve ends, so the last column shows
+    how many points each edge feature was computed from.
+    
+    1-D inputs give an (n, 7) matrix; 2-D inputs (one equal-length curve per
+    row) give (curves, n, 7).
+    """
+    voltages = np.asarray(voltages, dtype=np.float64)
+    currents = np.asarray(currents, dtype=np.float64)
+    n, half = currents.shape[-1], window // 2
+    
+    index = np.arange(n)
+    start = np.maximum(index - half, 0)
+    stop = np.minimum(index + half + 1, n)
+    size = stop - start
+    
+    # np.gradient(w).mean() only depends on the first two and last two points:
+    # (1.5 * (w[-1] - w[0]) - 0.5 * (w[-2] - w[1])) / len(w)
+    ends = currents[..., stop - 1] - currents[..., start]
+    inner = currents[..., np.maximum(stop - 2, 0)] - currents[..., np.minimum(start + 1, n - 1)]
+    gradient = np.where(size > 1, (1.5 * ends - 0.5 * inner) / size, 0.0)
+    
+    return np.stack([
+        currents,
+        voltages,
+        rolling_mean(currents, window, edges='shrink'),
+        rolling_std(currents, window, edges='shrink'),
+        rolling_max(currents, window, edges='shrink') - rolling_min(currents, window, edges='shrink'),
+        gradient,
+        np.broadcast_to(size.astype(np.float64), currents.shape)
+    ], axis=-1)
+
+
 class DeepCVAnalyzer:
     """Deep learning approach for CV peak detection"""
     
@@ -334,37 +376,37 @@ class DeepCVAnalyzer:
         except Exception as e:
             logger.error(f"Failed to add training data: {e}")
     
+    def add_training_batch(self, voltages: np.ndarray, currents: np.ndarray,
+                           ground_truth_peaks: List[List[int]]):
+        """Add equal-length curves (one per row) as training data in one pass"""
+        try:
+            voltages = np.asarray(voltages, dtype=np.float64)
+            currents = np.asarray(currents, dtype=np.float64)
+            if SCIENTIFIC_LIBS_AVAILABLE:
+                features = extract_window_features(voltages, currents, self.config['feature_window'])
+            else:
+                features = np.stack([voltages, currents], axis=-1)
+            
+            for i, peaks in enumerate(ground_truth_peaks):
+                self.training_data.append({
+                    'features': features[i],
+                    'labels': self._create_peak_labels(currents.shape[-1], peaks),
+                    'voltages': voltages[i],
+                    'currents': currents[i]
+                })
+            
+            logger.info(f"Added {len(ground_truth_peaks)} training samples. Total: {len(self.training_data)}")
+            
+        except Exception as e:
+            logger.error(f"Failed to add training batch: {e}")
+    
     def _extract_features(self, voltages: np.ndarray, currents: np.ndarray) -> np.ndarray:
         """Extract features for deep learning model"""
         if not SCIENTIFIC_LIBS_AVAILABLE:
             # Simple fallback features
             return np.column_stack([voltages, currents])
         
-        features = []
-        window = self.config['feature_window']
-        
-        for i in range(len(currents)):
-            # Current window features
-            start = max(0, i - window//2)
-            end = min(len(currents), i + window//2 + 1)
-            
-            window_currents = currents[start:end]
-            window_voltages = voltages[start:end]
-            
-            # Feature vector for this point
-            point_features = [
-                currents[i],                           # Current value
-                voltages[i],                           # Voltage value
-                np.mean(window_currents),              # Local mean current
-                np.std(window_currents),               # Local std current
-                np.max(window_currents) - np.min(window_currents),  # Local range
-                np.gradient(window_currents).mean(),   # Local derivative
-                len(window_currents)                   # Window size (for edge effects)
-            ]
-            
-            features.append(point_features)
-        
-        return np.array(features)
+        return extract_window_features(voltages, currents, self.config['feature_window'])
     
     def _create_peak_labels(self, data_length: int, peak_indices: List[int]) -> np.ndarray:
         """Create binary labels for peak detection"""
@@ -602,10 +644,199 @@ class HybridCVAnalyzer:
             timestamp=datetime.now()
         )
 
+METHOD_NAMES = ("TraditionalCV", "DeepCV", "HybridCV")
+
+# Processing-time histogram bins (seconds), half a decade apart
+TIMING_BIN_EDGES = np.logspace(-4, 2, 13)
+
+
+def result_to_json(result: PeakDetectionResult) -> Dict:
+    """JSON-serializable form of a PeakDetectionResult"""
+    json_result = asdict(result)
+    json_result['timestamp'] = result.timestamp.isoformat()
+    return json_result
+
+
+def result_from_json(data: Dict) -> PeakDetectionResult:
+    """Inverse of result_to_json"""
+    data = dict(data)
+    data['timestamp'] = datetime.fromisoformat(data['timestamp'])
+    data['anodic_peaks'] = [tuple(p) for p in data['anodic_peaks']]
+    data['cathodic_peaks'] = [tuple(p) for p in data['cathodic_peaks']]
+    return PeakDetectionResult(**data)
+
+
+def _json_default(value):
+    # numpy scalars and arrays inside metadata
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+class ValidationCheckpoint:
+    """Append-only store of completed files for one validation run
+    
+    Each completed file is one JSON line, flushed and synced before the next
+    is written, so after a crash every line except possibly a truncated last
+    one is intact and the run can resume from it.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+    
+    def load(self) -> Dict[str, Dict]:
+        """Completed records keyed by file path; drops a truncated last line"""
+        records = {}
+        if not self.path.exists():
+            return records
+        valid_bytes = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # Interrupted write
+                records[record['file']] = record
+                valid_bytes += len(line)
+        if valid_bytes < self.path.stat().st_size:
+            # Cut the partial line so new records start on a fresh line
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_bytes)
+        return records
+    
+    def append(self, record: Dict):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record, default=_json_default) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def clear(self):
+        if self.path.exists():
+            self.path.unlink()
+
+
+# Bump when _parse_cv_csv changes, so cached parses are redone
+CV_CSV_PARSER_VERSION = 2
+
+
+def _parse_cv_csv(filepath: Path) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+    # PalmSens exports have a "FileName: ..." line above the column header
+    with open(filepath, 'r') as f:
+        skiprows = 1 if f.readline().startswith('FileName:') else 0
+    
+    # Try to read with pandas first
+    df = pd.read_csv(filepath, skiprows=skiprows)
+    
+    # Detect column names (flexible)
+    voltage_cols = [col for col in df.columns if any(term in col.lower() 
+                   for term in ['voltage', 'potential', 'v', 'e'])]
+    current_cols = [col for col in df.columns if any(term in col.lower() 
+                   for term in ['current', 'i', 'amp'])]
+    
+    if not voltage_cols or not current_cols:
+        # Try positional approach
+        if df.shape[1] >= 2:
+            voltage_col, current_col = df.columns[0], df.columns[1]  # First two columns
+        else:
+            raise ValueError("Insufficient columns in CSV")
+    else:
+        voltage_col, current_col = voltage_cols[0], current_cols[0]
+    
+    voltages = df[voltage_col].values
+    currents = df[current_col].values
+    
+    # Basic validation
+    if len(voltages) != len(currents):
+        raise ValueError("Voltage and current arrays have different lengths")
+    
+    if len(voltages) < 10:
+        raise ValueError("Insufficient data points")
+    
+    metadata = {
+        'voltage_column': str(voltage_col),
+        'current_column': str(current_col),
+        'current_unit': detect_current_unit(current_col)
+    }
+    return voltages.astype(float), currents.astype(float), metadata
+
+
+def load_cv_data(filepath: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Load CV data from CSV file (parsed once, then served from the CV data cache)"""
+    try:
+        voltages, currents, _ = get_cache().get_or_parse(filepath, _parse_cv_csv, loader='framework',
+                                                         version=CV_CSV_PARSER_VERSION)
+        return voltages, currents
+        
+    except Exception as e:
+        raise ValueError(f"Failed to load CV data from {filepath}: {e}")
+
+
+# Analyzers and corpus store of a validation worker process, set once by its initializer
+_worker_analyzers: Optional[Dict[str, Any]] = None
+_worker_corpus: Optional[CVCorpusStore] = None
+
+
+def _init_validation_worker(analyzers: Dict[str, Any], corpus_path: Optional[str] = None):
+    global _worker_analyzers, _worker_corpus
+    _worker_analyzers = analyzers
+    # Each worker maps the store itself; the pages are shared through the OS cache
+    _worker_corpus = CVCorpusStore(corpus_path) if corpus_path else None
+
+
+def validate_file(filepath: str, analyzers: Optional[Dict[str, Any]] = None,
+                  corpus: Optional[CVCorpusStore] = None) -> Dict:
+    """Run every analyzer on one file; returns a checkpoint record
+    
+    With a corpus store, ``filepath`` is a file name in its catalog and the
+    curve is read from the memory-mapped store instead of the CSV.
+    Load and analysis errors are returned in the record rather than raised,
+    so they are checkpointed like successes and not retried on resume.
+    """
+    analyzers = analyzers or _worker_analyzers
+    corpus = corpus or _worker_corpus
+    record = {'file': filepath}
+    try:
+        if corpus is not None:
+            index = corpus.index_of(filepath)
+            if index is None:
+                raise ValueError(f"{Path(filepath).name} is not in the corpus store {corpus.path}")
+            voltages, currents = corpus.curve(index)
+        else:
+            voltages, currents = load_cv_data(filepath)
+        filename = Path(filepath).name
+        record['results'] = [result_to_json(analyzer.detect_peaks(voltages, currents, filename))
+                             for analyzer in analyzers.values()]
+        record['success'] = True
+    except Exception as e:
+        record['success'] = False
+        record['error'] = str(e)
+    return record
+
+
+def timing_histograms(method_results: Dict[str, List[PeakDetectionResult]]) -> Dict[str, Dict]:
+    """Per-method processing-time histogram and percentiles"""
+    histograms = {}
+    for method, results in method_results.items():
+        times = np.array([r.processing_time for r in results], dtype=float)
+        counts, _ = np.histogram(np.clip(times, TIMING_BIN_EDGES[0], TIMING_BIN_EDGES[-1]),
+                                 bins=TIMING_BIN_EDGES)
+        histograms[method] = {
+            'bin_edges_s': TIMING_BIN_EDGES.tolist(),
+            'counts': counts.tolist(),
+            'total_s': float(times.sum()),
+            'p50_s': float(np.percentile(times, 50)) if len(times) else 0.0,
+            'p90_s': float(np.percentile(times, 90)) if len(times) else 0.0,
+            'p99_s': float(np.percentile(times, 99)) if len(times) else 0.0,
+        }
+    return histograms
+
+
 class PeakDetectionValidator:
     """Main validation framework for 3-method peak detection"""
     
-    def __init__(self, validation_data_path: str = "validation_data"):
+    def __init__(self, validation_data_path: str = "validation_data",
+                 corpus_path: Optional[str] = None):
         self.base_path = Path(validation_data_path)
         self.splits_path = self.base_path / "splits"
         self.results_path = self.base_path / "results"
@@ -620,6 +851,10 @@ class PeakDetectionValidator:
         self.deep_analyzer = DeepCVAnalyzer()
         self.hybrid_analyzer = HybridCVAnalyzer()
         
+        # Packed corpus (cv_corpus_store.py); splits then come from its index lists
+        self.corpus_path = corpus_path
+        self.corpus = CVCorpusStore(corpus_path) if corpus_path else None
+        
         # Results storage
         self.all_results = []
         
@@ -627,51 +862,91 @@ class PeakDetectionValidator:
         print(f"📁 Base path: {self.base_path}")
         print(f"📊 Scientific libs available: {SCIENTIFIC_LIBS_AVAILABLE}")
     
-    def run_validation(self, dataset_split: str = "test") -> Dict[str, ValidationMetrics]:
-        """Run complete validation on specified dataset split"""
+    def _analyzers(self) -> Dict[str, Any]:
+        return dict(zip(METHOD_NAMES, (self.traditional_analyzer, self.deep_analyzer,
+                                       self.hybrid_analyzer)))
+    
+    def _checkpoint_path(self, dataset_split: str, settings: Optional[Dict] = None) -> Path:
+        """Checkpoint file of a run, keyed on the data source and the analyzer settings
+        
+        A changed analyzer config, DeepCV training state or preset gets a fresh
+        checkpoint instead of reusing records computed with the old one.
+        """
+        source = "corpus" if self.corpus is not None else "csv"
+        key = json.dumps({
+            'analyzers': {name: analyzer.config for name, analyzer in self._analyzers().items()},
+            'deep_training': {'samples': len(self.deep_analyzer.training_data),
+                              'is_trained': self.deep_analyzer.is_trained},
+            'corpus': str(Path(self.corpus_path).resolve()) if self.corpus_path else None,
+            # CSV runs and the corpus store both parse with _parse_cv_csv
+            'loader': ['framework', CV_CSV_PARSER_VERSION],
+            'settings': settings
+        }, sort_keys=True, default=str)
+        digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+        return self.results_path / "checkpoints" / f"{dataset_split}_{source}_{digest}.jsonl"
+    
+    def run_validation(self, dataset_split: str = "test", workers: int = 1,
+                       resume: bool = True, settings: Optional[Dict] = None) -> Dict[str, ValidationMetrics]:
+        """Run complete validation on specified dataset split
+        
+        Files are spread over ``workers`` processes (1 runs in this process)
+        and each completed file is checkpointed, so an interrupted run picks
+        up where it stopped unless ``resume`` is False. ``settings`` (e.g. the
+        preset in use) is part of the checkpoint key. The checkpoint is
+        removed once every file has been processed.
+        """
         print(f"\n🚀 Starting {dataset_split} set validation...")
         
         # Load file list
-        split_file = self.splits_path / f"{dataset_split}_files.txt"
-        if not split_file.exists():
-            raise FileNotFoundError(f"Split file not found: {split_file}")
-        
-        with open(split_file, 'r') as f:
-            file_list = [line.strip() for line in f if line.strip()]
+        if self.corpus is not None:
+            indices = self.corpus.split_indices(dataset_split)
+            file_list = [str(name) for name in self.corpus.catalog['filename'][indices]]
+        else:
+            split_file = self.splits_path / f"{dataset_split}_files.txt"
+            if not split_file.exists():
+                raise FileNotFoundError(f"Split file not found: {split_file}")
+            
+            with open(split_file, 'r') as f:
+                file_list = [line.strip() for line in f if line.strip()]
         
-        print(f"📊 Processing {len(file_list)} files...")
+        checkpoint = ValidationCheckpoint(self._checkpoint_path(dataset_split, settings))
+        if not resume:
+            checkpoint.clear()
+        split_files = set(file_list)
+        completed = {f: r for f, r in checkpoint.load().items() if f in split_files}
+        pending = [f for f in file_list if f not in completed]
         
-        # Process each file with all three methods
-        method_results = {"TraditionalCV": [], "DeepCV": [], "HybridCV": []}
+        if completed:
+            print(f"♻️  Resuming: {len(completed)} files already done")
+        print(f"📊 Processing {len(pending)} files with {workers} worker(s)...")
         
-        for i, filepath in enumerate(file_list):
+        for i, record in enumerate(self._validate_files(pending, workers)):
             if i % 100 == 0:
-                print(f"Progress: {i}/{len(file_list)} files processed")
+                print(f"Progress: {len(completed) + i}/{len(file_list)} files processed")
             
-            try:
-                # Load CV data
-                voltages, currents = self._load_cv_data(filepath)
-                filename = Path(filepath).name
-                
-                # Apply all three methods
-                traditional_result = self.traditional_analyzer.detect_peaks(voltages, currents, filename)
-                deep_result = self.deep_analyzer.detect_peaks(voltages, currents, filename)
-                hybrid_result = self.hybrid_analyzer.detect_peaks(voltages, currents, filename)
-                
-                # Store results
-                method_results["TraditionalCV"].append(traditional_result)
-                method_results["DeepCV"].append(deep_result)
-                method_results["HybridCV"].append(hybrid_result)
-                
+            checkpoint.append(record)
+            completed[record['file']] = record
+            if record['success']:
                 # Save individual results
-                self._save_individual_results([traditional_result, deep_result, hybrid_result])
-                
-            except Exception as e:
-                logger.error(f"Failed to process {filepath}: {e}")
-                continue
+                self._save_individual_results([result_from_json(r) for r in record['results']])
+            else:
+                logger.error(f"Failed to process {record['file']}: {record['error']}")
         
         print(f"✅ Processed {len(file_list)} files")
         
+        # Keep the checkpoint only if a worker died and left files to retry
+        if split_files.issubset(completed):
+            checkpoint.clear()
+        
+        # Aggregate in split order, skipping files that failed to load
+        method_results = {method: [] for method in METHOD_NAMES}
+        for filepath in file_list:
+            record = completed.get(filepath)
+            if record is None or not record['success']:
+                continue
+            for method, result in zip(METHOD_NAMES, record['results']):
+                method_results[method].append(result_from_json(result))
+        
         # Calculate validation metrics
         validation_metrics = {}
         for method, results in method_results.items():
@@ -679,44 +954,32 @@ class PeakDetectionValidator:
             validation_metrics[method] = metrics
         
         # Save validation report
-        self._save_validation_report(validation_metrics, dataset_split)
+        self._save_validation_report(validation_metrics, dataset_split, timing_histograms(method_results))
         
         return validation_metrics
     
+    def _validate_files(self, file_list: List[str], workers: int) -> Iterator[Dict]:
+        """Yield a checkpoint record per file, in completion order"""
+        analyzers = self._analyzers()
+        if workers <= 1 or len(file_list) <= 1:
+            for filepath in file_list:
+                yield validate_file(filepath, analyzers, self.corpus)
+            return
+        
+        # One task per file keeps the workers evenly loaded whatever the file sizes
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_validation_worker,
+                                 initargs=(analyzers, self.corpus_path)) as pool:
+            futures = {pool.submit(validate_file, filepath): filepath for filepath in file_list}
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    # Worker process died; not checkpointed, so retried on resume
+                    logger.error(f"Worker failed on {futures[future]}: {e}")
+    
     def _load_cv_data(self, filepath: str) -> Tuple[np.ndarray, np.ndarray]:
         """Load CV data from CSV file"""
-        try:
-            # Try to read with pandas first
-            df = pd.read_csv(filepath)
-            
-            # Detect column names (flexible)
-            voltage_cols = [col for col in df.columns if any(term in col.lower() 
-                           for term in ['voltage', 'potential', 'v', 'e'])]
-            current_cols = [col for col in df.columns if any(term in col.lower() 
-                           for term in ['current', 'i', 'amp'])]
-            
-            if not voltage_cols or not current_cols:
-                # Try positional approach
-                if df.shape[1] >= 2:
-                    voltages = df.iloc[:, 0].values  # First column as voltage
-                    currents = df.iloc[:, 1].values  # Second column as current
-                else:
-                    raise ValueError("Insufficient columns in CSV")
-            else:
-                voltages = df[voltage_cols[0]].values
-                currents = df[current_cols[0]].values
-            
-            # Basic validation
-            if len(voltages) != len(currents):
-                raise ValueError("Voltage and current arrays have different lengths")
-            
-            if len(voltages) < 10:
-                raise ValueError("Insufficient data points")
-            
-            return voltages.astype(float), currents.astype(float)
-            
-        except Exception as e:
-            raise ValueError(f"Failed to load CV data from {filepath}: {e}")
+        return load_cv_data(filepath)
     
     def _calculate_validation_metrics(self, method: str, dataset_split: str, 
                                     results: List[PeakDetectionResult]) -> ValidationMetrics:
@@ -790,17 +1053,13 @@ class PeakDetectionValidator:
         filepath = self.results_path / "individual_results" / filename
         
         # Convert to JSON-serializable format
-        json_results = []
-        for result in results:
-            json_result = asdict(result)
-            json_result['timestamp'] = result.timestamp.isoformat()
-            json_results.append(json_result)
+        json_results = [result_to_json(result) for result in results]
         
         with open(filepath, 'w') as f:
-            json.dump(json_results, f, indent=2)
+            json.dump(json_results, f, indent=2, default=_json_default)
     
     def _save_validation_report(self, metrics: Dict[str, ValidationMetrics], 
-                               dataset_split: str):
+                               dataset_split: str, timing: Optional[Dict[str, Dict]] = None):
         """Save comprehensive validation report"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"validation_report_{dataset_split}_{timestamp}.json"
@@ -820,16 +1079,17 @@ class PeakDetectionValidator:
                 "scientific_libs_available": SCIENTIFIC_LIBS_AVAILABLE
             },
             "method_metrics": json_metrics,
-            "performance_comparison": self._generate_performance_comparison(metrics)
+            "performance_comparison": self._generate_performance_comparison(metrics),
+            "timing_histograms": timing or {}
         }
         
         with open(filepath, 'w') as f:
-            json.dump(report, f, indent=2)
+            json.dump(report, f, indent=2, default=_json_default)
         
         print(f"📊 Validation report saved: {filepath}")
         
         # Print summary to console
-        self._print_validation_summary(metrics, dataset_split)
+        self._print_validation_summary(metrics, dataset_split, timing)
     
     def _generate_performance_comparison(self, metrics: Dict[str, ValidationMetrics]) -> Dict:
         """Generate performance comparison between methods"""
@@ -888,7 +1148,8 @@ class PeakDetectionValidator:
             "scores": scores
         }
     
-    def _print_validation_summary(self, metrics: Dict[str, ValidationMetrics], dataset_split: str):
+    def _print_validation_summary(self, metrics: Dict[str, ValidationMetrics], dataset_split: str,
+                                  timing: Optional[Dict[str, Dict]] = None):
         """Print validation summary to console"""
         print(f"\n📊 Validation Summary - {dataset_split.upper()} Set")
         print("=" * 60)
@@ -904,24 +1165,39 @@ class PeakDetectionValidator:
             print(f"   Avg Time: {metric.average_processing_time:.3f}s")
             print(f"   Peak Potential σ: {metric.peak_potential_std:.4f}V")
             print(f"   RMSE Potential: {metric.rmse_potential:.4f}V")
+            if timing and method in timing:
+                t = timing[method]
+                print(f"   Time p50/p90/p99: {t['p50_s']:.3f}s / {t['p90_s']:.3f}s / {t['p99_s']:.3f}s")
         
         print("\n✅ Validation completed successfully!")
 
 def main():
     """Main execution function"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="3-Method Peak Detection Framework Validation")
+    parser.add_argument('--split', choices=['train', 'validation', 'test'], default='test',
+                        help='Dataset split to validate (default: test)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Number of worker processes (default: all cores)')
+    parser.add_argument('--restart', action='store_true',
+                        help='Discard checkpointed results and start from scratch')
+    parser.add_argument('--corpus', default=None,
+                        help='Read curves from a packed corpus store instead of the CSV files')
+    args = parser.parse_args()
+    
     print("🎯 H743Poten 3-Method Peak Detection Framework")
     print("=" * 60)
     print("🔬 Methods: DeepCV + TraditionalCV + HybridCV")
     print(f"📊 Scientific Libraries: {'✅ Available' if SCIENTIFIC_LIBS_AVAILABLE else '❌ Limited'}")
     
     # Initialize validator
-    validator = PeakDetectionValidator()
+    validator = PeakDetectionValidator(corpus_path=args.corpus)
     
-    # Run validation on test set
-    print("\n🚀 Starting validation on test set...")
+    print(f"\n🚀 Starting validation on {args.split} set...")
     
     try:
-        metrics = validator.run_validation("test")
+        metrics = validator.run_validation(args.split, workers=args.workers, resume=not args.restart)
         
         print("\n🎉 3-Method Peak Detection Validation Completed!")
         print(f"📁 Results saved in: {validator.results_path}")
@@ -30,6 +30,8 @@ Examples:
   python run_validation.py --preset fast       # Use fast preset for quick testing
   python run_validation.py --preset accurate   # Use high accuracy preset
   python run_validation.py --split validation  # Run on validation set
+  python run_validation.py --workers 8         # Spread files over 8 processes
+  python run_validation.py --restart           # Ignore checkpointed results
   python run_validation.py --demo              # Run demonstration mode
   python run_validation.py --check             # Check system status only
         """
@@ -67,6 +69,26 @@ Examples:
         help='Enable verbose output'
     )
     
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Worker processes (default: preset max_workers, or 1 if the preset is serial)'
+    )
+    
+    parser.add_argument(
+        '--restart',
+        action='store_true',
+        help='Discard checkpointed results of the split and start from scratch'
+    )
+    
+    parser.add_argument(
+        '--corpus',
+        type=str,
+        default=None,
+        help='Read curves from a store packed by cv_corpus_store.py instead of the CSV files'
+    )
+    
     parser.add_argument(
         '--output-dir',
         type=str,
@@ -202,7 +224,8 @@ def apply_configuration_preset(preset_name):
         print(f"❌ Unknown preset: {preset_name}")
         return None
 
-def run_validation(split_name, preset_config, verbose=False):
+def run_validation(split_name, preset_config, verbose=False, workers=None, resume=True,
+                   corpus_path=None):
     """Run the main validation"""
     print(f"\n🚀 Starting Validation on {split_name.upper()} set")
     print("=" * 50)
@@ -211,7 +234,7 @@ def run_validation(split_name, preset_config, verbose=False):
     
     try:
         # Initialize validator
-        validator = PeakDetectionValidator()
+        validator = PeakDetectionValidator(corpus_path=corpus_path)
         
         # Apply custom configuration if provided
         if preset_config:
@@ -219,8 +242,13 @@ def run_validation(split_name, preset_config, verbose=False):
             # For now, we use the default initialization
             pass
         
+        if workers is None:
+            validation_config = (preset_config or {}).get('validation', {})
+            workers = validation_config.get('max_workers', 1) if validation_config.get('parallel_processing') else 1
+        
         # Run validation
-        results = validator.run_validation(split_name)
+        results = validator.run_validation(split_name, workers=workers, resume=resume,
+                                           settings=preset_config)
         
         if results:
             total_time = time.time() - start_time
@@ -291,7 +319,8 @@ def main():
     preset_config = apply_configuration_preset(args.preset)
     
     # Run validation
-    success = run_validation(args.split, preset_config, args.verbose)
+    success = run_validation(args.split, preset_config, args.verbose, args.workers, not args.restart,
+                             args.corpus)
     
     if success:
         print("\n🎉 VALIDATION COMPLETED SUCCESSFULLY!")
@@ -2,6 +2,8 @@
 """
 Production entry point for H743Poten Web Interface
 Uses Gunicorn for better performance and stability
+
+Run with: gunicorn -c gunicorn.conf.py wsgi:application
 """
 
 import os